@@ -104,11 +104,37 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("Failed to create default user", error=str(e), exc_info=True)
 
+    # Periodically rebuild per-user stats rollups from the base tables
+    try:
+        from backend_gateway.services.stats_rollup_service import stats_rollups
+
+        stats_rollups.start()
+    except Exception as e:
+        logger.warning(f"Failed to start stats rollup refresh: {e}")
+
     logger.info("PrepSense backend startup completed successfully")
     yield
 
     # Shutdown
     logger.info("Shutting down PrepSense backend...")
+    try:
+        from backend_gateway.services.stats_rollup_service import stats_rollups
+
+        await stats_rollups.stop()
+    except Exception as e:
+        logger.warning(f"Failed to stop stats rollup refresh: {e}")
+    try:
+        from backend_gateway.services.postgres_service import close_shared_pools
+
+        close_shared_pools()
+    except Exception as e:
+        logger.warning(f"Failed to close database pools: {e}")
+    try:
+        from backend_gateway.services.spoonacular_service import close_shared_clients
+
+        await close_shared_clients()
+    except Exception as e:
+        logger.warning(f"Failed to close Spoonacular HTTP clients: {e}")
     logger.info("PrepSense backend shutdown completed")
 
 
@@ -214,6 +240,11 @@ from backend_gateway.routers.chat_router import router as chat_router
 
 app.include_router(chat_router, prefix=f"{settings.API_V1_STR}", tags=["recipes"])
 
+# Streaming chat (SSE); the router carries its full /api/v1/chat prefix
+from backend_gateway.routers.chat_streaming_router import router as chat_streaming_router
+
+app.include_router(chat_streaming_router)
+
 
 # Import spoonacular router
 from backend_gateway.routers.spoonacular_router import router as spoonacular_router
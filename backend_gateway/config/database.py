@@ -28,6 +28,16 @@ class DatabaseConfig:
             "password": os.getenv("POSTGRES_PASSWORD", ""),
         }
 
+        # Connection pool sizing, shared by the threaded and asyncio pools
+        self.pool_config = {
+            "min_size": int(os.getenv("POSTGRES_POOL_MIN_SIZE", "1")),
+            "max_size": int(os.getenv("POSTGRES_POOL_MAX_SIZE", "20")),
+            "acquire_timeout": float(os.getenv("POSTGRES_POOL_ACQUIRE_TIMEOUT", "10")),
+            "statement_cache_size": int(os.getenv("POSTGRES_STATEMENT_CACHE_SIZE", "100")),
+            "command_timeout": float(os.getenv("POSTGRES_COMMAND_TIMEOUT", "60")),
+            "async_enabled": os.getenv("POSTGRES_ASYNC_POOL", "true").lower() == "true",
+        }
+
         # Cloud SQL specific
         self.cloud_sql_connection_name = os.getenv("CLOUD_SQL_CONNECTION_NAME")
 
@@ -77,7 +87,7 @@ class DatabaseConfig:
             if self.cloud_sql_connection_name and self.postgres_config["host"] == "127.0.0.1":
                 logger.info("Using Cloud SQL Proxy connection")
 
-            return PostgresService(self.postgres_config)
+            return PostgresService(self.postgres_config, pool_config=self.pool_config)
 
     def get_pantry_service(self):
         """Get pantry service with appropriate database backend"""
@@ -72,6 +72,10 @@ class Settings(BaseSettings):
 
     # Spoonacular Configuration
     SPOONACULAR_API_KEY: Optional[str] = None
+    SPOONACULAR_MAX_CONNECTIONS: int = 20
+    SPOONACULAR_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    # Seconds a request waits for recipe details of search results (bulk lookups)
+    SPOONACULAR_HYDRATION_BUDGET: float = 8.0
 
     # CrewAI Configuration
     SERPER_API_KEY: Optional[str] = None
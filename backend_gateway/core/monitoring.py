@@ -34,6 +34,12 @@ DATABASE_QUERIES = Counter(
     "database_queries_total", "Total database queries", ["query_type", "status"]
 )
 
+CHAT_TIME_TO_FIRST_RECIPE = Histogram(
+    "chat_time_to_first_recipe_seconds",
+    "Time from a streaming chat request to its first recipe card",
+    buckets=(0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
 
 def init_sentry(environment: str = "development") -> None:
     """Initialize Sentry error tracking."""
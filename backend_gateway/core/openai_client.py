@@ -3,13 +3,14 @@
 import logging
 from typing import Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from .config_utils import get_openai_api_key
 
 logger = logging.getLogger(__name__)
 
 _client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
 
 
 def get_openai_client() -> OpenAI:
@@ -39,7 +40,35 @@ def get_openai_client() -> OpenAI:
     return _client
 
 
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Get or create a singleton AsyncOpenAI client instance for use in async code paths.
+
+    Returns:
+        AsyncOpenAI: Configured async OpenAI client instance
+
+    Raises:
+        ValueError: If OpenAI API key is not configured
+    """
+    global _async_client
+
+    if _async_client is None:
+        try:
+            api_key = get_openai_api_key()
+            _async_client = AsyncOpenAI(api_key=api_key)
+            logger.info("Async OpenAI client initialized successfully")
+        except ValueError as e:
+            logger.error(f"Failed to initialize async OpenAI client: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error initializing async OpenAI client: {e}")
+            raise ValueError(f"Failed to initialize async OpenAI client: {e}") from e
+
+    return _async_client
+
+
 def reset_client():
-    """Reset the client instance. Useful for testing."""
-    global _client
+    """Reset the client instances. Useful for testing."""
+    global _client, _async_client
     _client = None
+    _async_client = None
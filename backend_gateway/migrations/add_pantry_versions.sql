@@ -0,0 +1,62 @@
+-- Per-user pantry version, bumped on every pantry_items write by the triggers
+-- below (see services/pantry_version_service.py). Pantry-aware caches key on it
+-- instead of hashing the whole pantry.
+
+CREATE TABLE IF NOT EXISTS pantry_versions (
+    user_id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Statement-level, so a batch insert bumps each affected user once
+CREATE OR REPLACE FUNCTION bump_pantry_versions()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        -- An item moved between pantries changes both owners' pantries
+        INSERT INTO pantry_versions AS v (user_id, version, updated_at)
+        SELECT DISTINCT p.user_id, 1, CURRENT_TIMESTAMP
+        FROM (
+            SELECT pantry_id FROM changed_pantry_items
+            UNION
+            SELECT pantry_id FROM previous_pantry_items
+        ) c
+        JOIN pantries p ON p.pantry_id = c.pantry_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET version = v.version + 1, updated_at = EXCLUDED.updated_at;
+    ELSE
+        INSERT INTO pantry_versions AS v (user_id, version, updated_at)
+        SELECT DISTINCT p.user_id, 1, CURRENT_TIMESTAMP
+        FROM changed_pantry_items c
+        JOIN pantries p ON p.pantry_id = c.pantry_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET version = v.version + 1, updated_at = EXCLUDED.updated_at;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS pantry_items_version_insert ON pantry_items;
+CREATE TRIGGER pantry_items_version_insert
+AFTER INSERT ON pantry_items
+REFERENCING NEW TABLE AS changed_pantry_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_pantry_versions();
+
+DROP TRIGGER IF EXISTS pantry_items_version_update ON pantry_items;
+CREATE TRIGGER pantry_items_version_update
+AFTER UPDATE ON pantry_items
+REFERENCING OLD TABLE AS previous_pantry_items NEW TABLE AS changed_pantry_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_pantry_versions();
+
+DROP TRIGGER IF EXISTS pantry_items_version_delete ON pantry_items;
+CREATE TRIGGER pantry_items_version_delete
+AFTER DELETE ON pantry_items
+REFERENCING OLD TABLE AS changed_pantry_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_pantry_versions();
+
+INSERT INTO pantry_versions (user_id)
+SELECT DISTINCT user_id FROM pantries
+ON CONFLICT (user_id) DO NOTHING;
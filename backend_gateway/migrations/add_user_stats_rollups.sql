@@ -0,0 +1,373 @@
+-- Per-user statistics rollups for /stats/comprehensive (see services/stats_rollup_service.py).
+-- Statement-level triggers keep them current on pantry_items, pantry_history and
+-- user_recipes writes, and a row trigger on pantry deletes; refresh_user_stats_rollups()
+-- rebuilds one user's rows from the base tables (run below as the backfill, and
+-- periodically by the backend).
+-- Run after add_user_recipes_status.sql.
+
+-- pantry_items rows per user, day of created_at and product
+CREATE TABLE IF NOT EXISTS user_pantry_daily (
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    product_name TEXT NOT NULL,  -- '' for NULL
+    items_added INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, product_name)
+);
+
+-- Current pantry_items per user, category and expiration date
+CREATE TABLE IF NOT EXISTS user_pantry_state (
+    user_id INTEGER NOT NULL,
+    category TEXT NOT NULL,  -- '' for NULL
+    expiration_date DATE NOT NULL,  -- 'infinity' for NULL
+    items INTEGER NOT NULL DEFAULT 0,
+    quantity_count INTEGER NOT NULL DEFAULT 0,  -- items with a quantity
+    quantity_sum NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, category, expiration_date)
+);
+
+-- Recipe completions (pantry_history rows) per user and day
+CREATE TABLE IF NOT EXISTS user_cooking_daily (
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    recipes_cooked INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+-- The counters of UserRecipesService.get_recipe_stats
+CREATE TABLE IF NOT EXISTS user_recipe_counts (
+    user_id INTEGER PRIMARY KEY,
+    total_recipes INTEGER NOT NULL DEFAULT 0,
+    favorite_recipes INTEGER NOT NULL DEFAULT 0,
+    ai_generated_recipes INTEGER NOT NULL DEFAULT 0,
+    bookmarked_external_recipes INTEGER NOT NULL DEFAULT 0,
+    liked_recipes INTEGER NOT NULL DEFAULT 0,
+    disliked_recipes INTEGER NOT NULL DEFAULT 0,
+    saved_recipes INTEGER NOT NULL DEFAULT 0,
+    cooked_recipes INTEGER NOT NULL DEFAULT 0
+);
+
+-- Lifetime counters and rollup timestamps per user
+CREATE TABLE IF NOT EXISTS user_stats_totals (
+    user_id INTEGER PRIMARY KEY,
+    recipe_items_used INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- last trigger update
+    refreshed_at TIMESTAMP  -- last rebuild from the base tables
+);
+
+-- Deltas: items is a JSON array of changed rows, direction 1 (added) or -1 (removed)
+
+CREATE OR REPLACE FUNCTION apply_pantry_items_rollup(items JSONB, direction INTEGER)
+RETURNS VOID AS $$
+    WITH changed AS (
+        SELECT p.user_id, i.*
+        FROM jsonb_to_recordset(items) AS i(
+            pantry_id INTEGER,
+            product_name TEXT,
+            category TEXT,
+            expiration_date DATE,
+            quantity NUMERIC,
+            created_at TIMESTAMP
+        )
+        JOIN pantries p ON p.pantry_id = i.pantry_id
+    ),
+    daily AS (
+        INSERT INTO user_pantry_daily AS d (user_id, day, product_name, items_added)
+        SELECT user_id, created_at::date, COALESCE(product_name, ''), direction * COUNT(*)
+        FROM changed
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, day, product_name) DO UPDATE
+        SET items_added = d.items_added + EXCLUDED.items_added
+    ),
+    state AS (
+        INSERT INTO user_pantry_state AS s (
+            user_id, category, expiration_date, items, quantity_count, quantity_sum
+        )
+        SELECT
+            user_id,
+            COALESCE(category, ''),
+            COALESCE(expiration_date, 'infinity'),
+            direction * COUNT(*),
+            direction * COUNT(quantity),
+            direction * COALESCE(SUM(quantity), 0)
+        FROM changed
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, category, expiration_date) DO UPDATE
+        SET items = s.items + EXCLUDED.items,
+            quantity_count = s.quantity_count + EXCLUDED.quantity_count,
+            quantity_sum = s.quantity_sum + EXCLUDED.quantity_sum
+    )
+    INSERT INTO user_stats_totals AS t (user_id, updated_at)
+    SELECT DISTINCT user_id, CURRENT_TIMESTAMP FROM changed
+    ON CONFLICT (user_id) DO UPDATE SET updated_at = EXCLUDED.updated_at;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION apply_pantry_history_rollup(items JSONB, direction INTEGER)
+RETURNS VOID AS $$
+    WITH changed AS (
+        SELECT i.user_id, i.changed_at::date AS day
+        FROM jsonb_to_recordset(items) AS i(
+            user_id INTEGER, change_source TEXT, changed_at TIMESTAMPTZ
+        )
+        WHERE i.change_source = 'recipe_completion' AND i.changed_at IS NOT NULL
+    ),
+    daily AS (
+        INSERT INTO user_cooking_daily AS c (user_id, day, recipes_cooked)
+        SELECT user_id, day, direction * COUNT(*)
+        FROM changed
+        GROUP BY 1, 2
+        ON CONFLICT (user_id, day) DO UPDATE
+        SET recipes_cooked = c.recipes_cooked + EXCLUDED.recipes_cooked
+    )
+    INSERT INTO user_stats_totals AS t (user_id, recipe_items_used, updated_at)
+    SELECT user_id, direction * COUNT(*), CURRENT_TIMESTAMP
+    FROM changed
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET recipe_items_used = t.recipe_items_used + EXCLUDED.recipe_items_used,
+        updated_at = EXCLUDED.updated_at;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION apply_user_recipes_rollup(items JSONB, direction INTEGER)
+RETURNS VOID AS $$
+    WITH counts AS (
+        INSERT INTO user_recipe_counts AS r (
+            user_id, total_recipes, favorite_recipes, ai_generated_recipes,
+            bookmarked_external_recipes, liked_recipes, disliked_recipes,
+            saved_recipes, cooked_recipes
+        )
+        SELECT
+            user_id,
+            direction * COUNT(*) FILTER (WHERE source <> 'spoonacular'),
+            direction * COUNT(*) FILTER (WHERE is_favorite AND source <> 'spoonacular'),
+            direction * COUNT(*) FILTER (WHERE source = 'chat'),
+            direction * COUNT(*) FILTER (WHERE source = 'spoonacular'),
+            direction * COUNT(*) FILTER (WHERE rating = 'thumbs_up' AND source <> 'spoonacular'),
+            direction * COUNT(*) FILTER (WHERE rating = 'thumbs_down' AND source <> 'spoonacular'),
+            direction * COUNT(*) FILTER (WHERE status = 'saved' AND source <> 'spoonacular'),
+            direction * COUNT(*) FILTER (WHERE status = 'cooked' AND source <> 'spoonacular')
+        FROM jsonb_to_recordset(items) AS i(
+            user_id INTEGER, source TEXT, is_favorite BOOLEAN, rating TEXT, status TEXT
+        )
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET total_recipes = r.total_recipes + EXCLUDED.total_recipes,
+            favorite_recipes = r.favorite_recipes + EXCLUDED.favorite_recipes,
+            ai_generated_recipes = r.ai_generated_recipes + EXCLUDED.ai_generated_recipes,
+            bookmarked_external_recipes =
+                r.bookmarked_external_recipes + EXCLUDED.bookmarked_external_recipes,
+            liked_recipes = r.liked_recipes + EXCLUDED.liked_recipes,
+            disliked_recipes = r.disliked_recipes + EXCLUDED.disliked_recipes,
+            saved_recipes = r.saved_recipes + EXCLUDED.saved_recipes,
+            cooked_recipes = r.cooked_recipes + EXCLUDED.cooked_recipes
+        RETURNING user_id
+    )
+    INSERT INTO user_stats_totals AS t (user_id, updated_at)
+    SELECT DISTINCT user_id, CURRENT_TIMESTAMP FROM counts
+    ON CONFLICT (user_id) DO UPDATE SET updated_at = EXCLUDED.updated_at;
+$$ LANGUAGE sql;
+
+-- Statement-level triggers; updates only move rows whose counted columns changed
+
+CREATE OR REPLACE FUNCTION rollup_pantry_items()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_pantry_items_rollup(
+            (SELECT jsonb_agg(to_jsonb(n)) FROM new_pantry_items n), 1
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM apply_pantry_items_rollup(
+            (SELECT jsonb_agg(to_jsonb(o)) FROM old_pantry_items o), -1
+        );
+    ELSE
+        PERFORM apply_pantry_items_rollup(
+            (SELECT jsonb_agg(to_jsonb(o))
+             FROM old_pantry_items o
+             JOIN new_pantry_items n USING (pantry_item_id)
+             WHERE (o.pantry_id, o.product_name, o.category, o.expiration_date, o.quantity,
+                    o.created_at)
+                IS DISTINCT FROM (n.pantry_id, n.product_name, n.category, n.expiration_date,
+                                  n.quantity, n.created_at)),
+            -1
+        );
+        PERFORM apply_pantry_items_rollup(
+            (SELECT jsonb_agg(to_jsonb(n))
+             FROM old_pantry_items o
+             JOIN new_pantry_items n USING (pantry_item_id)
+             WHERE (o.pantry_id, o.product_name, o.category, o.expiration_date, o.quantity,
+                    o.created_at)
+                IS DISTINCT FROM (n.pantry_id, n.product_name, n.category, n.expiration_date,
+                                  n.quantity, n.created_at)),
+            1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_pantry_history()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_pantry_history_rollup(
+            (SELECT jsonb_agg(to_jsonb(n)) FROM new_pantry_history n), 1
+        );
+    ELSE
+        PERFORM apply_pantry_history_rollup(
+            (SELECT jsonb_agg(to_jsonb(o)) FROM old_pantry_history o), -1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_user_recipes()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_user_recipes_rollup(
+            (SELECT jsonb_agg(to_jsonb(n)) FROM new_user_recipes n), 1
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM apply_user_recipes_rollup(
+            (SELECT jsonb_agg(to_jsonb(o)) FROM old_user_recipes o), -1
+        );
+    ELSE
+        PERFORM apply_user_recipes_rollup(
+            (SELECT jsonb_agg(to_jsonb(o))
+             FROM old_user_recipes o
+             JOIN new_user_recipes n USING (id)
+             WHERE (o.user_id, o.source, o.is_favorite, o.rating, o.status)
+                IS DISTINCT FROM (n.user_id, n.source, n.is_favorite, n.rating, n.status)),
+            -1
+        );
+        PERFORM apply_user_recipes_rollup(
+            (SELECT jsonb_agg(to_jsonb(n))
+             FROM old_user_recipes o
+             JOIN new_user_recipes n USING (id)
+             WHERE (o.user_id, o.source, o.is_favorite, o.rating, o.status)
+                IS DISTINCT FROM (n.user_id, n.source, n.is_favorite, n.rating, n.status)),
+            1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS pantry_items_rollup_insert ON pantry_items;
+CREATE TRIGGER pantry_items_rollup_insert
+AFTER INSERT ON pantry_items
+REFERENCING NEW TABLE AS new_pantry_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_pantry_items();
+
+DROP TRIGGER IF EXISTS pantry_items_rollup_update ON pantry_items;
+CREATE TRIGGER pantry_items_rollup_update
+AFTER UPDATE ON pantry_items
+REFERENCING OLD TABLE AS old_pantry_items NEW TABLE AS new_pantry_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_pantry_items();
+
+DROP TRIGGER IF EXISTS pantry_items_rollup_delete ON pantry_items;
+CREATE TRIGGER pantry_items_rollup_delete
+AFTER DELETE ON pantry_items
+REFERENCING OLD TABLE AS old_pantry_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_pantry_items();
+
+-- Deleting a pantry cascades to its pantry_items after the pantries row is gone, so
+-- apply_pantry_items_rollup can no longer find their user; take them out beforehand
+CREATE OR REPLACE FUNCTION rollup_pantry_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_pantry_items_rollup(
+        (SELECT jsonb_agg(to_jsonb(pi)) FROM pantry_items pi WHERE pi.pantry_id = OLD.pantry_id),
+        -1
+    );
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS pantries_rollup_delete ON pantries;
+CREATE TRIGGER pantries_rollup_delete
+BEFORE DELETE ON pantries
+FOR EACH ROW
+EXECUTE FUNCTION rollup_pantry_delete();
+
+DROP TRIGGER IF EXISTS pantry_history_rollup_insert ON pantry_history;
+CREATE TRIGGER pantry_history_rollup_insert
+AFTER INSERT ON pantry_history
+REFERENCING NEW TABLE AS new_pantry_history
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_pantry_history();
+
+DROP TRIGGER IF EXISTS pantry_history_rollup_delete ON pantry_history;
+CREATE TRIGGER pantry_history_rollup_delete
+AFTER DELETE ON pantry_history
+REFERENCING OLD TABLE AS old_pantry_history
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_pantry_history();
+
+DROP TRIGGER IF EXISTS user_recipes_rollup_insert ON user_recipes;
+CREATE TRIGGER user_recipes_rollup_insert
+AFTER INSERT ON user_recipes
+REFERENCING NEW TABLE AS new_user_recipes
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_user_recipes();
+
+DROP TRIGGER IF EXISTS user_recipes_rollup_update ON user_recipes;
+CREATE TRIGGER user_recipes_rollup_update
+AFTER UPDATE ON user_recipes
+REFERENCING OLD TABLE AS old_user_recipes NEW TABLE AS new_user_recipes
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_user_recipes();
+
+DROP TRIGGER IF EXISTS user_recipes_rollup_delete ON user_recipes;
+CREATE TRIGGER user_recipes_rollup_delete
+AFTER DELETE ON user_recipes
+REFERENCING OLD TABLE AS old_user_recipes
+FOR EACH STATEMENT
+EXECUTE FUNCTION rollup_user_recipes();
+
+-- Rebuild one user's rollups from the base tables (backfill and drift repair)
+CREATE OR REPLACE FUNCTION refresh_user_stats_rollups(p_user_id INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    -- Serialize refreshes of the same user
+    PERFORM pg_advisory_xact_lock(hashtext('user_stats_rollups'), p_user_id);
+
+    DELETE FROM user_pantry_daily WHERE user_id = p_user_id;
+    DELETE FROM user_pantry_state WHERE user_id = p_user_id;
+    DELETE FROM user_cooking_daily WHERE user_id = p_user_id;
+    DELETE FROM user_recipe_counts WHERE user_id = p_user_id;
+
+    PERFORM apply_pantry_items_rollup(
+        (SELECT jsonb_agg(to_jsonb(pi))
+         FROM pantry_items pi
+         JOIN pantries p ON p.pantry_id = pi.pantry_id
+         WHERE p.user_id = p_user_id),
+        1
+    );
+    PERFORM apply_user_recipes_rollup(
+        (SELECT jsonb_agg(to_jsonb(ur)) FROM user_recipes ur WHERE ur.user_id = p_user_id), 1
+    );
+
+    INSERT INTO user_cooking_daily (user_id, day, recipes_cooked)
+    SELECT user_id, changed_at::date, COUNT(*)
+    FROM pantry_history
+    WHERE user_id = p_user_id AND change_source = 'recipe_completion' AND changed_at IS NOT NULL
+    GROUP BY 1, 2;
+
+    INSERT INTO user_stats_totals AS t (user_id, recipe_items_used, updated_at, refreshed_at)
+    SELECT p_user_id, COALESCE(SUM(recipes_cooked), 0), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM user_cooking_daily
+    WHERE user_id = p_user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET recipe_items_used = EXCLUDED.recipe_items_used,
+        updated_at = EXCLUDED.updated_at,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_user_stats_rollups(user_id) FROM users;
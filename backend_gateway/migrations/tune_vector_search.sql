@@ -0,0 +1,27 @@
+-- Filtered, tunable vector search (see PostgresService._vector_search)
+-- Run after add_vector_embeddings.sql
+
+-- Iterative index scans (hnsw.iterative_scan) need pgvector 0.8.0 or later. The backend
+-- checks the installed version and leaves the setting off on older ones. Upgrading the
+-- extension is a separate ops step, not part of this migration: install the newer
+-- pgvector package on the database server, then run ALTER EXTENSION vector UPDATE in a
+-- maintenance window and restart the backend so it re-checks the version.
+
+-- Filters evaluated while walking the HNSW index
+CREATE INDEX IF NOT EXISTS idx_recipes_tags
+ON recipes USING GIN ((recipe_data -> 'tags'));
+
+CREATE INDEX IF NOT EXISTS idx_pantry_items_pantry_embedded
+ON pantry_items(pantry_id)
+WHERE embedding IS NOT NULL;
+
+-- HNSW build parameters cannot be altered in place. To rebuild with values chosen
+-- from backend_gateway/scripts/benchmark_vector_search.py, e.g. m = 24,
+-- ef_construction = 128:
+--
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_recipes_embedding_hnsw;
+-- CREATE INDEX CONCURRENTLY idx_recipes_embedding_hnsw
+-- ON recipes
+-- USING hnsw (embedding vector_cosine_ops)
+-- WITH (m = 24, ef_construction = 128)
+-- WHERE embedding IS NOT NULL;
@@ -4,7 +4,7 @@ OCR-related Pydantic models for request/response handling.
 
 from typing import Any, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ParsedItem(BaseModel):
@@ -80,3 +80,4 @@ class DebugStatusResponse(BaseModel):
     openai_client_status: str
     recent_detections: int
     image_hash_examples: list[str]
+    vision_pipeline: dict[str, Any] = Field(default_factory=dict)
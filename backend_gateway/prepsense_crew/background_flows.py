@@ -6,6 +6,7 @@ These flows pre-compute artifacts for the real-time crew to reuse.
 Implements the background/foreground pattern for optimal latency.
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -14,6 +15,9 @@ from typing import Any, Dict, List, Optional
 from crewai.flow.flow import Flow, listen, start
 
 from .cache_manager import ArtifactCacheManager
+from .embeddings import embed_ingredients
+from .executor import BACKGROUND_DEADLINE_S, crew_executor
+from .ml import build_taste_vector
 from .models import PantryArtifact, PantryState, PreferenceArtifact, PreferenceState
 
 logger = logging.getLogger(__name__)
@@ -165,13 +169,9 @@ class PantryAnalysisFlow(Flow[PantryState]):
             return "vectors_skipped"
 
         try:
-            # TODO: Replace with actual embedding service
-            # For now, create mock vectors
-            ingredient_vectors = []
-            for item in self.state.normalized_items:
-                # Mock 384-dimensional embedding
-                vector = [0.1] * 384  # Would use actual embedding model
-                ingredient_vectors.append(vector)
+            # One batch call; names seen before come from the embedding cache
+            names = [item["name"] for item in self.state.normalized_items]
+            ingredient_vectors = embed_ingredients(names).tolist()
 
             self.state.ingredient_vectors = ingredient_vectors
             logger.info(f"Generated {len(ingredient_vectors)} ingredient vectors")
@@ -306,19 +306,8 @@ class PreferenceLearningFlow(Flow[PreferenceState]):
             return "vector_skipped"
 
         try:
-            # Simple preference vector based on ratings
-            # In reality, this would use ML models
-            preference_scores = {
-                "spicy": 0.7,
-                "sweet": 0.3,
-                "savory": 0.8,
-                "healthy": 0.9,
-                "quick": 0.6,
-                "complex": 0.4,
-            }
-
-            # Convert to list for vector storage
-            self.state.preference_vector = list(preference_scores.values())
+            # Taste vector in the recipe embedding space, weighted by ratings
+            self.state.preference_vector = build_taste_vector(self.state.user_interactions)
 
             # Analyze cuisine preferences from interactions
             cuisine_counts = {}
@@ -392,6 +381,12 @@ class PreferenceLearningFlow(Flow[PreferenceState]):
 
 
 # Background Flow Orchestrator
+def _kickoff_flow(flow_class: type, inputs: Any) -> Any:
+    # Flows are built on the worker thread too, so construction errors surface as
+    # failed runs instead of escaping into the caller
+    return flow_class().kickoff(inputs=inputs)
+
+
 class BackgroundFlowOrchestrator:
     """Orchestrates background flows for cache warming"""
 
@@ -404,27 +399,37 @@ class BackgroundFlowOrchestrator:
         """Warm cache for a user by running background flows"""
         results = {}
 
-        try:
-            # Run pantry analysis flow
-            pantry_flow = PantryAnalysisFlow()
-            pantry_result = pantry_flow.kickoff(
-                inputs=PantryFlowInput(user_id=user_id, trigger_reason=trigger_reason)
-            )
-            results["pantry_flow"] = "artifact_persisted" in str(pantry_result)
-
-            # Run preference learning flow
-            preference_flow = PreferenceLearningFlow()
-            preference_result = preference_flow.kickoff(
-                inputs=PreferenceFlowInput(user_id=user_id, trigger_reason=trigger_reason)
-            )
-            results["preference_flow"] = "artifact_persisted" in str(preference_result)
-
-            logger.info("Cache warming completed for user %s: %s", user_id, results)
-            return results
+        # Both flows block (Flow.kickoff runs its own event loop), so they run
+        # concurrently on the crew executor rather than on the caller's loop
+        flow_runs = {
+            "pantry_flow": crew_executor.run(
+                _kickoff_flow,
+                PantryAnalysisFlow,
+                PantryFlowInput(user_id=user_id, trigger_reason=trigger_reason),
+                user_id=user_id,
+                deadline_s=BACKGROUND_DEADLINE_S,
+                kind="pantry_flow",
+            ),
+            "preference_flow": crew_executor.run(
+                _kickoff_flow,
+                PreferenceLearningFlow,
+                PreferenceFlowInput(user_id=user_id, trigger_reason=trigger_reason),
+                user_id=user_id,
+                deadline_s=BACKGROUND_DEADLINE_S,
+                kind="preference_flow",
+            ),
+        }
+        outcomes = await asyncio.gather(*flow_runs.values(), return_exceptions=True)
+
+        for flow_name, outcome in zip(flow_runs, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("Failed to run %s for user %s: %s", flow_name, user_id, outcome)
+                results[flow_name] = False
+            else:
+                results[flow_name] = "artifact_persisted" in str(outcome)
 
-        except Exception as e:
-            logger.error("Failed to warm cache for user %s: %s", user_id, e)
-            return {"pantry_flow": False, "preference_flow": False}
+        logger.info("Cache warming completed for user %s: %s", user_id, results)
+        return results
 
     def should_warm_cache(self, user_id: int) -> bool:
         """Check if user needs cache warming"""
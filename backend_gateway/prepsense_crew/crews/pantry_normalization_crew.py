@@ -8,12 +8,11 @@ from crewai import Crew, Task
 from backend_gateway.crewai.agents.food_categorizer_agent import create_food_categorizer_agent
 from backend_gateway.crewai.agents.unit_canon_agent import create_unit_canon_agent
 from backend_gateway.crewai.agents.fresh_filter_agent import create_fresh_filter_agent
+from backend_gateway.prepsense_crew.executor import BACKGROUND_DEADLINE_S, crew_executor
 import logging
 from typing import Dict, Any, List, Optional
 import json
 import time
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +25,6 @@ class PantryNormalizationCrew:
         self.food_categorizer_agent = create_food_categorizer_agent()
         self.unit_canon_agent = create_unit_canon_agent()
         self.fresh_filter_agent = create_fresh_filter_agent()
-        
-        # Thread pool for executing synchronous crew operations
-        self.executor = ThreadPoolExecutor(max_workers=1)
     
     async def kickoff(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the pantry normalization workflow with real agent collaboration"""
@@ -64,9 +60,13 @@ class PantryNormalizationCrew:
                 process="sequential"  # Ensure proper task sequencing
             )
             
-            # Execute crew in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(self.executor, crew.kickoff)
+            # Execute crew on the shared crew pool to avoid blocking the event loop
+            result = await crew_executor.run(
+                crew.kickoff,
+                user_id=user_id,
+                deadline_s=BACKGROUND_DEADLINE_S,
+                kind="normalization_crew",
+            )
             
             # Process the crew result into structured data
             processed_result = await self._process_crew_result(result, inputs)
@@ -9,12 +9,11 @@ from backend_gateway.crewai.agents.recipe_search_agent import create_recipe_sear
 from backend_gateway.crewai.agents.nutri_check_agent import create_nutri_check_agent
 from backend_gateway.crewai.agents.user_preferences_agent import create_user_preferences_agent
 from backend_gateway.crewai.agents.judge_thyme_agent import create_judge_thyme_agent
+from backend_gateway.prepsense_crew.executor import BACKGROUND_DEADLINE_S, crew_executor
 import logging
 from typing import Dict, Any, List, Optional
 import json
 import time
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +27,6 @@ class RecipeRecommendationCrew:
         self.nutri_check_agent = create_nutri_check_agent()
         self.user_preferences_agent = create_user_preferences_agent()
         self.judge_thyme_agent = create_judge_thyme_agent()
-        
-        # Thread pool for executing synchronous crew operations
-        self.executor = ThreadPoolExecutor(max_workers=1)
     
     async def kickoff(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the recipe recommendation workflow with real agent collaboration"""
@@ -69,9 +65,13 @@ class RecipeRecommendationCrew:
                 process="sequential"  # Ensure proper task sequencing
             )
             
-            # Execute crew in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(self.executor, crew.kickoff)
+            # Execute crew on the shared crew pool to avoid blocking the event loop
+            result = await crew_executor.run(
+                crew.kickoff,
+                user_id=user_id,
+                deadline_s=BACKGROUND_DEADLINE_S,
+                kind="recommendation_crew",
+            )
             
             # Process the crew result into structured data
             processed_result = await self._process_crew_result(result, inputs)
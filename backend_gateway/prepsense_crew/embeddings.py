@@ -2,53 +2,335 @@
 CrewAI Embeddings Module
 
 Utilities for creating embeddings for ingredients and recipes.
+
+Vectors come from an EmbeddingProvider. The default provider is a local hashed
+TF-IDF model (word and character-trigram features hashed into a fixed number of
+buckets), so embeddings are deterministic and work offline. Texts are embedded
+in batches and every vector is kept in a persistent per-text cache, so each
+ingredient is embedded once. Pantry and recipe vectors are built from the same
+ingredient vectors, which puts them in one space and makes their cosine
+similarity meaningful.
 """
 
 import hashlib
-from typing import Any, Dict, List
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(_TOKEN_RE.findall(str(text).lower()))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class EmbeddingProvider:
+    """
+    Turns texts into fixed-size vectors.
+
+    name identifies the model and its settings; cached vectors are keyed by it,
+    so changing either invalidates them.
+    """
+
+    name: str = "provider"
+    dimension: int = 0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a (len(texts), dimension) float32 matrix of L2-normalized rows"""
+        raise NotImplementedError
+
+
+class HashedTfidfEmbedder(EmbeddingProvider):
+    """
+    Local hashed TF-IDF embeddings.
+
+    Each text is split into words and character trigrams of those words, so
+    inflections and compounds ("tomato", "tomatoes", "cherry tomato") share
+    most of their features. Features are hashed into dimension buckets with a
+    stable hash, weighted by sublinear term frequency and, once fit() has seen
+    a corpus, by inverse document frequency.
+    """
+
+    def __init__(self, dimension: int = 256, trigram_weight: float = 0.5):
+        self.dimension = dimension
+        self.trigram_weight = trigram_weight
+        self.idf = np.ones(dimension, dtype=np.float32)
+        self._idf_tag = "noidf"
+
+    @property
+    def name(self) -> str:
+        return f"hashed_tfidf_{self.dimension}_{self._idf_tag}"
+
+    @lru_cache(maxsize=65536)
+    def _bucket(self, feature: str) -> int:
+        # Python's hash() is salted per process, which would break the persistent cache
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.dimension
+
+    def _features(self, text: str) -> Dict[int, float]:
+        counts: Dict[int, float] = {}
+        for word in _TOKEN_RE.findall(text.lower()):
+            bucket = self._bucket("w:" + word)
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                bucket = self._bucket("c:" + padded[i : i + 3])
+                counts[bucket] = counts.get(bucket, 0.0) + self.trigram_weight
+        return counts
+
+    def fit(self, corpus: Iterable[str]) -> "HashedTfidfEmbedder":
+        """Learn bucket IDF weights from a corpus, e.g. every ingredient name in the catalog"""
+        document_frequency = np.zeros(self.dimension, dtype=np.float64)
+        documents = 0
+        for text in corpus:
+            documents += 1
+            document_frequency[list(self._features(text))] += 1
+        if documents:
+            self.idf = (np.log((1 + documents) / (1 + document_frequency)) + 1).astype(np.float32)
+            self._idf_tag = hashlib.blake2b(self.idf.tobytes(), digest_size=4).hexdigest()
+        return self
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            for bucket, count in self._features(text).items():
+                rows.append(row)
+                columns.append(bucket)
+                values.append(1.0 + math.log(count) if count >= 1 else count)
+
+        # _features already sums each bucket, so every (row, column) pair is unique
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        matrix[rows, columns] = values
+        return _normalize_rows(matrix * self.idf)
+
+
+class EmbeddingCache:
+    """
+    Per-text vector cache: an in-process LRU in front of an on-disk SQLite table.
+
+    The table lives at <cache_dir>/embeddings.sqlite3 with one row per
+    (provider name, text); without a cache_dir only the in-process tier is used.
+    """
+
+    def __init__(self, maxsize: int = 20000, cache_dir: Optional[str] = None):
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                with self._connect() as conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS embeddings ("
+                        "provider TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, "
+                        "PRIMARY KEY (provider, text))"
+                    )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Embedding disk cache disabled ({self.cache_dir}): {e}")
+                self.cache_dir = None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager commits but never closes the connection
+        conn = sqlite3.connect(str(self.cache_dir / "embeddings.sqlite3"), timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, provider: str, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for text in texts:
+                vector = self._entries.get((provider, text))
+                if vector is not None:
+                    self._entries.move_to_end((provider, text))
+                    found[text] = vector
+
+        missing = [text for text in texts if text not in found]
+        if missing and self.cache_dir is not None:
+            try:
+                with self._connect() as conn:
+                    for start in range(0, len(missing), 500):
+                        chunk = missing[start : start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        rows = conn.execute(
+                            f"SELECT text, vector FROM embeddings "
+                            f"WHERE provider = ? AND text IN ({placeholders})",
+                            [provider, *chunk],
+                        ).fetchall()
+                        for text, blob in rows:
+                            found[text] = np.frombuffer(blob, dtype=np.float32)
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding disk cache read failed: {e}")
+            self._remember(provider, {text: found[text] for text in missing if text in found})
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, provider: str, vectors: Dict[str, np.ndarray]) -> None:
+        self._remember(provider, vectors)
+        if self.cache_dir is None or not vectors:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (provider, text, vector) VALUES (?, ?, ?)",
+                    [
+                        (provider, text, np.asarray(vector, dtype=np.float32).tobytes())
+                        for text, vector in vectors.items()
+                    ],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding disk cache write failed: {e}")
+
+    def _remember(self, provider: str, vectors: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for text, vector in vectors.items():
+                self._entries[(provider, text)] = vector
+                self._entries.move_to_end((provider, text))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "disk_tier": str(self.cache_dir) if self.cache_dir else None,
+            "hits": self.hits,
+            "lookups": lookups,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _default_cache_dir() -> Optional[str]:
+    # Set EMBEDDING_CACHE_DIR to an empty string to keep the cache in memory only
+    cache_dir = os.getenv("EMBEDDING_CACHE_DIR")
+    if cache_dir is None:
+        cache_dir = os.path.join(os.getenv("CACHE_DIR", "/tmp/prepsense_cache"), "embeddings")
+    return cache_dir or None
+
+
+embedding_provider: EmbeddingProvider = HashedTfidfEmbedder(
+    dimension=int(os.getenv("EMBEDDING_DIMENSION", "256"))
+)
+embedding_cache = EmbeddingCache(
+    maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", "20000")),
+    cache_dir=_default_cache_dir(),
+)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+
+
+def set_embedding_provider(provider: EmbeddingProvider) -> None:
+    """Swap the provider used by this module, e.g. for a hosted embedding model"""
+    global embedding_provider
+    embedding_provider = provider
+
+
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """
+    Embed texts with the current provider, one row per text.
+
+    Texts are normalized and deduplicated; cached vectors are reused and the
+    rest are embedded in batches of EMBEDDING_BATCH_SIZE and cached.
+    """
+    provider = embedding_provider
+    keys = [_normalize_text(text) for text in texts]
+    unique = list(dict.fromkeys(key for key in keys if key))
+    vectors = embedding_cache.get_many(provider.name, unique)
+
+    missing = [key for key in unique if key not in vectors]
+    for start in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+        batch = missing[start : start + EMBEDDING_BATCH_SIZE]
+        embedded = dict(zip(batch, provider.embed(batch)))
+        embedding_cache.put_many(provider.name, embedded)
+        vectors.update(embedded)
+
+    matrix = np.zeros((len(keys), provider.dimension), dtype=np.float32)
+    for row, key in enumerate(keys):
+        if key:
+            matrix[row] = vectors[key]
+    return matrix
+
+
+def embed_ingredients(names: Sequence[str]) -> np.ndarray:
+    """Per-ingredient vectors, one row per name"""
+    return embed_texts(names)
+
+
+def _item_name(item: Dict[str, Any]) -> str:
+    return item.get("clean_name") or item.get("name") or item.get("product_name") or ""
+
+
+def _recipe_ingredient_names(recipe: Dict[str, Any]) -> List[str]:
+    names = []
+    for ingredient in recipe.get("ingredients") or []:
+        if isinstance(ingredient, dict):
+            ingredient = ingredient.get("name") or ingredient.get("original") or ""
+        names.append(str(ingredient))
+    return names
+
+
+def _mean_vector(matrix: np.ndarray) -> np.ndarray:
+    if not len(matrix):
+        return np.zeros(embedding_provider.dimension, dtype=np.float32)
+    return _normalize_rows(matrix.sum(axis=0, keepdims=True))[0]
 
 
 def create_ingredient_embeddings(normalized_items: List[Dict[str, Any]]) -> List[float]:
     """
-    Create embeddings for normalized ingredients.
+    Create the pantry vector for normalized ingredients.
 
-    This is a mock implementation for testing purposes.
-    In production, this would use a proper embedding model.
+    The pantry vector is the normalized mean of the item vectors, so it can be
+    compared directly with recipe vectors.
     """
-    # Simple mock embedding based on ingredient names
     if not normalized_items:
         return []
 
-    # Create a simple hash-based embedding
-    combined_names = " ".join([item.get("clean_name", "") for item in normalized_items])
-    hash_bytes = hashlib.md5(combined_names.encode()).digest()
-
-    # Convert to float vector (mock embedding of size 5)
-    embedding = [float(b) / 255.0 for b in hash_bytes[:5]]
-
-    return embedding
+    names = [_item_name(item) for item in normalized_items]
+    return _mean_vector(embed_ingredients(names)).tolist()
 
 
 def create_recipe_embeddings(recipes: List[Dict[str, Any]]) -> Dict[int, List[float]]:
     """
     Create embeddings for recipes.
 
-    This is a mock implementation for testing purposes.
-    In production, this would use a proper embedding model.
+    A recipe vector is the normalized mean of its ingredient vectors and its
+    name vector. All texts for the batch are embedded in one call.
     """
-    embeddings = {}
-
+    recipes = [recipe for recipe in recipes if recipe.get("id")]
+    texts: List[str] = []
+    offsets = [0]
     for recipe in recipes:
-        recipe_id = recipe.get("id")
-        if not recipe_id:
-            continue
-
-        # Create mock embedding based on recipe name and ingredients
-        text = f"{recipe.get('name', '')} {' '.join(recipe.get('ingredients', []))}"
-        hash_bytes = hashlib.md5(text.encode()).digest()
-
-        # Convert to float vector (mock embedding of size 3)
-        embedding = [float(b) / 255.0 for b in hash_bytes[:3]]
-        embeddings[recipe_id] = embedding
+        texts.append(recipe.get("name") or recipe.get("title") or "")
+        texts.extend(_recipe_ingredient_names(recipe))
+        offsets.append(len(texts))
 
-    return embeddings
+    matrix = embed_texts(texts)
+    return {
+        recipe["id"]: _mean_vector(matrix[offsets[i] : offsets[i + 1]]).tolist()
+        for i, recipe in enumerate(recipes)
+    }
@@ -0,0 +1,204 @@
+"""
+Crew Executor
+
+Shared worker pool for running CrewAI crews and flows off the event loop.
+``Crew.kickoff`` and ``Flow.kickoff`` are blocking (flows even start their own
+event loop), so calling them from an ``async def`` stalls every other request.
+Runs go through a bounded thread pool instead, with a per-user cap on active
+runs of each kind, a bounded queue and deadlines after which the caller stops
+waiting.
+
+Threads cannot be interrupted, so a run that misses its deadline is cancelled
+only if it has not started yet; otherwise it is abandoned and keeps its worker
+(and its user's slot) until it returns. Crew and flow objects hold locks and
+LLM clients that cannot be pickled, which rules out a process pool.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .models import PERFORMANCE_TARGET_MS
+
+logger = logging.getLogger(__name__)
+
+
+class CrewCapacityError(Exception):
+    """Raised when the executor queue or the user's concurrency cap is full"""
+
+
+class CrewDeadlineExceeded(Exception):
+    """Raised when a run does not finish before its deadline"""
+
+    def __init__(self, kind: str, deadline_s: float, started: bool):
+        state = "still running" if started else "never started"
+        super().__init__(f"{kind} run exceeded its {deadline_s:.2f}s deadline ({state})")
+        self.kind = kind
+        self.deadline_s = deadline_s
+        self.started = started
+
+
+class CrewExecutor:
+    """Bounded thread pool for blocking crew/flow runs, with per-user caps and metrics"""
+
+    def __init__(self, max_workers: int = 4, max_per_user: int = 2, max_queue: int = 32):
+        self.max_workers = max_workers
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._active: Dict[tuple, int] = {}  # (kind, user_id) -> queued or running runs
+        self._queued = 0
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self._total_wait_s = 0.0
+        self._max_wait_s = 0.0
+        self._total_run_s = 0.0
+        self._max_run_s = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="crew"
+                )
+            return self._pool
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        user_id: Any = None,
+        deadline_s: Optional[float] = None,
+        kind: str = "crew",
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run fn(*args, **kwargs) on a worker thread and await its result.
+
+        Raises CrewCapacityError if the queue or the user's cap for this kind of run
+        is full, and CrewDeadlineExceeded if the run does not finish within
+        deadline_s seconds.
+        """
+        cap_key = (kind, user_id) if user_id is not None else None
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise CrewCapacityError(f"Crew executor queue is full ({self._queued} waiting)")
+            if cap_key is not None:
+                active = self._active.get(cap_key, 0)
+                if active >= self.max_per_user:
+                    self.rejected += 1
+                    raise CrewCapacityError(
+                        f"User {user_id} already has {active} {kind} runs in progress"
+                    )
+                self._active[cap_key] = active + 1
+            self._queued += 1
+            self.submitted += 1
+
+        submitted_at = time.monotonic()
+        started = threading.Event()
+
+        def _call():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                wait = time.monotonic() - submitted_at
+                self._total_wait_s += wait
+                self._max_wait_s = max(self._max_wait_s, wait)
+            started.set()
+            began = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.monotonic() - began
+                with self._lock:
+                    self._running -= 1
+                    self._total_run_s += elapsed
+                    self._max_run_s = max(self._max_run_s, elapsed)
+
+        future = self._get_pool().submit(_call)
+        future.add_done_callback(functools.partial(self._on_done, cap_key, started))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline_s)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            logger.warning(
+                f"{kind} run for user {user_id} missed its {deadline_s}s deadline "
+                f"({'abandoned while running' if started.is_set() else 'cancelled in queue'})"
+            )
+            raise CrewDeadlineExceeded(kind, deadline_s, started.is_set()) from None
+
+    def _on_done(self, cap_key: Optional[tuple], started: threading.Event, future: Future) -> None:
+        # Runs when the work really finishes (or is cancelled before starting), so an
+        # abandoned run keeps its user's slot until its thread is free again
+        with self._lock:
+            if future.cancelled():
+                self.cancelled += 1
+                if not started.is_set():
+                    self._queued -= 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+            if cap_key is not None:
+                remaining = self._active.get(cap_key, 1) - 1
+                if remaining > 0:
+                    self._active[cap_key] = remaining
+                else:
+                    self._active.pop(cap_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self.completed + self.failed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_per_user": self.max_per_user,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "active_users": len({user_id for _, user_id in self._active}),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "cancelled": self.cancelled,
+                "avg_wait_ms": round(self._total_wait_s / started * 1000, 1) if started else 0.0,
+                "max_wait_ms": round(self._max_wait_s * 1000, 1),
+                "avg_run_ms": (
+                    round(self._total_run_s / (self.completed + self.failed) * 1000, 1)
+                    if self.completed + self.failed
+                    else 0.0
+                ),
+                "max_run_ms": round(self._max_run_s * 1000, 1),
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+crew_executor = CrewExecutor(
+    max_workers=int(os.getenv("CREW_EXECUTOR_WORKERS", "4")),
+    max_per_user=int(os.getenv("CREW_MAX_RUNS_PER_USER", "2")),
+    max_queue=int(os.getenv("CREW_EXECUTOR_MAX_QUEUE", "32")),
+)
+
+# Deadlines: foreground crews answer a waiting user; background flows only warm caches
+FOREGROUND_DEADLINE_MS = int(os.getenv("CREW_FOREGROUND_DEADLINE_MS", str(PERFORMANCE_TARGET_MS)))
+BACKGROUND_DEADLINE_S = float(os.getenv("CREW_BACKGROUND_DEADLINE_S", "30"))
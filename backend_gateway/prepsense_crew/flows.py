@@ -154,7 +154,7 @@ class PantryAnalysisFlow(Flow[PantryState]):
         """Create ingredient embeddings and cache the artifact"""
         # Import embeddings here to avoid circular imports
         try:
-            from backend_gateway.crewai.embeddings import create_ingredient_embeddings
+            from backend_gateway.prepsense_crew.embeddings import create_ingredient_embeddings
 
             self.state.ingredient_vectors = create_ingredient_embeddings(
                 self.state.normalized_items
@@ -256,9 +256,10 @@ class PreferenceLearningFlow(Flow[PreferenceState]):
         """Build user preference vector from interactions"""
         # Import ML utilities here to avoid circular imports
         try:
-            from backend_gateway.crewai.ml import build_preference_vector
+            from backend_gateway.prepsense_crew.ml import build_taste_vector
 
-            self.state.preference_vector = build_preference_vector(self.state.user_interactions)
+            # Same space as recipe embeddings, so recipes can be ranked against it
+            self.state.preference_vector = build_taste_vector(self.state.user_interactions)
         except ImportError:
             # Mock preference vector for testing
             self.state.preference_vector = [0.7, 0.3, 0.9, 0.1, 0.5]
@@ -357,7 +358,7 @@ class RecipeIntelligenceFlow(Flow[RecipeState]):
 
         # Create embeddings for recipes
         try:
-            from backend_gateway.crewai.embeddings import create_recipe_embeddings
+            from backend_gateway.prepsense_crew.embeddings import create_recipe_embeddings
 
             recipe_embeddings = create_recipe_embeddings(recipes)
         except ImportError:
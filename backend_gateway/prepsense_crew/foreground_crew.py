@@ -14,6 +14,7 @@ from typing import Any, Dict, List, Optional
 from crewai import Agent, Crew, Process, Task
 
 from .cache_manager import ArtifactCacheManager
+from .executor import FOREGROUND_DEADLINE_MS, CrewDeadlineExceeded, crew_executor
 from .models import CrewInput, CrewOutput, RecipeArtifact
 
 logger = logging.getLogger(__name__)
@@ -164,9 +165,20 @@ class ForegroundRecipeCrew:
             crew_context = self._prepare_crew_context(crew_input, artifacts)
             logger.info(f"Prepared crew context with keys: {list(crew_context.keys())}")
 
-            # Step 3: Execute crew (target <2s)
+            # Step 3: Execute crew off the event loop (target <2s), giving up at the
+            # performance target
             logger.info("Starting crew kickoff...")
-            result = self.crew.kickoff(inputs=crew_context)
+            elapsed_s = (datetime.now() - start_time).total_seconds()
+            try:
+                result = await crew_executor.run(
+                    self.crew.kickoff,
+                    inputs=crew_context,
+                    user_id=crew_input.user_id,
+                    deadline_s=max(0.0, FOREGROUND_DEADLINE_MS / 1000 - elapsed_s),
+                    kind="foreground_crew",
+                )
+            except CrewDeadlineExceeded as e:
+                return self._handle_deadline_exceeded(crew_input, start_time, e)
             logger.info(f"Crew kickoff completed. Result type: {type(result)}")
 
             # Step 4: Process result and create CrewOutput
@@ -272,6 +284,22 @@ class ForegroundRecipeCrew:
             metadata={"cache_miss": True, "warming_cache": True},
         )
 
+    def _handle_deadline_exceeded(
+        self, crew_input: CrewInput, start_time: datetime, error: CrewDeadlineExceeded
+    ) -> CrewOutput:
+        """Handle a crew run that missed the foreground deadline"""
+        logger.warning(f"Foreground crew for user {crew_input.user_id} timed out: {error}")
+        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+
+        return CrewOutput(
+            response_text="This is taking longer than usual. Please try again in a moment for personalized recommendations!",
+            recipe_cards=[],
+            processing_time_ms=int(processing_time),
+            agents_used=[],
+            cache_hit=False,
+            metadata={"deadline_exceeded": True, "crew_started": error.started},
+        )
+
     def _parse_crew_result(self, result: Any) -> Dict[str, Any]:
         """Parse crew execution result into structured format"""
         try:
@@ -5,7 +5,11 @@ Machine learning utilities for preference learning and recommendation systems.
 """
 
 import math
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import embeddings
 
 
 def build_preference_vector(interactions: List[Dict[str, Any]]) -> List[float]:
@@ -86,26 +90,120 @@ def calculate_recipe_similarity(
     return max(0.0, min(1.0, (similarity + 1) / 2))
 
 
+def build_taste_vector(
+    interactions: List[Dict[str, Any]],
+    recipe_embeddings: Optional[Dict[Any, List[float]]] = None,
+) -> List[float]:
+    """
+    Build a user taste vector in the same space as recipe embeddings.
+
+    Each interaction contributes the embedding of its recipe (from
+    recipe_embeddings by recipe_id, else of its title, cuisine and dietary tags)
+    weighted by its rating: thumbs_up / thumbs_down, or a 1-5 star rating
+    centred on 3. Negative components are clipped so the vector stays in [0, 1].
+    Returns an empty list when no interaction carries a signal.
+    """
+    recipe_embeddings = recipe_embeddings or {}
+    weights, known, texts = [], [], []
+    for interaction in interactions:
+        rating = interaction.get("rating", "neutral")
+        if rating == "thumbs_up":
+            weight = 1.0
+        elif rating == "thumbs_down":
+            weight = -0.5
+        elif isinstance(rating, (int, float)):
+            weight = (rating - 3) / 2
+        else:
+            weight = 0.0
+        if not weight:
+            continue
+
+        weights.append(weight)
+        vector = recipe_embeddings.get(interaction.get("recipe_id"))
+        known.append(vector)
+        if vector is None:
+            tags = " ".join(interaction.get("dietary_tags") or [])
+            cuisine = interaction.get("cuisine_type") or interaction.get("cuisine") or ""
+            title = interaction.get("recipe_title") or interaction.get("title") or ""
+            texts.append(f"{title} {cuisine} {tags}")
+
+    if not weights:
+        return []
+
+    # Embed every interaction without a cached recipe vector in one batch
+    embedded = iter(embeddings.embed_texts(texts)) if texts else iter(())
+    matrix = np.vstack(
+        [
+            np.asarray(vector, dtype=np.float32) if vector is not None else next(embedded)
+            for vector in known
+        ]
+    )
+    taste = np.clip(np.asarray(weights, dtype=np.float32) @ matrix, 0.0, None)
+    norm = np.linalg.norm(taste)
+    return (taste / norm).tolist() if norm > 0 else []
+
+
+def score_recipe_matrix(recipe_matrix: np.ndarray, preference_vector: List[float]) -> np.ndarray:
+    """
+    Similarity of every row of recipe_matrix to preference_vector, in one operation.
+
+    Same scale as calculate_recipe_similarity: cosine mapped to [0, 1].
+    """
+    preference = np.asarray(preference_vector, dtype=np.float32)
+    preference_norm = np.linalg.norm(preference)
+    row_norms = np.linalg.norm(recipe_matrix, axis=1)
+    if not preference_norm:
+        return np.zeros(len(recipe_matrix), dtype=np.float32)
+
+    dots = recipe_matrix @ preference
+    similarity = np.divide(
+        dots,
+        row_norms * preference_norm,
+        out=np.zeros_like(dots),
+        where=row_norms > 0,
+    )
+    scores = np.clip((similarity + 1) / 2, 0.0, 1.0)
+    # Zero vectors score 0, as in calculate_recipe_similarity
+    scores[row_norms == 0] = 0.0
+    return scores
+
+
 def rank_recipes_by_preference(
     recipes: List[Dict[str, Any]], preference_vector: List[float]
 ) -> List[Dict[str, Any]]:
     """
     Rank recipes by user preference similarity.
 
-    Returns recipes sorted by preference score (highest first).
+    Recipe vectors are stacked into a matrix and scored in one operation.
+    Recipes without an "embedding" are embedded in one batch when the
+    preference vector comes from the embedding model, and otherwise get a
+    neutral vector. Returns recipes sorted by preference score (highest first).
     """
-    scored_recipes = []
-
+    dimension = len(preference_vector)
+    missing = [recipe for recipe in recipes if recipe.get("embedding") is None]
+    generated: Dict[Any, List[float]] = {}
+    if missing and dimension and dimension == embeddings.embedding_provider.dimension:
+        generated = embeddings.create_recipe_embeddings(missing)
+
+    neutral = [0.5] * dimension
+    vectors = []
     for recipe in recipes:
-        # Get recipe embedding (mock implementation)
-        recipe_vector = recipe.get("embedding", [0.5] * len(preference_vector))
+        vector = recipe.get("embedding")
+        if vector is None:
+            vector = generated.get(recipe.get("id"), neutral)
+        vectors.append(vector)
+
+    scores = np.zeros(len(recipes), dtype=np.float32)
+    # Vectors of another dimension cannot be compared and score 0
+    comparable = [i for i, vector in enumerate(vectors) if len(vector) == dimension]
+    if comparable and dimension:
+        matrix = np.asarray([vectors[i] for i in comparable], dtype=np.float32)
+        scores[comparable] = score_recipe_matrix(matrix, preference_vector)
 
-        # Calculate similarity score
-        similarity = calculate_recipe_similarity(recipe_vector, preference_vector)
-
-        # Add score to recipe
+    scored_recipes = []
+    for recipe, score in zip(recipes, scores.tolist()):
         recipe_with_score = recipe.copy()
-        recipe_with_score["preference_score"] = similarity
+        recipe_with_score["preference_score"] = score
         scored_recipes.append(recipe_with_score)
 
     # Sort by preference score (descending)
@@ -11,6 +11,9 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Union
 
+# Foreground crew responses should complete within this many milliseconds
+PERFORMANCE_TARGET_MS = 3000
+
 
 @dataclass
 class PantryArtifact:
@@ -194,7 +197,7 @@ class CrewOutput:
     cache_hit: bool = False
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-    def meets_performance_target(self, target_ms: int = 3000) -> bool:
+    def meets_performance_target(self, target_ms: int = PERFORMANCE_TARGET_MS) -> bool:
         """Check if processing time meets performance target"""
         return self.processing_time_ms <= target_ms
 
@@ -31,6 +31,7 @@ class ChatResponse(BaseModel):
     user_preferences: dict[str, Any] = None
     show_preference_choice: bool = False
     nutrient_analysis: dict[str, Any] = None
+    metadata: dict[str, Any] = {}  # processing details, e.g. per-stage timings
 
 
 class ImageGenerationRequest(BaseModel):
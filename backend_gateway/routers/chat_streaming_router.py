@@ -1,22 +1,27 @@
 """
 Streaming Chat Router for PrepSense
 Provides fast, streaming responses for recipe recommendations
+
+Recipe cards are sent as soon as they are ranked and their details (cooking time,
+diets, nutrition) follow as recipe_update events. Work for a stream stops when
+its client disconnects.
 """
 
 import asyncio
 import json
 import logging
-from collections.abc import AsyncGenerator
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from backend_gateway.config.database import get_database_service
-
-# from backend_gateway.services.lean_crew_ai_service import get_lean_crew_service  # Service removed
+from backend_gateway.core.monitoring import CHAT_TIME_TO_FIRST_RECIPE
 from backend_gateway.services.background_flows import BackgroundFlowManager, CacheManager
 
 logger = logging.getLogger(__name__)
@@ -30,33 +35,95 @@ class ChatRequest(BaseModel):
     context: dict[str, Any] = {}
 
 
+class StreamMetrics:
+    """Time-to-first-recipe and stream outcome counters, over a window of recent streams"""
+
+    def __init__(self, window: int = 500):
+        self._first_recipe_ms: deque = deque(maxlen=window)
+        self.streams = 0
+        self.completed = 0
+        self.disconnected = 0
+        self.without_recipes = 0
+
+    def record_first_recipe(self, elapsed_s: float) -> None:
+        self._first_recipe_ms.append(elapsed_s * 1000)
+        CHAT_TIME_TO_FIRST_RECIPE.observe(elapsed_s)
+
+    def snapshot(self) -> dict[str, Any]:
+        samples = sorted(self._first_recipe_ms)
+
+        def _percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 1)
+
+        return {
+            "streams": self.streams,
+            "completed": self.completed,
+            "disconnected": self.disconnected,
+            "without_recipes": self.without_recipes,
+            "time_to_first_recipe_ms": {
+                "samples": len(samples),
+                "p50": _percentile(0.5),
+                "p95": _percentile(0.95),
+                "max": round(samples[-1], 1) if samples else None,
+            },
+        }
+
+
 class ChatStreamingService:
     """Service for handling streaming chat responses"""
 
     def __init__(self, db_service):
         self.db_service = db_service
-        # self.lean_crew_service = get_lean_crew_service(db_service)  # Service removed
         self.background_flows = BackgroundFlowManager()
         self.cache_manager = CacheManager(self.background_flows)
+        self.metrics = StreamMetrics()
+        self._crew_service = None
+        # Cache refreshes outlive the stream that started them; referenced until done
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    @property
+    def crew_service(self):
+        """RealCrewAIService, created on first use (it connects to the artifact cache)"""
+        if self._crew_service is None:
+            from backend_gateway.services.real_crewai_service import RealCrewAIService
+
+            self._crew_service = RealCrewAIService()
+        return self._crew_service
 
     async def process_message_stream(
-        self, message: str, user_id: int, context: dict[str, Any]
+        self,
+        message: str,
+        user_id: int,
+        context: dict[str, Any],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
     ) -> AsyncGenerator[str, None]:
-        """Process chat message and stream response"""
+        """
+        Process chat message and stream response
+
+        is_disconnected is polled between events; once it returns True the stream
+        stops and the work behind it is cancelled.
+        """
+        self.metrics.streams += 1
+        # Determine if this is a recipe request
+        if self._is_recipe_request(message):
+            # Stream recipe recommendations
+            chunks = self._stream_recipe_recommendations(message, user_id, context)
+        else:
+            # Stream general chat response
+            chunks = self._stream_general_response(message, user_id, context)
+
         try:
-            # Determine if this is a recipe request
-            is_recipe_request = self._is_recipe_request(message)
-
-            if is_recipe_request:
-                # Stream recipe recommendations
-                async for chunk in self._stream_recipe_recommendations(message, user_id, context):
-                    yield f"data: {json.dumps(chunk)}\n\n"
-            else:
-                # Stream general chat response
-                async for chunk in self._stream_general_response(message, user_id, context):
-                    yield f"data: {json.dumps(chunk)}\n\n"
+            async for chunk in chunks:
+                if is_disconnected is not None and await is_disconnected():
+                    self.metrics.disconnected += 1
+                    logger.info(f"Chat stream client for user {user_id} disconnected")
+                    return
+                yield f"data: {json.dumps(chunk)}\n\n"
 
             # End stream
+            self.metrics.completed += 1
             yield "data: [DONE]\n\n"
 
         except Exception as e:
@@ -69,6 +136,10 @@ class ChatStreamingService:
             yield f"data: {json.dumps(error_chunk)}\n\n"
             yield "data: [DONE]\n\n"
 
+        finally:
+            # Stops the inner generator now rather than when it is garbage collected
+            await chunks.aclose()
+
     def _is_recipe_request(self, message: str) -> bool:
         """Determine if message is asking for recipe recommendations"""
         recipe_keywords = [
@@ -93,7 +164,8 @@ class ChatStreamingService:
     async def _stream_recipe_recommendations(
         self, message: str, user_id: int, context: dict[str, Any]
     ) -> AsyncGenerator[dict[str, Any], None]:
-        """Stream recipe recommendations"""
+        """Stream recipe cards as they are ranked, then their details as updates"""
+        started = time.perf_counter()
 
         # Send initial response
         yield {
@@ -102,63 +174,75 @@ class ChatStreamingService:
             "timestamp": datetime.now().isoformat(),
         }
 
-        # Trigger cache refresh in background if needed
-        cache_refresh_task = asyncio.create_task(
+        # Refresh the background caches for next time without holding up this stream
+        refresh = asyncio.ensure_future(
             self.cache_manager.ensure_fresh_cache(user_id, self.db_service)
         )
-
+        self._refresh_tasks.add(refresh)
+        refresh.add_done_callback(self._on_refresh_done)
+
+        recommendation_count = 0
+        time_to_first_ms = None
+        events = self.crew_service.stream_recommendations(
+            user_id,
+            message,
+            use_preferences=context.get("use_preferences", True),
+            limit=context.get("num_recommendations", 3),
+        )
         try:
-            # Get streaming recommendations
-            recommendation_count = 0
-            async for result in self.lean_crew_service.get_recipe_recommendations(
-                user_id, message, num_recommendations=3
-            ):
-
-                if "error" in result:
+            async for event in events:
+                if event["type"] == "recipe":
+                    recommendation_count += 1
+                    if time_to_first_ms is None:
+                        elapsed = time.perf_counter() - started
+                        self.metrics.record_first_recipe(elapsed)
+                        time_to_first_ms = round(elapsed * 1000)
+                    card = event["card"]
                     yield {
-                        "type": "error",
-                        "content": f'Error getting recommendations: {result["error"]}',
+                        "type": "recipe_recommendation",
+                        "content": self._format_recipe_recommendation(card),
+                        "recipe_data": card,
+                        "index": event["rank"],
+                        "total_found": event["total_found"],
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                elif event["type"] == "recipe_update":
+                    yield {
+                        "type": "recipe_update",
+                        "recipe_id": event["id"],
+                        "index": event["rank"],
+                        "delta": event["delta"],
                         "timestamp": datetime.now().isoformat(),
                     }
-                    continue
-
-                recommendation = result["recommendation"]
-                recommendation_count += 1
-
-                # Stream individual recommendation
-                yield {
-                    "type": "recipe_recommendation",
-                    "content": self._format_recipe_recommendation(recommendation),
-                    "recipe_data": recommendation,
-                    "index": recommendation_count,
-                    "total_found": result.get("total_found", 0),
-                    "timing": result.get("timing", {}),
-                    "timestamp": datetime.now().isoformat(),
-                }
-
-                # Add a small delay to demonstrate streaming
-                await asyncio.sleep(0.1)
-
-            # Send completion message
-            if recommendation_count > 0:
-                yield {
-                    "type": "message_complete",
-                    "content": f"Found {recommendation_count} great recipes for you! Tap any recipe to see details.",
-                    "timestamp": datetime.now().isoformat(),
-                }
-            else:
-                yield {
-                    "type": "message_complete",
-                    "content": "I couldn't find any recipes that match your pantry right now. Try adding more ingredients!",
-                    "timestamp": datetime.now().isoformat(),
-                }
-
         finally:
-            # Ensure cache refresh completes
-            try:
-                await cache_refresh_task
-            except Exception as e:
-                logger.warning(f"Cache refresh failed: {str(e)}")
+            await events.aclose()
+
+        timing = {
+            "time_to_first_recipe_ms": time_to_first_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000),
+        }
+
+        # Send completion message
+        if recommendation_count > 0:
+            yield {
+                "type": "message_complete",
+                "content": f"Found {recommendation_count} great recipes for you! Tap any recipe to see details.",
+                "timing": timing,
+                "timestamp": datetime.now().isoformat(),
+            }
+        else:
+            self.metrics.without_recipes += 1
+            yield {
+                "type": "message_complete",
+                "content": "I couldn't find any recipes that match your pantry right now. Try adding more ingredients!",
+                "timing": timing,
+                "timestamp": datetime.now().isoformat(),
+            }
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache refresh failed: {task.exception()}")
 
     async def _stream_general_response(
         self, message: str, user_id: int, context: dict[str, Any]
@@ -173,23 +257,7 @@ class ChatStreamingService:
         else:
             response = "I'm your cooking assistant! I can help you find recipes based on what you have in your pantry. What would you like to cook?"
 
-        # Simulate streaming for consistent UX
-        words = response.split()
-        current_text = ""
-
-        for _i, word in enumerate(words):
-            current_text += word + " "
-
-            yield {
-                "type": "message_partial",
-                "content": current_text.strip(),
-                "timestamp": datetime.now().isoformat(),
-            }
-
-            # Small delay to show streaming effect
-            await asyncio.sleep(0.05)
-
-        # Send final complete message
+        # The reply is already complete, so it goes out as a single message
         yield {
             "type": "message_complete",
             "content": response,
@@ -200,8 +268,15 @@ class ChatStreamingService:
         """Format recipe recommendation for display"""
         title = recommendation.get("title", "Unknown Recipe")
         explanation = recommendation.get("explanation", "")
-        cooking_time = recommendation.get("cooking_time", 0)
-        difficulty = recommendation.get("difficulty", "unknown")
+        if not explanation and "used_ingredient_count" in recommendation:
+            explanation = (
+                f"Uses {recommendation['used_ingredient_count']} of your ingredients, "
+                f"needs {recommendation['missed_ingredient_count']} more"
+            )
+        cooking_time = recommendation.get("cooking_time") or recommendation.get(
+            "ready_in_minutes", 0
+        )
+        difficulty = recommendation.get("difficulty", "unknown").lower()
 
         # Format highlights
         highlights = []
@@ -241,7 +316,9 @@ def get_chat_streaming_service(db_service=None) -> ChatStreamingService:
 
 
 @router.post("/stream")
-async def chat_stream(request: ChatRequest, db_service=Depends(get_database_service)):
+async def chat_stream(
+    request: ChatRequest, http_request: Request, db_service=Depends(get_database_service)
+):
     """
     Stream chat response for recipe recommendations
 
@@ -249,14 +326,13 @@ async def chat_stream(request: ChatRequest, db_service=Depends(get_database_serv
     """
     service = get_chat_streaming_service(db_service)
 
-    async def generate_stream():
-        async for chunk in service.process_message_stream(
-            request.message, request.user_id, request.context
-        ):
-            yield chunk
-
     return StreamingResponse(
-        generate_stream(),
+        service.process_message_stream(
+            request.message,
+            request.user_id,
+            request.context,
+            is_disconnected=http_request.is_disconnected,
+        ),
         media_type="text/plain",
         headers={
             "Cache-Control": "no-cache",
@@ -279,24 +355,23 @@ async def quick_recipe_recommendations(
     try:
         service = get_chat_streaming_service(db_service)
 
-        # Collect all recommendations
-        recommendations = []
-        timing_info = {}
+        # Collect all recommendations, with their details merged in
+        started = time.perf_counter()
+        recommendations = {}
 
-        async for result in service.lean_crew_service.get_recipe_recommendations(
-            request.user_id, request.message, num_recommendations=3
+        async for event in service.crew_service.stream_recommendations(
+            request.user_id, request.message, limit=3
         ):
-            if "error" in result:
-                raise HTTPException(status_code=500, detail=result["error"])
-
-            recommendations.append(result["recommendation"])
-            timing_info = result.get("timing", {})
+            if event["type"] == "recipe":
+                recommendations[event["rank"]] = event["card"]
+            elif event["type"] == "recipe_update":
+                recommendations[event["rank"]].update(event["delta"])
 
         return {
             "message": request.message,
-            "recommendations": recommendations,
+            "recommendations": [recommendations[rank] for rank in sorted(recommendations)],
             "total_found": len(recommendations),
-            "timing": timing_info,
+            "timing": {"total_ms": round((time.perf_counter() - started) * 1000)},
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -309,7 +384,7 @@ async def quick_recipe_recommendations(
 async def get_performance_stats(db_service=Depends(get_database_service)):
     """Get performance statistics for the chat service"""
     service = get_chat_streaming_service(db_service)
-    stats = service.lean_crew_service.get_performance_stats()
+    stats = service.metrics.snapshot()
 
     return {"performance_stats": stats, "timestamp": datetime.now().isoformat()}
 
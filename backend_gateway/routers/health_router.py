@@ -1,6 +1,9 @@
 """Simple health check router for readiness/liveness probes."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from backend_gateway.config.database import get_database_service
+from backend_gateway.services.postgres_service import query_translation_cache
 
 router = APIRouter(tags=["health"])
 
@@ -9,3 +12,14 @@ router = APIRouter(tags=["health"])
 async def health_check():
     """Return service status for health probes."""
     return {"status": "ok"}
+
+
+@router.get("/health/database", summary="Database pool metrics", tags=["monitoring"])
+async def database_health(db_service=Depends(get_database_service)):
+    """Return connection pool saturation and query translation cache metrics."""
+    pool_stats = db_service.get_pool_stats() if hasattr(db_service, "get_pool_stats") else None
+    return {
+        "status": "ok",
+        "pool": pool_stats,
+        "query_translation_cache": query_translation_cache.stats(),
+    }
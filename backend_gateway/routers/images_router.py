@@ -9,6 +9,7 @@ from pydantic import BaseModel, ConfigDict, Field
 
 from backend_gateway.config.database import get_database_service, get_pantry_service
 from backend_gateway.services.pantry_item_manager import PantryItemManager
+from backend_gateway.services.vision_pipeline import VisionCapacityError
 
 # Import additional services
 # Correct import for the centralized VisionService
@@ -71,7 +72,9 @@ async def upload_image(
             # This case should ideally not happen with UploadFile, but good to check
             raise HTTPException(status_code=400, detail="Could not determine image content type.")
 
-        openai_raw_response = vision_service.classify_food_items(base64_image, content_type)
+        openai_raw_response = await vision_service.classify_food_items_async(
+            base64_image, content_type
+        )
 
         try:
             parsed_items = vision_service.parse_openai_response(openai_raw_response)
@@ -83,6 +86,10 @@ async def upload_image(
                 status_code=500, detail=f"Failed to parse OpenAI response: {str(e)}"
             )
 
+    except VisionCapacityError as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        ) from e
     except RuntimeError as e:  # Errors from VisionService (e.g., OpenAI API communication)
         raise HTTPException(
             status_code=502, detail=f"Service error: {str(e)}"
@@ -246,7 +253,9 @@ async def scan_items_vision(
             base64_data = request.image_base64
 
         # Call vision service
-        openai_raw_response = vision_service.classify_food_items(base64_data, request.mime_type)
+        openai_raw_response = await vision_service.classify_food_items_async(
+            base64_data, request.mime_type
+        )
 
         # Parse response
         parsed_items = vision_service.parse_openai_response(openai_raw_response)
@@ -273,6 +282,10 @@ async def scan_items_vision(
             "message": f"Successfully identified {len(ocr_items)} items using vision service.",
         }
 
+    except VisionCapacityError as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        ) from e
     except Exception as e:
         print(f"Error in scan_items_vision: {str(e)}")
         return {"success": False, "items": [], "message": f"Failed to process image: {str(e)}"}
@@ -22,6 +22,7 @@ from backend_gateway.models.ocr_models import (
 )
 from backend_gateway.RemoteControl_7 import is_mock_enabled, set_mock
 from backend_gateway.services.ocr_service import ocr_service
+from backend_gateway.services.vision_pipeline import VisionCapacityError, vision_pipeline
 from backend_gateway.utils.smart_cache import get_cache
 
 logger = logging.getLogger(__name__)
@@ -78,6 +79,11 @@ async def scan_items(file: UploadFile = File(...)):
         logger.info(f"Scan items completed: {len(result.items)} items detected")
         return result
 
+    except VisionCapacityError as e:
+        logger.warning(f"Rejecting scan: {str(e)}")
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        ) from e
     except AuthenticationError:
         logger.error("OpenAI authentication failed")
         raise HTTPException(status_code=401, detail="OpenAI authentication failed") from None
@@ -117,6 +123,11 @@ async def scan_receipt(request: ReceiptScanRequest):
         logger.info(f"Receipt scan completed: {len(result.items)} items detected")
         return result
 
+    except VisionCapacityError as e:
+        logger.warning(f"Rejecting scan: {str(e)}")
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        ) from e
     except AuthenticationError:
         logger.error("OpenAI authentication failed")
         raise HTTPException(status_code=401, detail="OpenAI authentication failed") from None
@@ -247,9 +258,10 @@ async def get_debug_status():
         mock_data_enabled=is_ocr_mock_enabled(),
         cache_stats={
             **cache_stats,
-            "ocr_cache_entries": len([k for k in cache.cache if "ocr_scan_" in k]),
+            "ocr_cache_entries": len(cache.keys_matching("ocr_scan_")),
         },
         openai_client_status=openai_status,
+        vision_pipeline=vision_pipeline.stats(),
         recent_detections=len(recent_detections),
         image_hash_examples=[d.get("image_hash", "") for d in recent_detections[:3]],
     )
@@ -360,7 +360,7 @@ async def get_user_pantry_full(user_id: int = 111, db_service=Depends(get_databa
         params = {"user_id": user_id}
 
         # Execute the query and return results
-        return db_service.execute_query(query, params)
+        return await db_service.execute_query_async(query, params)
 
     except Exception as e:
         logger.error(f"Error retrieving user pantry full view: {e}")
@@ -448,7 +448,7 @@ async def consume_pantry_item(
         WHERE pantry_item_id = %(item_id)s
         """
 
-        result = db_service.execute_query(update_query, params)
+        result = await db_service.execute_query_async(update_query, params)
 
         # Check if any rows were updated
         if not result or result[0].get("affected_rows", 0) == 0:
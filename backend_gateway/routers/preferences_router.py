@@ -11,6 +11,7 @@ from pydantic import BaseModel
 from backend_gateway.config.database import get_database_service
 from backend_gateway.models.user import UserInDB
 from backend_gateway.routers.users import get_current_active_user
+from backend_gateway.services.recipe_preference_scorer import invalidate_user_profile
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +114,7 @@ async def save_user_preferences(
         }
 
         result = db_service.execute_query(query, params)
+        invalidate_user_profile(current_user.numeric_user_id)
 
         if result:
             row = result[0]
@@ -142,6 +144,7 @@ async def clear_user_preferences(current_user: UserInDB = Depends(get_current_ac
         params = {"user_id": current_user.numeric_user_id}
 
         db_service.execute_query(query, params)
+        invalidate_user_profile(current_user.numeric_user_id)
 
         return {"message": "Preferences cleared successfully"}
 
@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field
 from backend_gateway.config.database import get_pantry_service
 from backend_gateway.services.pantry_service import PantryService
 from backend_gateway.services.spoonacular_service import SpoonacularService
+from backend_gateway.services.unit_conversion_engine import unit_conversion_engine
 
 logger = logging.getLogger(__name__)
 
@@ -212,18 +213,37 @@ async def check_ingredients_availability(
             except Exception:
                 return None
 
+        # Pantry stock and recipe requirements in base units (grams where the
+        # ingredient's density or piece weight is known), each resolved in one pass
+        pantry_stock = unit_conversion_engine.normalize_many(
+            [item.get("product_name") for item in pantry_items],
+            [float(item.get("quantity") or 0) for item in pantry_items],
+            [item.get("quantity_unit") or item.get("unit_of_measurement") for item in pantry_items],
+            to_weight=True,
+        )
+        extended_ingredients = recipe.get("extendedIngredients", [])
+        requirements = unit_conversion_engine.normalize_many(
+            [ingredient.get("name") for ingredient in extended_ingredients],
+            [
+                (ingredient.get("amount") or 0) * request.servings
+                for ingredient in extended_ingredients
+            ],
+            [ingredient.get("unit") for ingredient in extended_ingredients],
+            to_weight=True,
+        )
+
         # Create pantry lookup by ingredient name
         pantry_lookup = {}
-        for item in pantry_items:
+        for row, item in enumerate(pantry_items):
             name = (item.get("product_name") or item.get("food_category", "")).lower().strip()
             if name not in pantry_lookup:
                 pantry_lookup[name] = []
-            pantry_lookup[name].append(item)
+            pantry_lookup[name].append((row, item))
 
         # Process each recipe ingredient in format expected by frontend
         ingredients_result = []
 
-        for ingredient in recipe.get("extendedIngredients", []):
+        for index, ingredient in enumerate(extended_ingredients):
             ingredient_name = ingredient.get("name", "").strip()
             required_amount = ingredient.get("amount", 0) * request.servings
             unit = ingredient.get("unit", "")
@@ -235,8 +255,9 @@ async def check_ingredients_availability(
             ingredient_key = ingredient_name.lower()
             if ingredient_key in pantry_lookup:
                 total_available = 0
+                rows = [row for row, _ in pantry_lookup[ingredient_key]]
 
-                for pantry_item in pantry_lookup[ingredient_key]:
+                for _, pantry_item in pantry_lookup[ingredient_key]:
                     quantity = float(pantry_item.get("quantity", 0))
                     total_available += quantity
 
@@ -269,10 +290,20 @@ async def check_ingredients_availability(
                     )
                 )
 
+                # Compare in base units when the recipe and every matching pantry item
+                # share one; otherwise fall back to the raw quantities
+                available, needed = total_available, required_amount
+                base_unit = requirements.units[index]
+                if base_unit is not None and all(
+                    pantry_stock.units[row] == base_unit for row in rows
+                ):
+                    available = float(pantry_stock.amounts[rows].sum())
+                    needed = float(requirements.amounts[index])
+
                 # Determine status
-                if total_available >= required_amount:
+                if available >= needed:
                     status = "available"
-                elif total_available > 0:
+                elif available > 0:
                     status = "partial"
 
             ingredients_result.append(
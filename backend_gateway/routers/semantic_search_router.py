@@ -25,6 +25,21 @@ class SemanticSearchRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=500, description="Search query text")
     limit: int = Field(10, ge=1, le=50, description="Maximum number of results")
     similarity_threshold: float = Field(0.3, ge=0.0, le=1.0, description="Minimum similarity score")
+    ef_search: Optional[int] = Field(
+        None, ge=1, le=1000, description="HNSW search breadth; higher = better recall, slower"
+    )
+
+
+class RecipeSemanticSearchRequest(SemanticSearchRequest):
+    """Request model for semantic recipe search, with filters applied inside the index scan"""
+
+    candidate_multiplier: Optional[int] = Field(
+        None, ge=1, le=20, description="Nearest recipes fetched per result before thresholding"
+    )
+    cuisines: list[str] = Field(default_factory=list, description="Only these cuisine types")
+    diet_tags: list[str] = Field(
+        default_factory=list, description="Only recipes tagged with all of these"
+    )
 
 
 class HybridSearchRequest(BaseModel):
@@ -82,7 +97,7 @@ class PantryItemSearchResult(BaseModel):
 
 @router.post("/recipes", response_model=list[RecipeSearchResult])
 async def semantic_search_recipes(
-    request: SemanticSearchRequest,
+    request: RecipeSemanticSearchRequest,
     current_user: UserInDB = Depends(get_current_user),
     db_service: PostgresService = Depends(get_database_service),
 ) -> list[RecipeSearchResult]:
@@ -98,6 +113,10 @@ async def semantic_search_recipes(
             query=request.query,
             limit=request.limit,
             similarity_threshold=request.similarity_threshold,
+            ef_search=request.ef_search,
+            candidate_multiplier=request.candidate_multiplier,
+            cuisines=request.cuisines or None,
+            diet_tags=request.diet_tags or None,
         )
 
         # Log search query for analytics
@@ -203,6 +222,7 @@ async def semantic_search_products(
             query=request.query,
             limit=request.limit,
             similarity_threshold=request.similarity_threshold,
+            ef_search=request.ef_search,
         )
 
         # Log search query for analytics
@@ -234,6 +254,12 @@ async def semantic_search_products(
 async def find_similar_pantry_items(
     item_name: str,
     limit: int = Query(5, ge=1, le=20, description="Maximum number of similar items"),
+    ef_search: Optional[int] = Query(
+        None, ge=1, le=1000, description="HNSW search breadth; higher = better recall, slower"
+    ),
+    candidate_multiplier: Optional[int] = Query(
+        None, ge=1, le=20, description="Nearest items fetched per result before thresholding"
+    ),
     current_user: UserInDB = Depends(get_current_user),
     db_service: PostgresService = Depends(get_database_service),
 ) -> list[PantryItemSearchResult]:
@@ -244,8 +270,14 @@ async def find_similar_pantry_items(
     that might be the same product with slightly different names.
     """
     try:
-        # Find similar items
-        results = await db_service.find_similar_pantry_items(item_name=item_name, limit=limit)
+        # Find similar items among the current user's pantry
+        results = await db_service.find_similar_pantry_items(
+            item_name=item_name,
+            limit=limit,
+            user_id=current_user.numeric_user_id,
+            ef_search=ef_search,
+            candidate_multiplier=candidate_multiplier,
+        )
 
         # Convert results to response model
         return [
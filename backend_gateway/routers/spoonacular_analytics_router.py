@@ -11,6 +11,7 @@ Endpoints:
 - GET /cost/projection - Cost projections and trends
 - GET /deduplication/stats - Deduplication effectiveness
 - GET /performance/endpoints - Endpoint performance metrics
+- GET /cache/stats - Response cache hit ratios
 """
 
 import logging
@@ -19,6 +20,8 @@ from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from backend_gateway.services.spoonacular_response_cache import spoonacular_response_cache
+
 # This import will work once the database table is created
 try:
     from backend_gateway.config.database import get_database_service
@@ -647,6 +650,16 @@ async def get_endpoint_performance(
         )
 
 
+@router.get("/cache/stats")
+async def get_cache_stats() -> dict[str, Any]:
+    """
+    Hit ratios of the Spoonacular response cache in this process.
+
+    Every hit is an API call (and its cost points) that did not reach Spoonacular.
+    """
+    return {"timestamp": datetime.now().isoformat(), "cache": spoonacular_response_cache.stats()}
+
+
 @router.get("/health")
 async def analytics_health_check() -> dict[str, Any]:
     """
@@ -7,6 +7,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from backend_gateway.config.database import get_database_service
+from backend_gateway.services.stats_rollup_service import stats_rollups
 from backend_gateway.services.user_recipes_service import UserRecipesService
 
 logger = logging.getLogger(__name__)
@@ -45,186 +46,45 @@ async def get_comprehensive_stats(
         else:
             start_date = now - timedelta(days=30)  # Default to month
 
-        # 1. Pantry Statistics
-        pantry_stats_query = """
-        WITH pantry_summary AS (
-            SELECT
-                COUNT(*) as total_items,
-                COUNT(CASE WHEN expiration_date < CURRENT_DATE THEN 1 END) as expired_items,
-                COUNT(CASE WHEN expiration_date BETWEEN CURRENT_DATE AND CURRENT_DATE + INTERVAL '7 days' THEN 1 END) as expiring_soon,
-                COUNT(CASE WHEN pi.created_at >= %(start_date)s THEN 1 END) as recently_added,
-                AVG(pi.quantity) as avg_quantity
-            FROM pantry_items pi
-            JOIN pantries p ON pi.pantry_id = p.pantry_id
-            WHERE p.user_id = %(user_id)s
-        ),
-        category_breakdown AS (
-            SELECT
-                pi.category,
-                COUNT(*) as count
-            FROM pantry_items pi
-            JOIN pantries p ON pi.pantry_id = p.pantry_id
-            WHERE p.user_id = %(user_id)s
-            GROUP BY pi.category
-            ORDER BY count DESC
-            LIMIT 5
-        ),
-        frequent_items AS (
-            SELECT
-                pi.product_name,
-                COUNT(*) as purchase_count
-            FROM pantry_items pi
-            JOIN pantries p ON pi.pantry_id = p.pantry_id
-            WHERE p.user_id = %(user_id)s
-            AND pi.created_at >= %(start_date)s
-            GROUP BY pi.product_name
-            ORDER BY purchase_count DESC
-            LIMIT 5
-        )
-        SELECT
-            ps.*,
-            (SELECT json_agg(row_to_json(cb)) FROM category_breakdown cb) as top_categories,
-            (SELECT json_agg(row_to_json(fi)) FROM frequent_items fi) as top_products
-        FROM pantry_summary ps
-        """
-
-        pantry_result = db_service.execute_query(
-            pantry_stats_query, {"user_id": user_id, "start_date": start_date}
-        )
-
-        # 2. Recipe Statistics
-        recipe_stats = await user_recipes_service.get_recipe_stats(user_id)
-
-        # 3. Cooking History Statistics
-        cooking_history_query = """
-        WITH daily_cooking AS (
-            SELECT
-                DATE(changed_at) as cook_date,
-                COUNT(*) as recipes_cooked
-            FROM pantry_history
-            WHERE user_id = %(user_id)s
-            AND change_source = 'recipe_completion'
-            AND changed_at >= %(start_date)s
-            GROUP BY DATE(changed_at)
-        ),
-        cooking_streak AS (
-            SELECT
-                cook_date,
-                cook_date - (ROW_NUMBER() OVER (ORDER BY cook_date))::int AS grp
-            FROM daily_cooking
-        ),
-        streak_groups AS (
-            SELECT
-                MIN(cook_date) as start_date,
-                MAX(cook_date) as end_date,
-                COUNT(*) as streak_length
-            FROM cooking_streak
-            GROUP BY grp
-            ORDER BY end_date DESC
-            LIMIT 1
-        )
-        SELECT
-            COUNT(DISTINCT DATE(changed_at)) as days_cooked,
-            COUNT(*) as total_recipes_cooked,
-            COALESCE((SELECT streak_length FROM streak_groups), 0) as current_streak,
-            COUNT(CASE WHEN changed_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as cooked_this_week,
-            COUNT(CASE WHEN changed_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as cooked_this_month
-        FROM pantry_history
-        WHERE user_id = %(user_id)s
-        AND change_source = 'recipe_completion'
-        AND changed_at >= %(start_date)s
-        """
-
-        cooking_result = db_service.execute_query(
-            cooking_history_query, {"user_id": user_id, "start_date": start_date}
-        )
-
-        # 4. Sustainability Metrics
-        sustainability_query = """
-        WITH waste_prevention AS (
-            SELECT
-                COUNT(CASE WHEN pi.expiration_date >= CURRENT_DATE THEN 1 END) as unexpired_items,
-                COUNT(CASE WHEN ph.change_source = 'recipe_completion' THEN 1 END) as items_used_in_recipes
-            FROM pantry_items pi
-            JOIN pantries p ON pi.pantry_id = p.pantry_id
-            LEFT JOIN pantry_history ph ON pi.pantry_item_id = ph.pantry_item_id
-            WHERE p.user_id = %(user_id)s
-        )
-        SELECT
-            unexpired_items * 0.3 as food_saved_kg,  -- Avg 0.3kg per item
-            unexpired_items * 0.3 * 2.5 as co2_saved_kg,  -- 2.5kg CO2 per kg food
-            items_used_in_recipes
-        FROM waste_prevention
-        """
+        # Per-day rollups cover whole days, so the window starts at midnight
+        data = await stats_rollups.read(user_id, start_date.date())
+        if data is None:
+            data = await _live_stats(db_service, user_recipes_service, user_id, start_date)
 
-        sustainability_result = db_service.execute_query(sustainability_query, {"user_id": user_id})
-
-        # 5. Shopping Patterns
-        shopping_patterns_query = """
-        SELECT
-            DATE_PART('dow', pi.created_at) as day_of_week,
-            COUNT(*) as items_added
-        FROM pantry_items pi
-        JOIN pantries p ON pi.pantry_id = p.pantry_id
-        WHERE p.user_id = %(user_id)s
-        AND pi.created_at >= %(start_date)s
-        GROUP BY DATE_PART('dow', pi.created_at)
-        ORDER BY day_of_week
-        """
-
-        shopping_result = db_service.execute_query(
-            shopping_patterns_query, {"user_id": user_id, "start_date": start_date}
-        )
+        pantry = data["pantry"]
+        cooking = data["cooking"]
+        sustainability = data["sustainability"]
 
         # Compile all statistics
         stats = {
             "timeframe": timeframe,
             "generated_at": datetime.now().isoformat(),
+            "freshness": data["freshness"],
             "pantry": {
                 "summary": {
-                    "total_items": pantry_result[0]["total_items"] if pantry_result else 0,
-                    "expired_items": pantry_result[0]["expired_items"] if pantry_result else 0,
-                    "expiring_soon": pantry_result[0]["expiring_soon"] if pantry_result else 0,
-                    "recently_added": pantry_result[0]["recently_added"] if pantry_result else 0,
-                    "avg_quantity": (
-                        float(pantry_result[0]["avg_quantity"] or 0) if pantry_result else 0
-                    ),
+                    "total_items": pantry.get("total_items", 0),
+                    "expired_items": pantry.get("expired_items", 0),
+                    "expiring_soon": pantry.get("expiring_soon", 0),
+                    "recently_added": pantry.get("recently_added", 0),
+                    "avg_quantity": float(pantry.get("avg_quantity") or 0),
                 },
-                "top_categories": pantry_result[0]["top_categories"] if pantry_result else [],
-                "top_products": pantry_result[0]["top_products"] if pantry_result else [],
+                "top_categories": pantry.get("top_categories", []),
+                "top_products": pantry.get("top_products", []),
             },
             "recipes": {
-                **recipe_stats,
+                **data["recipes"],
                 "cooking_history": {
-                    "days_cooked": cooking_result[0]["days_cooked"] if cooking_result else 0,
-                    "total_cooked": (
-                        cooking_result[0]["total_recipes_cooked"] if cooking_result else 0
-                    ),
-                    "current_streak": cooking_result[0]["current_streak"] if cooking_result else 0,
-                    "cooked_this_week": (
-                        cooking_result[0]["cooked_this_week"] if cooking_result else 0
-                    ),
-                    "cooked_this_month": (
-                        cooking_result[0]["cooked_this_month"] if cooking_result else 0
-                    ),
+                    "days_cooked": cooking.get("days_cooked", 0),
+                    "total_cooked": cooking.get("total_recipes_cooked", 0),
+                    "current_streak": cooking.get("current_streak", 0),
+                    "cooked_this_week": cooking.get("cooked_this_week", 0),
+                    "cooked_this_month": cooking.get("cooked_this_month", 0),
                 },
             },
             "sustainability": {
-                "food_saved_kg": (
-                    float(sustainability_result[0]["food_saved_kg"] or 0)
-                    if sustainability_result
-                    else 0
-                ),
-                "co2_saved_kg": (
-                    float(sustainability_result[0]["co2_saved_kg"] or 0)
-                    if sustainability_result
-                    else 0
-                ),
-                "items_used_in_recipes": (
-                    sustainability_result[0]["items_used_in_recipes"]
-                    if sustainability_result
-                    else 0
-                ),
+                "food_saved_kg": float(sustainability.get("food_saved_kg") or 0),
+                "co2_saved_kg": float(sustainability.get("co2_saved_kg") or 0),
+                "items_used_in_recipes": sustainability.get("items_used_in_recipes", 0),
             },
             "shopping_patterns": {
                 "by_day_of_week": [
@@ -240,7 +100,7 @@ async def get_comprehensive_stats(
                         ][int(item["day_of_week"])],
                         "items_added": item["items_added"],
                     }
-                    for item in shopping_result
+                    for item in data["shopping"]
                 ]
             },
         }
@@ -252,6 +112,156 @@ async def get_comprehensive_stats(
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}") from e
 
 
+async def _live_stats(
+    db_service, user_recipes_service: UserRecipesService, user_id: int, start_date: datetime
+) -> dict[str, Any]:
+    """The comprehensive stats computed from the full history, when rollups are unavailable"""
+    # 1. Pantry Statistics
+    pantry_stats_query = """
+    WITH pantry_summary AS (
+        SELECT
+            COUNT(*) as total_items,
+            COUNT(CASE WHEN expiration_date < CURRENT_DATE THEN 1 END) as expired_items,
+            COUNT(CASE WHEN expiration_date BETWEEN CURRENT_DATE AND CURRENT_DATE + INTERVAL '7 days' THEN 1 END) as expiring_soon,
+            COUNT(CASE WHEN pi.created_at >= %(start_date)s THEN 1 END) as recently_added,
+            AVG(pi.quantity) as avg_quantity
+        FROM pantry_items pi
+        JOIN pantries p ON pi.pantry_id = p.pantry_id
+        WHERE p.user_id = %(user_id)s
+    ),
+    category_breakdown AS (
+        SELECT
+            pi.category,
+            COUNT(*) as count
+        FROM pantry_items pi
+        JOIN pantries p ON pi.pantry_id = p.pantry_id
+        WHERE p.user_id = %(user_id)s
+        GROUP BY pi.category
+        ORDER BY count DESC
+        LIMIT 5
+    ),
+    frequent_items AS (
+        SELECT
+            pi.product_name,
+            COUNT(*) as purchase_count
+        FROM pantry_items pi
+        JOIN pantries p ON pi.pantry_id = p.pantry_id
+        WHERE p.user_id = %(user_id)s
+        AND pi.created_at >= %(start_date)s
+        GROUP BY pi.product_name
+        ORDER BY purchase_count DESC
+        LIMIT 5
+    )
+    SELECT
+        ps.*,
+        (SELECT json_agg(row_to_json(cb)) FROM category_breakdown cb) as top_categories,
+        (SELECT json_agg(row_to_json(fi)) FROM frequent_items fi) as top_products
+    FROM pantry_summary ps
+    """
+
+    pantry_result = db_service.execute_query(
+        pantry_stats_query, {"user_id": user_id, "start_date": start_date}
+    )
+
+    # 2. Recipe Statistics
+    recipe_stats = await user_recipes_service.get_recipe_stats(user_id)
+
+    # 3. Cooking History Statistics
+    cooking_history_query = """
+    WITH daily_cooking AS (
+        SELECT
+            DATE(changed_at) as cook_date,
+            COUNT(*) as recipes_cooked
+        FROM pantry_history
+        WHERE user_id = %(user_id)s
+        AND change_source = 'recipe_completion'
+        AND changed_at >= %(start_date)s
+        GROUP BY DATE(changed_at)
+    ),
+    cooking_streak AS (
+        SELECT
+            cook_date,
+            cook_date - (ROW_NUMBER() OVER (ORDER BY cook_date))::int AS grp
+        FROM daily_cooking
+    ),
+    streak_groups AS (
+        SELECT
+            MIN(cook_date) as start_date,
+            MAX(cook_date) as end_date,
+            COUNT(*) as streak_length
+        FROM cooking_streak
+        GROUP BY grp
+        ORDER BY end_date DESC
+        LIMIT 1
+    )
+    SELECT
+        COUNT(DISTINCT DATE(changed_at)) as days_cooked,
+        COUNT(*) as total_recipes_cooked,
+        COALESCE((SELECT streak_length FROM streak_groups), 0) as current_streak,
+        COUNT(CASE WHEN changed_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as cooked_this_week,
+        COUNT(CASE WHEN changed_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as cooked_this_month
+    FROM pantry_history
+    WHERE user_id = %(user_id)s
+    AND change_source = 'recipe_completion'
+    AND changed_at >= %(start_date)s
+    """
+
+    cooking_result = db_service.execute_query(
+        cooking_history_query, {"user_id": user_id, "start_date": start_date}
+    )
+
+    # 4. Sustainability Metrics
+    sustainability_query = """
+    WITH waste_prevention AS (
+        SELECT
+            COUNT(CASE WHEN pi.expiration_date >= CURRENT_DATE THEN 1 END) as unexpired_items,
+            COUNT(CASE WHEN ph.change_source = 'recipe_completion' THEN 1 END) as items_used_in_recipes
+        FROM pantry_items pi
+        JOIN pantries p ON pi.pantry_id = p.pantry_id
+        LEFT JOIN pantry_history ph ON pi.pantry_item_id = ph.pantry_item_id
+        WHERE p.user_id = %(user_id)s
+    )
+    SELECT
+        unexpired_items * 0.3 as food_saved_kg,  -- Avg 0.3kg per item
+        unexpired_items * 0.3 * 2.5 as co2_saved_kg,  -- 2.5kg CO2 per kg food
+        items_used_in_recipes
+    FROM waste_prevention
+    """
+
+    sustainability_result = db_service.execute_query(sustainability_query, {"user_id": user_id})
+
+    # 5. Shopping Patterns
+    shopping_patterns_query = """
+    SELECT
+        DATE_PART('dow', pi.created_at) as day_of_week,
+        COUNT(*) as items_added
+    FROM pantry_items pi
+    JOIN pantries p ON pi.pantry_id = p.pantry_id
+    WHERE p.user_id = %(user_id)s
+    AND pi.created_at >= %(start_date)s
+    GROUP BY DATE_PART('dow', pi.created_at)
+    ORDER BY day_of_week
+    """
+
+    shopping_result = db_service.execute_query(
+        shopping_patterns_query, {"user_id": user_id, "start_date": start_date}
+    )
+
+    return {
+        "pantry": dict(pantry_result[0]) if pantry_result else {},
+        "cooking": dict(cooking_result[0]) if cooking_result else {},
+        "sustainability": dict(sustainability_result[0]) if sustainability_result else {},
+        "shopping": shopping_result or [],
+        "recipes": recipe_stats,
+        "freshness": {
+            "source": "live",
+            "updated_at": None,
+            "refreshed_at": None,
+            "staleness_seconds": 0.0,
+        },
+    }
+
+
 @router.get(
     "/milestones", response_model=dict[str, Any], summary="Get user milestones and achievements"
 )
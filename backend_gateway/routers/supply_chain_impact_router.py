@@ -12,6 +12,7 @@ from fastapi import APIRouter, HTTPException, Query
 from backend_gateway.config.database import get_database_service
 from backend_gateway.services.environmental_impact_service import get_environmental_impact_service
 from backend_gateway.services.food_waste_service import get_food_waste_service
+from backend_gateway.utils.keyword_matcher import keyword_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +71,7 @@ async def get_today_impact(user_id: str):
 
         # Calculate supply chain impact
         get_food_waste_service()
-        get_environmental_impact_service()
+        env_service = get_environmental_impact_service()
 
         total_co2e = 0
         total_value = 0
@@ -89,8 +90,13 @@ async def get_today_impact(user_id: str):
             food_name = item["product_name"].lower()
             multiplier = get_supply_chain_multiplier(food_name)
 
-            # Get environmental impact
-            ghg_per_kg = item["ghg_kg_co2e_per_kg"] or estimate_ghg_impact(food_name)
+            # Get environmental impact: product table, OWID data, then estimate
+            impact = env_service.get_food_impact(food_name)
+            ghg_per_kg = (
+                item["ghg_kg_co2e_per_kg"]
+                or (impact and impact["environmental"].get("ghg_kg_co2e_per_kg"))
+                or estimate_ghg_impact(food_name)
+            )
 
             # Calculate amplified impact
             amplified_co2e = quantity_kg * ghg_per_kg * multiplier
@@ -334,78 +340,65 @@ async def get_weekly_trends(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+# Estimates for foods without data: group -> (keywords, value), first matching group wins
+SUPPLY_CHAIN_MULTIPLIERS = {
+    "leafy_greens": (["lettuce", "spinach", "arugula", "kale"], 5.7),
+    "fresh_vegetables": (["tomato", "cucumber", "pepper", "zucchini"], 2.52),
+    "tropical_fruits": (["banana", "avocado", "mango", "papaya"], 2.86),
+    "berries": (["strawberr", "raspberr", "blueberr", "grape"], 2.8),  # Berries and soft fruits
+    "tree_fruits": (["apple", "orange", "lemon", "lime"], 2.0),
+    "root_vegetables": (["carrot", "potato", "onion", "cabbage"], 2.2),  # Plus hardy produce
+    "meat": (["beef", "pork", "lamb", "chicken"], 1.8),
+    "dairy": (["milk", "cheese", "yogurt", "butter"], 1.6),
+    "grains": (["rice", "pasta", "bread", "cereal"], 1.5),  # Grains and processed foods
+}
+
+GHG_ESTIMATES = {
+    "beef": (["beef", "steak", "ground beef"], 99.48),
+    "lamb": (["lamb", "mutton"], 39.2),
+    "pork": (["pork", "bacon", "ham"], 12.1),
+    "poultry": (["chicken", "turkey", "poultry"], 9.87),
+    "fish": (["fish", "salmon", "tuna"], 6.0),
+    "cheese": (["cheese"], 23.88),
+    "milk": (["milk"], 3.15),
+    "rice": (["rice"], 4.45),
+    "tomato": (["tomato"], 2.09),
+    "potato": (["potato"], 0.46),
+}
+
+PRICE_ESTIMATES = {
+    "beef": (["beef", "steak"], 20.0),
+    "poultry": (["chicken", "turkey"], 8.0),
+    "fish": (["fish", "salmon"], 15.0),
+    "cheese": (["cheese"], 12.0),
+    "berries": (["berry", "grape"], 8.0),
+    "tomato": (["tomato", "pepper"], 4.0),
+    "greens": (["lettuce", "spinach"], 6.0),
+}
+
+
+def _groups(table: dict[str, tuple[list[str], float]]):
+    return keyword_matcher({name: keywords for name, (keywords, _) in table.items()})
+
+
+_MULTIPLIER_GROUPS = _groups(SUPPLY_CHAIN_MULTIPLIERS)
+_GHG_GROUPS = _groups(GHG_ESTIMATES)
+_PRICE_GROUPS = _groups(PRICE_ESTIMATES)
+
+
 def get_supply_chain_multiplier(food_name: str) -> float:
     """Get supply chain multiplier for a food item"""
-    food_lower = food_name.lower()
-
-    # High multiplier foods (fresh produce with high supply chain losses)
-    if any(term in food_lower for term in ["lettuce", "spinach", "arugula", "kale"]):
-        return 5.7  # Lettuce-like leafy greens
-    elif any(term in food_lower for term in ["tomato", "cucumber", "pepper", "zucchini"]):
-        return 2.52  # Fresh vegetables
-    elif any(term in food_lower for term in ["banana", "avocado", "mango", "papaya"]):
-        return 2.86  # Tropical fruits
-    elif any(term in food_lower for term in ["strawberr", "raspberr", "blueberr", "grape"]):
-        return 2.8  # Berries and soft fruits
-    elif any(term in food_lower for term in ["apple", "orange", "lemon", "lime"]):
-        return 2.0  # Tree fruits
-    elif any(term in food_lower for term in ["carrot", "potato", "onion", "cabbage"]):
-        return 2.2  # Root vegetables and hardy produce
-    elif any(term in food_lower for term in ["beef", "pork", "lamb", "chicken"]):
-        return 1.8  # Meat products
-    elif any(term in food_lower for term in ["milk", "cheese", "yogurt", "butter"]):
-        return 1.6  # Dairy products
-    elif any(term in food_lower for term in ["rice", "pasta", "bread", "cereal"]):
-        return 1.5  # Grains and processed foods
-    else:
-        return 1.8  # Default multiplier
+    group = _MULTIPLIER_GROUPS.first(food_name.lower())
+    return SUPPLY_CHAIN_MULTIPLIERS[group][1] if group else 1.8  # Default multiplier
 
 
 def estimate_ghg_impact(food_name: str) -> float:
     """Estimate GHG impact for foods without data"""
-    food_lower = food_name.lower()
-
-    if any(term in food_lower for term in ["beef", "steak", "ground beef"]):
-        return 99.48
-    elif any(term in food_lower for term in ["lamb", "mutton"]):
-        return 39.2
-    elif any(term in food_lower for term in ["pork", "bacon", "ham"]):
-        return 12.1
-    elif any(term in food_lower for term in ["chicken", "turkey", "poultry"]):
-        return 9.87
-    elif any(term in food_lower for term in ["fish", "salmon", "tuna"]):
-        return 6.0
-    elif any(term in food_lower for term in ["cheese"]):
-        return 23.88
-    elif any(term in food_lower for term in ["milk"]):
-        return 3.15
-    elif any(term in food_lower for term in ["rice"]):
-        return 4.45
-    elif any(term in food_lower for term in ["tomato"]):
-        return 2.09
-    elif any(term in food_lower for term in ["potato"]):
-        return 0.46
-    else:
-        return 2.0  # Default for vegetables/fruits
+    group = _GHG_GROUPS.first(food_name.lower())
+    return GHG_ESTIMATES[group][1] if group else 2.0  # Default for vegetables/fruits
 
 
 def estimate_price(food_name: str) -> float:
     """Estimate price per kg for economic impact calculation"""
-    food_lower = food_name.lower()
-
-    if any(term in food_lower for term in ["beef", "steak"]):
-        return 20.0
-    elif any(term in food_lower for term in ["chicken", "turkey"]):
-        return 8.0
-    elif any(term in food_lower for term in ["fish", "salmon"]):
-        return 15.0
-    elif any(term in food_lower for term in ["cheese"]):
-        return 12.0
-    elif any(term in food_lower for term in ["berry", "grape"]):
-        return 8.0
-    elif any(term in food_lower for term in ["tomato", "pepper"]):
-        return 4.0
-    elif any(term in food_lower for term in ["lettuce", "spinach"]):
-        return 6.0
-    else:
-        return 5.0  # Default price per kg
+    group = _PRICE_GROUPS.first(food_name.lower())
+    return PRICE_ESTIMATES[group][1] if group else 5.0  # Default price per kg
@@ -0,0 +1,124 @@
+"""Benchmark compiled keyword tables against per-keyword loops
+
+Times, per item name or chat message, the categorization tables of
+PracticalFoodCategorizationService, FoodDatabaseService and FoodWasteService and
+the keyword tables of MessageContextService, once the way they used to be
+matched (re.search / `in` per pattern, one table after another) and once with
+the compiled matchers from backend_gateway.utils.keyword_matcher, and checks
+that both give the same hits. Texts are random mixes of table keywords and
+filler words, so most of them hit several tables.
+
+Usage:
+    python backend_gateway/scripts/benchmark_keyword_matching.py
+    python backend_gateway/scripts/benchmark_keyword_matching.py --texts 20000 --words 12
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend_gateway.services.food_database_service import FoodDatabaseService
+from backend_gateway.services.food_waste_service import FoodWasteService
+from backend_gateway.services.message_context_service import MessageContextService
+from backend_gateway.services.practical_food_categorization import (
+    PracticalFoodCategorizationService,
+)
+
+FILLER = ["organic", "fresh", "i", "want", "some", "with", "for", "the", "and", "pack", "2"]
+
+
+def pattern_words(patterns) -> list[str]:
+    """Literal words inside regex patterns, to build texts that hit them"""
+    return [w for p in patterns for w in re.findall(r"[a-z][a-z ']+[a-z]", p.replace("\\b", " "))]
+
+
+def make_texts(vocabulary: list[str], count: int, words: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, words))) for _ in range(count)
+    ]
+
+
+def timed(fn, texts: list[str]) -> tuple[list, float]:
+    started = time.perf_counter()
+    results = [fn(text) for text in texts]
+    return results, (time.perf_counter() - started) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=10000, help="texts per benchmark")
+    parser.add_argument("--words", type=int, default=8, help="max words per text")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    practical = PracticalFoodCategorizationService()
+    database = FoodDatabaseService()
+    waste = FoodWasteService()
+    messages = MessageContextService()
+
+    practical_table = {c: info["patterns"] for c, info in practical.category_patterns.items()}
+    message_tables = list(messages.keyword_tables.values())
+
+    def practical_loop(text):
+        return {
+            c: hits
+            for c, patterns in practical_table.items()
+            if (hits := [p for p in patterns if re.search(p, text)])
+        }
+
+    def database_loop(text):
+        for category, patterns in database.category_patterns.items():
+            for pattern in patterns:
+                if re.search(pattern, text):
+                    return category, pattern
+        return None
+
+    def waste_loop(text):
+        for cpc, foods in waste.CPC_TO_FOOD_SAMPLES.items():
+            if any(food in text for food in foods):
+                return cpc
+        return None
+
+    def message_loop(text):
+        return {
+            (name, label)
+            for name, table in messages.keyword_tables.items()
+            for label, keywords in table.items()
+            if any(keyword in text for keyword in keywords)
+        }
+
+    item_words = (
+        pattern_words(p for patterns in practical_table.values() for p in patterns)
+        + [food for foods in waste.CPC_TO_FOOD_SAMPLES.values() for food in foods]
+        + FILLER
+    )
+    message_words = [k for t in message_tables for ks in t.values() for k in ks] + FILLER
+    items = make_texts(item_words, args.texts, min(args.words, 4), args.seed)
+    chats = make_texts(message_words, args.texts, args.words, args.seed)
+
+    benchmarks = [
+        ("practical categorization", items, practical_loop, practical._pattern_table.matches),
+        ("food database patterns", items, database_loop, database._pattern_table.first),
+        ("food waste CPC lookup", items, waste_loop, waste._cpc_keywords.first),
+        ("message keyword tables", chats, message_loop, messages._keywords.find),
+    ]
+
+    print(f"{'table':<26} {'loop us/text':>13} {'compiled us/text':>17} {'speedup':>8}")
+    for name, texts, loop, compiled in benchmarks:
+        expected, loop_us = timed(loop, texts)
+        actual, compiled_us = timed(compiled, texts)
+        mismatches = sum(a != b for a, b in zip(expected, actual))
+        print(
+            f"{name:<26} {loop_us:>13.1f} {compiled_us:>17.1f} {loop_us / compiled_us:>7.1f}x"
+            + (f"  MISMATCHES: {mismatches}" if mismatches else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
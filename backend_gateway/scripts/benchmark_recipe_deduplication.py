@@ -0,0 +1,150 @@
+"""Benchmark indexed vs. all-pairs recipe deduplication on a synthetic corpus
+
+Generates recipes shaped like Spoonacular results (with a share of near-duplicate
+copies, as seen when merging Spoonacular, backup-CSV and AI results), runs both
+RecipeDeduplicationService modes and checks that they return identical results.
+
+The all-pairs scan is slow (minutes at a few thousand recipes); pass --no-scan to
+time only the indexed mode on larger corpora.
+
+Usage:
+    python backend_gateway/scripts/benchmark_recipe_deduplication.py --recipes 2000
+    python backend_gateway/scripts/benchmark_recipe_deduplication.py --recipes 20000 --no-scan
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend_gateway.services.recipe_deduplication_service import RecipeDeduplicationService
+
+ADJECTIVES = [
+    "spicy",
+    "creamy",
+    "roasted",
+    "grilled",
+    "crispy",
+    "garlic",
+    "lemon",
+    "smoky",
+    "honey",
+    "herbed",
+    "baked",
+    "braised",
+    "sticky",
+    "zesty",
+    "rustic",
+    "golden",
+]
+DISHES = [
+    "chicken",
+    "salmon",
+    "pasta",
+    "risotto",
+    "curry",
+    "tacos",
+    "salad",
+    "soup",
+    "stew",
+    "burger",
+    "noodles",
+    "casserole",
+    "frittata",
+    "chili",
+    "stir fry",
+    "flatbread",
+]
+SIDES = ["rice", "potatoes", "greens", "beans", "couscous", "quinoa", "slaw", "vegetables"]
+
+
+def build_corpus(count: int, duplicate_rate: float, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    pantry = [f"ingredient{n}" for n in range(400)] + [
+        "chicken",
+        "beef",
+        "onion",
+        "garlic",
+        "olive oil",
+        "salt",
+        "pepper",
+        "butter",
+    ]
+    recipes = []
+    for recipe_id in range(count):
+        if recipes and rng.random() < duplicate_rate:
+            # Near-duplicate of an earlier recipe: same dish, small edits
+            base = rng.choice(recipes)
+            ingredients = list(base["extendedIngredients"])
+            if rng.random() < 0.5 and len(ingredients) > 3:
+                ingredients.pop(rng.randrange(len(ingredients)))
+            if rng.random() < 0.5:
+                ingredients.append({"name": rng.choice(pantry)})
+            title = base["title"] + rng.choice(["", " recipe", " (easy)", "!"])
+            recipes.append(
+                {
+                    "id": recipe_id,
+                    "title": title,
+                    "readyInMinutes": base["readyInMinutes"] + rng.randint(-5, 5),
+                    "servings": base["servings"],
+                    "extendedIngredients": ingredients,
+                }
+            )
+            continue
+
+        title = (f"{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} with {rng.choice(SIDES)}").title()
+        recipes.append(
+            {
+                "id": recipe_id,
+                "title": title,
+                "readyInMinutes": rng.choice([15, 20, 30, 45, 60, 90]),
+                "servings": rng.randint(1, 8),
+                "extendedIngredients": [
+                    {"name": name} for name in rng.sample(pantry, rng.randint(5, 14))
+                ],
+            }
+        )
+    return recipes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-scan", action="store_true", help="skip the all-pairs baseline")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.recipes, args.duplicate_rate, args.seed)
+    service = RecipeDeduplicationService(similarity_threshold=args.threshold)
+
+    start = time.perf_counter()
+    indexed_unique, indexed_dupes = service.deduplicate_recipes_indexed(corpus)
+    indexed_seconds = time.perf_counter() - start
+
+    print(f"recipes:             {len(corpus)}")
+    print(f"unique / duplicates: {len(indexed_unique)} / {len(indexed_dupes)}")
+    print(f"indexed:             {indexed_seconds:.2f}s")
+    if args.no_scan:
+        return 0
+
+    start = time.perf_counter()
+    scan_unique, scan_dupes = service.deduplicate_recipes(corpus, use_index=False)
+    scan_seconds = time.perf_counter() - start
+
+    identical = [r["id"] for r in indexed_unique] == [r["id"] for r in scan_unique] and (
+        indexed_dupes == scan_dupes
+    )
+
+    print(f"all-pairs scan:      {scan_seconds:.2f}s")
+    print(f"speedup:             {scan_seconds / indexed_seconds:.1f}x")
+    print(f"identical results:   {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
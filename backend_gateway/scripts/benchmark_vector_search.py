@@ -0,0 +1,192 @@
+"""Benchmark HNSW recall vs. latency for the semantic search query shape
+
+Loads a synthetic clustered corpus of unit vectors into a scratch table, builds an
+HNSW index with the given m / ef_construction and runs nearest-neighbour queries
+shaped like PostgresService._vector_search (inner ORDER BY distance LIMIT
+candidates, outer threshold and LIMIT) across a grid of ef_search values and
+candidate multipliers, with and without a row filter of the given selectivity
+(standing in for the user and diet predicates). Recall@k is measured against
+exact NumPy search.
+
+Needs a database with pgvector (0.8+ for --iterative-scan); the scratch table is
+dropped afterwards unless --keep is given.
+
+Usage:
+    python backend_gateway/scripts/benchmark_vector_search.py --rows 20000
+    python backend_gateway/scripts/benchmark_vector_search.py --rows 100000 --dim 1536 \
+        --m 24 --ef-construction 128 --ef-search 40,100,200 --multipliers 1,4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from psycopg2.extras import execute_values
+
+from backend_gateway.config.database import get_database_service
+
+TABLE = "vector_search_benchmark"
+
+
+def build_corpus(rows: int, dim: int, clusters: int, spread: float, seed: int) -> np.ndarray:
+    """Unit vectors scattered around random cluster centres, like topic-grouped embeddings"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(clusters, size=rows)]
+    vectors += rng.normal(scale=spread, size=(rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_table(db, vectors: np.ndarray, tagged: np.ndarray, m: int, ef_construction: int) -> float:
+    dim = vectors.shape[1]
+    with db.get_cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} "
+            f"(id INTEGER PRIMARY KEY, tagged BOOLEAN, embedding vector({dim}))"
+        )
+        for start in range(0, len(vectors), 500):
+            execute_values(
+                cursor,
+                f"INSERT INTO {TABLE} (id, tagged, embedding) VALUES %s",
+                [
+                    (start + i, bool(tagged[start + i]), vector)
+                    for i, vector in enumerate(vectors[start : start + 500])
+                ],
+            )
+
+    started = time.perf_counter()
+    with db.get_cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX ON {TABLE} USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = %(m)s, ef_construction = %(ef_construction)s)",
+            {"m": m, "ef_construction": ef_construction},
+        )
+        cursor.execute(f"ANALYZE {TABLE}")
+    return time.perf_counter() - started
+
+
+def run_query(
+    db,
+    query: np.ndarray,
+    k: int,
+    candidates: int,
+    ef_search: int,
+    filtered: bool,
+    iterative_scan: str,
+) -> list[int]:
+    where = "AND tagged" if filtered else ""
+    with db.get_cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('hnsw.ef_search', %(ef)s, true)", {"ef": str(min(ef_search, 1000))}
+        )
+        if iterative_scan:
+            cursor.execute(
+                "SELECT set_config('hnsw.iterative_scan', %(mode)s, true)", {"mode": iterative_scan}
+            )
+        cursor.execute(
+            f"""
+            SELECT nearest.id
+            FROM (
+                SELECT id, embedding <=> %(embedding)s::vector AS distance
+                FROM {TABLE}
+                WHERE embedding IS NOT NULL {where}
+                ORDER BY distance
+                LIMIT %(candidates)s
+            ) nearest
+            WHERE nearest.distance < %(max_distance)s
+            ORDER BY nearest.distance
+            LIMIT %(limit)s
+            """,
+            {"embedding": query, "candidates": candidates, "max_distance": 2.0, "limit": k},
+        )
+        return [row["id"] for row in cursor.fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--spread", type=float, default=0.05, help="noise around each centre")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--ef-search", default="20,40,80,160", help="comma-separated values")
+    parser.add_argument("--multipliers", default="1,2,4", help="comma-separated values")
+    parser.add_argument(
+        "--selectivity",
+        type=float,
+        default=0.05,
+        help="share of rows passing the filter in filtered runs",
+    )
+    parser.add_argument(
+        "--iterative-scan",
+        default="relaxed_order",
+        help="hnsw.iterative_scan mode; empty for pgvector < 0.8",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed + 1)
+    corpus = build_corpus(args.rows, args.dim, args.clusters, args.spread, args.seed)
+    tagged = rng.random(args.rows) < args.selectivity
+    queries = corpus[rng.integers(args.rows, size=args.queries)]
+    queries = queries + rng.normal(scale=args.spread, size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    # Exact top-k by cosine similarity, without and with the filter
+    similarity = queries @ corpus.T
+    truth = {
+        False: np.argsort(-similarity, axis=1)[:, : args.k],
+        True: np.argsort(-np.where(tagged, similarity, -np.inf), axis=1)[:, : args.k],
+    }
+
+    db = get_database_service()
+    build_seconds = load_table(db, corpus, tagged, args.m, args.ef_construction)
+    print(f"rows: {args.rows}  dim: {args.dim}  filtered share: {tagged.mean():.3f}")
+    print(f"hnsw m={args.m} ef_construction={args.ef_construction}: built in {build_seconds:.1f}s")
+    print()
+    print(f"{'filter':<8}{'ef_search':>10}{'mult':>6}{'recall@k':>10}{'p50 ms':>9}{'p95 ms':>9}")
+
+    try:
+        for filtered in (False, True):
+            for ef_search in (int(v) for v in args.ef_search.split(",")):
+                for multiplier in (int(v) for v in args.multipliers.split(",")):
+                    candidates = args.k * multiplier
+                    latencies, hits = [], 0
+                    for row, query in enumerate(queries):
+                        started = time.perf_counter()
+                        ids = run_query(
+                            db,
+                            query,
+                            args.k,
+                            candidates,
+                            max(ef_search, candidates),
+                            filtered,
+                            args.iterative_scan,
+                        )
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        hits += len(set(ids) & set(truth[filtered][row].tolist()))
+                    recall = hits / (args.k * len(queries))
+                    p50, p95 = np.percentile(latencies, [50, 95])
+                    print(
+                        f"{'yes' if filtered else 'no':<8}{ef_search:>10}{multiplier:>6}"
+                        f"{recall:>10.3f}{p50:>9.2f}{p95:>9.2f}"
+                    )
+    finally:
+        if not args.keep:
+            with db.get_cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
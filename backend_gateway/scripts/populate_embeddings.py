@@ -2,6 +2,9 @@
 Script to populate embeddings for existing data in the database
 This script generates embeddings for all recipes, products, and pantry items
 that don't already have embeddings.
+
+Without pgvector, the snapshot command writes recipe or product embeddings to
+the in-process vector index files instead (see services/vector_index.py).
 """
 
 import asyncio
@@ -17,6 +20,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from backend_gateway.core.config import get_settings
 from backend_gateway.services.embedding_service import get_embedding_service
 from backend_gateway.services.postgres_service import PostgresService
+from backend_gateway.services.vector_index import VECTOR_INDEX_DIR, write_snapshot
 
 # Configure logging
 logging.basicConfig(
@@ -133,9 +137,6 @@ class EmbeddingPopulator:
                 # Generate embedding
                 embedding = await self.embedding_service.generate_recipe_embedding(recipe_info)
 
-                # Convert to PostgreSQL array format
-                embedding_str = "[" + ",".join(map(str, embedding)) + "]"
-
                 # Update database
                 with self.db_service.get_cursor() as cursor:
                     cursor.execute(
@@ -145,7 +146,7 @@ class EmbeddingPopulator:
                             embedding_updated_at = CURRENT_TIMESTAMP
                         WHERE recipe_id = %s
                     """,
-                        (embedding_str, recipe["recipe_id"]),
+                        (embedding, recipe["recipe_id"]),
                     )
 
                 self.stats["recipes"]["processed"] += 1
@@ -190,9 +191,6 @@ class EmbeddingPopulator:
                 # Generate embedding
                 embedding = await self.embedding_service.generate_product_embedding(product)
 
-                # Convert to PostgreSQL array format
-                embedding_str = "[" + ",".join(map(str, embedding)) + "]"
-
                 # Update database
                 with self.db_service.get_cursor() as cursor:
                     cursor.execute(
@@ -202,7 +200,7 @@ class EmbeddingPopulator:
                             embedding_updated_at = CURRENT_TIMESTAMP
                         WHERE id = %s
                     """,
-                        (embedding_str, product["id"]),
+                        (embedding, product["id"]),
                     )
 
                 self.stats["products"]["processed"] += 1
@@ -272,9 +270,6 @@ class EmbeddingPopulator:
                 # Generate embedding
                 embedding = await self.embedding_service.generate_pantry_item_embedding(item_data)
 
-                # Convert to PostgreSQL array format
-                embedding_str = "[" + ",".join(map(str, embedding)) + "]"
-
                 # Update database
                 with self.db_service.get_cursor() as cursor:
                     cursor.execute(
@@ -284,7 +279,7 @@ class EmbeddingPopulator:
                             embedding_updated_at = CURRENT_TIMESTAMP
                         WHERE id = %s
                     """,
-                        (embedding_str, item["id"]),
+                        (embedding, item["id"]),
                     )
 
                 self.stats["pantry_items"]["processed"] += 1
@@ -313,6 +308,44 @@ class EmbeddingPopulator:
         else:
             logger.error(f"Failed to generate embedding for product {product_id}")
 
+    async def build_vector_index_snapshot(self, entity: str):
+        """Embed every recipe or product and write an in-process index snapshot"""
+        if entity == "recipes":
+            query = "SELECT recipe_id, recipe_name, cuisine_type, recipe_data FROM recipes"
+        else:
+            query = "SELECT id, name, brand, category, description, barcode FROM products"
+        with self.db_service.get_cursor() as cursor:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+        logger.info(f"Embedding {len(rows)} {entity} for the in-process index")
+
+        ids, vectors, metadata = [], [], []
+        batch_size = 100
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i : i + batch_size]
+            # Concurrent requests are coalesced into batched API calls by the service
+            if entity == "recipes":
+                infos = [self.db_service.recipe_embedding_info(row) for row in batch]
+                requests = [self.embedding_service.generate_recipe_embedding(r) for r in infos]
+                entries = [self.db_service.recipe_index_metadata(r) for r in infos]
+            else:
+                requests = [self.embedding_service.generate_product_embedding(r) for r in batch]
+                entries = [self.db_service.product_index_metadata(r) for r in batch]
+            results = await asyncio.gather(*requests, return_exceptions=True)
+            for entry, embedding in zip(entries, results):
+                if isinstance(embedding, Exception):
+                    logger.error(f"Failed to generate embedding for {entity} {entry}: {embedding}")
+                    self.stats[entity]["failed"] += 1
+                    continue
+                ids.append(entry["recipe_id"] if entity == "recipes" else entry["product_id"])
+                vectors.append(embedding)
+                metadata.append(entry)
+            logger.info(f"Processed {min(i + batch_size, len(rows))}/{len(rows)} {entity}")
+
+        write_snapshot(entity, ids, vectors, metadata)
+        self.stats[entity]["processed"] = len(ids)
+        logger.info(f"Wrote {len(ids)} {entity} to {VECTOR_INDEX_DIR}")
+
     async def cleanup(self):
         """Clean up resources"""
         await self.embedding_service.close()
@@ -349,6 +382,10 @@ async def main():
                 # Populate all pantry items
                 await populator.populate_pantry_item_embeddings()
 
+            elif command == "snapshot" and sys.argv[2:3] in (["recipes"], ["products"]):
+                # Write an in-process vector index snapshot
+                await populator.build_vector_index_snapshot(sys.argv[2])
+
             else:
                 logger.error(f"Unknown command: {command}")
                 print_usage()
@@ -377,11 +414,14 @@ Commands:
     pantry           - Populate embeddings for all pantry items
     recipe <id>      - Populate embedding for specific recipe
     product <id>     - Populate embedding for specific product
+    snapshot recipes - Write the in-process vector index for recipes (no pgvector)
+    snapshot products - Write the in-process vector index for products (no pgvector)
 
 Examples:
     python populate_embeddings.py
     python populate_embeddings.py recipes
     python populate_embeddings.py recipe 123
+    python populate_embeddings.py snapshot recipes
     """
     )
 
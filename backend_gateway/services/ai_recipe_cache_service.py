@@ -9,6 +9,7 @@ from typing import Any, Optional
 
 from sqlalchemy import text
 
+from backend_gateway.services.pantry_version_service import get_pantry_version
 from backend_gateway.services.postgres_service import PostgresService
 
 
@@ -44,20 +45,13 @@ class AIRecipeCacheService:
             session.execute(text(create_table_sql))
             session.commit()
 
-    def _generate_cache_key(
-        self, user_id: int, pantry_items: list[dict], preferences: dict, max_recipes: int
-    ) -> str:
-        """Generate a unique cache key based on user's pantry and preferences"""
-        # Sort items for consistent hashing
-        sorted_items = sorted(pantry_items, key=lambda x: x.get("pantry_item_id", 0))
-
-        # Create a string representation of the cache inputs
+    def _generate_cache_key(self, user_id: int, preferences: dict, max_recipes: int) -> str:
+        """Generate a unique cache key based on user's pantry version and preferences"""
+        # The pantry version changes on every pantry write, so the items themselves
+        # don't need to be fetched or hashed
         cache_data = {
             "user_id": user_id,
-            "items": [
-                (item["product_name"], item["available_quantity"], item["unit"])
-                for item in sorted_items
-            ],
+            "pantry_version": get_pantry_version(user_id),
             "preferences": preferences,
             "max_recipes": max_recipes,
         }
@@ -67,10 +61,14 @@ class AIRecipeCacheService:
         return hashlib.sha256(cache_string.encode()).hexdigest()
 
     def get_cached_recipes(
-        self, user_id: int, pantry_items: list[dict], preferences: dict, max_recipes: int
+        self,
+        user_id: int,
+        pantry_items: Optional[list[dict]],
+        preferences: dict,
+        max_recipes: int,
     ) -> Optional[dict[str, Any]]:
-        """Retrieve cached recipes if available and not expired"""
-        cache_key = self._generate_cache_key(user_id, pantry_items, preferences, max_recipes)
+        """Retrieve cached recipes if available and not expired (pantry_items is unused)"""
+        cache_key = self._generate_cache_key(user_id, preferences, max_recipes)
 
         with self.db_service.get_session() as session:
             query = text(
@@ -113,8 +111,8 @@ class AIRecipeCacheService:
         max_recipes: int,
         metadata: Optional[dict] = None,
     ):
-        """Cache AI-generated recipes"""
-        cache_key = self._generate_cache_key(user_id, pantry_items, preferences, max_recipes)
+        """Cache AI-generated recipes, keeping pantry_items as a snapshot"""
+        cache_key = self._generate_cache_key(user_id, preferences, max_recipes)
         expires_at = datetime.now() + self.cache_duration
 
         with self.db_service.get_session() as session:
@@ -747,17 +747,18 @@ class CrewAIService:
     def generate_recipes(self, user_id: int, max_recipes: int = 3) -> dict[str, Any]:
         """Generate recipe suggestions for a user based on their pantry"""
         try:
-            # First get pantry items and preferences for cache key
-            pantry_items = self.ingredient_filter_tool._run(user_id)
+            # Check cache first; it is keyed on the pantry version, so the pantry
+            # itself is only fetched on a miss
             preferences = self.user_restriction_tool._run(user_id)
-
-            # Check cache first
             cached_result = self.cache_service.get_cached_recipes(
-                user_id, pantry_items, preferences, max_recipes
+                user_id, None, preferences, max_recipes
             )
 
             if cached_result:
                 return cached_result
+
+            # Snapshot of the pantry the recipes were generated from
+            pantry_items = self.ingredient_filter_tool._run(user_id)
             # Create tasks for the crew
             tasks = [
                 self._create_task(
@@ -1176,25 +1176,28 @@ class CrewAIService:
             # Try to get user_id from pantry items (they should have it)
             user_id = 111  # Default for now, should be passed properly
 
-        # Score each recipe using the preference scorer
-        for recipe in recipes:
-            try:
-                score_result = self.preference_scorer.calculate_comprehensive_score(
-                    recipe=recipe,
-                    user_id=user_id,
-                    pantry_items=pantry_items,
-                    context={"season": "current", "meal_type": "any"},
-                )
-
-                # Add scoring results to recipe
-                recipe["preference_score"] = score_result["score"]
-                recipe["score_reasoning"] = score_result["reasoning"]
-                recipe["recommendation_level"] = score_result["recommendation_level"]
-                recipe["score_components"] = score_result["components"]
+        # Score all recipes in one pass (the user profile is loaded once)
+        try:
+            score_results = self.preference_scorer.score_recipes(
+                recipes,
+                user_id=user_id,
+                pantry_items=pantry_items,
+                context={"season": "current", "meal_type": "any"},
+            )
+        except Exception as e:
+            logger.warning(f"Could not load preference profile for user {user_id}: {e}")
+            score_results = [None] * len(recipes)
 
-            except Exception as e:
-                logger.warning(f"Could not score recipe {recipe.get('name', 'unknown')}: {e}")
+        for recipe, score_result in zip(recipes, score_results):
+            if score_result is None:
                 recipe["preference_score"] = 50.0  # Default middle score
+                continue
+
+            # Add scoring results to recipe
+            recipe["preference_score"] = score_result["score"]
+            recipe["score_reasoning"] = score_result["reasoning"]
+            recipe["recommendation_level"] = score_result["recommendation_level"]
+            recipe["score_components"] = score_result["components"]
 
         # Enhanced ranking with preference scores
         ranked = sorted(
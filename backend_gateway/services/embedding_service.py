@@ -4,39 +4,79 @@ Generates vector embeddings for semantic search using OpenAI's embedding models
 """
 
 import asyncio
+import base64
+import hashlib
 import logging
 import os
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime
 from typing import Any, Optional
 
 import httpx
 import numpy as np
 
+from .vector_codec import to_vector
+
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class EmbeddingResult:
     text: str
-    embedding: list[float]
+    embedding: np.ndarray  # float32, shape (dimensions,)
     model: str
     dimensions: int
     metadata: Optional[dict[str, Any]] = None
 
 
+class TokenBucket:
+    """
+    Token-bucket rate limiter: refills at rate tokens per second up to capacity.
+
+    A caller takes its tokens immediately, going into debt if needed, and sleeps
+    until the debt would be repaid, so concurrent callers queue up in order
+    without a lock.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.waits = 0
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= min(tokens, self.capacity)
+        if self._tokens < 0:
+            self.waits += 1
+            wait = -self._tokens / self.rate
+            logger.info(f"Embedding rate limit reached, waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+
 class EmbeddingService:
     """
     Service for generating embeddings for recipes, products, and pantry items
     using OpenAI's text embedding models
+
+    Embeddings are cached by a hash of model and text, in memory (LRU) and, when
+    a database service is attached, in the food_item_embeddings table. Texts that
+    miss both are queued briefly so concurrent requests share one API call, and
+    concurrent requests for the same text share one result.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, db_service: Optional[Any] = None):
         """
         Initialize the embedding service
 
         Args:
             api_key: OpenAI API key. If not provided, will look for OPENAI_API_KEY env var
+            db_service: Optional database service (with execute_query_async) used as the
+                persistent cache tier
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -45,6 +85,7 @@ class EmbeddingService:
         self.client = httpx.AsyncClient(
             headers={"Authorization": f"Bearer {self.api_key}"}, timeout=30.0
         )
+        self.db_service = db_service
 
         # Model configuration
         self.model = "text-embedding-3-small"  # 1536 dimensions, good balance of performance/cost
@@ -53,7 +94,30 @@ class EmbeddingService:
         # Rate limiting
         self.requests_per_minute = 3000
         self.tokens_per_minute = 1000000
-        self._request_times = []
+        self._request_bucket = TokenBucket(
+            self.requests_per_minute / 60, capacity=max(1, self.requests_per_minute // 60)
+        )
+        self._token_bucket = TokenBucket(
+            self.tokens_per_minute / 60, capacity=self.tokens_per_minute / 60
+        )
+
+        # Caching and micro-batching
+        self.cache_size = int(os.getenv("OPENAI_EMBEDDING_CACHE_SIZE", "10000"))
+        self.batch_window = int(os.getenv("OPENAI_EMBEDDING_BATCH_WINDOW_MS", "10")) / 1000
+        self.max_batch_size = int(os.getenv("OPENAI_EMBEDDING_MAX_BATCH", "100"))
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: dict[str, str] = {}  # cache key -> text, waiting for the next flush
+        self._in_flight: dict[str, asyncio.Future] = {}  # cache key -> shared result
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self._counters = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "coalesced": 0,
+            "api_calls": 0,
+            "api_texts": 0,
+        }
 
     async def generate_embedding(
         self, text: str, metadata: Optional[dict[str, Any]] = None
@@ -71,26 +135,8 @@ class EmbeddingService:
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
 
-        # Rate limiting
-        await self._check_rate_limit()
-
         try:
-            response = await self.client.post(
-                "https://api.openai.com/v1/embeddings", json={"input": text, "model": self.model}
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            embedding = data["data"][0]["embedding"]
-
-            return EmbeddingResult(
-                text=text,
-                embedding=embedding,
-                model=self.model,
-                dimensions=self.dimensions,
-                metadata=metadata,
-            )
-
+            embedding = await asyncio.shield(self._request(text))
         except httpx.HTTPStatusError as e:
             logger.error(f"OpenAI API error: {e.response.status_code} - {e.response.text}")
             raise
@@ -98,6 +144,14 @@ class EmbeddingService:
             logger.error(f"Error generating embedding: {e}")
             raise
 
+        return EmbeddingResult(
+            text=text,
+            embedding=embedding,
+            model=self.model,
+            dimensions=self.dimensions,
+            metadata=metadata,
+        )
+
     async def generate_embeddings_batch(self, texts: list[str]) -> list[EmbeddingResult]:
         """
         Generate embeddings for multiple texts in batch
@@ -106,48 +160,30 @@ class EmbeddingService:
             texts: List of texts to embed
 
         Returns:
-            List of EmbeddingResults
+            List of EmbeddingResults (texts whose batch failed are left out)
         """
         if not texts:
             return []
 
-        # OpenAI allows up to 2048 embeddings per request
-        batch_size = 100  # Conservative batch size
-        results = []
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-
-            # Rate limiting
-            await self._check_rate_limit()
+        outcomes = await asyncio.gather(
+            *(asyncio.shield(self._request(text)) for text in texts), return_exceptions=True
+        )
 
-            try:
-                response = await self.client.post(
-                    "https://api.openai.com/v1/embeddings",
-                    json={"input": batch, "model": self.model},
-                )
-                response.raise_for_status()
-
-                data = response.json()
-
-                for j, embedding_data in enumerate(data["data"]):
-                    results.append(
-                        EmbeddingResult(
-                            text=batch[j],
-                            embedding=embedding_data["embedding"],
-                            model=self.model,
-                            dimensions=self.dimensions,
-                        )
-                    )
-
-            except Exception as e:
-                logger.error(f"Error in batch embedding generation: {e}")
-                # Continue with next batch instead of failing completely
+        results = []
+        for text, outcome in zip(texts, outcomes):
+            if isinstance(outcome, BaseException):
+                # Continue with the other texts instead of failing completely
+                logger.error(f"Error in batch embedding generation: {outcome}")
                 continue
+            results.append(
+                EmbeddingResult(
+                    text=text, embedding=outcome, model=self.model, dimensions=self.dimensions
+                )
+            )
 
         return results
 
-    async def generate_recipe_embedding(self, recipe: dict[str, Any]) -> list[float]:
+    async def generate_recipe_embedding(self, recipe: dict[str, Any]) -> np.ndarray:
         """
         Generate embedding for a recipe by combining relevant fields
 
@@ -155,7 +191,7 @@ class EmbeddingService:
             recipe: Recipe dictionary with name, description, ingredients, etc.
 
         Returns:
-            Embedding vector
+            float32 embedding vector
         """
         # Combine relevant recipe information
         text_parts = []
@@ -203,7 +239,7 @@ class EmbeddingService:
         )
         return result.embedding
 
-    async def generate_product_embedding(self, product: dict[str, Any]) -> list[float]:
+    async def generate_product_embedding(self, product: dict[str, Any]) -> np.ndarray:
         """
         Generate embedding for a product
 
@@ -211,7 +247,7 @@ class EmbeddingService:
             product: Product dictionary with name, category, brand, etc.
 
         Returns:
-            Embedding vector
+            float32 embedding vector
         """
         # Combine relevant product information
         text_parts = []
@@ -245,7 +281,7 @@ class EmbeddingService:
         )
         return result.embedding
 
-    async def generate_pantry_item_embedding(self, item: dict[str, Any]) -> list[float]:
+    async def generate_pantry_item_embedding(self, item: dict[str, Any]) -> np.ndarray:
         """
         Generate embedding for a pantry item
 
@@ -253,7 +289,7 @@ class EmbeddingService:
             item: Pantry item dictionary
 
         Returns:
-            Embedding vector
+            float32 embedding vector
         """
         # Get product info if available
         product_info = item.get("product", {})
@@ -288,9 +324,7 @@ class EmbeddingService:
         )
         return result.embedding
 
-    async def generate_query_embedding(
-        self, query: str, query_type: str = "general"
-    ) -> list[float]:
+    async def generate_query_embedding(self, query: str, query_type: str = "general") -> np.ndarray:
         """
         Generate embedding for a search query
 
@@ -299,7 +333,7 @@ class EmbeddingService:
             query_type: Type of query (recipe, product, pantry, general)
 
         Returns:
-            Embedding vector
+            float32 embedding vector
         """
         # Add context based on query type
         if query_type == "recipe":
@@ -317,24 +351,169 @@ class EmbeddingService:
         )
         return result.embedding
 
-    async def _check_rate_limit(self):
-        """Simple rate limiting to avoid hitting OpenAI limits"""
-        current_time = datetime.now()
-
-        # Remove requests older than 1 minute
-        self._request_times = [t for t in self._request_times if (current_time - t).seconds < 60]
-
-        # If we're at the limit, wait
-        if len(self._request_times) >= self.requests_per_minute:
-            sleep_time = 60 - (current_time - self._request_times[0]).seconds
-            if sleep_time > 0:
-                logger.info(f"Rate limit reached, sleeping for {sleep_time} seconds")
-                await asyncio.sleep(sleep_time)
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
+
+    def _check_loop(self) -> asyncio.AbstractEventLoop:
+        # Futures and timers belong to one loop; start over if used from another
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = {}
+            self._in_flight = {}
+            self._flush_handle = None
+        return loop
+
+    def _request(self, text: str) -> asyncio.Future:
+        """Future for one text's embedding, served from memory, a shared request or a batch"""
+        loop = self._check_loop()
+        key = self._cache_key(text)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            self._counters["memory_hits"] += 1
+            future = loop.create_future()
+            future.set_result(cached)
+            return future
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._counters["coalesced"] += 1
+            return future
+
+        future = loop.create_future()
+        # Mark the exception retrieved in case every waiter was cancelled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+        self._pending[key] = text
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._resolve_batch(batch))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _resolve_batch(self, batch: dict[str, str]) -> None:
+        try:
+            found = await self._load_cached(list(batch))
+            self._counters["db_hits"] += len(found)
+
+            missing = {key: text for key, text in batch.items() if key not in found}
+            fetched = {}
+            if missing:
+                fetched = dict(zip(missing, await self._fetch_embeddings(list(missing.values()))))
+                found.update(fetched)
+
+            if len(found) < len(batch):
+                raise ValueError(f"Got {len(found)} embeddings for {len(batch)} texts")
+
+            for key, embedding in found.items():
+                self._remember(key, embedding)
+                future = self._in_flight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(embedding)
+        except Exception as e:
+            for key in batch:
+                future = self._in_flight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        # Persist after answering the waiters; later lookups hit memory meanwhile
+        await self._store_cached(fetched, missing)
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        # Cached arrays are handed to every caller, so keep them read-only
+        embedding.setflags(write=False)
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.cache_size:
+            self._memory.popitem(last=False)
+
+    async def _fetch_embeddings(self, texts: list[str]) -> list[np.ndarray]:
+        """One API call for up to max_batch_size texts, within the rate limits"""
+        await self._request_bucket.acquire(1)
+        # Rough token estimate: ~4 characters per token
+        await self._token_bucket.acquire(sum(len(text) // 4 + 1 for text in texts))
+
+        self._counters["api_calls"] += 1
+        self._counters["api_texts"] += len(texts)
+        # base64 returns raw little-endian float32s: a quarter of the JSON payload, no parsing
+        response = await self.client.post(
+            "https://api.openai.com/v1/embeddings",
+            json={"input": texts, "model": self.model, "encoding_format": "base64"},
+        )
+        response.raise_for_status()
 
-        # Record this request
-        self._request_times.append(current_time)
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [to_vector(base64.b64decode(item["embedding"])) for item in data]
 
-    def calculate_similarity(self, embedding1: list[float], embedding2: list[float]) -> float:
+    async def _load_cached(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Embeddings already stored in food_item_embeddings, keyed by content hash"""
+        if self.db_service is None:
+            return {}
+        try:
+            rows = await self.db_service.execute_query_async(
+                """
+                SELECT item_name, embedding
+                FROM food_item_embeddings
+                WHERE item_name = ANY(%(keys)s) AND model = %(model)s
+                """,
+                {"keys": keys, "model": self.model},
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+        # asyncpg decodes vectors to float lists, psycopg2 returns the text literal
+        return {row["item_name"]: to_vector(row["embedding"]) for row in rows or []}
+
+    async def _store_cached(self, embeddings: dict[str, np.ndarray], texts: dict[str, str]):
+        if self.db_service is None or not embeddings:
+            return
+        values, params = [], {"model": self.model}
+        for i, (key, embedding) in enumerate(embeddings.items()):
+            values.append(f"(%(key{i})s, %(embedding{i})s::vector, %(text{i})s, %(model)s)")
+            params[f"key{i}"] = key
+            params[f"embedding{i}"] = embedding
+            params[f"text{i}"] = texts[key]
+        try:
+            await self.db_service.execute_query_async(
+                f"""
+                INSERT INTO food_item_embeddings (item_name, embedding, embedding_text, model)
+                VALUES {", ".join(values)}
+                ON CONFLICT (item_name) DO UPDATE
+                SET embedding = EXCLUDED.embedding,
+                    embedding_text = EXCLUDED.embedding_text,
+                    model = EXCLUDED.model,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                params,
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "memory_size": len(self._memory),
+            "memory_maxsize": self.cache_size,
+            "persistent_tier": self.db_service is not None,
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "rate_limit_waits": self._request_bucket.waits + self._token_bucket.waits,
+        }
+
+    def calculate_similarity(self, embedding1: Any, embedding2: Any) -> float:
         """
         Calculate cosine similarity between two embeddings
 
@@ -345,9 +524,9 @@ class EmbeddingService:
         Returns:
             Cosine similarity score between -1 and 1
         """
-        # Convert to numpy arrays
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        # Accepts float32 arrays or lists
+        vec1 = to_vector(embedding1)
+        vec2 = to_vector(embedding2)
 
         # Calculate cosine similarity
         dot_product = np.dot(vec1, vec2)
@@ -368,9 +547,13 @@ class EmbeddingService:
 _embedding_service = None
 
 
-def get_embedding_service(api_key: Optional[str] = None) -> EmbeddingService:
-    """Get singleton instance of EmbeddingService"""
+def get_embedding_service(
+    api_key: Optional[str] = None, db_service: Optional[Any] = None
+) -> EmbeddingService:
+    """Get singleton instance of EmbeddingService, attaching db_service as its cache tier"""
     global _embedding_service
     if _embedding_service is None:
-        _embedding_service = EmbeddingService(api_key)
+        _embedding_service = EmbeddingService(api_key, db_service)
+    elif _embedding_service.db_service is None and db_service is not None:
+        _embedding_service.db_service = db_service
     return _embedding_service
@@ -19,6 +19,7 @@ from typing import Any, Optional
 
 from backend_gateway.services.recipe_deduplication_service import RecipeDeduplicationService
 from backend_gateway.services.spoonacular_api_tracker import SpoonacularAPITracker
+from backend_gateway.services.spoonacular_response_cache import served_from_cache
 from backend_gateway.services.spoonacular_service import SpoonacularService
 
 logger = logging.getLogger(__name__)
@@ -127,6 +128,7 @@ class EnhancedSpoonacularService(SpoonacularService):
                     ignore_pantry=ignore_pantry,
                     intolerances=intolerances,
                 )
+                context.set_cache_info(served_from_cache())
 
                 # Process recipes for deduplication and fingerprinting
                 if apply_dedup and self.deduplicator:
@@ -207,6 +209,7 @@ class EnhancedSpoonacularService(SpoonacularService):
 
                 # Call parent method
                 recipe = await super().get_recipe_information(recipe_id, include_nutrition)
+                context.set_cache_info(served_from_cache())
 
                 # Update tracking context
                 context.set_response_data(response_status=200, recipe_count=1 if recipe else 0)
@@ -223,6 +226,49 @@ class EnhancedSpoonacularService(SpoonacularService):
             # No tracking - just call parent method
             return await super().get_recipe_information(recipe_id, include_nutrition)
 
+    async def get_recipe_information_bulk(
+        self,
+        recipe_ids: list[str],
+        include_nutrition: bool = False,
+        budget: Optional[float] = None,
+        user_id: Optional[int] = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Enhanced bulk recipe information retrieval with tracking.
+
+        Args:
+            recipe_ids: List of recipe IDs to fetch
+            include_nutrition: Whether to include nutrition information
+            budget: Seconds to wait for upstream calls (see SpoonacularService)
+            user_id: User ID for tracking (optional)
+
+        Returns:
+            Dictionary mapping recipe IDs to their information
+        """
+        if self.enable_tracking and self.api_tracker:
+            with self.api_tracker.track_api_call(
+                endpoint="informationBulk",
+                user_id=user_id,
+                request_params={
+                    "ids": ",".join(str(recipe_id) for recipe_id in recipe_ids),
+                    "includeNutrition": include_nutrition,
+                },
+            ) as context:
+
+                # Call parent method
+                recipes = await super().get_recipe_information_bulk(
+                    recipe_ids, include_nutrition, budget
+                )
+                context.set_cache_info(served_from_cache())
+
+                # Update tracking context
+                context.set_response_data(response_status=200, recipe_count=len(recipes))
+
+                return recipes
+        else:
+            # No tracking - just call parent method
+            return await super().get_recipe_information_bulk(recipe_ids, include_nutrition, budget)
+
     async def search_recipes_complex(
         self,
         query: Optional[str] = None,
@@ -298,6 +344,7 @@ class EnhancedSpoonacularService(SpoonacularService):
                     number=number,
                     offset=offset,
                 )
+                context.set_cache_info(served_from_cache())
 
                 # Extract recipes from result
                 recipes = result.get("results", [])
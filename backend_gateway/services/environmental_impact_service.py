@@ -9,6 +9,8 @@ from typing import Optional
 import pandas as pd
 import requests
 
+from backend_gateway.services.food_name_resolver import FoodNameResolver
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,6 +68,7 @@ class EnvironmentalImpactService:
         self.data_dir = Path("data/environmental_impact")
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self._impact_data = {}
+        self._resolver = FoodNameResolver.build({})
         self._load_cached_data()
 
     def download_owid_data(self, force_update: bool = False) -> dict[str, pd.DataFrame]:
@@ -126,6 +129,14 @@ class EnvironmentalImpactService:
                 logger.info(f"Loaded impact data for {len(self._impact_data)} food items")
             except Exception as e:
                 logger.error(f"Error loading cached impact data: {str(e)}")
+        self._load_resolver()
+
+    def _load_resolver(self):
+        """Food name index over the impact data keys, reused from disk when unchanged"""
+        self._resolver = FoodNameResolver.load_or_build(
+            {food_item: food_item for food_item in self._impact_data},
+            self.data_dir / "food_name_index.json",
+        )
 
     def process_impact_data(self) -> dict[str, dict]:
         """Process OWID data into our food database format"""
@@ -137,25 +148,26 @@ class EnvironmentalImpactService:
 
         impact_data = {}
 
+        # Index each dataset once instead of filtering it for every product
+        metric_indexes = {
+            name: self._metric_index(datasets.get(name), "per kilogram")
+            for name in ("ghg", "land", "water", "eutrophying")
+        }
+        supply_chain_rows = self._entity_rows(datasets.get("supply_chain"))
+
         # Process each OWID product
         for owid_product, food_items in self.OWID_TO_FOOD_MAPPING.items():
 
             # Get environmental metrics for this product
             metrics = {
-                "ghg_kg_co2e_per_kg": self._get_metric(
-                    datasets.get("ghg"), owid_product, "per kilogram"
-                ),
-                "land_m2_per_kg": self._get_metric(
-                    datasets.get("land"), owid_product, "per kilogram"
-                ),
-                "water_L_per_kg": self._get_metric(
-                    datasets.get("water"), owid_product, "per kilogram"
-                ),
+                "ghg_kg_co2e_per_kg": self._get_metric(metric_indexes["ghg"], owid_product),
+                "land_m2_per_kg": self._get_metric(metric_indexes["land"], owid_product),
+                "water_L_per_kg": self._get_metric(metric_indexes["water"], owid_product),
                 "eutrophying_g_per_kg": self._get_metric(
-                    datasets.get("eutrophying"), owid_product, "per kilogram"
+                    metric_indexes["eutrophying"], owid_product
                 ),
                 "supply_chain_breakdown": self._get_supply_chain_breakdown(
-                    datasets.get("supply_chain"), owid_product
+                    supply_chain_rows, owid_product
                 ),
             }
 
@@ -173,38 +185,73 @@ class EnvironmentalImpactService:
             json.dump(impact_data, f, indent=2)
 
         self._impact_data = impact_data
+        self._load_resolver()
         logger.info(f"Processed impact data for {len(impact_data)} food items")
 
         return impact_data
 
-    def _get_metric(self, df: Optional[pd.DataFrame], product: str, unit: str) -> Optional[float]:
-        """Extract a metric value from a dataframe"""
+    def _metric_index(self, df: Optional[pd.DataFrame], unit: str) -> dict[str, dict]:
+        """
+        Most recent value per product of a metric dataframe.
+
+        "exact" is keyed by Entity, restricted to rows in unit when the dataframe has
+        a Unit column; "Entity" and "Food product" are keyed by the lowercased column
+        value over all rows and hold (year, value) for substring lookups.
+        """
+        index: dict[str, dict] = {"exact": {}, "Entity": {}, "Food product": {}}
         if df is None or df.empty:
-            return None
+            return index
 
         try:
-            # Try exact match first
-            mask = (df["Entity"] == product) & (df["Unit"] == unit)
-            if mask.any():
-                # Get the most recent year's data
-                row = df[mask].sort_values("Year", ascending=False).iloc[0]
-                return float(row.iloc[-1])  # Last column is usually the value
-
-            # Try fuzzy match
-            for col in ["Entity", "Food product"]:
+            # Last column is usually the value
+            latest_first = df.sort_values("Year", ascending=False)
+            years = latest_first["Year"].tolist()
+            values = pd.to_numeric(latest_first.iloc[:, -1], errors="coerce").tolist()
+
+            if "Entity" in df.columns:
+                in_unit = (
+                    (latest_first["Unit"] == unit).tolist()
+                    if "Unit" in df.columns
+                    else [True] * len(values)
+                )
+                for entity, matches_unit, value in zip(latest_first["Entity"], in_unit, values):
+                    if matches_unit:
+                        index["exact"].setdefault(entity, value)
+
+            for col in ("Entity", "Food product"):
                 if col in df.columns:
-                    mask = df[col].str.contains(product.split("(")[0].strip(), case=False, na=False)
-                    if mask.any():
-                        row = df[mask].sort_values("Year", ascending=False).iloc[0]
-                        return float(row.iloc[-1])
+                    for name, year, value in zip(latest_first[col], years, values):
+                        if isinstance(name, str):
+                            index[col].setdefault(name.lower(), (year, value))
 
         except Exception as e:
-            logger.debug(f"Could not find metric for {product}: {str(e)}")
+            logger.debug(f"Could not index metric dataframe: {str(e)}")
+
+        return index
+
+    def _get_metric(self, index: dict[str, dict], product: str) -> Optional[float]:
+        """Extract a metric value from an index built by _metric_index"""
+        # Try exact match first
+        if product in index["exact"]:
+            return index["exact"][product]
+
+        # Try fuzzy match, taking the most recent year among matching names
+        stem = product.split("(")[0].strip().lower()
+        for col in ("Entity", "Food product"):
+            matches = [entry for name, entry in index[col].items() if stem in name]
+            if matches:
+                return max(matches, key=lambda entry: entry[0])[1]
 
         return None
 
+    def _entity_rows(self, df: Optional[pd.DataFrame]) -> dict[str, pd.Series]:
+        """First row per Entity of a dataframe"""
+        if df is None or "Entity" not in df.columns:
+            return {}
+        return {row["Entity"]: row for _, row in df.drop_duplicates("Entity").iterrows()}
+
     def _get_supply_chain_breakdown(
-        self, df: Optional[pd.DataFrame], product: str
+        self, rows: dict[str, pd.Series], product: str
     ) -> dict[str, float]:
         """Extract supply chain breakdown from data"""
         breakdown = {
@@ -217,14 +264,10 @@ class EnvironmentalImpactService:
             "retail": 0.0,
         }
 
-        if df is None:
-            return breakdown
-
         try:
             # Find the product row
-            mask = df["Entity"] == product
-            if mask.any():
-                row = df[mask].iloc[0]
+            row = rows.get(product)
+            if row is not None:
 
                 # Map column names to our structure
                 column_mapping = {
@@ -239,7 +282,7 @@ class EnvironmentalImpactService:
 
                 total = 0
                 for col, key in column_mapping.items():
-                    if col in df.columns:
+                    if col in row.index:
                         value = float(row[col]) if pd.notna(row[col]) else 0.0
                         breakdown[key] = value
                         total += value
@@ -288,16 +331,8 @@ class EnvironmentalImpactService:
 
     def get_food_impact(self, food_name: str) -> Optional[dict]:
         """Get environmental impact data for a specific food"""
-        # Try direct match
-        if food_name.lower() in self._impact_data:
-            return self._impact_data[food_name.lower()]
-
-        # Try partial match
-        for key in self._impact_data:
-            if food_name.lower() in key or key in food_name.lower():
-                return self._impact_data[key]
-
-        return None
+        key = self._resolver.resolve(food_name)
+        return self._impact_data.get(key) if key else None
 
     def calculate_recipe_impact(self, ingredients: list[dict]) -> dict:
         """Calculate total environmental impact for a recipe"""
@@ -6,7 +6,6 @@ for better food categorization and unit validation
 import json
 import logging
 import os
-import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Optional
@@ -14,6 +13,7 @@ from typing import Any, Optional
 import httpx
 
 from backend_gateway.services.spoonacular_service import SpoonacularService
+from backend_gateway.utils.keyword_matcher import pattern_table
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +84,8 @@ class FoodDatabaseService:
                 r"\b(nuts|trail mix|dried fruit)\b",
             ],
         }
+        # Compiled once per distinct table, for a single pass over an item name
+        self._pattern_table = pattern_table(self.category_patterns)
 
         # Unit mappings per category
         self.category_unit_mappings = {
@@ -327,18 +329,18 @@ class FoodDatabaseService:
         """Fallback categorization using regex patterns"""
         item_lower = item_name.lower()
 
-        for category, patterns in self.category_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, item_lower):
-                    return FoodCategorization(
-                        item_name=item_name,
-                        category=category,
-                        allowed_units=self.category_unit_mappings[category]["allowed"],
-                        default_unit=self.category_unit_mappings[category]["default"],
-                        confidence=0.4,
-                        source="patterns",
-                        metadata={"matched_pattern": pattern},
-                    )
+        match = self._pattern_table.first(item_lower)
+        if match:
+            category, pattern = match
+            return FoodCategorization(
+                item_name=item_name,
+                category=category,
+                allowed_units=self.category_unit_mappings[category]["allowed"],
+                default_unit=self.category_unit_mappings[category]["default"],
+                confidence=0.4,
+                source="patterns",
+                metadata={"matched_pattern": pattern},
+            )
 
         # Default to 'other' category
         return FoodCategorization(
@@ -0,0 +1,148 @@
+"""
+Indexed food-name resolution for the OWID impact and FAO waste datasets
+
+Both datasets are keyed by a handful of canonical food names ("ground_beef",
+"apples") while callers pass whatever a pantry or recipe calls the ingredient
+("Lean Ground Beef 80/20"). Lookups used to scan every key with substring tests
+for each ingredient, so "egg" also matched "eggplant". FoodNameResolver
+normalizes names the same way the unit conversion engine does (lowercase,
+singular, punctuation free) and answers from, in order:
+
+    exact   the whole normalized name
+    phrase  the longest known name inside it, the rightmost one on ties
+            ("lean ground beef" -> "ground beef"), unless a product word follows
+            it ("chicken stock" and "apple juice" are not chicken and apples)
+    token   the shortest known name containing all of its words, for names of
+            two or more words ("extra virgin oil" -> "extra virgin olive oil")
+    fuzzy   the closest known name by difflib ratio, for misspellings
+
+Answers are memoized per raw name, so repeated ingredients are dictionary hits.
+The index itself is written next to the dataset as JSON and reused while the
+dataset's names are unchanged, so a worker starts without rebuilding it.
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from backend_gateway.services.unit_conversion_engine import normalize_ingredient
+
+logger = logging.getLogger(__name__)
+
+FOOD_NAME_FUZZY_CUTOFF = float(os.getenv("FOOD_NAME_FUZZY_CUTOFF", "0.85"))
+
+_INDEX_VERSION = 1
+
+# Words that make the food named before them into a different product
+_PRODUCT_WORDS = frozenset(
+    {"broth", "extract", "jam", "jelly", "juice", "oil", "sauce", "stock", "syrup", "yogurt"}
+)
+
+
+class FoodNameResolver:
+    """Exact, phrase, token and fuzzy indexes from food names to dataset keys"""
+
+    def __init__(
+        self,
+        names: dict[str, str],
+        tokens: dict[str, list[str]],
+        source: str = "",
+        fuzzy_cutoff: float = FOOD_NAME_FUZZY_CUTOFF,
+        memo_size: int = 4096,
+    ):
+        self.names = names  # normalized name -> dataset key
+        self.tokens = tokens  # word -> normalized names containing it, shortest first
+        self.source = source  # fingerprint of the aliases the index was built from
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._max_phrase = max((len(name.split()) for name in names), default=1)
+        self.resolve = lru_cache(maxsize=memo_size)(self._resolve)
+
+    @classmethod
+    def build(cls, aliases: Mapping[str, str], **kwargs) -> "FoodNameResolver":
+        """Index {food name: dataset key}; the first alias of a normalized name wins"""
+        names: dict[str, str] = {}
+        for alias, key in aliases.items():
+            normalized = normalize_ingredient(alias)
+            if normalized:
+                names.setdefault(normalized, key)
+
+        tokens: dict[str, list[str]] = {}
+        for name in sorted(names, key=lambda n: len(n.split())):
+            for word in set(name.split()):
+                tokens.setdefault(word, []).append(name)
+        return cls(names, tokens, source=_fingerprint(aliases), **kwargs)
+
+    @classmethod
+    def load_or_build(cls, aliases: Mapping[str, str], path: Path, **kwargs) -> "FoodNameResolver":
+        """Index from path if it was built from the same aliases, else build and save it"""
+        source = _fingerprint(aliases)
+        try:
+            with open(path) as f:
+                index = json.load(f)
+            if index.get("version") == _INDEX_VERSION and index.get("source") == source:
+                return cls(index["names"], index["tokens"], source=source, **kwargs)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        resolver = cls.build(aliases, **kwargs)
+        if aliases:
+            resolver.save(path)
+        return resolver
+
+    def save(self, path: Path) -> None:
+        index = {
+            "version": _INDEX_VERSION,
+            "source": self.source,
+            "names": self.names,
+            "tokens": self.tokens,
+        }
+        try:
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not save food name index to {path}: {e}")
+
+    def _resolve(self, name: str) -> Optional[str]:
+        """Dataset key for a food name, or None"""
+        words = normalize_ingredient(name).split()
+        if not words:
+            return None
+
+        # exact and phrase: longest known run of words, rightmost first (the head noun)
+        for length in range(min(self._max_phrase, len(words)), 0, -1):
+            for start in range(len(words) - length, -1, -1):
+                key = self.names.get(" ".join(words[start : start + length]))
+                if key is not None and _PRODUCT_WORDS.isdisjoint(words[start + length :]):
+                    return key
+
+        # token: shortest known name containing every word. A single word is not
+        # widened to a longer name, "butter" is not "peanut butter"
+        postings = [self.tokens.get(word) for word in words]
+        if len(words) > 1 and all(postings):
+            rest = [set(p) for p in postings[1:]]
+            for candidate in postings[0]:
+                if all(candidate in p for p in rest):
+                    return self.names[candidate]
+
+        # fuzzy
+        close = difflib.get_close_matches(
+            " ".join(words), self.names, n=1, cutoff=self.fuzzy_cutoff
+        )
+        return self.names[close[0]] if close else None
+
+    def stats(self) -> dict:
+        info = self.resolve.cache_info()
+        return {"names": len(self.names), "memo_hits": info.hits, "memo_misses": info.misses}
+
+
+def _fingerprint(aliases: Mapping[str, str]) -> str:
+    text = "\n".join(f"{alias}\t{key}" for alias, key in aliases.items())
+    return hashlib.sha1(text.encode()).hexdigest()
@@ -10,6 +10,9 @@ from typing import Optional
 
 import pandas as pd
 
+from backend_gateway.services.food_name_resolver import FoodNameResolver
+from backend_gateway.utils.keyword_matcher import keyword_matcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +34,27 @@ class FoodWasteService:
         "Eggs": 0.08,  # 8% average loss
     }
 
+    # Keywords for the commodity group fallback, checked in this order
+    DEFAULT_LOSS_KEYWORDS = {
+        "Fruits & Vegetables": [
+            "apple",
+            "banana",
+            "berry",
+            "fruit",
+            "vegetable",
+            "tomato",
+            "lettuce",
+            "spinach",
+            "carrot",
+        ],
+        "Cereals": ["rice", "wheat", "bread", "pasta", "cereal"],
+        "Roots & Tubers": ["potato", "sweet potato", "yam"],
+        "Meat": ["beef", "pork", "chicken", "meat", "poultry"],
+        "Fish & Seafood": ["fish", "salmon", "tuna", "shrimp", "seafood"],
+        "Milk": ["milk", "cheese", "yogurt", "dairy"],
+        "Eggs": ["egg"],
+    }
+
     # CPC to common food mapping (sample mappings)
     CPC_TO_FOOD_SAMPLES = {
         "01211": ["apples", "apple"],
@@ -85,6 +109,7 @@ class FoodWasteService:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self._loss_data = {}
         self._cpc_mapping = {}
+        self._default_loss_keywords = keyword_matcher(self.DEFAULT_LOSS_KEYWORDS)
         self._load_cached_data()
 
     def download_flw_data(self, csv_path: Optional[str] = None) -> pd.DataFrame:
@@ -158,17 +183,18 @@ class FoodWasteService:
 
         # Load CPC mappings
         self._cpc_mapping = self.CPC_TO_FOOD_SAMPLES.copy()
+        self._cpc_resolver = FoodNameResolver.load_or_build(
+            {food: cpc for cpc, foods in self._cpc_mapping.items() for food in foods},
+            self.data_dir / "food_name_index.json",
+        )
+        self._cpc_keywords = keyword_matcher(self._cpc_mapping)
 
     def get_loss_rate(self, food_name: str, stage: str = "consumer") -> Optional[float]:
         """Get loss rate for a specific food item"""
-        # Find CPC code for this food
-        cpc_code = None
-        food_lower = food_name.lower()
-
-        for cpc, foods in self._cpc_mapping.items():
-            if food_lower in foods or any(food in food_lower for food in foods):
-                cpc_code = cpc
-                break
+        # Find CPC code for this food: resolved by name, else the first with a sample in it
+        cpc_code = self._cpc_resolver.resolve(food_name) or self._cpc_keywords.first(
+            food_name.lower()
+        )
 
         if not cpc_code:
             # Try to match by commodity group
@@ -186,35 +212,10 @@ class FoodWasteService:
         food_lower = food_name.lower()
 
         # Simple categorization
-        if any(
-            item in food_lower
-            for item in [
-                "apple",
-                "banana",
-                "berry",
-                "fruit",
-                "vegetable",
-                "tomato",
-                "lettuce",
-                "spinach",
-                "carrot",
-            ]
-        ):
-            return self.DEFAULT_LOSS_RATES["Fruits & Vegetables"]
-        elif any(item in food_lower for item in ["rice", "wheat", "bread", "pasta", "cereal"]):
-            return self.DEFAULT_LOSS_RATES["Cereals"]
-        elif any(item in food_lower for item in ["potato", "sweet potato", "yam"]):
-            return self.DEFAULT_LOSS_RATES["Roots & Tubers"]
-        elif any(item in food_lower for item in ["beef", "pork", "chicken", "meat", "poultry"]):
-            return self.DEFAULT_LOSS_RATES["Meat"]
-        elif any(item in food_lower for item in ["fish", "salmon", "tuna", "shrimp", "seafood"]):
-            return self.DEFAULT_LOSS_RATES["Fish & Seafood"]
-        elif any(item in food_lower for item in ["milk", "cheese", "yogurt", "dairy"]):
-            return self.DEFAULT_LOSS_RATES["Milk"]
-        elif "egg" in food_lower:
-            return self.DEFAULT_LOSS_RATES["Eggs"]
-        else:
-            return 0.10  # Default 10% loss rate
+        group = self._default_loss_keywords.first(food_lower)
+        if group:
+            return self.DEFAULT_LOSS_RATES[group]
+        return 0.10  # Default 10% loss rate
 
     def calculate_waste_risk_score(
         self,
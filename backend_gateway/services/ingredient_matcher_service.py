@@ -3,14 +3,92 @@ Ingredient Matcher Service
 Advanced ingredient matching with substitution awareness and fuzzy matching
 """
 
+import bisect
 import difflib
 import logging
 import re
 from collections import defaultdict
-from typing import Optional
+from typing import Optional, Union
 
 logger = logging.getLogger(__name__)
 
+_PARENTHETICAL_RE = re.compile(r"\([^)]*\)")
+_QUANTITY_RE = re.compile(r"^([\d/.]+)\s*([a-zA-Z]+)?\s+")
+
+
+class PhraseLookup:
+    """
+    Substring lookups against an ordered phrase list without scanning it.
+
+    Finds the phrases that occur inside a text (via an index on each phrase's
+    first three characters) and the phrases that contain the text (via one
+    str.find over all phrases joined in order, so the first hit is the
+    earliest phrase).
+    """
+
+    _HEAD = 3
+
+    def __init__(self, phrases: list[str]):
+        self.phrases = phrases
+        self._by_head: dict[str, list[int]] = defaultdict(list)
+        for order, phrase in enumerate(phrases):
+            self._by_head[phrase[: self._HEAD]].append(order)
+
+        self._joined = "\n".join(phrases)
+        self._starts = []
+        offset = 0
+        for phrase in phrases:
+            self._starts.append(offset)
+            offset += len(phrase) + 1
+
+    def _order_at(self, position: int) -> int:
+        return bisect.bisect_right(self._starts, position) - 1
+
+    def contained_in(self, text: str) -> list[int]:
+        """Orders of phrases that are substrings of text, ascending"""
+        found = set()
+        for i in range(len(text)):
+            for length in range(1, self._HEAD + 1):
+                for order in self._by_head.get(text[i : i + length], ()):
+                    if text.startswith(self.phrases[order], i):
+                        found.add(order)
+        if "" in self._by_head:
+            found.update(self._by_head[""])
+        return sorted(found)
+
+    def _iter_containing(self, text: str):
+        if not text or not self.phrases:
+            return
+        if "\n" in text:
+            yield from (order for order, phrase in enumerate(self.phrases) if text in phrase)
+            return
+        last = None
+        position = self._joined.find(text)
+        while position != -1:
+            order = self._order_at(position)
+            # A match running past the end of its phrase spans the separator
+            if position + len(text) <= self._starts[order] + len(self.phrases[order]):
+                if order != last:
+                    yield order
+                    last = order
+            position = self._joined.find(text, position + 1)
+
+    def containing(self, text: str) -> list[int]:
+        """Orders of phrases that contain text, ascending"""
+        return list(self._iter_containing(text))
+
+    def overlapping(self, text: str) -> list[int]:
+        """Orders of phrases p with p in text or text in p, ascending"""
+        return sorted(set(self.contained_in(text)) | set(self._iter_containing(text)))
+
+    def first_overlapping(self, text: str) -> Optional[int]:
+        """Lowest order of a phrase p with p in text or text in p"""
+        candidates = self.contained_in(text)[:1]
+        first_containing = next(self._iter_containing(text), None)
+        if first_containing is not None:
+            candidates.append(first_containing)
+        return min(candidates) if candidates else None
+
 
 class IngredientMatcherService:
     """Advanced ingredient matching with substitution awareness"""
@@ -354,10 +432,45 @@ class IngredientMatcherService:
             "g": {"oz": 0.0353, "lb": 0.0022, "kg": 0.001},
         }
 
+        # Reverse lookups compiled once from the tables above
+        self._category_items: list[str] = []
+        self._category_labels: list[str] = []
+        for main_category, subcategories in self.ingredient_categories.items():
+            for subcategory, items in subcategories.items():
+                for item in items:
+                    self._category_items.append(item)
+                    self._category_labels.append(f"{main_category}.{subcategory}")
+        self._category_lookup = PhraseLookup(self._category_items)
+
+        self._substitution_bases = list(self.substitutions)
+        self._substitution_lookup = PhraseLookup(self._substitution_bases)
+
+    def compile_pantry(self, pantry_items: list[dict]) -> "CompiledPantryMatcher":
+        """
+        Build a matcher for one pantry snapshot.
+
+        Reuse it (pass it as pantry_items to match_recipe_to_pantry) when matching
+        several recipes against the same pantry.
+        """
+        return CompiledPantryMatcher(self, pantry_items)
+
+    def match_recipes_to_pantry(
+        self,
+        recipes_ingredients: list[list[str]],
+        pantry_items: list[dict],
+        allow_substitutions: bool = True,
+    ) -> list[dict]:
+        """Match several recipes against one pantry, compiling the pantry only once"""
+        pantry_matcher = self.compile_pantry(pantry_items)
+        return [
+            self.match_recipe_to_pantry(ingredients, pantry_matcher, allow_substitutions)
+            for ingredients in recipes_ingredients
+        ]
+
     def match_recipe_to_pantry(
         self,
         recipe_ingredients: list[str],
-        pantry_items: list[dict],
+        pantry_items: Union[list[dict], "CompiledPantryMatcher"],
         allow_substitutions: bool = True,
     ) -> dict:
         """
@@ -365,7 +478,7 @@ class IngredientMatcherService:
 
         Args:
             recipe_ingredients: List of recipe ingredient strings
-            pantry_items: List of pantry item dictionaries
+            pantry_items: List of pantry item dictionaries, or a matcher from compile_pantry
             allow_substitutions: Whether to suggest substitutions
 
         Returns:
@@ -383,7 +496,10 @@ class IngredientMatcherService:
         }
 
         # Create searchable pantry
-        pantry_search = self._create_pantry_search_index(pantry_items)
+        if isinstance(pantry_items, CompiledPantryMatcher):
+            pantry_matcher = pantry_items
+        else:
+            pantry_matcher = self.compile_pantry(pantry_items)
 
         for ingredient in recipe_ingredients:
             # Parse ingredient to extract name and quantity
@@ -391,7 +507,7 @@ class IngredientMatcherService:
             ingredient_name = parsed["name"]
 
             # Try different matching strategies
-            match_result = self._find_best_match(ingredient_name, pantry_search, pantry_items)
+            match_result = pantry_matcher.find_best_match(ingredient_name)
 
             if match_result["match_type"] == "perfect":
                 results["perfect_matches"].append(
@@ -412,7 +528,7 @@ class IngredientMatcherService:
                 )
             elif allow_substitutions:
                 # Look for substitutions
-                substitution = self._find_substitution(ingredient_name, pantry_search)
+                substitution = pantry_matcher.find_substitution(ingredient_name)
                 if substitution:
                     results["possible_substitutions"].append(
                         {
@@ -468,29 +584,6 @@ class IngredientMatcherService:
 
         return results
 
-    def _create_pantry_search_index(self, pantry_items: list[dict]) -> dict:
-        """Create searchable index of pantry items"""
-        index = {"by_name": {}, "by_category": defaultdict(list), "normalized": {}}
-
-        for item in pantry_items:
-            name = item.get("product_name", "").lower()
-            if not name:
-                continue
-
-            # Store by exact name
-            index["by_name"][name] = item
-
-            # Store by normalized name
-            normalized = self._normalize_ingredient_name(name)
-            index["normalized"][normalized] = item
-
-            # Categorize item
-            category = self._categorize_ingredient(name)
-            if category:
-                index["by_category"][category].append(item)
-
-        return index
-
     def _parse_ingredient(self, ingredient_string: str) -> dict:
         """Parse ingredient string to extract components"""
         result = {
@@ -502,11 +595,10 @@ class IngredientMatcherService:
         }
 
         # Remove parenthetical notes
-        ingredient_clean = re.sub(r"\([^)]*\)", "", ingredient_string).strip()
+        ingredient_clean = _PARENTHETICAL_RE.sub("", ingredient_string).strip()
 
         # Extract quantity and unit
-        quantity_pattern = r"^([\d/.]+)\s*([a-zA-Z]+)?\s+"
-        match = re.match(quantity_pattern, ingredient_clean)
+        match = _QUANTITY_RE.match(ingredient_clean)
 
         if match:
             result["quantity"] = match.group(1)
@@ -563,89 +655,9 @@ class IngredientMatcherService:
 
     def _categorize_ingredient(self, ingredient_name: str) -> Optional[str]:
         """Categorize an ingredient"""
-        ingredient_lower = ingredient_name.lower()
-
-        for main_category, subcategories in self.ingredient_categories.items():
-            for subcategory, items in subcategories.items():
-                for item in items:
-                    if item in ingredient_lower or ingredient_lower in item:
-                        return f"{main_category}.{subcategory}"
-
-        return None
-
-    def _find_best_match(
-        self, ingredient_name: str, pantry_index: dict, pantry_items: list[dict]
-    ) -> dict:
-        """Find the best match for an ingredient in the pantry"""
-        ingredient_lower = ingredient_name.lower()
-        normalized_ingredient = self._normalize_ingredient_name(ingredient_name)
-
-        # 1. Try exact match
-        if ingredient_lower in pantry_index["by_name"]:
-            return {
-                "match_type": "perfect",
-                "pantry_item": pantry_index["by_name"][ingredient_lower],
-                "confidence": 1.0,
-            }
-
-        # 2. Try normalized match
-        if normalized_ingredient in pantry_index["normalized"]:
-            return {
-                "match_type": "perfect",
-                "pantry_item": pantry_index["normalized"][normalized_ingredient],
-                "confidence": 0.95,
-            }
-
-        # 3. Try fuzzy matching
-        best_fuzzy_match = self._fuzzy_match_ingredient(
-            ingredient_name, list(pantry_index["by_name"].keys())
-        )
-
-        if best_fuzzy_match and best_fuzzy_match["score"] > 0.8:
-            return {
-                "match_type": "perfect",
-                "pantry_item": pantry_index["by_name"][best_fuzzy_match["match"]],
-                "confidence": best_fuzzy_match["score"],
-            }
-
-        # No match found
-        return {"match_type": "none", "pantry_item": None, "confidence": 0.0}
-
-    def _fuzzy_match_ingredient(self, ingredient: str, pantry_names: list[str]) -> Optional[dict]:
-        """Perform fuzzy matching for ingredients"""
-        if not pantry_names:
-            return None
-
-        # Get close matches
-        matches = difflib.get_close_matches(ingredient.lower(), pantry_names, n=1, cutoff=0.6)
-
-        if matches:
-            # Calculate similarity score
-            score = difflib.SequenceMatcher(None, ingredient.lower(), matches[0]).ratio()
-
-            return {"match": matches[0], "score": score}
-
-        return None
-
-    def _find_substitution(self, ingredient_name: str, pantry_index: dict) -> Optional[dict]:
-        """Find substitution for missing ingredient"""
-        ingredient_lower = ingredient_name.lower()
-
-        # Check if we have substitution rules for this ingredient
-        for base_ingredient, substitutes in self.substitutions.items():
-            if base_ingredient in ingredient_lower or ingredient_lower in base_ingredient:
-                # Try each substitute
-                for substitute, confidence in substitutes:
-                    # Check if substitute is in pantry
-                    if substitute in pantry_index["by_name"]:
-                        return {
-                            "substitute": substitute,
-                            "pantry_item": pantry_index["by_name"][substitute],
-                            "confidence": confidence,
-                            "notes": f"Can use {substitute} instead of {ingredient_name}",
-                        }
-
-        return None
+        # First catalog item that contains, or is contained in, the ingredient name
+        order = self._category_lookup.first_overlapping(ingredient_name.lower())
+        return self._category_labels[order] if order is not None else None
 
     def _suggest_alternatives(self, ingredient_name: str) -> list[str]:
         """Suggest alternative ingredients that might work"""
@@ -660,9 +672,9 @@ class IngredientMatcherService:
             suggestions.extend(similar_items[:3])
 
         # Add any known substitutes
-        for base, subs in self.substitutions.items():
-            if base.lower() in ingredient_name.lower():
-                suggestions.extend([sub[0] for sub in subs[:2]])
+        for order in self._substitution_lookup.contained_in(ingredient_name.lower()):
+            subs = self.substitutions[self._substitution_bases[order]]
+            suggestions.extend([sub[0] for sub in subs[:2]])
 
         return list(set(suggestions))[:5]  # Return up to 5 unique suggestions
 
@@ -721,3 +733,146 @@ class IngredientMatcherService:
             return quantity / self.unit_conversions[to_unit][from_unit]
 
         return None
+
+
+class CompiledPantryMatcher:
+    """
+    One pantry snapshot indexed for repeated ingredient matching.
+
+    Holds exact and normalized name maps, a trigram index that narrows fuzzy
+    matching to names sharing at least one trigram with the ingredient, and the
+    first substitute available in this pantry for every substitution rule.
+    Results are memoized per ingredient name, so matching a batch of recipes
+    costs roughly one lookup per distinct ingredient.
+    """
+
+    def __init__(self, service: IngredientMatcherService, pantry_items: list[dict]):
+        self.service = service
+        self.pantry_items = pantry_items
+        self.by_name: dict[str, dict] = {}
+        self.normalized: dict[str, dict] = {}
+
+        for item in pantry_items:
+            name = item.get("product_name", "").lower()
+            if not name:
+                continue
+            self.by_name[name] = item
+            self.normalized[service._normalize_ingredient_name(name)] = item
+
+        self._names = list(self.by_name)
+        self._trigram_index: dict[str, list[int]] = defaultdict(list)
+        for position, name in enumerate(self._names):
+            for trigram in self._trigrams(name):
+                self._trigram_index[trigram].append(position)
+
+        self._available_substitutes: dict[str, tuple[str, float]] = {}
+        for base, substitutes in service.substitutions.items():
+            for substitute, confidence in substitutes:
+                if substitute in self.by_name:
+                    self._available_substitutes[base] = (substitute, confidence)
+                    break
+
+        self._match_cache: dict[str, dict] = {}
+        self._substitution_cache: dict[str, Optional[dict]] = {}
+
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        # Padding lets short names and shared prefixes/suffixes produce trigrams
+        padded = f"  {text} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def _fuzzy_candidates(self, ingredient: str) -> list[str]:
+        positions = set()
+        for trigram in self._trigrams(ingredient):
+            positions.update(self._trigram_index.get(trigram, ()))
+        return [self._names[position] for position in sorted(positions)]
+
+    def fuzzy_match(self, ingredient: str) -> Optional[dict]:
+        """
+        Perform fuzzy matching for ingredients
+
+        Only names sharing a trigram with the ingredient are compared. A name with
+        no common trigram has a similarity of at most 0.8, below the 0.8+ needed
+        to count as a match, so the outcome is the same as comparing every name.
+        """
+        ingredient_lower = ingredient.lower()
+        candidates = self._fuzzy_candidates(ingredient_lower)
+        if not candidates:
+            return None
+
+        matches = difflib.get_close_matches(ingredient_lower, candidates, n=1, cutoff=0.6)
+
+        if matches:
+            # Calculate similarity score
+            score = difflib.SequenceMatcher(None, ingredient_lower, matches[0]).ratio()
+
+            return {"match": matches[0], "score": score}
+
+        return None
+
+    def find_best_match(self, ingredient_name: str) -> dict:
+        """Find the best match for an ingredient in the pantry"""
+        cached = self._match_cache.get(ingredient_name)
+        if cached is not None:
+            return cached
+
+        result = self._find_best_match(ingredient_name)
+        self._match_cache[ingredient_name] = result
+        return result
+
+    def _find_best_match(self, ingredient_name: str) -> dict:
+        ingredient_lower = ingredient_name.lower()
+        normalized_ingredient = self.service._normalize_ingredient_name(ingredient_name)
+
+        # 1. Try exact match
+        if ingredient_lower in self.by_name:
+            return {
+                "match_type": "perfect",
+                "pantry_item": self.by_name[ingredient_lower],
+                "confidence": 1.0,
+            }
+
+        # 2. Try normalized match
+        if normalized_ingredient in self.normalized:
+            return {
+                "match_type": "perfect",
+                "pantry_item": self.normalized[normalized_ingredient],
+                "confidence": 0.95,
+            }
+
+        # 3. Try fuzzy matching
+        best_fuzzy_match = self.fuzzy_match(ingredient_name)
+
+        if best_fuzzy_match and best_fuzzy_match["score"] > 0.8:
+            return {
+                "match_type": "perfect",
+                "pantry_item": self.by_name[best_fuzzy_match["match"]],
+                "confidence": best_fuzzy_match["score"],
+            }
+
+        # No match found
+        return {"match_type": "none", "pantry_item": None, "confidence": 0.0}
+
+    def find_substitution(self, ingredient_name: str) -> Optional[dict]:
+        """Find substitution for missing ingredient"""
+        if ingredient_name in self._substitution_cache:
+            return self._substitution_cache[ingredient_name]
+
+        result = None
+        # Rules whose ingredient overlaps this one, in table order; first one with a
+        # substitute in the pantry wins
+        lookup = self.service._substitution_lookup
+        for order in lookup.overlapping(ingredient_name.lower()):
+            available = self._available_substitutes.get(self.service._substitution_bases[order])
+            if available:
+                substitute, confidence = available
+                result = {
+                    "substitute": substitute,
+                    "pantry_item": self.by_name[substitute],
+                    "confidence": confidence,
+                    "notes": f"Can use {substitute} instead of {ingredient_name}",
+                }
+                break
+
+        self._substitution_cache[ingredient_name] = result
+        return result
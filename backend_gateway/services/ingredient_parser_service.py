@@ -3,11 +3,13 @@
 import logging
 import re
 from fractions import Fraction
-from typing import Any
+from typing import Any, Optional
 
 import httpx
+import numpy as np
 
 from backend_gateway.core.config import settings
+from backend_gateway.services.unit_conversion_engine import ML_PER_CUP, unit_conversion_engine
 
 logger = logging.getLogger(__name__)
 
@@ -292,12 +294,16 @@ class IngredientParserService:
 
         return normalized
 
-    def _aggregate_quantities(self, quantities_by_unit: dict[str, float]) -> tuple[str, float]:
+    def _aggregate_quantities(
+        self, quantities_by_unit: dict[str, float], ingredient_name: Optional[str] = None
+    ) -> tuple[str, float]:
         """
         Aggregate quantities with different units to a common unit
 
         Args:
             quantities_by_unit: Dict of unit -> quantity
+            ingredient_name: Lets mixed weight, volume and count units be added up by
+                weight when the ingredient's density or piece weight is known locally
 
         Returns:
             Tuple of (common_unit, total_quantity)
@@ -309,6 +315,20 @@ class IngredientParserService:
         has_volume = any(unit in volume_units for unit in quantities_by_unit)
         has_weight = any(unit in weight_units for unit in quantities_by_unit)
 
+        if (
+            ingredient_name
+            and (has_volume or has_weight)
+            and not quantities_by_unit.keys() <= volume_units
+            and not quantities_by_unit.keys() <= weight_units
+        ):
+            grams = [
+                unit_conversion_engine.convert(qty, unit, "g", ingredient_name)
+                for unit, qty in quantities_by_unit.items()
+            ]
+            if None not in grams:
+                quantities_by_unit = {"gram": sum(grams)}
+                has_volume, has_weight = False, True
+
         if has_volume and not has_weight:
             # Convert all to cups
             total_cups = 0
@@ -319,15 +339,7 @@ class IngredientParserService:
                     # Can't convert, just return the first unit/quantity
                     return list(quantities_by_unit.items())[0]
 
-            # Convert back to appropriate unit
-            if total_cups >= 4:
-                return ("quart", total_cups / 4)
-            elif total_cups >= 1:
-                return ("cup", total_cups)
-            elif total_cups >= 1 / 16:
-                return ("tablespoon", total_cups * 16)
-            else:
-                return ("teaspoon", total_cups * 48)
+            return self._volume_for_display(total_cups)
 
         elif has_weight and not has_volume:
             # Convert all to grams
@@ -339,20 +351,36 @@ class IngredientParserService:
                     # Can't convert, just return the first unit/quantity
                     return list(quantities_by_unit.items())[0]
 
-            # Convert back to appropriate unit
-            if total_grams >= 1000:
-                return ("kilogram", total_grams / 1000)
-            elif total_grams >= 453.592:
-                return ("pound", total_grams / 453.592)
-            elif total_grams >= 28.3495:
-                return ("ounce", total_grams / 28.3495)
-            else:
-                return ("gram", total_grams)
+            return self._weight_for_display(total_grams)
 
         else:
             # Mixed or no standard units, return the first one
             return list(quantities_by_unit.items())[0] if quantities_by_unit else (None, 0)
 
+    @staticmethod
+    def _volume_for_display(total_cups: float) -> tuple[str, float]:
+        """Express a volume in cups in the most readable unit"""
+        if total_cups >= 4:
+            return ("quart", total_cups / 4)
+        elif total_cups >= 1:
+            return ("cup", total_cups)
+        elif total_cups >= 1 / 16:
+            return ("tablespoon", total_cups * 16)
+        else:
+            return ("teaspoon", total_cups * 48)
+
+    @staticmethod
+    def _weight_for_display(total_grams: float) -> tuple[str, float]:
+        """Express a weight in grams in the most readable unit"""
+        if total_grams >= 1000:
+            return ("kilogram", total_grams / 1000)
+        elif total_grams >= 453.592:
+            return ("pound", total_grams / 453.592)
+        elif total_grams >= 28.3495:
+            return ("ounce", total_grams / 28.3495)
+        else:
+            return ("gram", total_grams)
+
     def _enhance_parsed_data(self, parsed_ingredient: dict[str, Any]) -> dict[str, Any]:
         """
         Enhance Spoonacular parsed data with aggregation info
@@ -378,56 +406,83 @@ class IngredientParserService:
         """
         Aggregate ingredients with the same name
 
+        A group whose rows all share one unit is summed in that unit. Otherwise
+        all-volume and all-weight groups are summed through the unit engine and shown
+        in the most readable unit, and other groups go through _aggregate_quantities.
+
         Args:
             ingredients: List of parsed ingredients
 
         Returns:
             Aggregated list of ingredients
         """
-        from collections import defaultdict
-
-        # Group by normalized name
-        grouped = defaultdict(list)
-
-        for ingredient in ingredients:
-            agg_data = ingredient.get("aggregatable", {})
-            if agg_data and agg_data.get("name"):
-                grouped[agg_data["name"]].append(agg_data)
+        rows = [
+            ingredient["aggregatable"]
+            for ingredient in ingredients
+            if ingredient.get("aggregatable") and ingredient["aggregatable"].get("name")
+        ]
+        if not rows:
+            return []
+
+        # Units of every row are resolved in one pass; each group's totals in base
+        # units are then a bincount
+        names = [row["name"] for row in rows]
+        units = [row.get("unit", "unit") for row in rows]
+        quantities = [row.get("quantity", 0) or 0 for row in rows]
+        groups = {name: code for code, name in enumerate(dict.fromkeys(names))}
+        group_codes = np.fromiter(map(groups.__getitem__, names), np.intp, count=len(names))
+        normalized = unit_conversion_engine.normalize_many(names, quantities, units)
+
+        def per_group(weights: np.ndarray) -> np.ndarray:
+            return np.bincount(group_codes, weights=weights, minlength=len(groups))
+
+        sizes = np.bincount(group_codes, minlength=len(groups))
+        volume_rows = per_group((normalized.units == "ml").astype(np.float64))
+        weight_rows = per_group((normalized.units == "g").astype(np.float64))
+        totals = per_group(np.nan_to_num(normalized.amounts))
+        unit_totals = per_group(np.asarray(quantities, dtype=np.float64))
+
+        # Groups with count or mixed units fall back to per-unit aggregation
+        mixed = (sizes > 1) & (volume_rows < sizes) & (weight_rows < sizes)
+        first_row, group_units, mixed_quantities = {}, {}, {}
+        for row, name, unit, qty in zip(rows, names, units, quantities):
+            first_row.setdefault(name, row)
+            group_units.setdefault(name, set()).add(unit)
+            if mixed[groups[name]]:
+                by_unit = mixed_quantities.setdefault(name, {})
+                by_unit[unit] = by_unit.get(unit, 0) + qty
 
-        # Aggregate each group
         aggregated = []
-        for name, group in grouped.items():
-            if len(group) == 1:
+        for name, code in groups.items():
+            if sizes[code] == 1:
                 # Single item, no aggregation needed
                 aggregated.append(
                     {
                         "item_name": name,
-                        "quantity": group[0].get("quantity", 0),
-                        "unit": group[0].get("unit", "unit"),
+                        "quantity": first_row[name].get("quantity", 0),
+                        "unit": first_row[name].get("unit", "unit"),
                         "category": self._guess_category(name),
                     }
                 )
+                continue
+
+            if len(group_units[name]) == 1:
+                unit, total_quantity = next(iter(group_units[name])), unit_totals[code]
+            elif volume_rows[code] == sizes[code]:
+                unit, total_quantity = self._volume_for_display(totals[code] / ML_PER_CUP)
+            elif weight_rows[code] == sizes[code]:
+                unit, total_quantity = self._weight_for_display(totals[code])
             else:
-                # Multiple items, need to aggregate
-                quantities_by_unit = {}
-                for item in group:
-                    unit = item.get("unit", "unit")
-                    qty = item.get("quantity", 0)
-                    if unit not in quantities_by_unit:
-                        quantities_by_unit[unit] = 0
-                    quantities_by_unit[unit] += qty
-
-                # Try to convert to common unit
-                unit, total_quantity = self._aggregate_quantities(quantities_by_unit)
-
-                aggregated.append(
-                    {
-                        "item_name": name,
-                        "quantity": round(total_quantity, 2) if total_quantity else 0,
-                        "unit": unit or "unit",
-                        "category": self._guess_category(name),
-                    }
-                )
+                unit, total_quantity = self._aggregate_quantities(mixed_quantities[name], name)
+
+            aggregated.append(
+                {
+                    "item_name": name,
+                    "quantity": round(float(total_quantity), 2) if total_quantity else 0,
+                    "unit": unit or "unit",
+                    "category": self._guess_category(name),
+                }
+            )
 
         return aggregated
 
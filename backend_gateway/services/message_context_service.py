@@ -6,8 +6,11 @@ Extract rich context from user messages for better recipe matching
 import logging
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
+from backend_gateway.utils.keyword_matcher import keyword_matcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -187,6 +190,103 @@ class MessageContextService:
             "meal_prep": ["meal prep", "batch", "week ahead", "prepare ahead"],
         }
 
+        # Meal-specific ingredients, used as a hint when nothing else decides the meal
+        self.meal_ingredient_hints = {
+            "breakfast": ["egg", "bacon", "cereal", "oatmeal", "pancake"],
+        }
+
+        # Serving size phrases
+        self.serving_phrases = {
+            "meal_prep": ["meal prep", "batch", "week ahead", "freeze"],
+            "single_serving": ["just for me", "single serving", "one person", "myself"],
+        }
+
+        # Temporary dietary preferences
+        self.dietary_patterns = {
+            "vegetarian": ["vegetarian", "veggie", "no meat", "meatless"],
+            "vegan": ["vegan", "plant based", "no animal", "dairy free"],
+            "gluten_free": ["gluten free", "no gluten", "celiac"],
+            "low_carb": ["low carb", "keto", "no carbs", "carb free"],
+            "paleo": ["paleo", "caveman", "primal"],
+            "dairy_free": ["dairy free", "no dairy", "lactose free"],
+        }
+
+        # Special requirement phrases
+        self.requirement_phrases = {
+            "no_shopping": [
+                "no shopping",
+                "dont buy",
+                "don't buy",
+                "only what i have",
+                "without shopping",
+                "no store",
+                "already have",
+            ],
+            "use_leftovers": ["leftover", "use up", "finish"],
+            "one_pot": ["one pot", "one pan", "single pot", "easy cleanup"],
+            "kid_friendly": ["kids", "children", "family", "picky eater"],
+            "budget_conscious": ["budget", "cheap", "affordable", "save money"],
+        }
+
+        # Expiring-ingredient intent
+        self.expiring_phrases = {
+            "expiring": [
+                "expiring",
+                "expire",
+                "going bad",
+                "use soon",
+                "about to expire",
+                "spoil",
+                "use up",
+                "before it goes bad",
+                "need to use",
+            ],
+        }
+
+        # Mood patterns
+        self.mood_patterns = {
+            "stressed": ["stressed", "exhausted", "tired", "long day", "rough day"],
+            "celebratory": ["celebrate", "special", "birthday", "anniversary"],
+            "adventurous": ["try something new", "experiment", "different", "unique"],
+            "nostalgic": ["childhood", "comfort", "grandma", "traditional", "classic"],
+            "lazy": ["lazy", "dont feel like", "don't want to cook", "minimal effort"],
+        }
+
+        # All keyword tables compile into one matcher, so a message is scanned once
+        # for every extractor (labels are (table, label) pairs)
+        self.keyword_tables = {
+            "meal": self.meal_patterns,
+            "time": self.time_patterns,
+            "health": self.health_patterns,
+            "cuisine": self.cuisine_patterns,
+            "cooking_method": self.cooking_methods,
+            "occasion": self.occasion_patterns,
+            "meal_ingredient": self.meal_ingredient_hints,
+            "serving": self.serving_phrases,
+            "dietary": self.dietary_patterns,
+            "requirement": self.requirement_phrases,
+            "expiring": self.expiring_phrases,
+            "mood": self.mood_patterns,
+        }
+        self._keywords = keyword_matcher(
+            {
+                (table, label): keywords
+                for table, patterns in self.keyword_tables.items()
+                for label, keywords in patterns.items()
+            }
+        )
+        self._find_keywords = lru_cache(maxsize=256)(self._keywords.find)
+
+    def _matches(self, message: str, table: str) -> list[str]:
+        """Labels of a keyword table found in the message, in table order"""
+        hits = self._find_keywords(message)
+        return [label for label in self.keyword_tables[table] if (table, label) in hits]
+
+    def _first_match(self, message: str, table: str) -> Optional[str]:
+        """First label of a keyword table found in the message"""
+        hits = self._find_keywords(message)
+        return next((label for label in self.keyword_tables[table] if (table, label) in hits), None)
+
     def extract_context(self, message: str, time_of_day: Optional[datetime] = None) -> dict:
         """
         Extract comprehensive context from user message
@@ -226,9 +326,9 @@ class MessageContextService:
     def _detect_meal_type(self, message: str, time_of_day: Optional[datetime]) -> str:
         """Detect meal type with time-based defaults"""
         # Check explicit mentions
-        for meal_type, patterns in self.meal_patterns.items():
-            if any(pattern in message for pattern in patterns):
-                return meal_type
+        meal_type = self._first_match(message, "meal")
+        if meal_type:
+            return meal_type
 
         # Use time of day as hint
         if time_of_day:
@@ -245,11 +345,7 @@ class MessageContextService:
                 return "snack"
 
         # Check for meal-specific ingredients as hints
-        breakfast_ingredients = ["egg", "bacon", "cereal", "oatmeal", "pancake"]
-        if any(ing in message for ing in breakfast_ingredients):
-            return "breakfast"
-
-        return "dinner"  # default
+        return self._first_match(message, "meal_ingredient") or "dinner"  # default
 
     def _extract_time_constraint(self, message: str) -> dict:
         """Extract cooking time preferences"""
@@ -279,31 +375,24 @@ class MessageContextService:
                 return {"max_minutes": value, "preference": preference, "explicit_time": True}
 
         # Check for qualitative time
-        for time_type, patterns in self.time_patterns.items():
-            if any(pattern in message for pattern in patterns):
-                max_times = {"quick": 20, "medium": 45, "leisurely": 120}
-                return {
-                    "max_minutes": max_times.get(time_type, 45),
-                    "preference": time_type,
-                    "explicit_time": False,
-                }
+        time_type = self._first_match(message, "time")
+        if time_type:
+            max_times = {"quick": 20, "medium": 45, "leisurely": 120}
+            return {
+                "max_minutes": max_times.get(time_type, 45),
+                "preference": time_type,
+                "explicit_time": False,
+            }
 
         return {"max_minutes": 60, "preference": "medium", "explicit_time": False}
 
     def _detect_health_intent(self, message: str) -> Optional[str]:
         """Detect health-related intent in the message"""
-        for health_type, patterns in self.health_patterns.items():
-            if any(pattern in message for pattern in patterns):
-                return health_type
-        return None
+        return self._first_match(message, "health")
 
     def _extract_cuisine_hints(self, message: str) -> list[str]:
         """Extract cuisine preferences from message"""
-        cuisines = []
-        for cuisine, patterns in self.cuisine_patterns.items():
-            if any(pattern in message for pattern in patterns):
-                cuisines.append(cuisine)
-        return cuisines
+        return self._matches(message, "cuisine")
 
     def _extract_ingredient_focus(self, message: str) -> list[str]:
         """Extract specific ingredients user wants to use"""
@@ -375,16 +464,15 @@ class MessageContextService:
                 serving_info["servings"] = int(match.group(1))
                 break
 
+        phrases = self._matches(message, "serving")
+
         # Check for meal prep intent
-        if any(phrase in message for phrase in ["meal prep", "batch", "week ahead", "freeze"]):
+        if "meal_prep" in phrases:
             serving_info["meal_prep"] = True
             serving_info["servings"] = max(serving_info["servings"], 8)  # Increase for meal prep
 
         # Check for single serving
-        if any(
-            phrase in message
-            for phrase in ["just for me", "single serving", "one person", "myself"]
-        ):
+        if "single_serving" in phrases:
             serving_info["servings"] = 1
             serving_info["leftovers_ok"] = False
 
@@ -392,36 +480,15 @@ class MessageContextService:
 
     def _extract_cooking_method(self, message: str) -> Optional[str]:
         """Extract preferred cooking method"""
-        for method, patterns in self.cooking_methods.items():
-            if any(pattern in message for pattern in patterns):
-                return method
-        return None
+        return self._first_match(message, "cooking_method")
 
     def _detect_occasion(self, message: str) -> Optional[str]:
         """Detect special occasion context"""
-        for occasion, patterns in self.occasion_patterns.items():
-            if any(pattern in message for pattern in patterns):
-                return occasion
-        return None
+        return self._first_match(message, "occasion")
 
     def _extract_dietary_overrides(self, message: str) -> list[str]:
         """Extract temporary dietary preferences from message"""
-        dietary_overrides = []
-
-        dietary_patterns = {
-            "vegetarian": ["vegetarian", "veggie", "no meat", "meatless"],
-            "vegan": ["vegan", "plant based", "no animal", "dairy free"],
-            "gluten_free": ["gluten free", "no gluten", "celiac"],
-            "low_carb": ["low carb", "keto", "no carbs", "carb free"],
-            "paleo": ["paleo", "caveman", "primal"],
-            "dairy_free": ["dairy free", "no dairy", "lactose free"],
-        }
-
-        for diet, patterns in dietary_patterns.items():
-            if any(pattern in message for pattern in patterns):
-                dietary_overrides.append(diet)
-
-        return dietary_overrides
+        return self._matches(message, "dietary")
 
     def _extract_special_requirements(self, message: str) -> dict:
         """Extract any special requirements or constraints"""
@@ -434,72 +501,23 @@ class MessageContextService:
             "budget_conscious": False,
         }
 
-        # Check for no shopping requirement
-        if any(
-            phrase in message
-            for phrase in [
-                "no shopping",
-                "dont buy",
-                "don't buy",
-                "only what i have",
-                "without shopping",
-                "no store",
-                "already have",
-            ]
-        ):
-            requirements["no_shopping"] = True
-
-        # Check for leftover usage
-        if any(phrase in message for phrase in ["leftover", "use up", "finish"]):
-            requirements["use_leftovers"] = True
-
-        # Check for one-pot meals
-        if any(
-            phrase in message for phrase in ["one pot", "one pan", "single pot", "easy cleanup"]
-        ):
-            requirements["one_pot"] = True
-            requirements["no_cleanup"] = True
-
-        # Check for kid-friendly
-        if any(phrase in message for phrase in ["kids", "children", "family", "picky eater"]):
-            requirements["kid_friendly"] = True
+        phrases = self._matches(message, "requirement")
+        for requirement in phrases:
+            requirements[requirement] = True
 
-        # Check for budget
-        if any(phrase in message for phrase in ["budget", "cheap", "affordable", "save money"]):
-            requirements["budget_conscious"] = True
+        # One-pot meals also mean little cleanup
+        if "one_pot" in phrases:
+            requirements["no_cleanup"] = True
 
         return requirements
 
     def _detect_expiring_intent(self, message: str) -> bool:
         """Check if user wants to use expiring ingredients"""
-        expiring_phrases = [
-            "expiring",
-            "expire",
-            "going bad",
-            "use soon",
-            "about to expire",
-            "spoil",
-            "use up",
-            "before it goes bad",
-            "need to use",
-        ]
-        return any(phrase in message for phrase in expiring_phrases)
+        return bool(self._matches(message, "expiring"))
 
     def _detect_user_mood(self, message: str) -> Optional[str]:
         """Detect user's mood or emotional state"""
-        mood_patterns = {
-            "stressed": ["stressed", "exhausted", "tired", "long day", "rough day"],
-            "celebratory": ["celebrate", "special", "birthday", "anniversary"],
-            "adventurous": ["try something new", "experiment", "different", "unique"],
-            "nostalgic": ["childhood", "comfort", "grandma", "traditional", "classic"],
-            "lazy": ["lazy", "dont feel like", "don't want to cook", "minimal effort"],
-        }
-
-        for mood, patterns in mood_patterns.items():
-            if any(pattern in message for pattern in patterns):
-                return mood
-
-        return None
+        return self._first_match(message, "mood")
 
     def get_response_tone(self, context: dict) -> str:
         """
@@ -5,7 +5,6 @@ and post-processing (unit validation, categorization, expiration).
 """
 
 import base64
-import hashlib
 import json
 import logging
 import re
@@ -14,13 +13,14 @@ from typing import Any, Optional
 
 from openai import AuthenticationError
 
-from backend_gateway.core.openai_client import get_openai_client
+from backend_gateway.core.openai_client import get_async_openai_client
 from backend_gateway.models.ocr_models import OCRResponse, ParsedItem
 from backend_gateway.RemoteControl_7 import is_mock_enabled
 from backend_gateway.services.fallback_unit_service import fallback_unit_service
 from backend_gateway.services.practical_food_categorization import (
     PracticalFoodCategorizationService,
 )
+from backend_gateway.services.vision_pipeline import generate_image_hash, vision_pipeline
 from backend_gateway.utils.smart_cache import get_cache, invalidate_pattern_cache
 
 logger = logging.getLogger(__name__)
@@ -123,7 +123,7 @@ class OcrService:
 
     def _generate_image_hash(self, data: bytes) -> str:
         """Compute an MD5 hash for the input bytes for cache keys."""
-        return hashlib.md5(data).hexdigest()
+        return generate_image_hash(data)
 
     def _get_mime_type(self, data: bytes) -> str:
         """Infer MIME type by inspecting the magic bytes of image data."""
@@ -193,8 +193,11 @@ class OcrService:
         """
         Invoke the OpenAI Vision API to analyze the image and extract structured data.
         Returns the raw JSON string from the model's response.
+
+        The call runs through the shared vision pipeline, so concurrent scans of the
+        same image share one request and a saturated pipeline raises VisionCapacityError.
         """
-        client = get_openai_client()
+        client = get_async_openai_client()
         if not client:
             raise RuntimeError("OpenAI client not configured")
 
@@ -231,11 +234,14 @@ class OcrService:
         logger.info("Calling OpenAI API for item scan with model: gpt-5-nano-2025-08-07")
 
         # Call the chat completion endpoint with increased token limit
-        response = client.chat.completions.create(
-        model="gpt-5-nano-2025-08-07",
-        messages=messages,
-        max_completion_tokens=2000,
-        response_format={"type": "json_object"},
+        response = await vision_pipeline.run(
+            f"ocr_scan_{self._generate_image_hash(image_data)}",
+            lambda: client.chat.completions.create(
+                model="gpt-5-nano-2025-08-07",
+                messages=messages,
+                max_completion_tokens=2000,
+                response_format={"type": "json_object"},
+            ),
         )
 
         logger.info(
@@ -656,21 +662,14 @@ class OcrService:
     def clear_cache(self) -> dict[str, Any]:
         """Clear OCR-related cache entries."""
         try:
-            # Find and clear OCR-related cache entries
-            ocr_keys = [key for key in self.cache.cache if "ocr_scan_" in key]
-
-            for key in ocr_keys:
-                self.cache.delete(key)
-
-            # Also use the pattern invalidation function
-            invalidate_pattern_cache("ocr_scan_")
+            cleared = invalidate_pattern_cache("ocr_scan_")
 
-            logger.info(f"🧹 Cleared {len(ocr_keys)} OCR cache entries")
+            logger.info(f"🧹 Cleared {cleared} OCR cache entries")
 
             return {
                 "success": True,
-                "cleared_entries": len(ocr_keys),
-                "message": f"Cleared {len(ocr_keys)} OCR cache entries",
+                "cleared_entries": cleared,
+                "message": f"Cleared {cleared} OCR cache entries",
             }
 
         except Exception as e:
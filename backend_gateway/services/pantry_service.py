@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Any
 
@@ -23,7 +24,7 @@ class PantryService:
         # Use the database service's method which handles the appropriate SQL syntax
         # For PostgreSQL, it uses proper table names without backticks
         # For BigQuery, it would use the backtick syntax
-        return self.db_service.get_user_pantry_items(user_id)
+        return await asyncio.to_thread(self.db_service.get_user_pantry_items, user_id)
 
     async def add_pantry_item(
         self, item_data: Any, user_id: int
@@ -0,0 +1,150 @@
+"""
+Per-user pantry versions for cache keys
+
+Caches keyed on pantry state used to fetch a user's whole pantry and hash it on
+every lookup. Instead, a trigger on pantry_items (migrations/add_pantry_versions.sql)
+bumps pantry_versions.version for the owning user whenever rows are inserted,
+updated or deleted, whichever code path writes them, so the current state is a
+single primary-key read. Versions are memoized per process for
+PANTRY_VERSION_TTL_S seconds; writes made through this process drop the memo
+(bump_pantry_version), so they are seen at once here and within the TTL in
+other workers.
+
+Without the migration the versions fall back to a per-process write counter,
+which only sees writes that call bump_pantry_version. Those versions carry a
+process token so persisted cache entries never match across processes.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PANTRY_VERSION_TTL_S = float(os.getenv("PANTRY_VERSION_TTL_S", "2"))
+
+_PROCESS_TOKEN = f"{os.getpid()}-{int(time.time())}"
+_VERSION_QUERY = "SELECT version FROM pantry_versions WHERE user_id = %(user_id)s"
+
+
+class PantryVersionService:
+    """Memoized reads of pantry_versions, with a process-local fallback counter"""
+
+    def __init__(self, ttl_s: float = PANTRY_VERSION_TTL_S):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._versions: dict[int, tuple[str, float]] = {}  # user_id -> (version, read at)
+        self._local_writes: dict[int, int] = {}
+        self._local_epoch = 0  # bumped by writes for unknown users
+        self._table_available: Optional[bool] = None
+        self.hits = 0
+        self.reads = 0
+
+    def _cached(self, user_id: int) -> Optional[str]:
+        with self._lock:
+            entry = self._versions.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl_s:
+                self.hits += 1
+                return entry[0]
+        return None
+
+    def _remember(self, user_id: int, rows: Optional[list]) -> str:
+        if rows is None:
+            writes = self._local_writes.get(user_id, 0)
+            version = f"local-{_PROCESS_TOKEN}.{self._local_epoch}.{writes}"
+        else:
+            version = f"v{rows[0]['version']}" if rows else "v0"
+        with self._lock:
+            self._versions[user_id] = (version, time.monotonic())
+            self.reads += 1
+        return version
+
+    def _read_failed(self, error: Exception) -> None:
+        # undefined_table, from psycopg2 (pgcode) or asyncpg (sqlstate)
+        if "42P01" not in (getattr(error, "pgcode", None), getattr(error, "sqlstate", None)):
+            logger.warning(f"Could not read pantry version: {error}")
+            return
+        if self._table_available is not False:
+            logger.warning(
+                "pantry_versions table not found; pantry versions only track writes made "
+                "by this process. Run migrations/add_pantry_versions.sql."
+            )
+        self._table_available = False
+
+    def get(self, user_id: int) -> str:
+        """Current pantry version for a user, e.g. "v42" """
+        version = self._cached(user_id)
+        if version is not None:
+            return version
+        rows = None
+        if self._table_available is not False:
+            try:
+                rows = _db().execute_query(_VERSION_QUERY, {"user_id": user_id})
+                self._table_available = True
+            except Exception as e:
+                self._read_failed(e)
+        return self._remember(user_id, rows)
+
+    async def get_async(self, user_id: int) -> str:
+        """get() without blocking the event loop on the database read"""
+        version = self._cached(user_id)
+        if version is not None:
+            return version
+        rows = None
+        if self._table_available is not False:
+            try:
+                rows = await _db().execute_query_async(_VERSION_QUERY, {"user_id": user_id})
+                self._table_available = True
+            except Exception as e:
+                self._read_failed(e)
+        return self._remember(user_id, rows)
+
+    def bump(self, user_id: Optional[int] = None) -> None:
+        """Forget the memoized version after a pantry write (every user's if user_id is None)"""
+        with self._lock:
+            if user_id is None:
+                self._versions.clear()
+                self._local_epoch += 1
+            else:
+                self._versions.pop(user_id, None)
+                self._local_writes[user_id] = self._local_writes.get(user_id, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ttl_s": self.ttl_s,
+                "users": len(self._versions),
+                "hits": self.hits,
+                "reads": self.reads,
+                "table_available": self._table_available,
+            }
+
+
+def _db():
+    # Imported lazily: postgres_service imports this module
+    from backend_gateway.config.database import get_database_service
+
+    return get_database_service()
+
+
+pantry_versions = PantryVersionService()
+
+
+def get_pantry_version(user_id: int) -> str:
+    return pantry_versions.get(user_id)
+
+
+async def get_pantry_version_async(user_id: int) -> str:
+    return await pantry_versions.get_async(user_id)
+
+
+def bump_pantry_version(user_id: Optional[int] = None) -> None:
+    """
+    Call after writing pantry_items rows for a user (or for unknown users).
+
+    The database trigger already moved the shared version; this makes the change
+    visible in this process without waiting out the memo.
+    """
+    pantry_versions.bump(user_id)
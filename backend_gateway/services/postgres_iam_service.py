@@ -3,6 +3,7 @@ PostgreSQL Service with IAM Authentication for PrepSense
 Uses Google Cloud IAM tokens instead of passwords
 """
 
+import asyncio
 import logging
 import threading
 from contextlib import contextmanager
@@ -186,6 +187,18 @@ class PostgresIAMService:
             execute_batch(cursor, query, data)
             return cursor.rowcount
 
+    async def execute_query_async(
+        self, query: str, params: Optional[dict[str, Any]] = None
+    ) -> list[dict[str, Any]]:
+        """Awaitable execute_query; each call opens its own connection, so threads are safe"""
+        return await asyncio.to_thread(self.execute_query, query, params)
+
+    async def execute_batch_insert_async(
+        self, table: str, data: list[dict[str, Any]], conflict_resolution: Optional[str] = None
+    ) -> int:
+        """Awaitable execute_batch_insert"""
+        return await asyncio.to_thread(self.execute_batch_insert, table, data, conflict_resolution)
+
     def close(self):
         """Close all connections in the pool"""
         if self.pool:
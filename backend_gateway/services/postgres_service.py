@@ -3,69 +3,465 @@ PostgreSQL Service for PrepSense
 Handles all database operations with PostgreSQL instead of BigQuery
 """
 
+import asyncio
+import json
 import logging
+import os
+import re
 import threading
-from contextlib import contextmanager
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
 from typing import Any, Optional, Union
 
 from psycopg2.extras import RealDictCursor, execute_batch
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
 
 from .embedding_service import get_embedding_service
+from .pantry_version_service import bump_pantry_version
+from .recipe_preference_scorer import invalidate_user_profile
+from .vector_codec import register_asyncpg_vector, register_psycopg2_vector
+from .vector_index import VECTOR_INDEX_BACKEND, get_vector_index
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL_CONFIG = {
+    "min_size": 1,
+    "max_size": 20,
+    "acquire_timeout": 10.0,
+    "statement_cache_size": 100,
+    "command_timeout": 60.0,
+    "async_enabled": True,
+}
+
+# HNSW search defaults; requests can raise ef_search (recall) or the candidate multiplier
+# (rows fetched from the index before thresholding) per call
+VECTOR_EF_SEARCH = int(os.getenv("VECTOR_EF_SEARCH", "40"))
+VECTOR_CANDIDATE_MULTIPLIER = int(os.getenv("VECTOR_CANDIDATE_MULTIPLIER", "4"))
+# pgvector >= 0.8 keeps scanning the index until enough rows pass the WHERE filters.
+# Skipped automatically on older versions, which do not know the setting; empty = off
+VECTOR_ITERATIVE_SCAN = os.getenv("VECTOR_ITERATIVE_SCAN", "relaxed_order")
+# pgvector caps hnsw.ef_search at 1000
+_MAX_EF_SEARCH = 1000
+
+# psycopg2-style named placeholder, e.g. %(user_id)s
+_NAMED_PARAM_RE = re.compile(r"%\((\w+)\)s")
+# Statements whose result set should be fetched rather than reported as a row count
+_RETURNS_ROWS_RE = re.compile(r"^\s*(SELECT|WITH|VALUES|SHOW|EXPLAIN)\b|\bRETURNING\b", re.I)
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled connection becomes available within the acquire timeout."""
+
+
+class PoolMetrics:
+    """Thread-safe saturation counters for a connection pool"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.waiting = 0
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def start_wait(self) -> float:
+        with self._lock:
+            self.waiting += 1
+        return time.perf_counter()
+
+    def acquired(self, started: float) -> None:
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.acquisitions += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.timeouts += 1
+
+    def released(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            avg_wait = self.total_wait_seconds / self.acquisitions if self.acquisitions else 0.0
+            return {
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "waiting": self.waiting,
+                "saturation": round(self.in_use / self.max_size, 3) if self.max_size else 0.0,
+                "acquisitions": self.acquisitions,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+def _encode_json(value: Any) -> str:
+    # Strings are already JSON text, as with psycopg2
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _version_tuple(version: Optional[str]) -> tuple[int, ...]:
+    """'0.8.0' -> (0, 8, 0); a missing version sorts before every release"""
+    return tuple(int(part) for part in re.findall(r"\d+", version or ""))
+
+
+async def _init_async_connection(conn) -> None:
+    """asyncpg pool init hook: decode json/jsonb like psycopg2 and register pgvector"""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name, encoder=_encode_json, decoder=json.loads, schema="pg_catalog"
+        )
+    await register_asyncpg_vector(conn)
+
+
+class _SharedPools:
+    """Per-process pools shared by every PostgresService built for the same database"""
+
+    def __init__(self, connection_params: dict[str, Any], pool_config: dict[str, Any]):
+        self.connection_params = connection_params
+        self.pool_config = pool_config
+        self.services = 0  # PostgresService instances using these pools
+        max_size = pool_config["max_size"]
+
+        # float32 embedding arrays bound through psycopg2 become vector literals
+        register_psycopg2_vector()
+        self.sync_pool = ThreadedConnectionPool(
+            pool_config["min_size"],
+            max_size,
+            host=connection_params["host"],
+            port=connection_params.get("port", 5432),
+            database=connection_params["database"],
+            user=connection_params["user"],
+            password=connection_params["password"],
+        )
+        # ThreadedConnectionPool raises instead of waiting when exhausted, so callers
+        # queue on this semaphore (with a timeout) before asking it for a connection.
+        self.sync_slots = threading.BoundedSemaphore(max_size)
+        self.sync_metrics = PoolMetrics(max_size)
+
+        self.async_pool = None
+        self.async_metrics = PoolMetrics(max_size)
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    async def get_async_pool(self):
+        """Create the asyncpg pool on first use (it must be bound to the running loop)"""
+        if self.async_pool is not None:
+            return self.async_pool
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+
+        async with self._async_lock:
+            if self.async_pool is None:
+                import asyncpg
+
+                params = self.connection_params
+                self.async_pool = await asyncpg.create_pool(
+                    host=params["host"],
+                    port=params.get("port", 5432),
+                    database=params["database"],
+                    user=params["user"],
+                    password=params["password"],
+                    min_size=self.pool_config["min_size"],
+                    max_size=self.pool_config["max_size"],
+                    # Each connection keeps this many server-side prepared statements,
+                    # so repeated queries skip parse/plan on the server.
+                    statement_cache_size=self.pool_config["statement_cache_size"],
+                    command_timeout=self.pool_config["command_timeout"],
+                    # json/jsonb and pgvector codecs on every new connection
+                    init=_init_async_connection,
+                )
+                logger.info("PostgreSQL asyncio connection pool initialized")
+        return self.async_pool
+
+    def close(self):
+        self.sync_pool.closeall()
+        if self.async_pool is not None:
+            self.async_pool.terminate()
+            self.async_pool = None
+
+
+_shared_pools: dict[tuple, _SharedPools] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def _pool_key(connection_params: dict[str, Any]) -> tuple:
+    return (
+        connection_params["host"],
+        connection_params.get("port", 5432),
+        connection_params["database"],
+        connection_params["user"],
+    )
+
+
+# BigQuery table references still used by older queries, mapped to PostgreSQL tables
+BIGQUERY_TO_POSTGRES = {
+    '"adsp-34002-on02-prep-sense.Inventory.user_pantry_full"': "user_pantry_full",
+    '"adsp-34002-on02-prep-sense.Inventory.pantry_items"': "pantry_items",
+    '"adsp-34002-on02-prep-sense.Inventory.pantry"': "pantries",
+    '"adsp-34002-on02-prep-sense.Inventory.products"': "products",
+    '"adsp-34002-on02-prep-sense.Inventory.users"': "users",
+    '"adsp-34002-on02-prep-sense.Inventory.user_preferences"': "user_preferences",
+    '"adsp-34002-on02-prep-sense.Inventory.dietary_preferences"': "user_dietary_preferences",
+    '"adsp-34002-on02-prep-sense.Inventory.allergens"': "user_allergens",
+    '"adsp-34002-on02-prep-sense.Inventory.cuisine_preferences"': "user_cuisine_preferences",
+}
+
+
+@dataclass(frozen=True)
+class TranslatedQuery:
+    """A rewritten statement plus the parameter layout needed to bind it"""
+
+    statement: str  # psycopg2 form with %(name)s placeholders
+    positional_statement: str  # asyncpg form with $n placeholders
+    param_order: tuple[str, ...]  # parameter name bound to $1, $2, ...
+    returns_rows: bool  # fetch a result set rather than report a row count
+
+    def positional_args(self, params: Optional[dict[str, Any]]) -> list[Any]:
+        return [params[name] for name in self.param_order] if params else []
+
+
+def _to_positional(query: str) -> tuple[str, tuple[str, ...]]:
+    """
+    Rewrite %(name)s placeholders to asyncpg's $n form.
+
+    Repeated names share one positional slot, and escaped %% becomes a literal %.
+    """
+    order: dict[str, int] = {}
+
+    def _replace(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in order:
+            order[name] = len(order) + 1
+        return f"${order[name]}"
+
+    positional = _NAMED_PARAM_RE.sub(_replace, query).replace("%%", "%")
+    return positional, tuple(order)
+
+
+def translate_query(query: str, param_names: tuple[str, ...]) -> TranslatedQuery:
+    """Convert BigQuery-flavoured SQL and @params to PostgreSQL placeholders"""
+    # Remove backticks and project/dataset prefixes
+    statement = query.replace("`", '"')
+
+    # Replace BigQuery table references with PostgreSQL table names
+    for bq_table, pg_table in BIGQUERY_TO_POSTGRES.items():
+        statement = statement.replace(bq_table, pg_table)
+
+    # Convert BigQuery types to PostgreSQL
+    statement = statement.replace("FLOAT64", "NUMERIC")
+    statement = statement.replace("INT64", "INTEGER")
+
+    # Convert BigQuery-style parameters to psycopg2 style
+    # Sort parameters by length (descending) to avoid partial replacements
+    # e.g., replace @unit_price before @unit
+    for param_name in sorted(param_names, key=len, reverse=True):
+        statement = statement.replace(f"@{param_name}", f"%({param_name})s")
+
+    if param_names:
+        positional, order = _to_positional(statement)
+    else:
+        positional, order = statement, ()
+    return TranslatedQuery(statement, positional, order, bool(_RETURNS_ROWS_RE.search(statement)))
+
+
+class QueryTranslationCache:
+    """
+    Bounded LRU of translated statements keyed by raw query text and parameter names.
+
+    The same few dozen query strings are executed on every request, so the
+    rewrite in translate_query only has to run once per distinct statement.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, tuple[str, ...]], TranslatedQuery] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query: str, params: Optional[dict[str, Any]]) -> TranslatedQuery:
+        key = (query, tuple(sorted(params)) if params else ())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = translate_query(query, key[1])
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+query_translation_cache = QueryTranslationCache(
+    maxsize=int(os.getenv("POSTGRES_QUERY_CACHE_SIZE", "512"))
+)
+
 
 class PostgresService:
-    def __init__(self, connection_params: dict[str, Any]):
+    def __init__(
+        self, connection_params: dict[str, Any], pool_config: Optional[dict[str, Any]] = None
+    ):
         """
         Initialize PostgreSQL service with connection pooling
 
         Args:
             connection_params: Dict with host, port, database, user, password
+            pool_config: Optional pool sizing (min_size, max_size, acquire_timeout,
+                statement_cache_size, command_timeout, async_enabled). Defaults to
+                the POSTGRES_POOL_* environment settings.
         """
         self.connection_params = connection_params
+        self.pool_config = {**DEFAULT_POOL_CONFIG, **(pool_config or self._env_pool_config())}
         self.pool = None
+        self._pools: Optional[_SharedPools] = None
         self._local = threading.local()
+        self._pgvector_installed: Optional[bool] = None
+        self._iterative_scan_supported: Optional[bool] = None
         self._initialize_pool()
 
+    @staticmethod
+    def _env_pool_config() -> dict[str, Any]:
+        try:
+            from backend_gateway.config.database import db_config
+
+            return db_config.pool_config
+        except Exception:
+            return {}
+
     def _initialize_pool(self):
-        """Initialize connection pool"""
+        """Initialize (or join) the shared connection pool for this database"""
+        key = _pool_key(self.connection_params)
         try:
-            self.pool = SimpleConnectionPool(
-                1,
-                20,  # min and max connections
-                host=self.connection_params["host"],
-                port=self.connection_params.get("port", 5432),
-                database=self.connection_params["database"],
-                user=self.connection_params["user"],
-                password=self.connection_params["password"],
-            )
-            logger.info("PostgreSQL connection pool initialized")
+            with _shared_pools_lock:
+                pools = _shared_pools.get(key)
+                if pools is None:
+                    pools = _SharedPools(self.connection_params, self.pool_config)
+                    _shared_pools[key] = pools
+                    logger.info("PostgreSQL connection pool initialized")
+                pools.services += 1
+            self._pools = pools
+            self.pool = pools.sync_pool
         except Exception as e:
             logger.error(f"Failed to initialize connection pool: {e}")
             raise
 
     @contextmanager
-    def get_cursor(self, dict_cursor: bool = True):
-        """Get a database cursor from the pool"""
-        conn = None
+    def get_connection(self):
+        """Check a connection out of the threaded pool, waiting up to acquire_timeout"""
+        pools = self._pools
+        started = pools.sync_metrics.start_wait()
+        if not pools.sync_slots.acquire(timeout=self.pool_config["acquire_timeout"]):
+            pools.sync_metrics.timed_out()
+            raise PoolTimeoutError(
+                f"No database connection available within {self.pool_config['acquire_timeout']}s"
+            )
         try:
             conn = self.pool.getconn()
-            cursor_factory = RealDictCursor if dict_cursor else None
-            cursor = conn.cursor(cursor_factory=cursor_factory)
-            yield cursor
-            conn.commit()
-        except Exception as e:
-            if conn:
+        except Exception:
+            pools.sync_metrics.timed_out()
+            pools.sync_slots.release()
+            raise
+        pools.sync_metrics.acquired(started)
+        try:
+            yield conn
+        finally:
+            self.pool.putconn(conn)
+            pools.sync_metrics.released()
+            pools.sync_slots.release()
+
+    @contextmanager
+    def get_cursor(self, dict_cursor: bool = True):
+        """Get a database cursor from the pool"""
+        with self.get_connection() as conn:
+            cursor = None
+            try:
+                cursor_factory = RealDictCursor if dict_cursor else None
+                cursor = conn.cursor(cursor_factory=cursor_factory)
+                yield cursor
+                conn.commit()
+            except Exception as e:
                 conn.rollback()
-            logger.error(f"Database error: {e}")
+                logger.error(f"Database error: {e}")
+                raise
+            finally:
+                if cursor:
+                    cursor.close()
+
+    @asynccontextmanager
+    async def get_async_connection(self):
+        """Check a connection out of the asyncio pool, waiting up to acquire_timeout"""
+        pool = await self._pools.get_async_pool()
+        metrics = self._pools.async_metrics
+        started = metrics.start_wait()
+        try:
+            conn = await pool.acquire(timeout=self.pool_config["acquire_timeout"])
+        except asyncio.TimeoutError as e:
+            metrics.timed_out()
+            raise PoolTimeoutError(
+                f"No database connection available within {self.pool_config['acquire_timeout']}s"
+            ) from e
+        except Exception:
+            metrics.timed_out()
             raise
+        metrics.acquired(started)
+        try:
+            yield conn
         finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                self.pool.putconn(conn)
+            await pool.release(conn)
+            metrics.released()
+
+    def get_pool_stats(self) -> dict[str, Any]:
+        """Saturation metrics for the threaded and asyncio pools"""
+        return {
+            "sync": self._pools.sync_metrics.snapshot(),
+            "async": {
+                "enabled": self.pool_config["async_enabled"],
+                "initialized": self._pools.async_pool is not None,
+                **self._pools.async_metrics.snapshot(),
+            },
+            "acquire_timeout": self.pool_config["acquire_timeout"],
+            "statement_cache_size": self.pool_config["statement_cache_size"],
+        }
 
     def execute_query(
         self, query: str, params: Optional[dict[str, Any]] = None, fetch: str = "all"
@@ -81,40 +477,9 @@ class PostgresService:
         Returns:
             List of dicts, single dict, or None
         """
+        translated = query_translation_cache.get(query, params)
         with self.get_cursor(dict_cursor=True) as cursor:
-            # Convert BigQuery syntax to PostgreSQL
-            # Remove backticks and project/dataset prefixes
-            query = query.replace("`", '"')
-
-            # Replace BigQuery table references with PostgreSQL table names
-            bigquery_to_postgres = {
-                '"adsp-34002-on02-prep-sense.Inventory.user_pantry_full"': "user_pantry_full",
-                '"adsp-34002-on02-prep-sense.Inventory.pantry_items"': "pantry_items",
-                '"adsp-34002-on02-prep-sense.Inventory.pantry"': "pantries",
-                '"adsp-34002-on02-prep-sense.Inventory.products"': "products",
-                '"adsp-34002-on02-prep-sense.Inventory.users"': "users",
-                '"adsp-34002-on02-prep-sense.Inventory.user_preferences"': "user_preferences",
-                '"adsp-34002-on02-prep-sense.Inventory.dietary_preferences"': "user_dietary_preferences",
-                '"adsp-34002-on02-prep-sense.Inventory.allergens"': "user_allergens",
-                '"adsp-34002-on02-prep-sense.Inventory.cuisine_preferences"': "user_cuisine_preferences",
-            }
-
-            for bq_table, pg_table in bigquery_to_postgres.items():
-                query = query.replace(bq_table, pg_table)
-
-            # Convert BigQuery types to PostgreSQL
-            query = query.replace("FLOAT64", "NUMERIC")
-            query = query.replace("INT64", "INTEGER")
-
-            # Convert BigQuery-style parameters to psycopg2 style
-            if params:
-                # Sort parameters by length (descending) to avoid partial replacements
-                # e.g., replace @unit_price before @unit
-                sorted_params = sorted(params.keys(), key=len, reverse=True)
-                for param_name in sorted_params:
-                    query = query.replace(f"@{param_name}", f"%({param_name})s")
-
-            cursor.execute(query, params or {})
+            cursor.execute(translated.statement, params or {})
 
             # Check if this is a SELECT query
             if cursor.description:
@@ -123,6 +488,38 @@ class PostgresService:
                 # For INSERT/UPDATE/DELETE, return affected rows count
                 return [{"affected_rows": cursor.rowcount}]
 
+    async def execute_query_async(
+        self, query: str, params: Optional[dict[str, Any]] = None, fetch: str = "all"
+    ) -> Optional[Union[list[dict[str, Any]], dict[str, Any]]]:
+        """
+        Awaitable execute_query that never blocks the event loop.
+
+        Runs on the asyncio pool (with per-connection prepared statements) when it is
+        enabled. Queries relying on psycopg2-only adaptation, such as tuples expanded
+        for ``IN %(ids)s``, run through the threaded pool in a worker thread instead.
+        """
+        if not self.pool_config["async_enabled"] or any(
+            isinstance(value, tuple) for value in (params or {}).values()
+        ):
+            return await asyncio.to_thread(self.execute_query, query, params, fetch)
+
+        translated = query_translation_cache.get(query, params)
+        statement = translated.positional_statement
+        args = translated.positional_args(params)
+
+        async with self.get_async_connection() as conn:
+            # fetch/execute go through the connection's prepared statement cache
+            if translated.returns_rows:
+                return [dict(record) for record in await conn.fetch(statement, *args)]
+            status = await conn.execute(statement, *args)
+
+        # Status strings look like "UPDATE 3" / "INSERT 0 1"; the last token is the row count
+        try:
+            affected = int(status.split()[-1])
+        except (ValueError, IndexError):
+            affected = -1
+        return [{"affected_rows": affected}]
+
     def execute_batch_insert(
         self, table: str, data: list[dict[str, Any]], conflict_resolution: Optional[str] = None
     ) -> int:
@@ -156,11 +553,55 @@ class PostgresService:
             execute_batch(cursor, query, data)
             return cursor.rowcount
 
+    async def execute_batch_insert_async(
+        self, table: str, data: list[dict[str, Any]], conflict_resolution: Optional[str] = None
+    ) -> int:
+        """
+        Awaitable execute_batch_insert, using one prepared statement for every row
+
+        Args:
+            table: Table name
+            data: List of dictionaries to insert
+            conflict_resolution: Optional ON CONFLICT clause
+
+        Returns:
+            Number of rows inserted
+        """
+        if not data:
+            return 0
+
+        if not self.pool_config["async_enabled"]:
+            return await asyncio.to_thread(
+                self.execute_batch_insert, table, data, conflict_resolution
+            )
+
+        columns = list(data[0].keys())
+        placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+        column_names = ", ".join(columns)
+
+        query = f"INSERT INTO {table} ({column_names}) VALUES ({placeholders})"
+
+        if conflict_resolution:
+            query += f" {conflict_resolution}"
+
+        async with self.get_async_connection() as conn:
+            async with conn.transaction():
+                await conn.executemany(query, [[row.get(col) for col in columns] for row in data])
+        return len(data)
+
     def close(self):
-        """Close all connections in the pool"""
-        if self.pool:
-            self.pool.closeall()
-            logger.info("PostgreSQL connection pool closed")
+        """Release the shared pools; they close once no other service uses them"""
+        if self._pools:
+            pools, self._pools, self.pool = self._pools, None, None
+            key = _pool_key(self.connection_params)
+            with _shared_pools_lock:
+                pools.services -= 1
+                last = pools.services <= 0
+                if last and _shared_pools.get(key) is pools:
+                    del _shared_pools[key]
+            if last:
+                pools.close()
+                logger.info("PostgreSQL connection pool closed")
 
     # Pantry-specific methods that match BigQueryService interface
 
@@ -284,25 +725,27 @@ class PostgresService:
             cursor.execute(insert_query, params)
             result = cursor.fetchone()
 
-            return {
-                "id": str(result["pantry_item_id"]),
-                "pantry_item_id": result["pantry_item_id"],
-                "product_name": params["product_name"],
-                "item_name": params["product_name"],
-                "quantity": params["quantity"],
-                "quantity_amount": params["quantity"],
-                "unit_of_measurement": params["unit_of_measurement"],
-                "quantity_unit": params["unit_of_measurement"],
-                "expiration_date": (
-                    params["expiration_date"].isoformat() if params["expiration_date"] else None
-                ),
-                "expected_expiration": (
-                    params["expiration_date"].isoformat() if params["expiration_date"] else None
-                ),
-                "category": params["category"],
-                "created_at": result["created_at"].isoformat(),
-                "message": "Item added successfully",
-            }
+        bump_pantry_version(user_id)
+
+        return {
+            "id": str(result["pantry_item_id"]),
+            "pantry_item_id": result["pantry_item_id"],
+            "product_name": params["product_name"],
+            "item_name": params["product_name"],
+            "quantity": params["quantity"],
+            "quantity_amount": params["quantity"],
+            "unit_of_measurement": params["unit_of_measurement"],
+            "quantity_unit": params["unit_of_measurement"],
+            "expiration_date": (
+                params["expiration_date"].isoformat() if params["expiration_date"] else None
+            ),
+            "expected_expiration": (
+                params["expiration_date"].isoformat() if params["expiration_date"] else None
+            ),
+            "category": params["category"],
+            "created_at": result["created_at"].isoformat(),
+            "message": "Item added successfully",
+        }
 
     async def update_pantry_item(self, pantry_item_id: int, item_data: Any) -> dict[str, Any]:
         """Update a pantry item"""
@@ -355,27 +798,30 @@ class PostgresService:
             cursor.execute(query, params)
             result = cursor.fetchone()
 
-            if not result:
-                return None
-
-            return {
-                "id": str(result["pantry_item_id"]),
-                "pantry_item_id": result["pantry_item_id"],
-                "product_name": result["product_name"],
-                "item_name": result["product_name"],
-                "quantity": float(result["quantity"]),
-                "quantity_amount": float(result["quantity"]),
-                "unit_of_measurement": result["unit_of_measurement"],
-                "quantity_unit": result["unit_of_measurement"],
-                "expiration_date": (
-                    result["expiration_date"].isoformat() if result["expiration_date"] else None
-                ),
-                "expected_expiration": (
-                    result["expiration_date"].isoformat() if result["expiration_date"] else None
-                ),
-                "category": result["category"],
-                "message": "Item updated successfully",
-            }
+        if not result:
+            return None
+
+        # The owner isn't known here; drop every memoized version in this process
+        bump_pantry_version()
+
+        return {
+            "id": str(result["pantry_item_id"]),
+            "pantry_item_id": result["pantry_item_id"],
+            "product_name": result["product_name"],
+            "item_name": result["product_name"],
+            "quantity": float(result["quantity"]),
+            "quantity_amount": float(result["quantity"]),
+            "unit_of_measurement": result["unit_of_measurement"],
+            "quantity_unit": result["unit_of_measurement"],
+            "expiration_date": (
+                result["expiration_date"].isoformat() if result["expiration_date"] else None
+            ),
+            "expected_expiration": (
+                result["expiration_date"].isoformat() if result["expiration_date"] else None
+            ),
+            "category": result["category"],
+            "message": "Item updated successfully",
+        }
 
     def delete_pantry_item(self, pantry_item_id: int) -> bool:
         """Delete a pantry item"""
@@ -385,7 +831,10 @@ class PostgresService:
         """
 
         result = self.execute_query(query, {"pantry_item_id": pantry_item_id})
-        return result[0]["affected_rows"] > 0
+        deleted = result[0]["affected_rows"] > 0
+        if deleted:
+            bump_pantry_version()
+        return deleted
 
     async def delete_single_pantry_item(self, pantry_item_id: int) -> bool:
         """Delete a single pantry item (async wrapper for compatibility)"""
@@ -395,6 +844,7 @@ class PostgresService:
         """Add multiple pantry items in a batch"""
         # Get user's pantry
         pantry_query = "SELECT pantry_id FROM pantries WHERE user_id = %(user_id)s LIMIT 1"
+        saved_items = []
 
         with self.get_cursor() as cursor:
             cursor.execute(pantry_query, {"user_id": user_id})
@@ -438,7 +888,6 @@ class PostgresService:
                 RETURNING pantry_item_id, product_name
                 """
 
-                saved_items = []
                 for item_data in insert_data:
                     cursor.execute(query, item_data)
                     result = cursor.fetchone()
@@ -449,9 +898,9 @@ class PostgresService:
                         }
                     )
 
-                return {"saved_count": len(saved_items), "saved_items": saved_items}
-
-        return {"saved_count": 0, "saved_items": []}
+        if saved_items:
+            bump_pantry_version(user_id)
+        return {"saved_count": len(saved_items), "saved_items": saved_items}
 
     # User preference methods
 
@@ -547,10 +996,18 @@ class PostgresService:
                         {"user_id": user_id, "cuisine": cuisine},
                     )
 
+        invalidate_user_profile(user_id)
         return self.get_user_preferences(user_id)
 
     async def semantic_search_recipes(
-        self, query: str, limit: int = 10, similarity_threshold: float = 0.3
+        self,
+        query: str,
+        limit: int = 10,
+        similarity_threshold: float = 0.3,
+        ef_search: Optional[int] = None,
+        candidate_multiplier: Optional[int] = None,
+        cuisines: Optional[list[str]] = None,
+        diet_tags: Optional[list[str]] = None,
     ) -> list[dict[str, Any]]:
         """
         Search recipes using semantic similarity
@@ -559,36 +1016,85 @@ class PostgresService:
             query: Search query text
             limit: Maximum number of results
             similarity_threshold: Minimum similarity score (0-1)
+            ef_search: HNSW candidate list size; higher improves recall and costs latency
+            candidate_multiplier: Nearest rows fetched per result before thresholding
+            cuisines: Only recipes of these cuisine types
+            diet_tags: Only recipes tagged with all of these (recipe_data tags)
 
         Returns:
             List of recipes with similarity scores
         """
         # Get embedding service
-        embedding_service = get_embedding_service()
+        embedding_service = get_embedding_service(db_service=self)
 
         # Generate embedding for query
         query_embedding = await embedding_service.generate_query_embedding(
             query, query_type="recipe"
         )
 
-        # Convert to PostgreSQL array format
-        embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-
-        with self.get_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT * FROM find_similar_recipes(
-                    %(embedding)s::vector,
-                    %(limit)s,
-                    %(threshold)s
-                )
-                """,
-                {"embedding": embedding_str, "limit": limit, "threshold": similarity_threshold},
+        if not await self._use_pgvector():
+            cuisine_set, tag_set = set(cuisines or []), set(diet_tags or [])
+            return await self._local_vector_search(
+                "recipes",
+                query_embedding,
+                limit,
+                similarity_threshold,
+                columns=("recipe_id", "recipe_name", "ingredients", "description"),
+                where=lambda recipe: (not cuisine_set or recipe["cuisine_type"] in cuisine_set)
+                and tag_set.issubset(recipe["tags"]),
             )
-            return cursor.fetchall()
+
+        # Filters sit inside the index scan, which skips non-matching rows as it walks
+        filters = ["r.embedding IS NOT NULL"]
+        params: dict[str, Any] = {"embedding": query_embedding}
+        if cuisines:
+            filters.append("r.cuisine_type = ANY(%(cuisines)s)")
+            params["cuisines"] = cuisines
+        if diet_tags:
+            filters.append("(r.recipe_data -> 'tags') ?& %(diet_tags)s::text[]")
+            params["diet_tags"] = diet_tags
+
+        return await self._vector_search(
+            f"""
+            SELECT
+                nearest.recipe_id,
+                nearest.recipe_name,
+                1 - nearest.distance AS similarity_score,
+                CASE
+                    WHEN jsonb_typeof(nearest.recipe_data -> 'ingredients') = 'array' THEN ARRAY(
+                        SELECT jsonb_array_elements_text(nearest.recipe_data -> 'ingredients')
+                    )
+                    ELSE ARRAY[]::text[]
+                END AS ingredients,
+                nearest.recipe_data ->> 'description' AS description
+            FROM (
+                SELECT
+                    r.recipe_id,
+                    r.recipe_name,
+                    r.recipe_data,
+                    r.embedding <=> %(embedding)s::vector AS distance
+                FROM recipes r
+                WHERE {" AND ".join(filters)}
+                ORDER BY distance
+                LIMIT %(candidates)s
+            ) nearest
+            WHERE nearest.distance < %(max_distance)s
+            ORDER BY nearest.distance
+            LIMIT %(limit)s
+            """,
+            params,
+            limit=limit,
+            similarity_threshold=similarity_threshold,
+            ef_search=ef_search,
+            candidate_multiplier=candidate_multiplier,
+        )
 
     async def semantic_search_products(
-        self, query: str, limit: int = 10, similarity_threshold: float = 0.3
+        self,
+        query: str,
+        limit: int = 10,
+        similarity_threshold: float = 0.3,
+        ef_search: Optional[int] = None,
     ) -> list[dict[str, Any]]:
         """
         Search products using semantic similarity
@@ -597,33 +1103,40 @@ class PostgresService:
             query: Search query text
             limit: Maximum number of results
             similarity_threshold: Minimum similarity score (0-1)
+            ef_search: HNSW candidate list size; higher improves recall and costs latency
 
         Returns:
             List of products with similarity scores
         """
         # Get embedding service
-        embedding_service = get_embedding_service()
+        embedding_service = get_embedding_service(db_service=self)
 
         # Generate embedding for query
         query_embedding = await embedding_service.generate_query_embedding(
             query, query_type="product"
         )
 
-        # Convert to PostgreSQL array format
-        embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
+        if not await self._use_pgvector():
+            return await self._local_vector_search(
+                "products",
+                query_embedding,
+                limit,
+                similarity_threshold,
+                columns=("product_id", "product_name", "brand", "category"),
+            )
 
-        with self.get_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT * FROM find_similar_products(
-                    %(embedding)s::vector,
-                    %(limit)s,
-                    %(threshold)s
-                )
-                """,
-                {"embedding": embedding_str, "limit": limit, "threshold": similarity_threshold},
+        # The float32 array is bound as a binary pgvector value
+        return await self._with_vector_settings(
+            """
+            SELECT * FROM find_similar_products(
+                %(embedding)s::vector,
+                %(limit)s,
+                %(threshold)s
             )
-            return cursor.fetchall()
+            """,
+            {"embedding": query_embedding, "limit": limit, "threshold": similarity_threshold},
+            ef_search=ef_search or VECTOR_EF_SEARCH,
+        )
 
     async def hybrid_recipe_search(
         self,
@@ -647,39 +1160,45 @@ class PostgresService:
             List of recipes with combined scores
         """
         # Get embedding service
-        embedding_service = get_embedding_service()
+        embedding_service = get_embedding_service(db_service=self)
 
         # Generate embedding for query
         query_embedding = await embedding_service.generate_query_embedding(
             query, query_type="recipe"
         )
 
-        # Convert to PostgreSQL array format
-        embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
+        if not await self._use_pgvector():
+            logger.warning("Hybrid recipe search needs pgvector; returning no results")
+            return []
 
-        with self.get_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT * FROM hybrid_recipe_search(
-                    %(embedding)s::vector,
-                    %(ingredients)s::text[],
-                    %(limit)s,
-                    %(semantic_weight)s,
-                    %(ingredient_weight)s
-                )
-                """,
-                {
-                    "embedding": embedding_str,
-                    "ingredients": available_ingredients,
-                    "limit": limit,
-                    "semantic_weight": semantic_weight,
-                    "ingredient_weight": ingredient_weight,
-                },
+        # The float32 array is bound as a binary pgvector value
+        return await self.execute_query_async(
+            """
+            SELECT * FROM hybrid_recipe_search(
+                %(embedding)s::vector,
+                %(ingredients)s::text[],
+                %(limit)s,
+                %(semantic_weight)s,
+                %(ingredient_weight)s
             )
-            return cursor.fetchall()
+            """,
+            {
+                "embedding": query_embedding,
+                "ingredients": available_ingredients,
+                "limit": limit,
+                "semantic_weight": semantic_weight,
+                "ingredient_weight": ingredient_weight,
+            },
+        )
 
     async def find_similar_pantry_items(
-        self, item_name: str, limit: int = 5
+        self,
+        item_name: str,
+        limit: int = 5,
+        user_id: Optional[int] = None,
+        similarity_threshold: float = 0.3,
+        ef_search: Optional[int] = None,
+        candidate_multiplier: Optional[int] = None,
     ) -> list[dict[str, Any]]:
         """
         Find pantry items similar to a given item name
@@ -687,35 +1206,227 @@ class PostgresService:
         Args:
             item_name: Name of the item to find similar items for
             limit: Maximum number of results
+            user_id: Only search this user's pantries
+            similarity_threshold: Minimum similarity score (0-1)
+            ef_search: HNSW candidate list size; higher improves recall and costs latency
+            candidate_multiplier: Nearest rows fetched per result before thresholding
 
         Returns:
             List of similar pantry items
         """
         # Get embedding service
-        embedding_service = get_embedding_service()
+        embedding_service = get_embedding_service(db_service=self)
 
         # Generate embedding for item
         query_embedding = await embedding_service.generate_query_embedding(
             item_name, query_type="pantry"
         )
 
-        # Convert to PostgreSQL array format
-        embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
+        if not await self._use_pgvector():
+            # Pantry rows change per user all day; they are not kept in the in-process index
+            logger.warning("Similar pantry item search needs pgvector; returning no results")
+            return []
 
-        with self.get_cursor() as cursor:
-            cursor.execute(
-                """
+        filters = ["pi.embedding IS NOT NULL"]
+        params: dict[str, Any] = {"embedding": query_embedding}
+        if user_id is not None:
+            filters.append(
+                "pi.pantry_id IN (SELECT pantry_id FROM pantries WHERE user_id = %(user_id)s)"
+            )
+            params["user_id"] = user_id
+
+        return await self._vector_search(
+            f"""
+            SELECT
+                nearest.id,
+                nearest.item_name,
+                nearest.category,
+                nearest.quantity,
+                nearest.unit,
+                nearest.expiration_date,
+                1 - nearest.distance AS similarity_score
+            FROM (
                 SELECT
-                    pi.*,
-                    1 - (pi.embedding <=> %(embedding)s::vector) as similarity_score
+                    pi.pantry_item_id AS id,
+                    pi.product_name AS item_name,
+                    pi.category,
+                    pi.quantity,
+                    pi.unit_of_measurement AS unit,
+                    pi.expiration_date,
+                    pi.embedding <=> %(embedding)s::vector AS distance
                 FROM pantry_items pi
-                WHERE pi.embedding IS NOT NULL
-                    AND 1 - (pi.embedding <=> %(embedding)s::vector) > 0.3
-                ORDER BY pi.embedding <=> %(embedding)s::vector
-                LIMIT %(limit)s
-                """,
-                {"embedding": embedding_str, "limit": limit},
+                WHERE {" AND ".join(filters)}
+                ORDER BY distance
+                LIMIT %(candidates)s
+            ) nearest
+            WHERE nearest.distance < %(max_distance)s
+            ORDER BY nearest.distance
+            LIMIT %(limit)s
+            """,
+            params,
+            limit=limit,
+            similarity_threshold=similarity_threshold,
+            ef_search=ef_search,
+            candidate_multiplier=candidate_multiplier,
+        )
+
+    async def _use_pgvector(self) -> bool:
+        """Whether semantic search runs in Postgres or on the in-process vector index"""
+        if VECTOR_INDEX_BACKEND != "auto":
+            return VECTOR_INDEX_BACKEND == "pgvector"
+        if self._pgvector_installed is None:
+            rows = await self.execute_query_async(
+                "SELECT 1 FROM pg_extension WHERE extname = 'vector'"
+            )
+            self._pgvector_installed = bool(rows)
+            if not rows:
+                logger.info("pgvector is not installed; using the in-process vector index")
+        return self._pgvector_installed
+
+    async def _iterative_scan_mode(self) -> str:
+        """VECTOR_ITERATIVE_SCAN, or "" when the installed pgvector predates iterative scans"""
+        if not VECTOR_ITERATIVE_SCAN:
+            return ""
+        if self._iterative_scan_supported is None:
+            rows = await self.execute_query_async(
+                "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
             )
+            version = rows[0].get("extversion") if rows else None
+            self._iterative_scan_supported = _version_tuple(version) >= (0, 8)
+            if not self._iterative_scan_supported:
+                logger.info(f"pgvector {version} has no iterative index scans; not enabling them")
+        return VECTOR_ITERATIVE_SCAN if self._iterative_scan_supported else ""
+
+    async def _local_vector_search(
+        self,
+        index_name: str,
+        query_embedding: Any,
+        limit: int,
+        similarity_threshold: float,
+        columns: tuple[str, ...],
+        where: Optional[Any] = None,
+    ) -> list[dict[str, Any]]:
+        """Search the in-process index, returning rows shaped like the SQL results"""
+        index = await asyncio.to_thread(get_vector_index, index_name)
+        hits = await asyncio.to_thread(
+            index.search, query_embedding, limit, similarity_threshold, where
+        )
+        return [
+            {**{column: metadata.get(column) for column in columns}, "similarity_score": score}
+            for metadata, score in hits
+        ]
+
+    @staticmethod
+    def recipe_embedding_info(recipe: dict[str, Any]) -> dict[str, Any]:
+        """Fields of a recipes row that go into its embedding"""
+        recipe_info = {
+            "id": recipe["recipe_id"],
+            "name": recipe["recipe_name"],
+            "cuisine": recipe.get("cuisine_type"),
+            "description": "",
+            "ingredients": [],
+            "tags": [],
+        }
+        data = recipe.get("recipe_data")
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                data = None
+        if isinstance(data, dict):
+            recipe_info["description"] = data.get("description") or ""
+            recipe_info["ingredients"] = data.get("ingredients") or []
+            recipe_info["tags"] = data.get("tags") or []
+        return recipe_info
+
+    @staticmethod
+    def recipe_index_metadata(recipe_info: dict[str, Any]) -> dict[str, Any]:
+        """In-process index row for a recipe, with the columns semantic search returns"""
+        return {
+            "recipe_id": recipe_info["id"],
+            "recipe_name": recipe_info["name"],
+            "cuisine_type": recipe_info["cuisine"],
+            "tags": list(recipe_info["tags"]),
+            # Matches jsonb_array_elements_text: objects become their JSON text
+            "ingredients": [
+                i if isinstance(i, str) else json.dumps(i) for i in recipe_info["ingredients"]
+            ],
+            "description": recipe_info["description"],
+        }
+
+    @staticmethod
+    def product_index_metadata(product: dict[str, Any]) -> dict[str, Any]:
+        """In-process index row for a product, shaped like find_similar_products"""
+        return {
+            "product_id": product["id"],
+            "product_name": product.get("name"),
+            "brand": product.get("brand"),
+            "category": product.get("category"),
+        }
+
+    async def _vector_search(
+        self,
+        query: str,
+        params: dict[str, Any],
+        limit: int,
+        similarity_threshold: float,
+        ef_search: Optional[int] = None,
+        candidate_multiplier: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Run a nearest-neighbour query shaped as an inner ORDER BY distance LIMIT
+        %(candidates)s (an HNSW index scan) and an outer threshold on %(max_distance)s.
+
+        Thresholding the nearest rows rather than filtering on similarity inside the
+        scan keeps the index ordering usable, and returns the same rows. ef_search is
+        raised to at least the candidate count, since HNSW returns no more rows than that.
+        """
+        candidates = limit * max(1, candidate_multiplier or VECTOR_CANDIDATE_MULTIPLIER)
+        params = {
+            **params,
+            "limit": limit,
+            "candidates": candidates,
+            "max_distance": 1 - similarity_threshold,
+        }
+        return await self._with_vector_settings(
+            query, params, ef_search=max(ef_search or VECTOR_EF_SEARCH, candidates)
+        )
+
+    async def _with_vector_settings(
+        self, query: str, params: dict[str, Any], ef_search: int
+    ) -> list[dict[str, Any]]:
+        """Run a query with transaction-local HNSW settings (SET LOCAL via set_config)"""
+        settings = {"hnsw.ef_search": str(min(ef_search, _MAX_EF_SEARCH))}
+        iterative_scan = await self._iterative_scan_mode()
+        if iterative_scan:
+            settings["hnsw.iterative_scan"] = iterative_scan
+
+        if not self.pool_config["async_enabled"]:
+            return await asyncio.to_thread(self._with_vector_settings_sync, query, params, settings)
+
+        translated = query_translation_cache.get(query, params)
+        set_configs = ", ".join(
+            f"set_config(${2 * i + 1}, ${2 * i + 2}, true)" for i in range(len(settings))
+        )
+        async with self.get_async_connection() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f"SELECT {set_configs}", *[arg for item in settings.items() for arg in item]
+                )
+                records = await conn.fetch(
+                    translated.positional_statement, *translated.positional_args(params)
+                )
+        return [dict(record) for record in records]
+
+    def _with_vector_settings_sync(
+        self, query: str, params: dict[str, Any], settings: dict[str, str]
+    ) -> list[dict[str, Any]]:
+        with self.get_cursor() as cursor:
+            for name, value in settings.items():
+                cursor.execute(
+                    "SELECT set_config(%(name)s, %(value)s, true)", {"name": name, "value": value}
+                )
+            cursor.execute(query, params)
             return cursor.fetchall()
 
     async def update_recipe_embedding(self, recipe_id: int) -> bool:
@@ -739,35 +1450,21 @@ class PostgresService:
                 return False
 
             # Get embedding service
-            embedding_service = get_embedding_service()
+            embedding_service = get_embedding_service(db_service=self)
 
             # Parse recipe data for embedding generation
-            recipe_info = {
-                "id": recipe["recipe_id"],
-                "name": recipe["recipe_name"],
-                "cuisine": recipe.get("cuisine_type"),
-                "description": "",
-                "ingredients": [],
-                "tags": [],
-            }
-
-            # Extract from recipe_data JSON if available
-            if recipe.get("recipe_data"):
-                import json
-
-                try:
-                    data = json.loads(recipe["recipe_data"])
-                    recipe_info["description"] = data.get("description", "")
-                    recipe_info["ingredients"] = data.get("ingredients", [])
-                    recipe_info["tags"] = data.get("tags", [])
-                except Exception:
-                    pass
+            recipe_info = self.recipe_embedding_info(recipe)
 
             # Generate embedding
             embedding = await embedding_service.generate_recipe_embedding(recipe_info)
 
-            # Convert to PostgreSQL array format
-            embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+            if not await self._use_pgvector():
+                index = await asyncio.to_thread(get_vector_index, "recipes")
+                await asyncio.to_thread(
+                    index.add, recipe_id, embedding, self.recipe_index_metadata(recipe_info)
+                )
+                logger.info(f"Indexed embedding for recipe {recipe_id} in process")
+                return True
 
             # Update recipe with embedding
             with self.get_cursor() as cursor:
@@ -778,7 +1475,7 @@ class PostgresService:
                         embedding_updated_at = CURRENT_TIMESTAMP
                     WHERE recipe_id = %(id)s
                     """,
-                    {"embedding": embedding_str, "id": recipe_id},
+                    {"embedding": embedding, "id": recipe_id},
                 )
 
             logger.info(f"Updated embedding for recipe {recipe_id}")
@@ -809,13 +1506,18 @@ class PostgresService:
                 return False
 
             # Get embedding service
-            embedding_service = get_embedding_service()
+            embedding_service = get_embedding_service(db_service=self)
 
             # Generate embedding
             embedding = await embedding_service.generate_product_embedding(product)
 
-            # Convert to PostgreSQL array format
-            embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+            if not await self._use_pgvector():
+                index = await asyncio.to_thread(get_vector_index, "products")
+                await asyncio.to_thread(
+                    index.add, product_id, embedding, self.product_index_metadata(product)
+                )
+                logger.info(f"Indexed embedding for product {product_id} in process")
+                return True
 
             # Update product with embedding
             with self.get_cursor() as cursor:
@@ -826,7 +1528,7 @@ class PostgresService:
                         embedding_updated_at = CURRENT_TIMESTAMP
                     WHERE id = %(id)s
                     """,
-                    {"embedding": embedding_str, "id": product_id},
+                    {"embedding": embedding, "id": product_id},
                 )
 
             logger.info(f"Updated embedding for product {product_id}")
@@ -858,15 +1560,16 @@ class PostgresService:
             True if successful, False otherwise
         """
         try:
+            if not await self._use_pgvector():
+                # search_query_embeddings has a vector column
+                return False
+
             # Get embedding service
-            embedding_service = get_embedding_service()
+            embedding_service = get_embedding_service(db_service=self)
 
             # Generate embedding for query
             embedding = await embedding_service.generate_query_embedding(query_text, query_type)
 
-            # Convert to PostgreSQL array format
-            embedding_str = "[" + ",".join(map(str, embedding)) + "]"
-
             with self.get_cursor() as cursor:
                 cursor.execute(
                     """
@@ -879,7 +1582,7 @@ class PostgresService:
                         "user_id": user_id,
                         "query_text": query_text,
                         "query_type": query_type,
-                        "embedding": embedding_str,
+                        "embedding": embedding,
                         "results_count": results_count,
                         "clicked_result_id": clicked_result_id,
                     },
@@ -906,5 +1609,16 @@ def get_postgres_service() -> "PostgresService":
     if _service_instance is None:
         from backend_gateway.config.database import db_config
 
-        _service_instance = PostgresService(db_config.postgres_config)
+        _service_instance = PostgresService(
+            db_config.postgres_config, pool_config=db_config.pool_config
+        )
     return _service_instance
+
+
+def close_shared_pools() -> None:
+    """Close every shared PostgreSQL pool (called on application shutdown)."""
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for shared in pools:
+        shared.close()
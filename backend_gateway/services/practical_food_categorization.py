@@ -4,12 +4,12 @@ Since we only have Spoonacular API access, this focuses on what we can actually
 """
 
 import logging
-import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
 from backend_gateway.services.spoonacular_service import SpoonacularService
+from backend_gateway.utils.keyword_matcher import pattern_table
 
 logger = logging.getLogger(__name__)
 
@@ -246,6 +246,11 @@ class PracticalFoodCategorizationService:
             },
         }
 
+        # All category patterns compiled for a single pass over an item name
+        self._pattern_table = pattern_table(
+            {category: info["patterns"] for category, info in self.category_patterns.items()}
+        )
+
     async def categorize_food_item(
         self, item_name: str, use_cache: bool = True
     ) -> FoodCategorization:
@@ -279,7 +284,7 @@ class PracticalFoodCategorizationService:
         """Categorize using Spoonacular API"""
         try:
             # Use the parse ingredients endpoint
-            parsed = self.spoonacular.parse_ingredients([item_name])
+            parsed = await self.spoonacular.parse_ingredients_async([item_name])
             if parsed and len(parsed) > 0:
                 ingredient = parsed[0]
 
@@ -308,24 +313,15 @@ class PracticalFoodCategorizationService:
         """Enhanced pattern matching with specific brand and product recognition"""
         item_lower = item_name.lower()
 
-        # Score each category
-        category_scores = {}
-
-        for category, info in self.category_patterns.items():
-            score = 0
-            matched_patterns = []
-
-            for pattern in info["patterns"]:
-                if re.search(pattern, item_lower):
-                    score += 1
-                    matched_patterns.append(pattern)
-
-            if score > 0:
-                category_scores[category] = {
-                    "score": score,
-                    "patterns": matched_patterns,
-                    "info": info,
-                }
+        # Score each category by its number of matching patterns
+        category_scores = {
+            category: {
+                "score": len(matched_patterns),
+                "patterns": matched_patterns,
+                "info": self.category_patterns[category],
+            }
+            for category, matched_patterns in self._pattern_table.matches(item_lower).items()
+        }
 
         # Find best match
         if category_scores:
@@ -5,9 +5,11 @@ This service replaces the fake CrewAIService with actual CrewAI-powered
 recipe recommendations using background flows and foreground crews.
 """
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from backend_gateway.config.database import get_database_service
 
@@ -16,7 +18,13 @@ from backend_gateway.prepsense_crew.cache_manager import ArtifactCacheManager
 from backend_gateway.prepsense_crew.file_cache_manager import FileCacheManager
 from backend_gateway.prepsense_crew.models import CrewInput, CrewOutput
 from backend_gateway.prepsense_crew.foreground_crew import ForegroundRecipeCrew
+from backend_gateway.services.recipe_advisor_service import (
+    CHAT_DB_STAGE_TIMEOUT,
+    CHAT_PIPELINE_BUDGET,
+    CHAT_SPOONACULAR_STAGE_TIMEOUT,
+)
 from backend_gateway.services.spoonacular_service import SpoonacularService
+from backend_gateway.utils.stage_graph import Stage, StageGraph
 
 logger = logging.getLogger(__name__)
 
@@ -66,31 +74,23 @@ class RealCrewAIService:
         logger.info(f"🚀 Processing message with Real CrewAI for user {user_id}: '{message}'")
 
         try:
-            # Step 1: Check for cached artifacts
-            pantry_artifact = self.cache_manager.get_pantry_artifact(user_id)
-            preference_artifact = (
-                self.cache_manager.get_preference_artifact(user_id) if use_preferences else None
-            )
-
-            # If cache miss, create artifacts from database
-            if not pantry_artifact:
-                logger.info("Creating pantry artifact from database")
-                pantry_artifact = await self._create_pantry_artifact(user_id)
-            
-            if use_preferences and not preference_artifact:
-                logger.info("Creating preference artifact from database")
-                preference_artifact = await self._create_preference_artifact(user_id)
-
-            # Step 2: Get recipe candidates from Spoonacular
-            recipe_candidates = await self._get_recipe_candidates(message, user_id)
+            # Steps 1-2: pantry items, cached or fresh artifacts and Spoonacular candidates;
+            # independent fetches run concurrently
+            stages = await StageGraph(
+                self._build_message_stages(user_id, message, use_preferences),
+                budget=CHAT_PIPELINE_BUDGET,
+            ).run()
+            logger.info(f"⏱️  Stage timings (ms): {stages.timings}")
+            if stages.degraded:
+                logger.warning(f"⚠️  Degraded stages: {stages.degraded}")
 
             # Step 3: Create crew input
             crew_input = CrewInput(
                 user_message=message,
                 user_id=user_id,
-                pantry_artifact=pantry_artifact,
-                preference_artifact=preference_artifact,
-                recipe_candidates=recipe_candidates,
+                pantry_artifact=stages.results["pantry_artifact"],
+                preference_artifact=stages.results["preference_artifact"],
+                recipe_candidates=stages.results["recipe_candidates"],
                 context=self._extract_context(message),
             )
 
@@ -101,19 +101,194 @@ class RealCrewAIService:
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
             logger.info(f"✅ Processed in {processing_time:.0f}ms")
 
-            return self._format_chat_response(crew_output, crew_input)
+            response = self._format_chat_response(crew_output, crew_input)
+            response["metadata"].update(stages.metadata())
+            return response
 
         except Exception as e:
             logger.error(f"❌ Error in CrewAI processing: {e}")
             return await self._get_fallback_response(user_id, message)
 
-    async def _get_recipe_candidates(self, message: str, user_id: int) -> list[dict[str, Any]]:
+    def _build_message_stages(
+        self, user_id: int, message: str, use_preferences: bool
+    ) -> list[Stage]:
+        """
+        Stage graph for process_message.
+
+        Pantry items and the preference artifact load concurrently; the pantry
+        artifact and the Spoonacular candidate search both start once the pantry
+        items are in.
+        """
+
+        async def fetch_pantry_items(_):
+            return await self._get_pantry_items(user_id)
+
+        async def load_pantry_artifact(inputs):
+            return await self._load_pantry_artifact(user_id, inputs["pantry_items"])
+
+        async def load_preference_artifact(_):
+            if not use_preferences:
+                return None
+            return await self._load_preference_artifact(user_id)
+
+        async def fetch_candidates(inputs):
+            return await self._get_recipe_candidates(message, user_id, inputs["pantry_items"])
+
+        return [
+            Stage("pantry_items", fetch_pantry_items, timeout=CHAT_DB_STAGE_TIMEOUT, fallback=list),
+            Stage("preference_artifact", load_preference_artifact, timeout=CHAT_DB_STAGE_TIMEOUT),
+            Stage(
+                "pantry_artifact",
+                load_pantry_artifact,
+                depends_on=("pantry_items",),
+                timeout=CHAT_DB_STAGE_TIMEOUT,
+            ),
+            Stage(
+                "recipe_candidates",
+                fetch_candidates,
+                depends_on=("pantry_items",),
+                timeout=CHAT_SPOONACULAR_STAGE_TIMEOUT,
+                fallback=list,
+            ),
+        ]
+
+    async def stream_recommendations(
+        self, user_id: int, message: str, use_preferences: bool = True, limit: int = 3
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yield recipe cards as soon as they are ranked, then their enrichment.
+
+        Pantry items, preferences and candidates load concurrently; ranking is an
+        in-memory pass, so the first card follows the candidate search directly.
+        Details and nutrition for the shown recipes come from one informationBulk
+        call and are yielded as updates. Work still pending when the consumer stops
+        iterating (client disconnect, aclose) is cancelled.
+
+        Events:
+            {"type": "recipe", "card": {...}, "rank": n, "total_found": n}
+            {"type": "recipe_update", "id": recipe_id, "rank": n, "delta": {...}}
+        """
+        pantry_items = await self._get_pantry_items(user_id)
+        pending: list[asyncio.Task] = []
+        try:
+            pantry_task = asyncio.ensure_future(
+                self._load_pantry_artifact(user_id, pantry_items)
+            )
+            preference_task = asyncio.ensure_future(
+                self._load_preference_artifact(user_id) if use_preferences else _none()
+            )
+            candidates_task = asyncio.ensure_future(
+                self._get_recipe_candidates(message, user_id, pantry_items)
+            )
+            pending = [pantry_task, preference_task, candidates_task]
+            pantry_artifact, preference_artifact, candidates = await asyncio.gather(*pending)
+
+            ranked = self._rank_recipes_intelligently(
+                candidates, pantry_artifact, preference_artifact
+            )[:limit]
+            if not ranked:
+                return
+
+            # Start enrichment before the cards go out so it overlaps with the client
+            # rendering them
+            details_task = asyncio.ensure_future(
+                self.spoonacular_service.get_recipe_information_bulk(
+                    [recipe["id"] for recipe in ranked], include_nutrition=True
+                )
+            )
+            pending.append(details_task)
+
+            for rank, recipe in enumerate(ranked, 1):
+                yield {
+                    "type": "recipe",
+                    "card": self._format_initial_card(recipe),
+                    "rank": rank,
+                    "total_found": len(candidates),
+                }
+
+            try:
+                details = await details_task
+            except Exception as e:
+                logger.warning(f"Recipe enrichment failed: {e}")
+                return
+            for rank, recipe in enumerate(ranked, 1):
+                info = details.get(str(recipe["id"]))
+                if info:
+                    yield {
+                        "type": "recipe_update",
+                        "id": recipe["id"],
+                        "rank": rank,
+                        "delta": self._format_recipe_delta(info),
+                    }
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _load_pantry_artifact(self, user_id: int, pantry_items: list[dict[str, Any]]):
+        artifact = self.cache_manager.get_pantry_artifact(user_id)
+        if artifact:
+            return artifact
+        return await self._create_pantry_artifact(user_id, pantry_items)
+
+    async def _load_preference_artifact(self, user_id: int):
+        artifact = self.cache_manager.get_preference_artifact(user_id)
+        if artifact:
+            return artifact
+        return await self._create_preference_artifact(user_id)
+
+    def _format_initial_card(self, recipe: dict[str, Any]) -> dict[str, Any]:
+        """Card from search data alone; details follow in a recipe_update event"""
+        card = {
+            "id": recipe.get("id"),
+            "title": recipe.get("title", "Unknown Recipe"),
+            "image": recipe.get("image", ""),
+            "rank_score": recipe.get("rank_score", 0.5),
+            "source": "spoonacular",
+        }
+        if "usedIngredientCount" in recipe:
+            card["used_ingredient_count"] = recipe["usedIngredientCount"]
+            card["missed_ingredient_count"] = recipe.get("missedIngredientCount", 0)
+        if "readyInMinutes" in recipe:
+            card["ready_in_minutes"] = recipe["readyInMinutes"]
+        return card
+
+    def _format_recipe_delta(self, info: dict[str, Any]) -> dict[str, Any]:
+        """Fields recipe information adds to an initial card"""
+        delta = self._format_recipe_cards([info])[0]
+        for key in ("id", "title", "rank_score", "source"):
+            delta.pop(key, None)
+        if not delta.get("image"):
+            delta.pop("image", None)
+        nutrients = {
+            n.get("name"): n for n in (info.get("nutrition") or {}).get("nutrients", [])
+        }
+        nutrition = {
+            key: round(nutrients[name]["amount"])
+            for key, name in (
+                ("calories", "Calories"),
+                ("protein", "Protein"),
+                ("carbs", "Carbohydrates"),
+                ("fat", "Fat"),
+            )
+            if name in nutrients and nutrients[name].get("amount") is not None
+        }
+        if nutrition:
+            delta["nutrition"] = nutrition
+        return delta
+
+    async def _get_recipe_candidates(
+        self,
+        message: str,
+        user_id: int,
+        pantry_items: Optional[list[dict[str, Any]]] = None,
+    ) -> list[dict[str, Any]]:
         """
         Get recipe candidates from Spoonacular based on message.
         
         Args:
             message (str): User's chat message requesting recipes
             user_id (int): User ID for fetching pantry items
+            pantry_items: The user's pantry items, if already loaded
             
         Returns:
             list[dict[str, Any]]: List of recipe dictionaries with structure:
@@ -139,7 +314,8 @@ class RealCrewAIService:
         """
         try:
             # Extract ingredients from pantry if available
-            pantry_items = await self._get_pantry_items(user_id)
+            if pantry_items is None:
+                pantry_items = await self._get_pantry_items(user_id)
 
             # Use Spoonacular to find recipes
             if pantry_items:
@@ -241,8 +417,11 @@ class RealCrewAIService:
 
             # Pantry-based scoring
             if pantry_artifact:
+                # Cached artifacts carry "name"; ones built from the database rows
+                # carry "product_name"
                 available_ingredients = {
-                    item["name"].lower() for item in pantry_artifact.normalized_items
+                    (item.get("name") or item.get("product_name") or "").lower()
+                    for item in pantry_artifact.normalized_items
                 }
                 recipe_ingredients = set()
 
@@ -253,6 +432,12 @@ class RealCrewAIService:
                     }
                 elif "ingredients" in recipe:
                     recipe_ingredients = {ing.lower() for ing in recipe["ingredients"]}
+                elif "usedIngredients" in recipe:
+                    # findByIngredients results
+                    recipe_ingredients = {
+                        ing["name"].lower()
+                        for ing in recipe["usedIngredients"] + recipe.get("missedIngredients", [])
+                    }
 
                 # Score based on ingredient matches
                 if recipe_ingredients:
@@ -457,13 +642,16 @@ class RealCrewAIService:
 
         return context
 
-    async def _create_pantry_artifact(self, user_id: int):
+    async def _create_pantry_artifact(
+        self, user_id: int, pantry_items: Optional[list[dict[str, Any]]] = None
+    ):
         """Create pantry artifact from database data"""
         from backend_gateway.prepsense_crew.models import PantryArtifact
         from datetime import datetime
         
         try:
-            pantry_items = await self._get_pantry_items(user_id)
+            if pantry_items is None:
+                pantry_items = await self._get_pantry_items(user_id)
             
             if not pantry_items:
                 return None
@@ -489,7 +677,9 @@ class RealCrewAIService:
         try:
             # Get user preferences - database service methods are synchronous
             try:
-                preferences = self.db_service.get_user_preferences(user_id)
+                preferences = await asyncio.to_thread(
+                    self.db_service.get_user_preferences, user_id
+                )
             except Exception as e:
                 logger.error(f"Error fetching user preferences: {e}")
                 return None
@@ -515,8 +705,10 @@ class RealCrewAIService:
     async def _get_pantry_items(self, user_id: int) -> list[dict[str, Any]]:
         """Get pantry items from database"""
         try:
-            # Database service methods are synchronous, don't await them
-            pantry_items = self.db_service.get_user_pantry_items(user_id)
+            # Database service methods are synchronous; keep them off the event loop
+            pantry_items = await asyncio.to_thread(
+                self.db_service.get_user_pantry_items, user_id
+            )
             return pantry_items if pantry_items else []
         except Exception as e:
             logger.error(f"Error fetching pantry items: {e}")
@@ -532,3 +724,7 @@ class RealCrewAIService:
             "show_preference_choice": False,
             "metadata": {"error": True, "processing_time_ms": 50},
         }
+
+
+async def _none() -> None:
+    return None
@@ -11,6 +11,12 @@ from typing import Any, Optional
 import openai
 from pydantic import BaseModel, Field
 
+from backend_gateway.services.vision_pipeline import (
+    VisionCapacityError,
+    generate_base64_image_hash,
+    vision_pipeline,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,7 +48,7 @@ class ReceiptScannerService:
         if not self.api_key:
             raise ValueError("OpenAI API key not configured")
 
-        self.client = openai.OpenAI()
+        self.client = openai.AsyncOpenAI()
 
     async def scan_receipt(self, image_data: str) -> dict[str, Any]:
         """
@@ -91,13 +97,17 @@ Return data in the exact JSON format specified.""",
                 },
             ]
 
-            # Call OpenAI Vision API with structured output
-            response = self.client.beta.chat.completions.parse(
-                model="gpt-4o",
-                messages=messages,
-                response_format=ReceiptData,
-                max_completion_tokens=1000,
-                temperature=0.1,  # Low temperature for consistent parsing
+            # Call OpenAI Vision API with structured output; identical receipts being
+            # scanned at the same time share one call
+            response = await vision_pipeline.run(
+                f"receipt_scan_{generate_base64_image_hash(image_data)}",
+                lambda: self.client.beta.chat.completions.parse(
+                    model="gpt-4o",
+                    messages=messages,
+                    response_format=ReceiptData,
+                    max_completion_tokens=1000,
+                    temperature=0.1,  # Low temperature for consistent parsing
+                ),
             )
 
             # Extract the parsed data
@@ -127,6 +137,9 @@ Return data in the exact JSON format specified.""",
             logger.info(f"Successfully extracted {len(receipt_data.items)} items from receipt")
             return result
 
+        except VisionCapacityError:
+            # Let the endpoint turn this into a 429 instead of a failed scan
+            raise
         except Exception as e:
             logger.error(f"Error scanning receipt: {str(e)}")
             return {"success": False, "error": str(e), "data": None}
@@ -1,19 +1,38 @@
 import logging
+import os
 from datetime import datetime
 from typing import Any
 
 import openai
 
 from backend_gateway.config.database import get_database_service
+from backend_gateway.core.config import settings
 from backend_gateway.services.openai_recipe_service import OpenAIRecipeService
+from backend_gateway.services.recipe_pantry_matcher import (
+    PantryMatchIndex,
+    recipe_ingredient_names,
+)
 from backend_gateway.services.recipe_preference_scorer import RecipePreferenceScorer
 from backend_gateway.services.recipe_service import RecipeService
 from backend_gateway.services.spoonacular_service import SpoonacularService
 from backend_gateway.services.user_recipes_service import UserRecipesService
+from backend_gateway.utils.stage_graph import Stage, StageGraph
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Chat pipeline limits (seconds): per-stage timeouts and the budget for all fetch stages
+CHAT_DB_STAGE_TIMEOUT = float(os.getenv("CHAT_DB_STAGE_TIMEOUT", "10"))
+CHAT_SPOONACULAR_STAGE_TIMEOUT = float(os.getenv("CHAT_SPOONACULAR_STAGE_TIMEOUT", "15"))
+CHAT_PIPELINE_BUDGET = float(os.getenv("CHAT_PIPELINE_BUDGET", "25"))
+
+# Saved and Spoonacular recipes together make up this many candidates
+MAX_SPOONACULAR_RECIPES = 10
+
+
+def _default_preferences() -> dict[str, Any]:
+    return {"dietary_preference": [], "allergens": [], "cuisine_preference": []}
+
 
 class RecipeAdvisor:
     """Single agent that combines recipe recommendation logic"""
@@ -35,6 +54,8 @@ class RecipeAdvisor:
             "categories": {},
             "protein_sources": [],
             "staples": [],
+            "vegetables": [],
+            "carbs": [],
         }
 
         for item in pantry_items:
@@ -113,50 +134,55 @@ class RecipeAdvisor:
         Returns:
             dict[str, Any]: Evaluation metrics
         """
-        evaluation = {
-            "uses_expiring": False,
-            "nutritional_balance": "unknown",
-            "meal_variety": "standard",
-            "cooking_complexity": "medium",
-        }
+        return self.evaluate_recipes_fit([recipe], user_preferences, pantry_analysis)[0]
 
-        # Check if recipe uses expiring ingredients
-        ingredients = recipe.get("ingredients", [])
-        # Handle both string and dict ingredient formats
-        ingredient_strings = []
-        for ing in ingredients:
-            if isinstance(ing, str):
-                ingredient_strings.append(ing)
-            elif isinstance(ing, dict):
-                # Try different possible keys for ingredient names
-                name = ing.get("name") or ing.get("original") or ing.get("nameClean") or str(ing)
-                ingredient_strings.append(name)
-            else:
-                ingredient_strings.append(str(ing))
-        recipe_ingredients = " ".join(ingredient_strings).lower()
-        for expiring in pantry_analysis["expiring_soon"]:
-            if expiring["name"].lower() in recipe_ingredients:
-                evaluation["uses_expiring"] = True
-                break
-
-        # Evaluate nutritional balance (simple check)
-        if any(protein in recipe_ingredients for protein in pantry_analysis["protein_sources"]):
-            if any(
-                veg in recipe_ingredients
-                for veg in pantry_analysis["vegetables"]
-            ):
-                evaluation["nutritional_balance"] = "good"
-            else:
-                evaluation["nutritional_balance"] = "fair"
+    def evaluate_recipes_fit(
+        self,
+        recipes: list[dict[str, Any]],
+        user_preferences: dict[str, Any],
+        pantry_analysis: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """
+        Evaluate a batch of recipes; see evaluate_recipe_fit.
+
+        Expiring-ingredient usage is matched for the whole batch in one pass.
+        """
+        recipes_ingredients = [recipe_ingredient_names(recipe) for recipe in recipes]
+
+        # An expiring item is used when its name occurs in one of the ingredients
+        expiring_names = [expiring["name"].lower() for expiring in pantry_analysis["expiring_soon"]]
+        expiring_index = PantryMatchIndex(
+            expiring_names, expiring=[True] * len(expiring_names), bidirectional=False
+        )
+        batch = expiring_index.match_recipes(recipes_ingredients)
+
+        evaluations = []
+        for row, recipe in enumerate(recipes):
+            evaluation = {
+                "uses_expiring": bool(batch.expiring_counts[row]),
+                "nutritional_balance": "unknown",
+                "meal_variety": "standard",
+                "cooking_complexity": "medium",
+            }
+
+            # Evaluate nutritional balance (simple check)
+            recipe_ingredients = " ".join(recipes_ingredients[row])
+            if any(protein in recipe_ingredients for protein in pantry_analysis["protein_sources"]):
+                if any(veg in recipe_ingredients for veg in pantry_analysis["vegetables"]):
+                    evaluation["nutritional_balance"] = "good"
+                else:
+                    evaluation["nutritional_balance"] = "fair"
 
-        # Estimate cooking complexity
-        instructions = recipe.get("instructions", [])
-        if len(instructions) <= 4:
-            evaluation["cooking_complexity"] = "easy"
-        elif len(instructions) > 8:
-            evaluation["cooking_complexity"] = "complex"
+            # Estimate cooking complexity
+            instructions = recipe.get("instructions", [])
+            if len(instructions) <= 4:
+                evaluation["cooking_complexity"] = "easy"
+            elif len(instructions) > 8:
+                evaluation["cooking_complexity"] = "complex"
 
-        return evaluation
+            evaluations.append(evaluation)
+
+        return evaluations
 
     def generate_advice(
         self, recipes: list[dict[str, Any]], pantry_analysis: dict[str, Any], message: str
@@ -219,52 +245,19 @@ class CrewAIService:
         logger.info("=" * 60)
 
         try:
-            # Step 1: Fetch pantry items and user preferences
-            logger.info("\n📦 STEP 1: Fetching pantry items...")
-            pantry_items = await self._fetch_pantry_items(user_id)
-            logger.info(f"✅ Found {len(pantry_items)} total pantry items")
-
-            # Only fetch preferences if we're using them
-            if use_preferences:
-                logger.info("\n👤 Fetching user preferences...")
-                user_preferences = await self._fetch_user_preferences(user_id)
-                logger.info(f"✅ Preferences loaded: {user_preferences}")
-            else:
-                logger.info("\n⏭️  Skipping user preferences (use_preferences=False)")
-                user_preferences = {
-                    "dietary_preference": [],
-                    "allergens": [],
-                    "cuisine_preference": [],
-                }
-
-            # Step 2: Filter non-expired items
-            logger.info("\n🔍 STEP 2: Filtering valid (non-expired) items...")
-            valid_items = self._filter_valid_items(pantry_items)
-            logger.info(f"✅ {len(valid_items)} valid items out of {len(pantry_items)} total")
-
-            # Step 3: Use RecipeAdvisor to analyze pantry
-            logger.info("\n🧠 STEP 3: Analyzing pantry with RecipeAdvisor...")
-            pantry_analysis = self.recipe_advisor.analyze_pantry(pantry_items)
-            logger.info("✅ Analysis complete:")
-            logger.info(f"   - Expiring soon: {len(pantry_analysis['expiring_soon'])} items")
-            logger.info(f"   - Expired: {len(pantry_analysis['expired'])} items")
-            logger.info(f"   - Protein sources: {len(pantry_analysis['protein_sources'])} items")
-            logger.info(f"   - Staples: {len(pantry_analysis['staples'])} items")
-            logger.info(f"   - Vegetables: {len(pantry_analysis['vegetables'])} items")
-            logger.info(f"   - Carbs: {len(pantry_analysis['carbs'])} items")
-
-            # Step 4: Check saved recipes first
-            logger.info("\n💾 STEP 4: Checking saved recipes...")
-            saved_recipes = await self._get_matching_saved_recipes(user_id, valid_items)
-            logger.info(f"✅ Found {len(saved_recipes)} matching saved recipes")
-
-            # Step 5: Get Spoonacular recipes (fewer if we have saved matches)
-            num_spoon_recipes = 10 - len(saved_recipes) if len(saved_recipes) < 5 else 5
-            logger.info(f"\n🥄 STEP 5: Fetching {num_spoon_recipes} Spoonacular recipes...")
-            spoonacular_recipes = await self._get_spoonacular_recipes(
-                valid_items, message, user_preferences, num_spoon_recipes
-            )
-            logger.info(f"✅ Found {len(spoonacular_recipes)} Spoonacular recipes")
+            # Steps 1-5: fetch pantry, preferences, saved and Spoonacular recipes; independent
+            # fetches run concurrently
+            stages = await StageGraph(
+                self._build_chat_stages(user_id, message, use_preferences),
+                budget=CHAT_PIPELINE_BUDGET,
+            ).run()
+            user_preferences = stages.results["preferences"]
+            valid_items, pantry_analysis = stages.results["pantry_analysis"]
+            saved_recipes = stages.results["saved_recipes"]
+            spoonacular_recipes = stages.results["spoonacular_recipes"]
+            logger.info(f"⏱️  Stage timings (ms): {stages.timings}")
+            if stages.degraded:
+                logger.warning(f"⚠️  Degraded stages: {stages.degraded}")
 
             # Step 6: Combine and rank all recipes
             logger.info("\n🔀 STEP 6: Combining recipe sources...")
@@ -275,10 +268,11 @@ class CrewAIService:
 
             # Step 7: Evaluate recipes with advisor
             logger.info("\n📊 STEP 7: Evaluating recipes...")
-            for recipe in all_recipes:
-                recipe["evaluation"] = self.recipe_advisor.evaluate_recipe_fit(
-                    recipe, user_preferences, pantry_analysis
-                )
+            evaluations = self.recipe_advisor.evaluate_recipes_fit(
+                all_recipes, user_preferences, pantry_analysis
+            )
+            for recipe, evaluation in zip(all_recipes, evaluations):
+                recipe["evaluation"] = evaluation
             logger.info(f"✅ Evaluated all {len(all_recipes)} recipes")
 
             logger.info("\n🏆 STEP 8: Ranking recipes...")
@@ -305,12 +299,120 @@ class CrewAIService:
                 "recipes": ranked_recipes[:5],  # Top 5 recipes
                 "pantry_items": valid_items,
                 "user_preferences": user_preferences,
+                "metadata": stages.metadata(),
             }
 
         except Exception as e:
             logger.error(f"Error in AI recipe service: {str(e)}")
             raise
 
+    def _build_chat_stages(self, user_id: int, message: str, use_preferences: bool) -> list[Stage]:
+        """
+        Stage graph for process_message.
+
+        Pantry and preferences load concurrently; saved recipes and the Spoonacular
+        search both start once the pantry is analysed. The Spoonacular search asks for
+        the most recipes that could be needed, and the list is trimmed once the saved
+        recipe count is known, before recipe details are fetched.
+        """
+
+        async def fetch_pantry(_):
+            logger.info("\n📦 STEP 1: Fetching pantry items...")
+            pantry_items = await self._fetch_pantry_items(user_id)
+            logger.info(f"✅ Found {len(pantry_items)} total pantry items")
+            return pantry_items
+
+        async def fetch_preferences(_):
+            # Only fetch preferences if we're using them
+            if not use_preferences:
+                logger.info("\n⏭️  Skipping user preferences (use_preferences=False)")
+                return _default_preferences()
+            logger.info("\n👤 Fetching user preferences...")
+            user_preferences = await self._fetch_user_preferences(user_id)
+            logger.info(f"✅ Preferences loaded: {user_preferences}")
+            return user_preferences
+
+        async def analyse_pantry(inputs):
+            pantry_items = inputs["pantry"]
+
+            # Step 2: Filter non-expired items
+            logger.info("\n🔍 STEP 2: Filtering valid (non-expired) items...")
+            valid_items = self._filter_valid_items(pantry_items)
+            logger.info(f"✅ {len(valid_items)} valid items out of {len(pantry_items)} total")
+
+            # Step 3: Use RecipeAdvisor to analyze pantry
+            logger.info("\n🧠 STEP 3: Analyzing pantry with RecipeAdvisor...")
+            pantry_analysis = self.recipe_advisor.analyze_pantry(pantry_items)
+            logger.info("✅ Analysis complete:")
+            logger.info(f"   - Expiring soon: {len(pantry_analysis['expiring_soon'])} items")
+            logger.info(f"   - Expired: {len(pantry_analysis['expired'])} items")
+            logger.info(f"   - Protein sources: {len(pantry_analysis['protein_sources'])} items")
+            logger.info(f"   - Staples: {len(pantry_analysis['staples'])} items")
+            logger.info(f"   - Vegetables: {len(pantry_analysis['vegetables'])} items")
+            logger.info(f"   - Carbs: {len(pantry_analysis['carbs'])} items")
+            return valid_items, pantry_analysis
+
+        async def fetch_saved_recipes(inputs):
+            # Step 4: Check saved recipes first
+            logger.info("\n💾 STEP 4: Checking saved recipes...")
+            valid_items, _ = inputs["pantry_analysis"]
+            saved_recipes = await self._get_matching_saved_recipes(user_id, valid_items)
+            logger.info(f"✅ Found {len(saved_recipes)} matching saved recipes")
+            return saved_recipes
+
+        async def search_spoonacular(inputs):
+            valid_items, _ = inputs["pantry_analysis"]
+            return await self._search_spoonacular_recipes(
+                valid_items, message, inputs["preferences"], MAX_SPOONACULAR_RECIPES
+            )
+
+        async def fetch_spoonacular_recipes(inputs):
+            # Step 5: Get Spoonacular recipes (fewer if we have saved matches)
+            saved_count = len(inputs["saved_recipes"])
+            num_spoon_recipes = (
+                MAX_SPOONACULAR_RECIPES - saved_count
+                if saved_count < 5
+                else MAX_SPOONACULAR_RECIPES - 5
+            )
+            logger.info(f"\n🥄 STEP 5: Fetching {num_spoon_recipes} Spoonacular recipes...")
+            spoonacular_recipes = await self._standardize_spoonacular_recipes(
+                inputs["spoonacular_search"][:num_spoon_recipes]
+            )
+            logger.info(f"✅ Found {len(spoonacular_recipes)} Spoonacular recipes")
+            return spoonacular_recipes
+
+        return [
+            Stage("pantry", fetch_pantry, timeout=CHAT_DB_STAGE_TIMEOUT, fallback=list),
+            Stage(
+                "preferences",
+                fetch_preferences,
+                timeout=CHAT_DB_STAGE_TIMEOUT,
+                fallback=_default_preferences,
+            ),
+            Stage("pantry_analysis", analyse_pantry, depends_on=("pantry",), required=True),
+            Stage(
+                "saved_recipes",
+                fetch_saved_recipes,
+                depends_on=("pantry_analysis",),
+                timeout=CHAT_DB_STAGE_TIMEOUT,
+                fallback=list,
+            ),
+            Stage(
+                "spoonacular_search",
+                search_spoonacular,
+                depends_on=("pantry_analysis", "preferences"),
+                timeout=CHAT_SPOONACULAR_STAGE_TIMEOUT,
+                fallback=list,
+            ),
+            Stage(
+                "spoonacular_recipes",
+                fetch_spoonacular_recipes,
+                depends_on=("saved_recipes", "spoonacular_search"),
+                timeout=CHAT_SPOONACULAR_STAGE_TIMEOUT,
+                fallback=list,
+            ),
+        ]
+
     def _generate_recipe_id(self, recipe: dict[str, Any], source: str) -> str:
         """Generate a unique ID for recipes that don't have one"""
         # Try to get existing ID first
@@ -387,7 +489,7 @@ class CrewAIService:
         params = {"user_id": user_id}
         logger.info(f"📤 Executing query: user_pantry_full for user {user_id}")
 
-        results = self.db_service.execute_query(query, params)
+        results = await self.db_service.execute_query_async(query, params)
         logger.info(f"📦 Found {len(results)} pantry items for user {user_id}")
 
         # Log the product names for debugging
@@ -419,7 +521,7 @@ class CrewAIService:
         params = {"user_id": user_id}
         logger.info(f"📤 Executing query: user_preferences for user {user_id}")
 
-        results = self.db_service.execute_query(query, params)
+        results = await self.db_service.execute_query_async(query, params)
         if results and results[0].get("preferences"):
             # Extract preferences from JSONB column
             prefs_data = results[0]["preferences"]
@@ -435,7 +537,7 @@ class CrewAIService:
             return preferences
         else:
             logger.info("ℹ️  No preferences found for user, using defaults")
-            return {"dietary_preference": [], "allergens": [], "cuisine_preference": []}
+            return _default_preferences()
 
     async def _get_matching_saved_recipes(
         self, user_id: int, pantry_items: list[dict[str, Any]]
@@ -546,7 +648,19 @@ class CrewAIService:
             list[dict[str, Any]]: List of Spoonacular recipe objects
         """
         logger.info(f"🥄 Getting {limit} Spoonacular recipes...")
+        recipes = await self._search_spoonacular_recipes(
+            pantry_items, message, user_preferences, limit
+        )
+        return await self._standardize_spoonacular_recipes(recipes)
 
+    async def _search_spoonacular_recipes(
+        self,
+        pantry_items: list[dict[str, Any]],
+        message: str,
+        user_preferences: dict[str, Any],
+        limit: int = 5,
+    ) -> list[dict[str, Any]]:
+        """Search Spoonacular by pantry ingredients; returns the raw search results"""
         try:
             # Extract ingredient names for search
             ingredient_names = []
@@ -575,18 +689,31 @@ class CrewAIService:
                 ignore_pantry=False,          # bool - consider pantry ingredients
             )
 
-            if not result or "results" not in result:
+            # search_recipes_by_ingredients returns a list of recipes
+            recipes = result.get("results", []) if isinstance(result, dict) else result
+            if not recipes:
                 logger.warning("⚠️  No results from Spoonacular API")
                 return []
 
-            recipes = result["results"]
             logger.info(f"✅ Got {len(recipes)} recipes from Spoonacular")
+            return recipes
+
+        except Exception as e:
+            logger.error(f"Error getting Spoonacular recipes: {str(e)}")
+            return []
+
+    async def _standardize_spoonacular_recipes(
+        self, recipes: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Convert Spoonacular search results to the standard recipe format"""
+        try:
+            # Get detailed recipe information for all recipes in one bulk lookup
+            details = await self._get_recipes_details([recipe.get("id") for recipe in recipes])
 
             # Standardize recipe format
             standardized_recipes = []
             for recipe in recipes:
-                # Get detailed recipe information if needed
-                detailed_recipe = await self._get_recipe_details(recipe.get("id"))
+                detailed_recipe = details.get(str(recipe.get("id")), {})
 
                 # Calculate missing ingredients count
                 used_ingredients = recipe.get("usedIngredients", [])
@@ -628,20 +755,17 @@ class CrewAIService:
             logger.error(f"Error getting Spoonacular recipes: {str(e)}")
             return []
 
-    async def _get_recipe_details(self, recipe_id: int) -> dict[str, Any]:
-        """Get detailed recipe information from Spoonacular."""
+    async def _get_recipes_details(self, recipe_ids: list[int]) -> dict[str, dict[str, Any]]:
+        """Get detailed recipe information from Spoonacular, keyed by recipe id."""
         try:
-            if not recipe_id:
-                return {}
-
-            result = await self.spoonacular_service.get_recipe_information(
-                recipe_id=recipe_id, include_nutrition=True
+            return await self.spoonacular_service.get_recipe_information_bulk(
+                recipe_ids,
+                include_nutrition=True,
+                budget=settings.SPOONACULAR_HYDRATION_BUDGET,
             )
 
-            return result if result else {}
-
         except Exception as e:
-            logger.warning(f"Could not get details for recipe {recipe_id}: {str(e)}")
+            logger.warning(f"Could not get details for recipes {recipe_ids}: {str(e)}")
             return {}
 
     def _extract_ingredients(self, recipe: dict[str, Any]) -> list[str]:
@@ -729,25 +853,28 @@ class CrewAIService:
             # Try to get user_id from pantry items (they should have it)
             user_id = 111  # Default for now, should be passed properly
 
-        # Score each recipe using the preference scorer
-        for recipe in recipes:
-            try:
-                score_result = self.preference_scorer.calculate_comprehensive_score(
-                    recipe=recipe,
-                    user_id=user_id,
-                    pantry_items=pantry_items,
-                    context={"season": "current", "meal_type": "any"},
-                )
-
-                # Add scoring results to recipe
-                recipe["preference_score"] = score_result["score"]
-                recipe["score_reasoning"] = score_result["reasoning"]
-                recipe["recommendation_level"] = score_result["recommendation_level"]
-                recipe["score_components"] = score_result["components"]
+        # Score all recipes in one pass (the user profile is loaded once)
+        try:
+            score_results = self.preference_scorer.score_recipes(
+                recipes,
+                user_id=user_id,
+                pantry_items=pantry_items,
+                context={"season": "current", "meal_type": "any"},
+            )
+        except Exception as e:
+            logger.warning(f"Could not load preference profile for user {user_id}: {e}")
+            score_results = [None] * len(recipes)
 
-            except Exception as e:
-                logger.warning(f"Could not score recipe {recipe.get('name', 'unknown')}: {e}")
+        for recipe, score_result in zip(recipes, score_results):
+            if score_result is None:
                 recipe["preference_score"] = 50.0  # Default middle score
+                continue
+
+            # Add scoring results to recipe
+            recipe["preference_score"] = score_result["score"]
+            recipe["score_reasoning"] = score_result["reasoning"]
+            recipe["recommendation_level"] = score_result["recommendation_level"]
+            recipe["score_components"] = score_result["components"]
 
         # Enhanced ranking with demo recipe priority
         ranked = sorted(
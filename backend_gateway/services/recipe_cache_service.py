@@ -1,12 +1,12 @@
 """Service for caching and managing recipe recommendations to avoid repetition"""
 
-import hashlib
-import json
 import logging
 import random
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
+from .pantry_version_service import get_pantry_version
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,25 +35,22 @@ class RecipeCacheService:
         """Generate cache key based on user and pantry state"""
         return f"{user_id}_{pantry_hash}"
 
-    def _hash_pantry_items(self, pantry_items: list[dict[str, Any]]) -> str:
-        """Create a hash of pantry items to detect changes"""
-        # Sort items by name to ensure consistent hashing
-        sorted_items = sorted(
-            [(item.get("product_name", ""), item.get("quantity", 0)) for item in pantry_items]
-        )
-        pantry_str = json.dumps(sorted_items, sort_keys=True)
-        return hashlib.md5(pantry_str.encode()).hexdigest()[:8]
-
     def get_cached_recipes(
-        self, user_id: int, pantry_items: list[dict[str, Any]], exclude_shown: bool = True
+        self,
+        user_id: int,
+        pantry_items: Optional[list[dict[str, Any]]] = None,
+        exclude_shown: bool = True,
     ) -> Optional[list[dict[str, Any]]]:
         """
         Get recipes from cache, excluding already shown ones
 
+        Entries are keyed on the user's pantry version, so pantry_items is no longer
+        needed and only kept for existing callers.
+
         Returns:
             List of recipes or None if cache miss/expired
         """
-        pantry_hash = self._hash_pantry_items(pantry_items)
+        pantry_hash = get_pantry_version(user_id)
         cache_key = self._get_cache_key(user_id, pantry_hash)
 
         if cache_key not in self._cache:
@@ -105,7 +102,7 @@ class RecipeCacheService:
     def cache_recipes(
         self,
         user_id: int,
-        pantry_items: list[dict[str, Any]],
+        pantry_items: Optional[list[dict[str, Any]]],
         recipes: list[dict[str, Any]],
         merge_with_existing: bool = False,
     ):
@@ -114,11 +111,11 @@ class RecipeCacheService:
 
         Args:
             user_id: User ID
-            pantry_items: Current pantry items
+            pantry_items: Unused, the cache is keyed on the pantry version
             recipes: Recipes to cache
             merge_with_existing: Whether to merge with existing cache
         """
-        pantry_hash = self._hash_pantry_items(pantry_items)
+        pantry_hash = get_pantry_version(user_id)
         cache_key = self._get_cache_key(user_id, pantry_hash)
 
         if merge_with_existing and cache_key in self._cache:
@@ -145,10 +142,10 @@ class RecipeCacheService:
         }
 
     def mark_recipes_shown(
-        self, user_id: int, pantry_items: list[dict[str, Any]], recipe_ids: list[Any]
+        self, user_id: int, pantry_items: Optional[list[dict[str, Any]]], recipe_ids: list[Any]
     ):
         """Mark specific recipes as shown"""
-        pantry_hash = self._hash_pantry_items(pantry_items)
+        pantry_hash = get_pantry_version(user_id)
         cache_key = self._get_cache_key(user_id, pantry_hash)
 
         if cache_key in self._cache:
@@ -162,9 +159,11 @@ class RecipeCacheService:
             del self._cache[key]
         logger.info(f"Cleared cache for user {user_id}")
 
-    def get_cache_stats(self, user_id: int, pantry_items: list[dict[str, Any]]) -> dict[str, Any]:
+    def get_cache_stats(
+        self, user_id: int, pantry_items: Optional[list[dict[str, Any]]] = None
+    ) -> dict[str, Any]:
         """Get cache statistics for debugging"""
-        pantry_hash = self._hash_pantry_items(pantry_items)
+        pantry_hash = get_pantry_version(user_id)
         cache_key = self._get_cache_key(user_id, pantry_hash)
 
         if cache_key not in self._cache:
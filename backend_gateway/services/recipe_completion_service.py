@@ -5,10 +5,11 @@ from typing import Any, Optional
 
 from backend_gateway.constants.units import (
     UnitCategory,
-    convert_quantity,
     get_unit_category,
     normalize_unit,
 )
+from backend_gateway.services.pantry_version_service import bump_pantry_version
+from backend_gateway.services.unit_conversion_engine import unit_conversion_engine
 
 logger = logging.getLogger(__name__)
 
@@ -79,10 +80,14 @@ class RecipeCompletionService:
         needed_unit: Optional[str],
         available_quantity: float,
         available_unit: str,
+        ingredient_name: Optional[str] = None,
     ) -> tuple[Optional[float], str, dict[str, Any]]:
         """
         Calculate how much to subtract considering unit conversions
 
+        With ingredient_name, conversions across weight, volume and count use the
+        local density and piece-weight data (e.g. 2 cups flour against a pantry in g).
+
         Returns:
             - quantity_to_subtract (in pantry item's units)
             - unit_used
@@ -109,8 +114,8 @@ class RecipeCompletionService:
             return min(needed_quantity, available_quantity), available_unit_norm, metadata
 
         # Try to convert units
-        converted_quantity = convert_quantity(
-            needed_quantity, needed_unit_norm, available_unit_norm
+        converted_quantity = unit_conversion_engine.convert(
+            needed_quantity, needed_unit_norm, available_unit_norm, ingredient_name
         )
 
         if converted_quantity is not None:
@@ -189,7 +194,11 @@ class RecipeCompletionService:
             # Calculate how much to use from this item
             quantity_to_use, unit_used, conversion_meta = (
                 RecipeCompletionService.calculate_quantity_to_use(
-                    remaining_needed, remaining_needed_unit, current_quantity, pantry_unit
+                    remaining_needed,
+                    remaining_needed_unit,
+                    current_quantity,
+                    pantry_unit,
+                    ingredient["ingredient_name"],
                 )
             )
 
@@ -254,6 +263,9 @@ class RecipeCompletionService:
                     f"Failed to update {pantry_item['product_name']}: {str(e)}"
                 )
 
+        if result["consumed_items"]:
+            bump_pantry_version()
+
         # Check if we consumed enough
         if remaining_needed and remaining_needed > 0.01:  # Small tolerance for float arithmetic
             result["insufficient"] = True
@@ -9,16 +9,19 @@ Features implemented:
 - ✅ Recipe fingerprint generation
 - ✅ Similarity scoring (fixed algorithm)
 - ✅ Batch deduplication
+- ✅ Indexed batch deduplication (ingredient prefix-filter blocking)
 - ✅ Fuzzy ingredient matching
 """
 
 import hashlib
 import logging
+import math
 import re
 import unicodedata
-from dataclasses import dataclass
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from difflib import SequenceMatcher
-from typing import Any
+from typing import Any, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +38,24 @@ class RecipeFingerprint:
     serving_category: str
 
 
+# Component weights used by calculate_similarity; ingredients always participate
+TITLE_WEIGHT = 0.5
+INGREDIENT_WEIGHT = 0.3
+TIMING_WEIGHT = 0.1
+SERVING_WEIGHT = 0.1
+
+
+@dataclass
+class _RecipeProfile:
+    """Per-recipe values calculate_similarity needs, computed once for indexed dedup."""
+
+    recipe: dict[str, Any]
+    title: Optional[str] = None  # None when title normalization raised
+    title_words: frozenset = field(default_factory=frozenset)
+    ingredients: Optional[frozenset] = None  # None when ingredient extraction raised
+    prefix: tuple = ()
+
+
 class RecipeDeduplicationService:
     """
     Service for detecting and handling duplicate recipes from Spoonacular API calls.
@@ -326,12 +347,12 @@ class RecipeDeduplicationService:
                     # Take the maximum of sequence similarity and word overlap
                     title_sim = max(title_sim, word_overlap)
 
-                scores.append(("title", title_sim, 0.5))
+                scores.append(("title", title_sim, TITLE_WEIGHT))
 
             # Ingredient similarity (30% weight)
             ing_sim = self._calculate_ingredient_overlap(recipe1, recipe2)
             if ing_sim >= 0:  # Only add if calculation was successful
-                scores.append(("ingredients", ing_sim, 0.3))
+                scores.append(("ingredients", ing_sim, INGREDIENT_WEIGHT))
 
             # Timing similarity (10% weight)
             time1 = recipe1.get("readyInMinutes", 0)
@@ -340,7 +361,7 @@ class RecipeDeduplicationService:
                 time_diff = abs(time1 - time2)
                 # More generous time tolerance (45 minutes)
                 time_sim = max(0, 1 - (time_diff / 45))
-                scores.append(("timing", time_sim, 0.1))
+                scores.append(("timing", time_sim, TIMING_WEIGHT))
 
             # Serving similarity (10% weight)
             serv1 = recipe1.get("servings", 0)
@@ -349,7 +370,7 @@ class RecipeDeduplicationService:
                 serv_diff = abs(serv1 - serv2)
                 # More generous serving tolerance (up to 3 servings difference)
                 serv_sim = max(0, 1 - (serv_diff / 6))
-                scores.append(("servings", serv_sim, 0.1))
+                scores.append(("servings", serv_sim, SERVING_WEIGHT))
 
             # Calculate weighted average
             if scores:
@@ -434,7 +455,7 @@ class RecipeDeduplicationService:
         return similarity >= threshold
 
     def deduplicate_recipes(
-        self, recipes: list[dict[str, Any]], threshold: float = None
+        self, recipes: list[dict[str, Any]], threshold: float = None, use_index: bool = True
     ) -> tuple[list[dict[str, Any]], list[int]]:
         """
         Remove duplicate recipes from a list.
@@ -442,11 +463,15 @@ class RecipeDeduplicationService:
         Args:
             recipes: List of recipe dictionaries
             threshold: Custom similarity threshold
+            use_index: Use the indexed (blocking) mode when it is exact for the threshold
 
         Returns:
             Tuple of (deduplicated_recipes, duplicate_recipe_ids)
         """
         threshold = threshold or self.similarity_threshold
+        if use_index and self._min_ingredient_overlap(threshold) > 0:
+            return self.deduplicate_recipes_indexed(recipes, threshold)
+
         unique_recipes = []
         duplicate_ids = []
 
@@ -480,6 +505,193 @@ class RecipeDeduplicationService:
 
         return unique_recipes, duplicate_ids
 
+    def deduplicate_recipes_indexed(
+        self, recipes: list[dict[str, Any]], threshold: float = None
+    ) -> tuple[list[dict[str, Any]], list[int]]:
+        """
+        Remove duplicate recipes using ingredient blocking instead of all-pairs comparison.
+
+        Ingredients always carry 30% of the similarity score, so reaching the threshold
+        requires an ingredient Jaccard of at least (threshold - 0.7) / 0.3 (0.5 at the
+        default 0.85). Each recipe is normalized once, and only recipes sharing a token
+        in their ingredient prefix (rarest ingredients first, the standard prefix filter
+        for a Jaccard bound) are scored, which returns the same result as the full scan.
+        Below a threshold of 0.7 there is no ingredient bound and the full scan is used.
+
+        Args:
+            recipes: List of recipe dictionaries
+            threshold: Custom similarity threshold
+
+        Returns:
+            Tuple of (deduplicated_recipes, duplicate_recipe_ids)
+        """
+        threshold = threshold or self.similarity_threshold
+        min_overlap = self._min_ingredient_overlap(threshold)
+        if min_overlap <= 0:
+            return self.deduplicate_recipes(recipes, threshold, use_index=False)
+
+        logger.info(
+            f"Starting indexed deduplication of {len(recipes)} recipes with threshold {threshold}"
+        )
+
+        profiles = [self._build_profile(recipe) for recipe in recipes]
+
+        # Global token order: rarest ingredients first keeps posting lists short
+        frequency = Counter(
+            token for profile in profiles if profile.ingredients for token in profile.ingredients
+        )
+        # Slightly loosen the bound so float rounding can never drop a true duplicate
+        bound = min_overlap - 1e-9
+        for profile in profiles:
+            if profile.ingredients:
+                ordered = sorted(profile.ingredients, key=lambda t: (frequency[t], t))
+                size = len(ordered)
+                profile.prefix = tuple(ordered[: size - math.ceil(bound * size) + 1])
+
+        unique_profiles: list[_RecipeProfile] = []
+        postings: dict[str, list[int]] = defaultdict(list)
+        # Recipes whose ingredient extraction failed are scored without the ingredient
+        # component, so they must be compared against everything.
+        wildcards: list[int] = []
+        duplicate_ids = []
+        comparisons = 0
+
+        for i, profile in enumerate(profiles):
+            if profile.title is None:
+                # calculate_similarity returns 0.0 for any pair involving this recipe
+                unique_profiles.append(profile)
+                continue
+
+            if profile.ingredients is None:
+                candidates = range(len(unique_profiles))
+            else:
+                candidate_set = set(wildcards)
+                for token in profile.prefix:
+                    candidate_set.update(postings.get(token, ()))
+                candidates = sorted(candidate_set)
+
+            match = None
+            for idx in candidates:
+                other = unique_profiles[idx]
+                if other.title is None:
+                    continue
+                if profile.ingredients is not None and other.ingredients is not None:
+                    ing1, ing2 = profile.ingredients, other.ingredients
+                    if min(len(ing1), len(ing2)) < bound * max(len(ing1), len(ing2)):
+                        continue  # Length filter: Jaccard can't reach the bound
+                    if len(ing1 & ing2) < bound * len(ing1 | ing2):
+                        continue  # Cheap set check before the title SequenceMatcher
+                comparisons += 1
+                if self._profile_similarity(profile, other) >= threshold:
+                    match = other
+                    break
+
+            if match is not None:
+                recipe_id = profile.recipe.get("id", f"recipe_{i}")
+                duplicate_ids.append(recipe_id)
+                logger.debug(
+                    f"Recipe {recipe_id} '{profile.recipe.get('title', '')}' "
+                    f"is duplicate of {match.recipe.get('id', '')} "
+                    f"'{match.recipe.get('title', '')}'"
+                )
+                continue
+
+            idx = len(unique_profiles)
+            unique_profiles.append(profile)
+            if profile.ingredients is None:
+                wildcards.append(idx)
+            else:
+                for token in profile.prefix:
+                    postings[token].append(idx)
+
+        unique_recipes = [profile.recipe for profile in unique_profiles]
+        reduction_percent = (len(duplicate_ids) / len(recipes)) * 100 if recipes else 0
+        logger.info(
+            f"Indexed deduplication complete: {len(unique_recipes)} unique recipes, "
+            f"{len(duplicate_ids)} duplicates removed ({reduction_percent:.1f}% reduction), "
+            f"{comparisons} similarity comparisons"
+        )
+
+        return unique_recipes, duplicate_ids
+
+    @staticmethod
+    def _min_ingredient_overlap(threshold: float) -> float:
+        """Lowest ingredient Jaccard that can still reach the threshold when every other
+        component scores 1.0 (the loosest case is all four components present)."""
+        return (threshold - (1 - INGREDIENT_WEIGHT)) / INGREDIENT_WEIGHT
+
+    def _build_profile(self, recipe: dict[str, Any]) -> _RecipeProfile:
+        """Normalize a recipe's title and ingredient set once."""
+        profile = _RecipeProfile(recipe=recipe)
+        try:
+            profile.title = self.normalize_text(recipe.get("title", ""))
+            profile.title_words = frozenset(profile.title.split())
+        except Exception:
+            profile.title = None
+        try:
+            profile.ingredients = frozenset(self._similarity_ingredient_set(recipe))
+        except Exception:
+            profile.ingredients = None
+        return profile
+
+    def _similarity_ingredient_set(self, recipe: dict[str, Any]) -> set[str]:
+        """The normalized ingredient set _calculate_ingredient_overlap compares."""
+        ingredients = set()
+        if "extendedIngredients" in recipe:
+            for ing in recipe["extendedIngredients"]:
+                name = ing.get("name", "")
+                if name:
+                    normalized = self.normalize_ingredient_name(name)
+                    if normalized:
+                        ingredients.add(normalized)
+        return ingredients
+
+    def _profile_similarity(self, profile1: _RecipeProfile, profile2: _RecipeProfile) -> float:
+        """calculate_similarity over precomputed profiles (same components and weights)."""
+        try:
+            recipe1, recipe2 = profile1.recipe, profile2.recipe
+            scores = []
+
+            title1, title2 = profile1.title, profile2.title
+            if title1 and title2:
+                title_sim = SequenceMatcher(None, title1, title2).ratio()
+                words1, words2 = profile1.title_words, profile2.title_words
+                if words1 and words2:
+                    word_overlap = len(words1.intersection(words2)) / len(words1.union(words2))
+                    title_sim = max(title_sim, word_overlap)
+                scores.append(("title", title_sim, TITLE_WEIGHT))
+
+            ing1, ing2 = profile1.ingredients, profile2.ingredients
+            if ing1 is not None and ing2 is not None:
+                if ing1 and ing2:
+                    ing_sim = len(ing1.intersection(ing2)) / len(ing1.union(ing2))
+                else:
+                    ing_sim = 0.0
+                scores.append(("ingredients", ing_sim, INGREDIENT_WEIGHT))
+
+            time1 = recipe1.get("readyInMinutes", 0)
+            time2 = recipe2.get("readyInMinutes", 0)
+            if time1 and time2:
+                time_sim = max(0, 1 - (abs(time1 - time2) / 45))
+                scores.append(("timing", time_sim, TIMING_WEIGHT))
+
+            serv1 = recipe1.get("servings", 0)
+            serv2 = recipe2.get("servings", 0)
+            if serv1 and serv2:
+                serv_sim = max(0, 1 - (abs(serv1 - serv2) / 6))
+                scores.append(("servings", serv_sim, SERVING_WEIGHT))
+
+            if scores:
+                total_weight = sum(weight for _, _, weight in scores)
+                weighted_sum = sum(score * weight for _, score, weight in scores)
+                return weighted_sum / total_weight
+
+            return 0.0
+
+        except Exception as e:
+            logger.warning(f"Error calculating similarity: {str(e)}")
+            return 0.0
+
     def analyze_recipe_batch(self, recipes: list[dict[str, Any]]) -> dict[str, Any]:
         """
         Analyze a batch of recipes for deduplication insights.
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Optional, Union
 
+from backend_gateway.core.config import settings
 from backend_gateway.core.database import get_db_pool
 from backend_gateway.routers.backup_recipes_router import (
     get_backup_recipe_details,
@@ -282,15 +283,29 @@ class RecipeFallbackService:
                 ingredients=ingredients or [], number=max_results, ranking=1, ignore_pantry=True
             )
 
+            # Search hits lack timings and servings; hydrate them in one bulk lookup
+            try:
+                details = await self.spoonacular_service.get_recipe_information_bulk(
+                    [recipe_data.get("id") for recipe_data in spoonacular_recipes],
+                    budget=settings.SPOONACULAR_HYDRATION_BUDGET,
+                )
+            except Exception as e:
+                logger.warning(f"Spoonacular recipe details unavailable: {e}")
+                details = {}
+
             results = []
             for recipe_data in spoonacular_recipes:
+                detail = details.get(str(recipe_data.get("id")), {})
                 result = RecipeResult(
                     id=recipe_data.get("id"),
                     title=recipe_data.get("title"),
                     source=RecipeSource.SPOONACULAR,
                     spoonacular_id=recipe_data.get("id"),
-                    image_url=recipe_data.get("image"),
-                    ready_in_minutes=recipe_data.get("readyInMinutes"),
+                    image_url=recipe_data.get("image") or detail.get("image"),
+                    ready_in_minutes=recipe_data.get(
+                        "readyInMinutes", detail.get("readyInMinutes")
+                    ),
+                    servings=detail.get("servings"),
                     used_ingredients=[
                         ing.get("name", "") for ing in recipe_data.get("usedIngredients", [])
                     ],
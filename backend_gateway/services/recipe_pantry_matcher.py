@@ -0,0 +1,251 @@
+"""
+Batch recipe-to-pantry matching.
+
+Scores a whole candidate set of recipes against one pantry in a single pass.
+Each distinct ingredient across the candidates is matched against the pantry
+once, then recipes are encoded as sparse rows of ingredient ids (CSR layout:
+an ``indptr`` offsets array and an ``indices`` array) so match counts, missing
+counts and expiring-item coverage for every recipe come out of a handful of
+NumPy reductions instead of nested loops over ingredients and pantry items.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional
+
+import numpy as np
+
+from backend_gateway.services.ingredient_matcher_service import PhraseLookup
+
+logger = logging.getLogger(__name__)
+
+EXPIRING_WITHIN_DAYS = 7
+
+
+def recipe_ingredient_names(recipe: dict[str, Any]) -> list[str]:
+    """Lower-cased ingredient names of a recipe whose ingredients are strings or dicts"""
+    names = []
+    for ing in recipe.get("ingredients", []):
+        if isinstance(ing, str):
+            names.append(ing.lower())
+        elif isinstance(ing, dict):
+            # Try different possible keys for ingredient names
+            name = ing.get("name") or ing.get("original") or ing.get("nameClean") or str(ing)
+            names.append(name.lower())
+        else:
+            names.append(str(ing).lower())
+    return names
+
+
+def _days_until(expiration_date: Any, today: date) -> Optional[int]:
+    if not expiration_date:
+        return None
+    if isinstance(expiration_date, datetime):
+        expiration_date = expiration_date.date()
+    elif not isinstance(expiration_date, date):
+        try:
+            expiration_date = datetime.strptime(str(expiration_date)[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    return (expiration_date - today).days
+
+
+@dataclass
+class BatchMatchResult:
+    """Per-recipe match metrics for a batch, as arrays aligned with the input order"""
+
+    ingredients: list[str]  # distinct ingredient names; position is the ingredient id
+    ingredient_matched: np.ndarray  # bool per ingredient id
+    indptr: np.ndarray  # recipe i uses indices[indptr[i]:indptr[i + 1]]
+    indices: np.ndarray
+    total_counts: np.ndarray
+    matched_counts: np.ndarray
+    missing_counts: np.ndarray
+    expiring_counts: np.ndarray  # recipe ingredients that match an expiring item
+    expiring_covered: np.ndarray  # distinct expiring pantry items the recipe uses
+    expiring_coverage: np.ndarray  # expiring_covered / number of expiring items
+    match_scores: np.ndarray  # matched_counts / total_counts, 0 for empty recipes
+
+    def __len__(self) -> int:
+        return len(self.total_counts)
+
+    def _row(self, row: int) -> np.ndarray:
+        return self.indices[self.indptr[row] : self.indptr[row + 1]]
+
+    def matched_ingredients(self, row: int) -> list[str]:
+        return [self.ingredients[i] for i in self._row(row) if self.ingredient_matched[i]]
+
+    def missing_ingredients(self, row: int) -> list[str]:
+        return [self.ingredients[i] for i in self._row(row) if not self.ingredient_matched[i]]
+
+    def summary(self, row: int) -> dict[str, Any]:
+        return {
+            "match_score": float(self.match_scores[row]),
+            "matched_count": int(self.matched_counts[row]),
+            "missing_count": int(self.missing_counts[row]),
+            "total_ingredients": int(self.total_counts[row]),
+            "expiring_count": int(self.expiring_counts[row]),
+            "expiring_coverage": float(self.expiring_coverage[row]),
+            "matched_ingredients": self.matched_ingredients(row),
+            "missing_ingredients": self.missing_ingredients(row),
+        }
+
+
+class PantryMatchIndex:
+    """
+    One pantry snapshot prepared for batch matching.
+
+    An ingredient matches a pantry name when either contains the other (with
+    bidirectional=False, only when the pantry name occurs in the ingredient).
+    Per-ingredient results are memoized, so reusing an index across batches
+    only pays for ingredients it has not seen yet.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        expiring: Optional[list[bool]] = None,
+        bidirectional: bool = True,
+    ):
+        expiring = expiring or [False] * len(names)
+        self.names = list(dict.fromkeys(name for name in names if name))
+        self.expiring_names = list(
+            dict.fromkeys(
+                name for name, is_expiring in zip(names, expiring) if name and is_expiring
+            )
+        )
+        self.bidirectional = bidirectional
+        self._lookup = PhraseLookup(self.names)
+        self._expiring_lookup = PhraseLookup(self.expiring_names)
+        self._matched: dict[str, bool] = {}
+        self._expiring_hits: dict[str, list[int]] = {}
+
+    @classmethod
+    def from_pantry_items(
+        cls,
+        pantry_items: list[dict[str, Any]],
+        expiring_within_days: int = EXPIRING_WITHIN_DAYS,
+        bidirectional: bool = True,
+    ) -> "PantryMatchIndex":
+        """Index pantry rows by cleaned product name, flagging items about to expire"""
+        today = date.today()
+        names, expiring = [], []
+        for item in pantry_items:
+            if not item.get("product_name"):
+                continue
+            name = item["product_name"].lower().strip()
+            # Remove size/weight info
+            if "–" in name:
+                name = name.split("–")[0].strip()
+            days = _days_until(item.get("expiration_date"), today)
+            names.append(name)
+            expiring.append(days is not None and 0 <= days <= expiring_within_days)
+        return cls(names, expiring, bidirectional)
+
+    def _match(self, lookup: PhraseLookup, ingredient: str) -> list[int]:
+        if self.bidirectional:
+            return lookup.overlapping(ingredient)
+        return lookup.contained_in(ingredient)
+
+    def _resolve(self, ingredient: str) -> None:
+        if self.bidirectional:
+            matched = self._lookup.first_overlapping(ingredient) is not None
+        else:
+            matched = bool(self._lookup.contained_in(ingredient))
+        self._matched[ingredient] = matched
+        self._expiring_hits[ingredient] = (
+            self._match(self._expiring_lookup, ingredient) if matched else []
+        )
+
+    def match_recipes(self, recipes_ingredients: list[list[str]]) -> BatchMatchResult:
+        """Match every recipe (given as its lower-cased ingredient names) in one pass"""
+        vocabulary: dict[str, int] = {}
+        lengths = np.fromiter(
+            (len(ingredients) for ingredients in recipes_ingredients),
+            dtype=np.int64,
+            count=len(recipes_ingredients),
+        )
+        indptr = np.zeros(len(recipes_ingredients) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.fromiter(
+            (
+                vocabulary.setdefault(ingredient, len(vocabulary))
+                for ingredients in recipes_ingredients
+                for ingredient in ingredients
+            ),
+            dtype=np.int64,
+            count=int(indptr[-1]),
+        )
+
+        ingredients = list(vocabulary)
+        for ingredient in ingredients:
+            if ingredient not in self._matched:
+                self._resolve(ingredient)
+
+        ingredient_matched = np.fromiter(
+            (self._matched[ingredient] for ingredient in ingredients),
+            dtype=bool,
+            count=len(ingredients),
+        )
+        # ingredient id x expiring pantry item incidence
+        expiring_matrix = np.zeros((len(ingredients), len(self.expiring_names)), dtype=bool)
+        for ingredient_id, ingredient in enumerate(ingredients):
+            expiring_matrix[ingredient_id, self._expiring_hits[ingredient]] = True
+
+        num_recipes = len(recipes_ingredients)
+        rows = np.repeat(np.arange(num_recipes), lengths)
+        total_counts = lengths
+        matched_counts = np.bincount(
+            rows, weights=ingredient_matched[indices], minlength=num_recipes
+        ).astype(np.int64)
+        expiring_counts = np.bincount(
+            rows, weights=expiring_matrix.any(axis=1)[indices], minlength=num_recipes
+        ).astype(np.int64)
+
+        # OR the expiring rows of each recipe's ingredients together; reduceat over the
+        # start offsets of non-empty recipes only, since an empty slice would otherwise
+        # pick up the next recipe's first row
+        covered = np.zeros((num_recipes, len(self.expiring_names)), dtype=bool)
+        non_empty = np.flatnonzero(lengths)
+        if len(non_empty) and len(self.expiring_names):
+            covered[non_empty] = np.logical_or.reduceat(
+                expiring_matrix[indices], indptr[non_empty], axis=0
+            )
+        expiring_covered = covered.sum(axis=1)
+
+        match_scores = np.divide(
+            matched_counts,
+            total_counts,
+            out=np.zeros(num_recipes, dtype=np.float64),
+            where=total_counts > 0,
+        )
+        expiring_coverage = (
+            expiring_covered / len(self.expiring_names)
+            if self.expiring_names
+            else np.zeros(num_recipes, dtype=np.float64)
+        )
+
+        return BatchMatchResult(
+            ingredients=ingredients,
+            ingredient_matched=ingredient_matched,
+            indptr=indptr,
+            indices=indices,
+            total_counts=total_counts,
+            matched_counts=matched_counts,
+            missing_counts=total_counts - matched_counts,
+            expiring_counts=expiring_counts,
+            expiring_covered=expiring_covered,
+            expiring_coverage=expiring_coverage,
+            match_scores=match_scores,
+        )
+
+
+def match_recipes_to_pantry(
+    recipes: list[dict[str, Any]],
+    pantry_items: list[dict[str, Any]],
+    expiring_within_days: int = EXPIRING_WITHIN_DAYS,
+) -> BatchMatchResult:
+    """Score recipe dicts against pantry rows; the entry point for routers and services"""
+    index = PantryMatchIndex.from_pantry_items(pantry_items, expiring_within_days)
+    return index.match_recipes([recipe_ingredient_names(recipe) for recipe in recipes])
@@ -1,12 +1,32 @@
 """Enhanced recipe preference scoring system with weighted factors"""
 
 import logging
+import threading
+import time
 from collections import defaultdict
 from datetime import datetime
 from typing import Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Derived user profiles are shared across scorer instances (services are built per request)
+PROFILE_CACHE_TTL_SECONDS = 300
+_profile_cache: dict[int, tuple[float, dict[str, Any]]] = {}
+_profile_cache_lock = threading.Lock()
+
+
+def invalidate_user_profile(user_id: Optional[int] = None) -> None:
+    """
+    Drop the cached preference profile for a user (or every user).
+
+    Call after writing allergens, dietary/cuisine preferences or recipe ratings.
+    """
+    with _profile_cache_lock:
+        if user_id is None:
+            _profile_cache.clear()
+        else:
+            _profile_cache.pop(user_id, None)
+
 
 class RecipePreferenceScorer:
     """Advanced recipe scoring based on user preferences, history, and behavior"""
@@ -38,12 +58,71 @@ class RecipePreferenceScorer:
         # Maximum possible score for normalization
         self.max_score = sum(v for v in self.weights.values() if v > 0)
 
+    def score_recipes(
+        self,
+        recipes: list[dict[str, Any]],
+        user_id: int,
+        pantry_items: Optional[list[dict[str, Any]]] = None,
+        context: Optional[dict[str, Any]] = None,
+    ) -> list[Optional[dict[str, Any]]]:
+        """
+        Score a whole candidate list against one user profile
+
+        The profile is loaded once (from cache when possible) and expiring pantry
+        items are resolved once, instead of per recipe.
+
+        Args:
+            recipes: Candidate recipes
+            user_id: User ID for preference lookup
+            pantry_items: Current pantry items (for expiring item bonus)
+            context: Additional context (meal type, season, etc.)
+
+        Returns:
+            One score result per recipe, in input order (None where scoring failed)
+        """
+        user_data = self.get_user_profile(user_id)
+        expiring_names = self._expiring_item_names(pantry_items) if pantry_items else []
+
+        results: list[Optional[dict[str, Any]]] = []
+        for recipe in recipes:
+            try:
+                results.append(
+                    self.calculate_comprehensive_score(
+                        recipe,
+                        user_id,
+                        pantry_items=pantry_items,
+                        context=context,
+                        user_data=user_data,
+                        expiring_names=expiring_names,
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Could not score recipe {recipe.get('name', 'unknown')}: {e}")
+                results.append(None)
+        return results
+
+    def get_user_profile(self, user_id: int, refresh: bool = False) -> dict[str, Any]:
+        """Return the derived preference profile for a user, cached for PROFILE_CACHE_TTL_SECONDS"""
+        now = time.monotonic()
+        if not refresh:
+            with _profile_cache_lock:
+                cached = _profile_cache.get(user_id)
+            if cached and now - cached[0] < PROFILE_CACHE_TTL_SECONDS:
+                return cached[1]
+
+        user_data = self._get_user_preference_data(user_id)
+        with _profile_cache_lock:
+            _profile_cache[user_id] = (now, user_data)
+        return user_data
+
     def calculate_comprehensive_score(
         self,
         recipe: dict[str, Any],
         user_id: int,
         pantry_items: Optional[list[dict[str, Any]]] = None,
         context: Optional[dict[str, Any]] = None,
+        user_data: Optional[dict[str, Any]] = None,
+        expiring_names: Optional[list[str]] = None,
     ) -> dict[str, Any]:
         """
         Calculate comprehensive recipe score with detailed breakdown
@@ -53,20 +132,23 @@ class RecipePreferenceScorer:
             user_id: User ID for preference lookup
             pantry_items: Current pantry items (for expiring item bonus)
             context: Additional context (meal type, season, etc.)
+            user_data: Preloaded profile from get_user_profile (skips the lookup)
+            expiring_names: Preresolved expiring pantry item names
 
         Returns:
             Dictionary with score, breakdown, and recommendations
         """
 
         # Get user preferences and history
-        user_data = self._get_user_preference_data(user_id)
+        if user_data is None:
+            user_data = self.get_user_profile(user_id)
 
         # Initialize scoring components
         score_components = {}
         total_score = 0.0
 
         # 1. Ingredient matching
-        ingredient_score = self._score_ingredients(recipe, user_data, pantry_items)
+        ingredient_score = self._score_ingredients(recipe, user_data, pantry_items, expiring_names)
         score_components["ingredients"] = ingredient_score
         total_score += ingredient_score["weighted_score"]
 
@@ -206,28 +288,32 @@ class RecipePreferenceScorer:
         recipe: dict[str, Any],
         user_data: dict[str, Any],
         pantry_items: Optional[list[dict[str, Any]]],
+        expiring_names: Optional[list[str]] = None,
     ) -> dict[str, Any]:
         """Score recipe based on ingredient preferences"""
 
         recipe_ingredients = self._extract_recipe_ingredients(recipe)
+        recipe_ingredient_set = set(recipe_ingredients)
         score = 0.0
         details = []
 
         # Check favorite ingredients
-        favorite_matches = set(recipe_ingredients) & set(user_data["favorite_ingredients"])
+        favorite_matches = recipe_ingredient_set & set(user_data["favorite_ingredients"])
         if favorite_matches:
             score += len(favorite_matches) * self.weights["favorite_ingredient_match"]
             details.append(f"Contains {len(favorite_matches)} favorite ingredients")
 
         # Check disliked ingredients
-        disliked_matches = set(recipe_ingredients) & set(user_data["disliked_ingredients"])
+        disliked_matches = recipe_ingredient_set & set(user_data["disliked_ingredients"])
         if disliked_matches:
             score += len(disliked_matches) * self.weights["disliked_ingredient"]
             details.append(f"Contains {len(disliked_matches)} disliked ingredients")
 
         # Bonus for using expiring items
         if pantry_items:
-            expiring_used = self._count_expiring_items_used(recipe_ingredients, pantry_items)
+            if expiring_names is None:
+                expiring_names = self._expiring_item_names(pantry_items)
+            expiring_used = self._count_expiring_items_used(recipe_ingredients, expiring_names)
             if expiring_used > 0:
                 score += self.weights["expiring_ingredient_use"] * min(expiring_used / 3, 1)
                 details.append(f"Uses {expiring_used} expiring items")
@@ -415,12 +501,10 @@ class RecipePreferenceScorer:
 
         return allergens
 
-    def _count_expiring_items_used(
-        self, recipe_ingredients: list[str], pantry_items: list[dict[str, Any]]
-    ) -> int:
-        """Count how many expiring pantry items the recipe uses"""
+    def _expiring_item_names(self, pantry_items: list[dict[str, Any]]) -> list[str]:
+        """Names of pantry items expiring within a week"""
 
-        expiring_count = 0
+        expiring = []
         today = datetime.now().date()
 
         for item in pantry_items:
@@ -431,11 +515,20 @@ class RecipePreferenceScorer:
 
                 days_until = (exp_date - today).days
                 if 0 <= days_until <= 7:  # Expiring within a week
-                    item_name = item.get("product_name", "").lower()
-                    if any(item_name in ing or ing in item_name for ing in recipe_ingredients):
-                        expiring_count += 1
+                    expiring.append(item.get("product_name", "").lower())
+
+        return expiring
+
+    def _count_expiring_items_used(
+        self, recipe_ingredients: list[str], expiring_names: list[str]
+    ) -> int:
+        """Count how many expiring pantry items the recipe uses"""
 
-        return expiring_count
+        return sum(
+            1
+            for item_name in expiring_names
+            if any(item_name in ing or ing in item_name for ing in recipe_ingredients)
+        )
 
     def _generate_reasoning(self, components: dict[str, Any], recipe: dict[str, Any]) -> list[str]:
         """Generate human-readable reasoning for the score"""
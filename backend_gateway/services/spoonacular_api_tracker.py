@@ -197,9 +197,9 @@ class SpoonacularAPITracker:
             Database record ID if successful, None otherwise
         """
         try:
-            # Calculate cost if not provided
+            # Calculate cost if not provided; responses served from cache cost nothing
             if cost_points is None:
-                cost_points = self.get_endpoint_cost(endpoint, recipe_count)
+                cost_points = 0 if cache_hit else self.get_endpoint_cost(endpoint, recipe_count)
 
             # Set timestamp if not provided
             if call_timestamp is None:
@@ -0,0 +1,376 @@
+"""
+Two-tier cache for Spoonacular API responses.
+
+Responses are kept in an in-process LRU and mirrored to a disk tier so they
+survive restarts and are shared between worker processes on the same host.
+Each endpoint has its own freshness window; once an entry is past it (but still
+inside the stale window) it is served immediately while a background task
+fetches a fresh copy.
+
+The disk tier is swept every few hundred writes, or as soon as it outgrows
+disk_max_bytes: files past every endpoint's stale window are deleted, then the
+oldest files until the tier is back under 90% of the limit.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long responses stay fresh, and how long after that they may still be served stale"""
+
+    ttl: int  # seconds
+    stale_ttl: int  # seconds past ttl
+
+
+# Recipe details by id practically never change; search results drift as
+# Spoonacular adds recipes, so they are refreshed more often.
+ENDPOINT_POLICIES: dict[str, CachePolicy] = {
+    "information": CachePolicy(ttl=7 * 24 * 3600, stale_ttl=30 * 24 * 3600),
+    "findByIngredients": CachePolicy(ttl=6 * 3600, stale_ttl=24 * 3600),
+    "complexSearch": CachePolicy(ttl=6 * 3600, stale_ttl=24 * 3600),
+}
+
+# Files older than this are past every endpoint's stale window
+_MAX_DISK_AGE = max(policy.ttl + policy.stale_ttl for policy in ENDPOINT_POLICIES.values())
+# Leftovers of writes interrupted between open() and the rename
+_MAX_TMP_AGE = 3600
+# Disk writes between sweeps while the tier is under its size limit
+_DISK_SWEEP_EVERY = 256
+
+# Comma-separated parameters whose order and case do not change the response
+LIST_PARAMS = frozenset(
+    {"ingredients", "includeIngredients", "excludeIngredients", "intolerances", "ids"}
+)
+
+# Whether the most recent lookup in the current task was answered from the cache
+_served_from_cache: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "spoonacular_served_from_cache", default=False
+)
+
+
+def served_from_cache() -> bool:
+    """Return True if the last Spoonacular call made by this task was a cache hit"""
+    return _served_from_cache.get()
+
+
+def normalize_params(params: dict[str, Any]) -> dict[str, str]:
+    """Canonical form of request parameters used to build cache keys"""
+    normalized = {}
+    for name, value in params.items():
+        if name == "apiKey" or value is None:
+            continue
+        if name in LIST_PARAMS:
+            items = {item.strip().lower() for item in str(value).split(",")}
+            normalized[name] = ",".join(sorted(item for item in items if item))
+        elif isinstance(value, bool):
+            normalized[name] = "true" if value else "false"
+        else:
+            normalized[name] = str(value).strip()
+    return normalized
+
+
+def cache_key(endpoint: str, params: dict[str, Any]) -> str:
+    return f"{endpoint}:{json.dumps(normalize_params(params), sort_keys=True)}"
+
+
+@dataclass
+class CachedResponse:
+    value: Any
+    stale: bool
+
+
+class SpoonacularResponseCache:
+    """
+    In-process LRU in front of a disk tier, keyed by normalized request.
+
+    Bodies are stored as JSON text and decoded on every hit, so callers that
+    mutate the returned recipes never corrupt the cached copy.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 2048,
+        cache_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None  # unknown until the first sweep
+        self._disk_writes = 0  # since the last sweep
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self.hits: dict[str, int] = defaultdict(int)
+        self.stale_hits: dict[str, int] = defaultdict(int)
+        self.disk_hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Spoonacular disk cache disabled ({self.cache_dir}): {e}")
+                self.cache_dir = None
+
+    # ---- disk tier -------------------------------------------------------
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _read_disk(self, key: str) -> Optional[tuple[str, float]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable Spoonacular cache file {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        # Guard against a hash collision returning another request's body
+        if record.get("key") != key:
+            return None
+        return record["body"], record["fetched_at"]
+
+    def _write_disk(self, key: str, body: str, fetched_at: float) -> None:
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "fetched_at": fetched_at, "body": body}, f)
+                size = f.tell()
+            # Atomic rename so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write Spoonacular disk cache: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._disk_writes += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            sweep = (
+                self._disk_bytes is None
+                or self._disk_bytes > self.disk_max_bytes
+                or self._disk_writes >= _DISK_SWEEP_EVERY
+            )
+        if sweep:
+            self._sweep_disk()
+
+    def _sweep_disk(self) -> None:
+        """Delete expired files, then the oldest ones until the tier fits disk_max_bytes"""
+        # One sweep at a time per process; other processes may sweep the same directory
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.time()
+            files = []
+            for path in self.cache_dir.iterdir():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                max_age = _MAX_DISK_AGE if path.suffix == ".json" else _MAX_TMP_AGE
+                if now - stat.st_mtime > max_age:
+                    path.unlink(missing_ok=True)
+                elif path.suffix == ".json":
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            if total > self.disk_max_bytes:
+                # Trim below the limit so a full tier isn't swept again on the next write
+                target = self.disk_max_bytes * 0.9
+                for _, size, path in sorted(files):
+                    if total <= target:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+            with self._lock:
+                self._disk_bytes = total
+                self._disk_writes = 0
+        except OSError as e:
+            logger.warning(f"Failed to sweep Spoonacular disk cache: {e}")
+        finally:
+            self._sweep_lock.release()
+
+    def _delete_disk(self, key: str) -> None:
+        self._disk_path(key).unlink(missing_ok=True)
+
+    # ---- lookups ---------------------------------------------------------
+
+    async def lookup(self, endpoint: str, params: dict[str, Any]) -> Optional[CachedResponse]:
+        """Return the cached response for a request, or None if absent or expired"""
+        policy = ENDPOINT_POLICIES[endpoint]
+        key = cache_key(endpoint, params)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        from_disk = False
+        if entry is None and self.cache_dir is not None:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            from_disk = entry is not None
+
+        age = time.time() - entry[1] if entry is not None else None
+        if entry is None or age > policy.ttl + policy.stale_ttl:
+            if entry is not None:
+                self._forget(key)
+                if self.cache_dir is not None:
+                    await asyncio.to_thread(self._delete_disk, key)
+            with self._lock:
+                self.misses[endpoint] += 1
+            _served_from_cache.set(False)
+            return None
+
+        if from_disk:
+            self._remember(key, entry)
+
+        stale = age > policy.ttl
+        with self._lock:
+            self.hits[endpoint] += 1
+            if stale:
+                self.stale_hits[endpoint] += 1
+            if from_disk:
+                self.disk_hits[endpoint] += 1
+        _served_from_cache.set(True)
+        return CachedResponse(value=json.loads(entry[0]), stale=stale)
+
+    async def store(self, endpoint: str, params: dict[str, Any], value: Any) -> None:
+        key = cache_key(endpoint, params)
+        entry = (json.dumps(value), time.time())
+        self._remember(key, entry)
+        if self.cache_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, *entry)
+
+    async def lookup_many(
+        self, endpoint: str, params_list: list[dict[str, Any]]
+    ) -> list[Optional[CachedResponse]]:
+        """Look up several requests at once; counts as served from cache only if all hit"""
+        cached = await asyncio.gather(*(self.lookup(endpoint, params) for params in params_list))
+        _served_from_cache.set(all(entry is not None for entry in cached))
+        return cached
+
+    def schedule_refresh(self, key: str, refresh: Callable[[], Awaitable[None]]) -> None:
+        """Run refresh() in the background unless a refresh for key is already running"""
+        if key in self._refreshing:
+            return
+
+        async def _run():
+            try:
+                await refresh()
+            except Exception as e:
+                logger.warning(f"Background refresh of Spoonacular {key} failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(_run())
+
+    def revalidate(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> None:
+        """Refresh a stale entry in the background"""
+
+        async def _refresh():
+            await self.store(endpoint, params, await fetch())
+
+        self.schedule_refresh(cache_key(endpoint, params), _refresh)
+
+    async def get_or_fetch(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Serve a request from the cache, calling fetch() only on a miss"""
+        cached = await self.lookup(endpoint, params)
+        if cached is not None:
+            if cached.stale:
+                self.revalidate(endpoint, params, fetch)
+            return cached.value
+
+        value = await fetch()
+        await self.store(endpoint, params, value)
+        return value
+
+    # ---- in-process tier -------------------------------------------------
+
+    def _remember(self, key: str, entry: tuple[str, float]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            endpoints = {}
+            for endpoint in sorted(set(self.hits) | set(self.misses)):
+                hits, misses = self.hits[endpoint], self.misses[endpoint]
+                endpoints[endpoint] = {
+                    "hits": hits,
+                    "stale_hits": self.stale_hits[endpoint],
+                    "disk_hits": self.disk_hits[endpoint],
+                    "misses": misses,
+                    "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                }
+            total_hits = sum(self.hits.values())
+            lookups = total_hits + sum(self.misses.values())
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "disk_tier": str(self.cache_dir) if self.cache_dir else None,
+                "disk_bytes": self._disk_bytes,
+                "hits": total_hits,
+                "lookups": lookups,
+                "hit_ratio": round(total_hits / lookups, 4) if lookups else 0.0,
+                "endpoints": endpoints,
+            }
+
+
+def _default_cache_dir() -> Optional[str]:
+    # Set SPOONACULAR_CACHE_DIR to an empty string to keep the cache in memory only
+    cache_dir = os.getenv("SPOONACULAR_CACHE_DIR")
+    if cache_dir is None:
+        cache_dir = os.path.join(os.getenv("CACHE_DIR", "/tmp/prepsense_cache"), "spoonacular")
+    return cache_dir or None
+
+
+spoonacular_response_cache = SpoonacularResponseCache(
+    maxsize=int(os.getenv("SPOONACULAR_CACHE_SIZE", "2048")),
+    cache_dir=_default_cache_dir(),
+    disk_max_bytes=int(os.getenv("SPOONACULAR_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024))),
+)
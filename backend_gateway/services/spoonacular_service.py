@@ -1,16 +1,141 @@
 """Service for interacting with Spoonacular API"""
 
 import asyncio
+import importlib.util
 import logging
+import threading
 from typing import Any, Optional
 
 import httpx
 
 from backend_gateway.core.config import settings
 from backend_gateway.services.openai_recipe_service import OpenAIRecipeService
+from backend_gateway.services.spoonacular_response_cache import spoonacular_response_cache
 
 logger = logging.getLogger(__name__)
 
+SPOONACULAR_BASE_URL = "https://api.spoonacular.com"
+
+# 2 minute timeout with 1 minute connect timeout
+SPOONACULAR_TIMEOUT = httpx.Timeout(120.0, connect=60.0)
+
+# httpx only negotiates HTTP/2 when the optional h2 package is installed
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _client_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.SPOONACULAR_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SPOONACULAR_MAX_KEEPALIVE_CONNECTIONS,
+    )
+
+
+class _SharedAsyncClient:
+    """Pooled AsyncClient plus the GET requests currently in flight on it"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.client = httpx.AsyncClient(
+            base_url=SPOONACULAR_BASE_URL,
+            timeout=SPOONACULAR_TIMEOUT,
+            limits=_client_limits(),
+            http2=_HTTP2_AVAILABLE,
+        )
+        self.in_flight: dict[tuple, asyncio.Future] = {}
+
+
+_shared_async_client: Optional[_SharedAsyncClient] = None
+_shared_sync_client: Optional[httpx.Client] = None
+_shared_sync_client_lock = threading.Lock()
+
+# Bulk fetches that outlived their caller's budget; referenced here until they finish
+_background_bulk_fetches: set[asyncio.Task] = set()
+
+
+def _get_shared_async_client() -> _SharedAsyncClient:
+    """
+    Return the process-wide AsyncClient, creating it on first use.
+
+    Connections are bound to the event loop that opened them, so a new client is
+    created if the running loop changes (e.g. scripts calling asyncio.run twice).
+    """
+    global _shared_async_client
+
+    loop = asyncio.get_running_loop()
+    shared = _shared_async_client
+    if shared is None or shared.loop is not loop or shared.client.is_closed:
+        shared = _SharedAsyncClient(loop)
+        _shared_async_client = shared
+        logger.info(f"Spoonacular HTTP client initialized (http2={_HTTP2_AVAILABLE})")
+    return shared
+
+
+def _get_shared_sync_client() -> httpx.Client:
+    """Return the process-wide blocking client used by the synchronous helpers"""
+    global _shared_sync_client
+
+    with _shared_sync_client_lock:
+        if _shared_sync_client is None or _shared_sync_client.is_closed:
+            _shared_sync_client = httpx.Client(
+                base_url=SPOONACULAR_BASE_URL,
+                timeout=SPOONACULAR_TIMEOUT,
+                limits=_client_limits(),
+                http2=_HTTP2_AVAILABLE,
+            )
+        return _shared_sync_client
+
+
+async def close_shared_clients():
+    """Close the shared Spoonacular HTTP clients (called on application shutdown)"""
+    global _shared_async_client, _shared_sync_client
+
+    shared, _shared_async_client = _shared_async_client, None
+    if shared is not None and shared.loop is asyncio.get_running_loop():
+        await shared.client.aclose()
+
+    with _shared_sync_client_lock:
+        client, _shared_sync_client = _shared_sync_client, None
+    if client is not None:
+        client.close()
+
+
+def _request_key(path: str, params: dict[str, Any]) -> tuple:
+    # The API key is the same for every caller, so it is left out of the key
+    return (
+        path,
+        tuple(sorted((name, str(value)) for name, value in params.items() if name != "apiKey")),
+    )
+
+
+async def _coalesced_get(path: str, params: dict[str, Any]) -> httpx.Response:
+    """
+    GET a Spoonacular path on the shared client, sharing one upstream call between
+    identical requests that are in flight at the same time.
+
+    Every caller receives the same Response and decodes its own copy of the body,
+    so callers that mutate the returned data do not affect each other.
+    """
+    shared = _get_shared_async_client()
+    key = _request_key(path, params)
+
+    future = shared.in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(shared.client.get(path, params=params))
+        shared.in_flight[key] = future
+
+        def _done(done: asyncio.Future):
+            shared.in_flight.pop(key, None)
+            # Mark the exception retrieved in case every waiter was cancelled
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(_done)
+    else:
+        logger.debug(f"Coalescing in-flight Spoonacular request {path}")
+
+    # Shield the shared request so one caller being cancelled does not fail the others
+    return await asyncio.shield(future)
+
 
 class SpoonacularService:
     """Service for interacting with Spoonacular API"""
@@ -25,10 +150,8 @@ class SpoonacularService:
             except FileNotFoundError:
                 logger.warning("Spoonacular API key not found in environment or config file")
 
-        self.base_url = "https://api.spoonacular.com"
-        self.timeout = httpx.Timeout(
-            120.0, connect=60.0
-        )  # 2 minute timeout with 1 minute connect timeout
+        self.base_url = SPOONACULAR_BASE_URL
+        self.timeout = SPOONACULAR_TIMEOUT
         self.max_retries = 3
         self.openai_service = OpenAIRecipeService()
 
@@ -36,6 +159,9 @@ class SpoonacularService:
         """
         Parse ingredients using Spoonacular API to get nutritional info and categories
 
+        Blocking variant for synchronous callers; async code should use
+        parse_ingredients_async.
+
         Args:
             ingredients: List of ingredient names
 
@@ -47,16 +173,74 @@ class SpoonacularService:
             return []
 
         try:
-            import requests
+            response = _get_shared_sync_client().post(
+                "/recipes/parseIngredients",
+                params={"apiKey": self.api_key, "language": "en"},
+                data={"ingredientList": "\n".join(ingredients)},
+                timeout=30,
+            )
+            response.raise_for_status()
+
+            return response.json()
+
+        except Exception as e:
+            logger.error(f"Error parsing ingredients with Spoonacular: {str(e)}")
+            return []
+
+    def convert_amount(
+        self, ingredient_name: str, source_amount: float, source_unit: str, target_unit: str
+    ) -> Optional[dict[str, Any]]:
+        """
+        Convert an ingredient amount between units with Spoonacular's converter
 
-            url = f"{self.base_url}/recipes/parseIngredients"
+        Blocking; UnitConversionService only calls it when the local engine has no
+        answer and keeps the result.
 
-            params = {"apiKey": self.api_key, "language": "en"}
+        Returns:
+            Response with targetAmount and answer, or None on failure
+        """
+        if not self.api_key:
+            return None
 
-            # Join ingredients as comma-separated string
-            data = {"ingredientList": "\n".join(ingredients)}
+        try:
+            response = _get_shared_sync_client().get(
+                "/recipes/convert",
+                params={
+                    "apiKey": self.api_key,
+                    "ingredientName": ingredient_name,
+                    "sourceAmount": source_amount,
+                    "sourceUnit": source_unit,
+                    "targetUnit": target_unit,
+                },
+            )
+            response.raise_for_status()
+            return response.json()
+
+        except Exception as e:
+            logger.error(f"Error converting {ingredient_name} with Spoonacular: {str(e)}")
+            return None
+
+    async def parse_ingredients_async(self, ingredients: list[str]) -> list[dict[str, Any]]:
+        """
+        Parse ingredients using Spoonacular API without blocking the event loop
+
+        Args:
+            ingredients: List of ingredient names
+
+        Returns:
+            List of parsed ingredient dictionaries
+        """
+        if not self.api_key:
+            logger.warning("No Spoonacular API key available for ingredient parsing")
+            return []
 
-            response = requests.post(url, params=params, data=data, timeout=30)
+        try:
+            response = await _get_shared_async_client().client.post(
+                "/recipes/parseIngredients",
+                params={"apiKey": self.api_key, "language": "en"},
+                data={"ingredientList": "\n".join(ingredients)},
+                timeout=30,
+            )
             response.raise_for_status()
 
             return response.json()
@@ -172,21 +356,22 @@ class SpoonacularService:
             "ignorePantry": ignore_pantry,
         }
 
-        # Continue with standard findByIngredients without allergen filtering
+        return await spoonacular_response_cache.get_or_fetch(
+            "findByIngredients", params, lambda: self._find_by_ingredients(params)
+        )
 
+    async def _find_by_ingredients(self, params: dict[str, Any]) -> list[dict[str, Any]]:
+        """Call findByIngredients upstream, retrying on timeouts"""
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    if attempt > 0:
-                        logger.info(
-                            f"Retry attempt {attempt + 1}/{self.max_retries} for ingredient search"
-                        )
-
-                    response = await client.get(
-                        f"{self.base_url}/recipes/findByIngredients", params=params
+                if attempt > 0:
+                    logger.info(
+                        f"Retry attempt {attempt + 1}/{self.max_retries} for ingredient search"
                     )
-                    response.raise_for_status()
-                    return response.json()
+
+                response = await _coalesced_get("/recipes/findByIngredients", params)
+                response.raise_for_status()
+                return response.json()
 
             except httpx.ReadTimeout:
                 logger.warning(
@@ -226,22 +411,29 @@ class SpoonacularService:
             f"Getting recipe info for ID {recipe_id}, API key present: {bool(self.api_key)}"
         )
 
+        return await spoonacular_response_cache.get_or_fetch(
+            "information",
+            {"id": str(recipe_id), "includeNutrition": include_nutrition},
+            lambda: self._fetch_recipe_information(recipe_id, include_nutrition),
+        )
+
+    async def _fetch_recipe_information(
+        self, recipe_id: int, include_nutrition: bool
+    ) -> dict[str, Any]:
+        """Call recipe information upstream, retrying on timeouts"""
         params = {"apiKey": self.api_key, "includeNutrition": include_nutrition}
 
         # Add retry logic for timeouts
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    if attempt > 0:
-                        logger.info(
-                            f"Retry attempt {attempt + 1}/{self.max_retries} for recipe {recipe_id}"
-                        )
-
-                    response = await client.get(
-                        f"{self.base_url}/recipes/{recipe_id}/information", params=params
+                if attempt > 0:
+                    logger.info(
+                        f"Retry attempt {attempt + 1}/{self.max_retries} for recipe {recipe_id}"
                     )
-                    response.raise_for_status()
-                    return response.json()
+
+                response = await _coalesced_get(f"/recipes/{recipe_id}/information", params)
+                response.raise_for_status()
+                return response.json()
 
             except httpx.ReadTimeout:
                 logger.warning(
@@ -270,14 +462,24 @@ class SpoonacularService:
                 raise
 
     async def get_recipe_information_bulk(
-        self, recipe_ids: list[str], include_nutrition: bool = False
+        self,
+        recipe_ids: list[str],
+        include_nutrition: bool = False,
+        budget: Optional[float] = None,
     ) -> dict[str, dict[str, Any]]:
         """
         Get information for multiple recipes in a single request
 
+        This is the shared hydrator for search results: recipes already in the
+        response cache are served locally and the rest are fetched with
+        informationBulk, up to 100 ids per call, with the calls made concurrently.
+
         Args:
             recipe_ids: List of recipe IDs to fetch
             include_nutrition: Whether to include nutrition information
+            budget: Seconds to wait for upstream calls. Recipes still loading when
+                it runs out are left out of the result; their calls finish in the
+                background and fill the cache.
 
         Returns:
             Dictionary mapping recipe IDs to their information
@@ -285,39 +487,100 @@ class SpoonacularService:
         if not self.api_key:
             raise ValueError("Spoonacular API key not configured")
 
+        recipe_ids = list(dict.fromkeys(str(recipe_id) for recipe_id in recipe_ids if recipe_id))
         if not recipe_ids:
             return {}
 
-        # Spoonacular allows up to 100 recipes per bulk request
+        # Recipes already cached individually are not fetched again
+        cached = await spoonacular_response_cache.lookup_many(
+            "information",
+            [{"id": recipe_id, "includeNutrition": include_nutrition} for recipe_id in recipe_ids],
+        )
+
         results = {}
+        missing_ids = []
+        stale_ids = []
+        for recipe_id, entry in zip(recipe_ids, cached):
+            if entry is None:
+                missing_ids.append(recipe_id)
+            else:
+                results[recipe_id] = entry.value
+                if entry.stale:
+                    stale_ids.append(recipe_id)
+
+        if stale_ids:
+            spoonacular_response_cache.schedule_refresh(
+                f"informationBulk:{','.join(sorted(stale_ids))}:{include_nutrition}",
+                lambda: self._fetch_recipe_information_bulk(stale_ids, include_nutrition),
+            )
+
+        if missing_ids:
+            results.update(
+                await self._fetch_recipe_information_bulk(missing_ids, include_nutrition, budget)
+            )
+
+        return results
+
+    async def _fetch_recipe_information_bulk(
+        self,
+        recipe_ids: list[str],
+        include_nutrition: bool,
+        budget: Optional[float] = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Call informationBulk upstream and cache each recipe under its own id"""
+        # Spoonacular allows up to 100 recipes per bulk request
         batch_size = 100
+        batches = [
+            self._fetch_recipe_information_batch(recipe_ids[i : i + batch_size], include_nutrition)
+            for i in range(0, len(recipe_ids), batch_size)
+        ]
+        if len(batches) == 1 and budget is None:
+            return await batches[0]
+
+        tasks = [asyncio.ensure_future(batch) for batch in batches]
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+        if pending:
+            logger.warning(
+                f"Recipe information budget of {budget}s exhausted; "
+                f"{len(pending)} of {len(tasks)} bulk requests still loading"
+            )
+            for task in pending:
+                _background_bulk_fetches.add(task)
+                task.add_done_callback(_background_bulk_fetches.discard)
 
-        for i in range(0, len(recipe_ids), batch_size):
-            batch = recipe_ids[i : i + batch_size]
-            ids_param = ",".join(batch)
+        results = {}
+        for task in done:
+            results.update(task.result())
+        return results
 
-            params = {
-                "apiKey": self.api_key,
-                "ids": ids_param,
-                "includeNutrition": include_nutrition,
-            }
+    async def _fetch_recipe_information_batch(
+        self, recipe_ids: list[str], include_nutrition: bool
+    ) -> dict[str, dict[str, Any]]:
+        results = {}
+        params = {
+            "apiKey": self.api_key,
+            "ids": ",".join(recipe_ids),
+            "includeNutrition": include_nutrition,
+        }
 
-            try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.get(
-                        f"{self.base_url}/recipes/informationBulk", params=params
+        try:
+            response = await _coalesced_get("/recipes/informationBulk", params)
+
+            if response.status_code == 200:
+                recipes = response.json()
+                for recipe in recipes:
+                    results[str(recipe["id"])] = recipe
+                    await spoonacular_response_cache.store(
+                        "information",
+                        {"id": str(recipe["id"]), "includeNutrition": include_nutrition},
+                        recipe,
                     )
+            else:
+                logger.error(f"Error fetching bulk recipe info: {response.status_code}")
 
-                    if response.status_code == 200:
-                        recipes = response.json()
-                        for recipe in recipes:
-                            results[str(recipe["id"])] = recipe
-                    else:
-                        logger.error(f"Error fetching bulk recipe info: {response.status_code}")
-
-            except Exception as e:
-                logger.error(f"Error in bulk recipe fetch: {str(e)}")
-                # Continue with partial results rather than failing completely
+        except Exception as e:
+            logger.error(f"Error in bulk recipe fetch: {str(e)}")
+            # Continue with partial results rather than failing completely
 
         return results
 
@@ -398,14 +661,19 @@ class SpoonacularService:
         if sort:
             params["sort"] = sort
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(f"{self.base_url}/recipes/complexSearch", params=params)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(f"Error in complex search: {str(e)}")
-                raise
+        return await spoonacular_response_cache.get_or_fetch(
+            "complexSearch", params, lambda: self._complex_search(params)
+        )
+
+    async def _complex_search(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Call complexSearch upstream"""
+        try:
+            response = await _coalesced_get("/recipes/complexSearch", params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error in complex search: {str(e)}")
+            raise
 
     def _check_recipe_for_allergens(self, recipe_title: str, intolerances: list[str]) -> bool:
         """
@@ -510,14 +778,14 @@ class SpoonacularService:
         if tags:
             params["tags"] = ",".join(tags)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(f"{self.base_url}/recipes/random", params=params)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(f"Error getting random recipes: {str(e)}")
-                raise
+        # Not coalesced: concurrent callers each expect their own random selection
+        try:
+            response = await _get_shared_async_client().client.get("/recipes/random", params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error getting random recipes: {str(e)}")
+            raise
 
     def validate_recipe_instructions(self, recipe: dict[str, Any], min_steps: int = 2) -> bool:
         """
@@ -0,0 +1,271 @@
+"""
+Per-user statistics rollups for /stats/comprehensive
+
+The comprehensive stats endpoint used to aggregate a user's whole pantry_items,
+pantry_history and user_recipes on every call, so it got slower with every item
+and recipe a user ever logged. migrations/add_user_stats_rollups.sql keeps
+per-user, per-day counters instead (items added by day and product, current
+items by category and expiration date, recipes cooked by day, recipe counts),
+maintained by triggers on those tables in the same transaction as each write.
+A week, month or year view then reads at most 365 day rows per table,
+whatever the length of the history.
+
+Because the triggers are incremental, every user is also rebuilt from the base
+tables once STATS_ROLLUP_MAX_AGE_S has passed since their last rebuild, by a
+background loop every STATS_ROLLUP_REFRESH_INTERVAL_S seconds (0 disables it).
+This repairs drift from writes made while the triggers were disabled, and
+moves day-based counts such as expired items on as the calendar turns.
+
+Without the migration, or when the read fails, read() returns None and callers
+compute the stats live.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+from datetime import date
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+STATS_ROLLUP_REFRESH_INTERVAL_S = float(os.getenv("STATS_ROLLUP_REFRESH_INTERVAL_S", "3600"))
+STATS_ROLLUP_MAX_AGE_S = float(os.getenv("STATS_ROLLUP_MAX_AGE_S", "86400"))
+STATS_ROLLUP_REFRESH_BATCH = int(os.getenv("STATS_ROLLUP_REFRESH_BATCH", "100"))
+
+_ROLLUP_QUERY = """
+WITH state AS (
+    SELECT category, expiration_date, items, quantity_count, quantity_sum
+    FROM user_pantry_state
+    WHERE user_id = %(user_id)s AND items <> 0
+),
+added AS (
+    SELECT day, product_name, items_added
+    FROM user_pantry_daily
+    WHERE user_id = %(user_id)s AND day >= %(start_day)s AND items_added <> 0
+),
+cooking AS (
+    SELECT day, recipes_cooked
+    FROM user_cooking_daily
+    WHERE user_id = %(user_id)s AND day >= %(start_day)s AND recipes_cooked > 0
+),
+streak AS (
+    SELECT MAX(day) AS end_date, COUNT(*) AS streak_length
+    FROM (SELECT day, day - (ROW_NUMBER() OVER (ORDER BY day))::int AS grp FROM cooking) c
+    GROUP BY grp
+    ORDER BY end_date DESC
+    LIMIT 1
+)
+SELECT
+    (SELECT COALESCE(SUM(items), 0)::int FROM state) AS total_items,
+    (SELECT COALESCE(SUM(items), 0)::int FROM state
+     WHERE expiration_date < CURRENT_DATE) AS expired_items,
+    (SELECT COALESCE(SUM(items), 0)::int FROM state
+     WHERE expiration_date BETWEEN CURRENT_DATE AND CURRENT_DATE + 7) AS expiring_soon,
+    (SELECT COALESCE(SUM(items), 0)::int FROM state
+     WHERE expiration_date >= CURRENT_DATE AND expiration_date <> 'infinity') AS unexpired_items,
+    (SELECT SUM(quantity_sum) / NULLIF(SUM(quantity_count), 0) FROM state) AS avg_quantity,
+    (SELECT COALESCE(SUM(items_added), 0)::int FROM added) AS recently_added,
+    (SELECT json_agg(row_to_json(c)) FROM (
+        SELECT NULLIF(category, '') AS category, SUM(items)::int AS count
+        FROM state GROUP BY category ORDER BY count DESC LIMIT 5
+    ) c) AS top_categories,
+    (SELECT json_agg(row_to_json(f)) FROM (
+        SELECT NULLIF(product_name, '') AS product_name, SUM(items_added)::int AS purchase_count
+        FROM added GROUP BY product_name ORDER BY purchase_count DESC LIMIT 5
+    ) f) AS top_products,
+    (SELECT json_agg(row_to_json(d)) FROM (
+        SELECT DATE_PART('dow', day) AS day_of_week, SUM(items_added)::int AS items_added
+        FROM added GROUP BY 1 HAVING SUM(items_added) > 0 ORDER BY 1
+    ) d) AS shopping_by_day,
+    (SELECT COUNT(*)::int FROM cooking) AS days_cooked,
+    (SELECT COALESCE(SUM(recipes_cooked), 0)::int FROM cooking) AS total_recipes_cooked,
+    COALESCE((SELECT streak_length FROM streak), 0)::int AS current_streak,
+    (SELECT COALESCE(SUM(recipes_cooked), 0)::int FROM cooking
+     WHERE day >= CURRENT_DATE - 7) AS cooked_this_week,
+    (SELECT COALESCE(SUM(recipes_cooked), 0)::int FROM cooking
+     WHERE day >= CURRENT_DATE - 30) AS cooked_this_month,
+    (SELECT row_to_json(r) FROM user_recipe_counts r
+     WHERE r.user_id = %(user_id)s) AS recipe_counts,
+    COALESCE(t.recipe_items_used, 0) AS items_used_in_recipes,
+    t.updated_at,
+    t.refreshed_at,
+    EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - t.refreshed_at) AS staleness_seconds
+FROM (SELECT 1) one
+LEFT JOIN user_stats_totals t ON t.user_id = %(user_id)s
+"""
+
+_STALE_USERS_QUERY = """
+SELECT u.user_id
+FROM users u
+LEFT JOIN user_stats_totals t ON t.user_id = u.user_id
+WHERE t.refreshed_at IS NULL
+   OR t.refreshed_at < CURRENT_TIMESTAMP - make_interval(secs => %(max_age_s)s)
+ORDER BY t.refreshed_at NULLS FIRST
+LIMIT %(limit)s
+"""
+
+_REFRESH_QUERY = "SELECT refresh_user_stats_rollups(%(user_id)s)"
+
+RECIPE_COUNT_KEYS = (
+    "total_recipes",
+    "favorite_recipes",
+    "ai_generated_recipes",
+    "bookmarked_external_recipes",
+    "liked_recipes",
+    "disliked_recipes",
+    "saved_recipes",
+    "cooked_recipes",
+)
+
+
+def _isoformat(value: Any) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+class StatsRollupService:
+    """Reads of the per-user stats rollups and their periodic rebuild"""
+
+    def __init__(self):
+        self._tables_available: Optional[bool] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _query_failed(self, error: Exception) -> None:
+        # undefined_table / undefined_function, from psycopg2 (pgcode) or asyncpg (sqlstate)
+        codes = (getattr(error, "pgcode", None), getattr(error, "sqlstate", None))
+        if "42P01" not in codes and "42883" not in codes:
+            logger.warning(f"Could not read stats rollups: {error}")
+            return
+        if self._tables_available is not False:
+            logger.warning(
+                "Stats rollup tables not found; statistics are computed from the full "
+                "history. Run migrations/add_user_stats_rollups.sql."
+            )
+        self._tables_available = False
+
+    async def read(self, user_id: int, start_day: date) -> Optional[dict[str, Any]]:
+        """
+        Stats for a user from start_day on, shaped like the live stats queries.
+
+        Returns {"pantry", "cooking", "sustainability", "shopping", "recipes", "freshness"},
+        or None when the rollups can't be read.
+        """
+        if self._tables_available is False:
+            return None
+        try:
+            rows = await _db().execute_query_async(
+                _ROLLUP_QUERY, {"user_id": user_id, "start_day": start_day}
+            )
+            self._tables_available = True
+        except Exception as e:
+            self._query_failed(e)
+            return None
+
+        row = rows[0]
+        unexpired = row["unexpired_items"]
+        recipe_counts = row["recipe_counts"] or {}
+        staleness = row["staleness_seconds"]
+        return {
+            "pantry": {
+                "total_items": row["total_items"],
+                "expired_items": row["expired_items"],
+                "expiring_soon": row["expiring_soon"],
+                "recently_added": row["recently_added"],
+                "avg_quantity": row["avg_quantity"],
+                "top_categories": row["top_categories"],
+                "top_products": row["top_products"],
+            },
+            "cooking": {
+                key: row[key]
+                for key in (
+                    "days_cooked",
+                    "total_recipes_cooked",
+                    "current_streak",
+                    "cooked_this_week",
+                    "cooked_this_month",
+                )
+            },
+            "sustainability": {
+                "food_saved_kg": unexpired * 0.3,  # Avg 0.3kg per item
+                "co2_saved_kg": unexpired * 0.3 * 2.5,  # 2.5kg CO2 per kg food
+                "items_used_in_recipes": row["items_used_in_recipes"],
+            },
+            "shopping": row["shopping_by_day"] or [],
+            "recipes": {key: recipe_counts.get(key, 0) for key in RECIPE_COUNT_KEYS},
+            "freshness": {
+                "source": "rollups",
+                "updated_at": _isoformat(row["updated_at"]),
+                "refreshed_at": _isoformat(row["refreshed_at"]),
+                "staleness_seconds": float(staleness) if staleness is not None else None,
+            },
+        }
+
+    async def refresh_user(self, user_id: int) -> None:
+        """Rebuild a user's rollups from the base tables"""
+        await _db().execute_query_async(_REFRESH_QUERY, {"user_id": user_id})
+
+    async def refresh_stale(
+        self,
+        max_age_s: float = STATS_ROLLUP_MAX_AGE_S,
+        batch_size: int = STATS_ROLLUP_REFRESH_BATCH,
+    ) -> int:
+        """Rebuild every user not rebuilt for max_age_s seconds, batch_size at a time"""
+        refreshed = 0
+        while self._tables_available is not False:
+            try:
+                rows = await _db().execute_query_async(
+                    _STALE_USERS_QUERY, {"max_age_s": max_age_s, "limit": batch_size}
+                )
+                self._tables_available = True
+            except Exception as e:
+                self._query_failed(e)
+                break
+
+            batch_refreshed = 0
+            for row in rows:
+                try:
+                    await self.refresh_user(row["user_id"])
+                    batch_refreshed += 1
+                except Exception as e:
+                    logger.warning(
+                        f"Could not refresh stats rollups for user {row['user_id']}: {e}"
+                    )
+            refreshed += batch_refreshed
+            # A short batch was the last one; a batch that only failed would come back as is
+            if len(rows) < batch_size or not batch_refreshed:
+                break
+        return refreshed
+
+    async def _refresh_loop(self, interval_s: float) -> None:
+        while True:
+            try:
+                refreshed = await self.refresh_stale()
+                if refreshed:
+                    logger.info(f"Refreshed stats rollups for {refreshed} users")
+            except Exception as e:
+                logger.warning(f"Stats rollup refresh failed: {e}")
+            if self._tables_available is False:
+                return
+            await asyncio.sleep(interval_s)
+
+    def start(self, interval_s: float = STATS_ROLLUP_REFRESH_INTERVAL_S) -> None:
+        """Start the periodic rebuild in the running event loop"""
+        if interval_s <= 0 or (self._refresh_task and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop(interval_s))
+
+    async def stop(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+        self._refresh_task = None
+
+
+def _db():
+    from backend_gateway.config.database import get_database_service
+
+    return get_database_service()
+
+
+stats_rollups = StatsRollupService()
@@ -0,0 +1,430 @@
+"""
+Local unit conversion engine.
+
+Unit aliases from constants/units.py and the extra cooking units known to
+SmartUnitConversionService are compiled at import into one table of
+(category, base unit, scale). Ingredient data from constants/common_food_densities.json
+is compiled into a density index (grams per millilitre) and a piece-weight index
+(grams per each, clove, slice, stick, ...), both keyed by normalized ingredient
+name. A conversion is a single factor, so results are memoized per
+(ingredient, from unit, to unit) and converting is a multiplication.
+
+normalize_many does the same for whole columns of (name, amount, unit): each
+distinct unit and (ingredient, unit) pair is resolved once, and the per-row work
+is NumPy indexing and multiplication.
+
+Factors answered by Spoonacular or the AI agent are kept in LearnedConversions,
+an in-process dict in front of a SQLite table under UNIT_CONVERSION_CACHE_DIR, so
+each remote answer is paid for once.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from backend_gateway.constants.units import (
+    UNIT_CONVERSIONS,
+    UNIT_INFO,
+    UNIT_VARIATIONS,
+    Unit,
+    UnitCategory,
+)
+
+logger = logging.getLogger(__name__)
+
+_DENSITY_FILE = Path(__file__).resolve().parent.parent / "constants" / "common_food_densities.json"
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+ML_PER_CUP = UNIT_CONVERSIONS[Unit.CUP]
+ML_PER_TBSP = UNIT_CONVERSIONS[Unit.TABLESPOON]
+ML_PER_TSP = UNIT_CONVERSIONS[Unit.TEASPOON]
+
+
+class UnitSpec(NamedTuple):
+    category: UnitCategory
+    base: str  # "g", "ml", "each", or a piece unit such as "clove"
+    scale: float  # amount of base per unit
+
+
+# Cooking units missing from constants/units.py (scales as in SmartUnitConversionService)
+_EXTRA_UNITS = {
+    "floz": UnitSpec(UnitCategory.VOLUME, "ml", UNIT_CONVERSIONS[Unit.FLUID_OUNCE]),
+    "fl. oz": UnitSpec(UnitCategory.VOLUME, "ml", UNIT_CONVERSIONS[Unit.FLUID_OUNCE]),
+    "litre": UnitSpec(UnitCategory.VOLUME, "ml", 1000.0),
+    "litres": UnitSpec(UnitCategory.VOLUME, "ml", 1000.0),
+    "millilitre": UnitSpec(UnitCategory.VOLUME, "ml", 1.0),
+    "millilitres": UnitSpec(UnitCategory.VOLUME, "ml", 1.0),
+    "c": UnitSpec(UnitCategory.VOLUME, "ml", ML_PER_CUP),
+    "tbs": UnitSpec(UnitCategory.VOLUME, "ml", ML_PER_TBSP),
+    "tbsps": UnitSpec(UnitCategory.VOLUME, "ml", ML_PER_TBSP),
+    "tsps": UnitSpec(UnitCategory.VOLUME, "ml", ML_PER_TSP),
+    "pinch": UnitSpec(UnitCategory.VOLUME, "ml", 0.3),
+    "dash": UnitSpec(UnitCategory.VOLUME, "ml", 0.6),
+    "drop": UnitSpec(UnitCategory.VOLUME, "ml", 0.05),
+    "handful": UnitSpec(UnitCategory.VOLUME, "ml", 60.0),
+    "item": UnitSpec(UnitCategory.COUNT, "each", 1.0),
+    "items": UnitSpec(UnitCategory.COUNT, "each", 1.0),
+    "unit": UnitSpec(UnitCategory.COUNT, "each", 1.0),
+    "whole": UnitSpec(UnitCategory.COUNT, "each", 1.0),
+    "dozen": UnitSpec(UnitCategory.COUNT, "each", 12.0),
+    "pair": UnitSpec(UnitCategory.COUNT, "each", 2.0),
+}
+
+# Count units that only convert through ingredient data, with their plurals
+_PIECE_UNITS = {
+    "clove": "cloves",
+    "slice": "slices",
+    "stick": "sticks",
+    "loaf": "loaves",
+    "packet": "packets",
+    "head": "heads",
+    "bunch": "bunches",
+}
+
+
+def _unit_spec(unit: Unit) -> UnitSpec:
+    category = UNIT_INFO[unit]["category"]
+    if unit == Unit.GROSS:
+        return UnitSpec(category, "each", 144.0)
+    if category == UnitCategory.COUNT:
+        # Packaging units (bag, case, ...) only convert to themselves
+        return UnitSpec(category, unit.value, 1.0)
+    base = "g" if category == UnitCategory.WEIGHT else "ml"
+    return UnitSpec(category, base, UNIT_CONVERSIONS[unit])
+
+
+def _compile_units() -> dict[str, UnitSpec]:
+    units = {alias: _unit_spec(unit) for alias, unit in UNIT_VARIATIONS.items()}
+    # Canonical values such as "mg" are not all listed as aliases
+    for unit in Unit:
+        units.setdefault(unit.value, _unit_spec(unit))
+    units.update(_EXTRA_UNITS)
+    for piece, plural in _PIECE_UNITS.items():
+        units[piece] = units[plural] = UnitSpec(UnitCategory.COUNT, piece, 1.0)
+    return units
+
+
+def _singular(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("oes") or word.endswith("ches"):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+class NormalizedAmounts(NamedTuple):
+    amounts: np.ndarray  # float64 in the row's base unit, NaN where the unit is unknown
+    units: np.ndarray  # object: "g", "ml", "each", a piece unit such as "clove", or None
+
+
+def _unit_text(unit: Any) -> str:
+    # normalize_unit() returns Unit members, whose str() is "Unit.CUP"
+    return str(getattr(unit, "value", unit) or "").lower().strip().rstrip(".")
+
+
+def _codes(values: Sequence, key: Callable[[Any], Any]) -> tuple[np.ndarray, list]:
+    """Integer code per value plus the distinct keys, in first-seen order"""
+    # key() runs once per distinct raw value, not once per row
+    seen = dict.fromkeys(values)
+    for code, value in enumerate(seen):
+        seen[value] = code
+    raw_codes = np.fromiter(map(seen.__getitem__, values), np.intp, count=len(values))
+    index: dict[Any, int] = {}
+    remap = np.array([index.setdefault(key(value), len(index)) for value in seen], np.intp)
+    return (remap[raw_codes] if len(raw_codes) else raw_codes), list(index)
+
+
+def normalize_ingredient(name: str) -> str:
+    """Lowercase, singular, punctuation-free form of an ingredient name"""
+    return " ".join(_singular(word) for word in _TOKEN_RE.findall(str(name).lower()))
+
+
+class UnitConversionEngine:
+    """Compiled unit table plus per-ingredient density and piece-weight indexes"""
+
+    def __init__(self, density_file: Path = _DENSITY_FILE, memo_size: int = 8192):
+        self.units = _compile_units()
+        self.densities: dict[str, float] = {}  # ingredient -> grams per ml
+        self.piece_grams: dict[str, dict[str, float]] = {}  # ingredient -> {piece unit: grams}
+        self._names: dict[str, str] = {}  # normalized phrase -> ingredient
+        self._load(density_file)
+        self._max_phrase = max((len(p.split()) for p in self._names), default=1)
+        self.factor = lru_cache(maxsize=memo_size)(self._factor)
+        self.ingredient_key = lru_cache(maxsize=memo_size)(self._ingredient_key)
+
+    def _load(self, density_file: Path) -> None:
+        try:
+            with open(density_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Food density data unavailable ({density_file}): {e}")
+            return
+
+        for key, item in data.get("density_conversions", {}).items():
+            if "density_g_per_ml" in item:
+                self._add_density(key, item["density_g_per_ml"])
+            elif "cup_to_grams" in item:
+                self._add_density(key, item["cup_to_grams"] / ML_PER_CUP)
+            elif "tablespoon_to_grams" in item:
+                self._add_density(key, item["tablespoon_to_grams"] / ML_PER_TBSP)
+            elif "teaspoon_to_grams" in item:
+                self._add_density(key, item["teaspoon_to_grams"] / ML_PER_TSP)
+            if "stick_to_grams" in item:
+                self._add_piece(key, "stick", item["stick_to_grams"])
+            if "name" in item:
+                self._names.setdefault(normalize_ingredient(item["name"].split("(")[0]), key)
+
+        common = data.get("common_conversions", {})
+        bread = common.get("bread", {})
+        if "slice_weight_grams" in bread:
+            self._add_piece("bread", "slice", bread["slice_weight_grams"])
+            if "loaf_to_slices" in bread:
+                self._add_piece(
+                    "bread", "loaf", bread["loaf_to_slices"] * bread["slice_weight_grams"]
+                )
+        if "large_egg_grams" in common.get("eggs", {}):
+            self._add_piece("egg", "each", common["eggs"]["large_egg_grams"])
+        cheese = common.get("cheese", {})
+        if "slice_weight_grams" in cheese:
+            self._add_piece("cheese", "slice", cheese["slice_weight_grams"])
+        if "cup_shredded_grams" in cheese:
+            self._add_density("cheese", cheese["cup_shredded_grams"] / ML_PER_CUP)
+        for group in ("vegetables", "fruits"):
+            for field, grams in common.get(group, {}).items():
+                if field.endswith("_medium_grams"):
+                    self._add_piece(field[: -len("_medium_grams")], "each", grams)
+        for field, grams in common.get("nuts", {}).items():
+            if field.endswith("_per_cup_grams"):
+                self._add_density(field[: -len("_per_cup_grams")], grams / ML_PER_CUP)
+
+        for key, item in data.get("special_conversions", {}).items():
+            if not isinstance(item, dict):
+                continue
+            if "clove_to_grams" in item:
+                self._add_piece(key, "clove", item["clove_to_grams"])
+                if "head_to_cloves" in item:
+                    self._add_piece(key, "head", item["head_to_cloves"] * item["clove_to_grams"])
+            if "packet_to_grams" in item:
+                self._add_piece(key, "packet", item["packet_to_grams"])
+
+    def _add_density(self, key: str, grams_per_ml: float) -> None:
+        self.densities[key] = float(grams_per_ml)
+        self._names.setdefault(normalize_ingredient(key.replace("_", " ")), key)
+
+    def _add_piece(self, key: str, unit: str, grams: float) -> None:
+        self.piece_grams.setdefault(key, {})[unit] = float(grams)
+        self._names.setdefault(normalize_ingredient(key.replace("_", " ")), key)
+
+    def unit(self, unit: Optional[str]) -> Optional[UnitSpec]:
+        if not unit:
+            return None
+        return self.units.get(_unit_text(unit))
+
+    def _ingredient_key(self, name: str) -> Optional[str]:
+        """Longest known phrase in the name, preferring the rightmost (the head noun)"""
+        words = normalize_ingredient(name).split()
+        for length in range(min(self._max_phrase, len(words)), 0, -1):
+            for start in range(len(words) - length, -1, -1):
+                key = self._names.get(" ".join(words[start : start + length]))
+                if key is not None:
+                    return key
+        return None
+
+    def _grams_per(self, key: str, unit: UnitSpec) -> Optional[float]:
+        if unit.category == UnitCategory.WEIGHT:
+            return 1.0
+        if unit.category == UnitCategory.VOLUME:
+            return self.densities.get(key)
+        return self.piece_grams.get(key, {}).get(unit.base)
+
+    def _factor(
+        self, from_unit: str, to_unit: str, ingredient: Optional[str] = None
+    ) -> Optional[tuple[float, str]]:
+        """(multiplier, "unit" or "ingredient") taking from_unit amounts to to_unit, or None"""
+        source, target = self.unit(from_unit), self.unit(to_unit)
+        if source is None or target is None:
+            return None
+        if source.base == target.base:
+            return source.scale / target.scale, "unit"
+
+        key = self.ingredient_key(ingredient) if ingredient else None
+        if key is None:
+            return None
+        source_grams = self._grams_per(key, source)
+        target_grams = self._grams_per(key, target)
+        if not source_grams or not target_grams:
+            return None
+        return source.scale * source_grams / (target.scale * target_grams), "ingredient"
+
+    def convert(
+        self, amount: float, from_unit: str, to_unit: str, ingredient: Optional[str] = None
+    ) -> Optional[float]:
+        """Convert an amount locally, or None if the engine has no path between the units"""
+        found = self.factor(from_unit, to_unit, ingredient)
+        return float(amount) * found[0] if found else None
+
+    def normalize_many(
+        self,
+        names: Sequence[Optional[str]],
+        amounts: Sequence[Optional[float]],
+        units: Sequence[Any],
+        to_weight: bool = False,
+    ) -> NormalizedAmounts:
+        """
+        Convert columns of (ingredient name, amount, unit) to base units in one pass.
+
+        Amounts end up in g, ml, each or the row's piece unit. With to_weight, rows
+        whose ingredient has a density or piece weight are expressed in grams.
+        """
+        values = np.array(amounts, dtype=np.float64)  # None becomes NaN
+        unit_codes, unit_keys = _codes(units, _unit_text)
+        specs = [self.units.get(key) for key in unit_keys]
+        scales = np.array([spec.scale if spec else np.nan for spec in specs], dtype=np.float64)
+        bases = np.array([spec.base if spec else None for spec in specs], dtype=object)
+
+        values = values * scales[unit_codes] if len(values) else values
+        row_units = bases[unit_codes]
+        if not to_weight or not len(values):
+            return NormalizedAmounts(values, row_units)
+
+        name_codes, name_keys = _codes(names, lambda name: name or "")
+        ingredients = [self.ingredient_key(name) if name else None for name in name_keys]
+        pairs, pair_codes = np.unique(name_codes * len(specs) + unit_codes, return_inverse=True)
+        pair_grams = []
+        for pair in pairs.tolist():
+            ingredient, spec = ingredients[pair // len(specs)], specs[pair % len(specs)]
+            pair_grams.append(self._grams_per(ingredient, spec) if ingredient and spec else None)
+        grams = np.array(pair_grams, dtype=np.float64)[pair_codes.reshape(-1)]
+        weighed = ~np.isnan(grams)
+        return NormalizedAmounts(
+            np.where(weighed, values * grams, values), np.where(weighed, "g", row_units)
+        )
+
+    def stats(self) -> dict[str, Any]:
+        memo = self.factor.cache_info()
+        return {
+            "units": len(self.units),
+            "ingredients": len(set(self._names.values())),
+            "memo_size": memo.currsize,
+            "memo_hits": memo.hits,
+            "memo_misses": memo.misses,
+        }
+
+
+class LearnedConversions:
+    """
+    Conversion factors answered remotely, keyed by (ingredient, from unit, to unit).
+
+    Kept in-process and, with a cache_dir, in <cache_dir>/unit_conversions.sqlite3
+    so they survive restarts and are shared between workers.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: dict[tuple, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                with self._connect() as conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS conversions ("
+                        "ingredient TEXT NOT NULL, from_unit TEXT NOT NULL, "
+                        "to_unit TEXT NOT NULL, factor REAL NOT NULL, method TEXT NOT NULL, "
+                        "confidence REAL NOT NULL, message TEXT, "
+                        "PRIMARY KEY (ingredient, from_unit, to_unit))"
+                    )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Unit conversion disk cache disabled ({self.cache_dir}): {e}")
+                self.cache_dir = None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.cache_dir / "unit_conversions.sqlite3"), timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(ingredient: str, from_unit: str, to_unit: str) -> tuple:
+        return (
+            normalize_ingredient(ingredient),
+            str(getattr(from_unit, "value", from_unit)).lower().strip(),
+            str(getattr(to_unit, "value", to_unit)).lower().strip(),
+        )
+
+    def get(self, ingredient: str, from_unit: str, to_unit: str) -> Optional[dict[str, Any]]:
+        key = self._key(ingredient, from_unit, to_unit)
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+        if self.cache_dir is None:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT factor, method, confidence, message FROM conversions "
+                    "WHERE ingredient = ? AND from_unit = ? AND to_unit = ?",
+                    key,
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Unit conversion disk cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        entry = {"factor": row[0], "method": row[1], "confidence": row[2], "message": row[3]}
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def put(
+        self,
+        ingredient: str,
+        from_unit: str,
+        to_unit: str,
+        factor: float,
+        method: str,
+        confidence: float,
+        message: str = "",
+    ) -> None:
+        key = self._key(ingredient, from_unit, to_unit)
+        entry = {"factor": factor, "method": method, "confidence": confidence, "message": message}
+        with self._lock:
+            self._entries[key] = entry
+        if self.cache_dir is None:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO conversions "
+                    "(ingredient, from_unit, to_unit, factor, method, confidence, message) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, factor, method, confidence, message),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Unit conversion disk cache write failed: {e}")
+
+
+def _default_cache_dir() -> Optional[str]:
+    # Set UNIT_CONVERSION_CACHE_DIR to an empty string to keep learned factors in memory only
+    cache_dir = os.getenv("UNIT_CONVERSION_CACHE_DIR")
+    if cache_dir is None:
+        cache_dir = os.path.join(os.getenv("CACHE_DIR", "/tmp/prepsense_cache"), "unit_conversions")
+    return cache_dir or None
+
+
+unit_conversion_engine = UnitConversionEngine()
+learned_conversions = LearnedConversions(cache_dir=_default_cache_dir())
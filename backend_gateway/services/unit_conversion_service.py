@@ -9,20 +9,21 @@ from typing import Any, Optional
 import openai
 from crewai import Agent, Crew, Task
 
-from backend_gateway.constants.units import (
-    convert_quantity,
-    get_unit_category,
-    normalize_unit,
-)
 from backend_gateway.services.spoonacular_service import SpoonacularService
+from backend_gateway.services.unit_conversion_engine import (
+    learned_conversions,
+    unit_conversion_engine,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class UnitConversionService:
     """
-    Service for intelligent unit conversion and validation using both
-    Spoonacular API and AI agents for complex cases
+    Service for intelligent unit conversion and validation.
+
+    Conversions are answered by the local engine whenever it can; Spoonacular and
+    AI agents are only asked about the rest, and their answers are kept.
     """
 
     def __init__(self):
@@ -88,14 +89,36 @@ class UnitConversionService:
                 source_unit = "each"
                 logger.info("Converting descriptive unit to 'each' for countable item")
 
-        # Step 2: Try Spoonacular conversion first
+        # Step 2: Local unit tables and ingredient densities
+        internal_result = self._try_internal_conversion(
+            ingredient_name, source_amount, source_unit, target_unit
+        )
+        if internal_result:
+            return internal_result
+
+        # Step 3: Factors answered remotely before
+        learned = learned_conversions.get(ingredient_name, source_unit, target_unit)
+        if learned:
+            return {
+                "success": True,
+                "method": learned["method"],
+                "source_amount": source_amount,
+                "source_unit": source_unit,
+                "target_amount": source_amount * learned["factor"],
+                "target_unit": target_unit,
+                "confidence": learned["confidence"],
+                "message": learned["message"] or "",
+                "cached": True,
+            }
+
+        # Step 4: Try Spoonacular conversion
         try:
             spoon_result = self.spoonacular.convert_amount(
                 ingredient_name, source_amount, source_unit, target_unit
             )
             if spoon_result and spoon_result.get("targetAmount"):
                 logger.info(f"Spoonacular conversion successful: {spoon_result}")
-                return {
+                result = {
                     "success": True,
                     "method": "spoonacular",
                     "source_amount": source_amount,
@@ -105,30 +128,23 @@ class UnitConversionService:
                     "confidence": 0.95,
                     "message": spoon_result.get("answer", ""),
                 }
+                self._remember_conversion(ingredient_name, result)
+                return result
         except Exception as e:
             logger.warning(f"Spoonacular conversion failed: {e}")
 
-        # Step 3: Try internal conversion system
-        try:
-            internal_result = self._try_internal_conversion(
-                ingredient_name, source_amount, source_unit, target_unit
-            )
-            if internal_result:
-                return internal_result
-        except Exception as e:
-            logger.warning(f"Internal conversion failed: {e}")
-
-        # Step 4: Use AI agent for complex conversions
+        # Step 5: Use AI agent for complex conversions
         try:
             ai_result = self._ai_conversion_agent(
                 ingredient_name, source_amount, source_unit, target_unit, pantry_context
             )
             if ai_result:
+                self._remember_conversion(ingredient_name, ai_result)
                 return ai_result
         except Exception as e:
             logger.error(f"AI conversion failed: {e}")
 
-        # Step 5: Fallback - return original amount with warning
+        # Step 6: Fallback - return original amount with warning
         return {
             "success": False,
             "method": "fallback",
@@ -175,29 +191,40 @@ class UnitConversionService:
         source_unit: Optional[str],
         target_unit: str,
     ) -> Optional[dict[str, Any]]:
-        """Try conversion using internal unit system"""
-        source_norm = normalize_unit(source_unit)
-        target_norm = normalize_unit(target_unit)
-
-        # Check if units are in the same category
-        source_cat = get_unit_category(source_norm)
-        target_cat = get_unit_category(target_norm)
-
-        if source_cat and target_cat and source_cat == target_cat:
-            converted = convert_quantity(source_amount, source_norm, target_norm)
-            if converted is not None:
-                return {
-                    "success": True,
-                    "method": "internal",
-                    "source_amount": source_amount,
-                    "source_unit": source_unit,
-                    "target_amount": converted,
-                    "target_unit": target_unit,
-                    "confidence": 0.85,
-                    "message": f"Converted using internal {source_cat} conversion",
-                }
+        """Try conversion using the local unit tables and ingredient densities"""
+        found = unit_conversion_engine.factor(source_unit, target_unit, ingredient_name)
+        if found is None:
+            return None
 
-        return None
+        factor, method = found
+        return {
+            "success": True,
+            "method": "internal" if method == "unit" else "density",
+            "source_amount": source_amount,
+            "source_unit": source_unit,
+            "target_amount": source_amount * factor,
+            "target_unit": target_unit,
+            "confidence": 0.9 if method == "unit" else 0.8,
+            "message": (
+                "Converted using internal unit tables"
+                if method == "unit"
+                else f"Converted using ingredient data for {ingredient_name}"
+            ),
+        }
+
+    def _remember_conversion(self, ingredient_name: str, result: dict[str, Any]) -> None:
+        """Keep a remote answer as a factor so the same conversion stays local"""
+        if not result["source_amount"]:
+            return
+        learned_conversions.put(
+            ingredient_name,
+            result["source_unit"],
+            result["target_unit"],
+            float(result["target_amount"]) / result["source_amount"],
+            result["method"],
+            result["confidence"],
+            result.get("message", ""),
+        )
 
     def _ai_conversion_agent(
         self,
@@ -5,6 +5,8 @@ import logging
 from typing import Any, Optional
 
 from backend_gateway.services.recipe_enrichment_service import RecipeEnrichmentService
+from backend_gateway.services.recipe_pantry_matcher import PantryMatchIndex
+from backend_gateway.services.recipe_preference_scorer import invalidate_user_profile
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +73,7 @@ class UserRecipesService:
                 )
 
                 logger.info(f"Updated existing recipe for user {user_id}: {recipe_title}")
+                invalidate_user_profile(user_id)
                 return {
                     "success": True,
                     "recipe_id": existing[0]["id"],
@@ -168,6 +171,7 @@ class UserRecipesService:
                 logger.info(
                     f"Recipe saved successfully for user {user_id}: {recipe_title} (source: {source}, demo: {is_demo})"
                 )
+                invalidate_user_profile(user_id)
 
                 return {
                     "success": True,
@@ -417,6 +421,7 @@ class UserRecipesService:
             self.db_service.execute_query(
                 update_query, {"rating": rating, "recipe_id": recipe_id, "user_id": user_id}
             )
+            invalidate_user_profile(user_id)
 
             return {"success": True, "message": f"Recipe rating updated to {rating}"}
 
@@ -454,6 +459,7 @@ class UserRecipesService:
                 update_query,
                 {"is_favorite": new_favorite, "recipe_id": recipe_id, "user_id": user_id},
             )
+            invalidate_user_profile(user_id)
 
             return {
                 "success": True,
@@ -478,6 +484,7 @@ class UserRecipesService:
             )
 
             if result and result[0].get("affected_rows", 0) > 0:
+                invalidate_user_profile(user_id)
                 return {"success": True, "message": "Recipe deleted successfully"}
             else:
                 return {"success": False, "message": "Recipe not found"}
@@ -669,29 +676,19 @@ class UserRecipesService:
             LIMIT %(limit)s
             """
 
-            recipes = self.db_service.execute_query(
+            recipes = await self.db_service.execute_query_async(
                 query, {"user_id": user_id, "limit": limit * 2}  # Get more to filter
             )
 
             if not recipes:
                 return []
 
-            # Extract pantry ingredient names for matching
-            pantry_ingredients = set()
-            for item in pantry_items:
-                if item.get("product_name"):
-                    # Clean ingredient name
-                    name = item["product_name"].lower().strip()
-                    # Remove size/weight info
-                    if "–" in name:
-                        name = name.split("–")[0].strip()
-                    pantry_ingredients.add(name)
-
-            matched_recipes = []
+            # Match all candidate recipes against the pantry in one batch
+            pantry_index = PantryMatchIndex.from_pantry_items(pantry_items)
 
+            recipes_ingredients = []
             for recipe in recipes:
                 recipe_data = recipe.get("recipe_data", {})
-                is_demo = recipe.pop("is_demo_recipe", 0)
 
                 # Extract ingredients from recipe
                 recipe_ingredients = []
@@ -702,27 +699,23 @@ class UserRecipesService:
                             recipe_ingredients.append(ing.lower())
                         elif isinstance(ing, dict) and "name" in ing:
                             recipe_ingredients.append(ing["name"].lower())
+                recipes_ingredients.append(recipe_ingredients)
 
-                # Count matching ingredients
-                matched_ingredients = []
-                missing_ingredients = []
+            batch = pantry_index.match_recipes(recipes_ingredients)
 
-                for ingredient in recipe_ingredients:
-                    found = False
-                    # Check if any pantry item matches this ingredient
-                    for pantry_item in pantry_ingredients:
-                        if pantry_item in ingredient or ingredient in pantry_item:
-                            matched_ingredients.append(ingredient)
-                            found = True
-                            break
+            matched_recipes = []
+
+            for row, recipe in enumerate(recipes):
+                recipe_data = recipe.get("recipe_data", {})
+                is_demo = recipe.pop("is_demo_recipe", 0)
 
-                    if not found:
-                        missing_ingredients.append(ingredient)
+                matched_ingredients = batch.matched_ingredients(row)
+                missing_ingredients = batch.missing_ingredients(row)
 
                 # Calculate match score
-                total_ingredients = len(recipe_ingredients)
+                total_ingredients = int(batch.total_counts[row])
                 if total_ingredients > 0:
-                    match_score = len(matched_ingredients) / total_ingredients
+                    match_score = float(batch.match_scores[row])
 
                     # Include recipe with match info
                     matched_recipe = {
@@ -0,0 +1,78 @@
+"""
+pgvector adaptation for float32 NumPy embeddings.
+
+Embeddings are held and bound as 1-D float32 arrays. On asyncpg connections the
+vector type gets a binary codec (a 4-byte header followed by big-endian
+float32s), so a query vector is sent without formatting 1536 decimal numbers
+and result vectors are read without parsing them. psycopg2 only speaks text, so
+arrays are rendered once into a compact vector literal there.
+
+Vector columns read back decode to plain float lists rather than arrays: some
+endpoints return rows selected with * straight to JSON, and arrays do not
+serialize. Use to_vector() where an array is wanted.
+"""
+
+import logging
+import struct
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">HH")  # dimensions, unused
+
+
+def to_vector(value: Any) -> np.ndarray:
+    """Coerce a list, array, bytes from the OpenAI base64 format or a '[...]' literal"""
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float32, copy=False).ravel()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype="<f4").astype(np.float32)
+    if isinstance(value, str):
+        return np.array(value.strip("[]").split(","), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def vector_literal(vector: np.ndarray) -> str:
+    """pgvector text form, e.g. '[0.1,0.2]'; float32 keeps each number short"""
+    return "[" + ",".join(to_vector(vector).astype(str)) + "]"
+
+
+def encode_binary(vector: Any) -> bytes:
+    vector = to_vector(vector)
+    return _HEADER.pack(len(vector), 0) + vector.astype(">f4").tobytes()
+
+
+def decode_binary(data: bytes) -> list[float]:
+    dimensions, _ = _HEADER.unpack_from(data)
+    if len(data) != _HEADER.size + 4 * dimensions:
+        raise ValueError(f"vector header says {dimensions} dimensions, got {len(data)} bytes")
+    return np.frombuffer(data, dtype=">f4", count=dimensions, offset=_HEADER.size).tolist()
+
+
+async def register_asyncpg_vector(conn) -> None:
+    """asyncpg pool init hook: bind vectors in binary and read them back as float lists"""
+    try:
+        await conn.set_type_codec(
+            "vector",
+            schema="public",
+            encoder=encode_binary,
+            decoder=decode_binary,
+            format="binary",
+        )
+    except ValueError:
+        # The pgvector extension is not installed in this database
+        logger.debug("vector type not found; skipping pgvector codec")
+
+
+def register_psycopg2_vector() -> None:
+    """Render 1-D float32 arrays bound through psycopg2 as vector literals (process-wide)"""
+    from psycopg2.extensions import AsIs, adapt, register_adapter
+
+    def _adapt_array(array: np.ndarray):
+        if array.dtype == np.float32 and array.ndim == 1:
+            return AsIs(f"'{vector_literal(array)}'::vector")
+        return adapt(array.tolist())
+
+    register_adapter(np.ndarray, _adapt_array)
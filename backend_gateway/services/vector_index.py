@@ -0,0 +1,408 @@
+"""
+In-process vector index
+
+Fallback for semantic search on Postgres servers without the pgvector extension
+(smaller deployments, CI). Each index ("recipes", "products") is a float32 matrix
+of unit vectors with a row id and a metadata dict per row, searched by exact dot
+product, or through an IVF partition (spherical k-means lists, probing the
+nearest few) once it holds VECTOR_INDEX_IVF_MIN_ROWS rows.
+
+Snapshot files in VECTOR_INDEX_DIR:
+    <name>.npy   (rows, dim) float32 matrix, memory-mapped read-only
+    <name>.json  {"ids": [...], "metadata": [...]} aligned with the matrix rows
+    <name>.log   adds since the snapshot, one JSON line each
+
+add() (from update_recipe_embedding / update_product_embedding) puts a vector in
+an in-memory delta searched alongside the matrix, shadowing any snapshot row with
+the same id, and appends it to the log so it survives restarts and reaches other
+worker processes. Each index re-stats its files at most every
+VECTOR_INDEX_RELOAD_S seconds: new log lines are replayed, and a replaced
+snapshot is loaded on a background thread and swapped in while searches keep
+using the old one. compact() folds the log into a new snapshot.
+"""
+
+import base64
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .vector_codec import to_vector
+
+logger = logging.getLogger(__name__)
+
+# "pgvector" | "memory" | "auto" (pgvector when the extension is installed)
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "auto").lower()
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "/tmp/prepsense_cache/vector_index")
+VECTOR_INDEX_RELOAD_S = float(os.getenv("VECTOR_INDEX_RELOAD_S", "5"))
+# Below this many rows exact search is as fast as probing IVF lists
+VECTOR_INDEX_IVF_MIN_ROWS = int(os.getenv("VECTOR_INDEX_IVF_MIN_ROWS", "20000"))
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+
+_KMEANS_ITERATIONS = 10
+_ASSIGN_CHUNK_ROWS = 8192
+
+
+@dataclass
+class _Snapshot:
+    matrix: np.ndarray  # (rows, dim) float32, read-only
+    ids: list[Any]
+    metadata: list[dict[str, Any]]
+    version: tuple = ()  # (mtime_ns, size) of the .json file it was loaded from
+    row_of: dict[Any, int] = field(default_factory=dict)
+    centroids: Optional[np.ndarray] = None  # (lists, dim) when IVF is built
+    lists: list[np.ndarray] = field(default_factory=list)  # row numbers per centroid
+
+    @classmethod
+    def empty(cls, dimension: int = 0) -> "_Snapshot":
+        return cls(np.zeros((0, dimension), dtype=np.float32), [], [])
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _build_ivf(matrix: np.ndarray, seed: int = 0) -> tuple[np.ndarray, list[np.ndarray]]:
+    """Spherical k-means on a sample, then every row assigned to its nearest centroid"""
+    rows = len(matrix)
+    nlist = max(1, int(math.sqrt(rows)))
+    rng = np.random.default_rng(seed)
+    sample = np.asarray(matrix[np.sort(rng.choice(rows, min(rows, nlist * 64), replace=False))])
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(_KMEANS_ITERATIONS):
+        nearest = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, nearest, sample)
+        filled = np.bincount(nearest, minlength=nlist) > 0
+        centroids[filled] = _normalize(sums[filled])
+
+    assignment = np.empty(rows, dtype=np.int64)
+    for start in range(0, rows, _ASSIGN_CHUNK_ROWS):
+        chunk = np.asarray(matrix[start : start + _ASSIGN_CHUNK_ROWS])
+        assignment[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    order = np.argsort(assignment, kind="stable")
+    bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+    return centroids, [order[bounds[i] : bounds[i + 1]] for i in range(nlist)]
+
+
+class InProcessVectorIndex:
+    """Memory-mapped snapshot plus in-memory delta, searched by cosine similarity"""
+
+    def __init__(self, name: str, directory: str = VECTOR_INDEX_DIR):
+        self.name = name
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot.empty()
+        self._delta: dict[Any, tuple[np.ndarray, dict[str, Any]]] = {}
+        self._delta_matrix: Optional[np.ndarray] = None
+        self._delta_ids: list[Any] = []
+        self._shadowed = np.zeros(0, dtype=bool)
+        self._log_offset = 0
+        self._log_inode = 0
+        self._checked_at = 0.0
+        self._reloading = False
+        self.reloads = 0
+        self.searches = 0
+        self.adds = 0
+        self.reload()
+
+    @property
+    def _matrix_path(self) -> Path:
+        return self.directory / f"{self.name}.npy"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / f"{self.name}.json"
+
+    @property
+    def _log_path(self) -> Path:
+        return self.directory / f"{self.name}.log"
+
+    def _snapshot_version(self) -> tuple:
+        try:
+            stat = self._meta_path.stat()
+        except FileNotFoundError:
+            return ()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_snapshot(self) -> _Snapshot:
+        version = self._snapshot_version()
+        if not version:
+            return _Snapshot.empty()
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        matrix = np.load(self._matrix_path, mmap_mode="r")
+        if matrix.dtype != np.float32 or len(matrix) != len(meta["ids"]):
+            # Caught between the .npy and .json replace of a compaction; retry next check
+            raise ValueError(f"{self.name} snapshot files do not match")
+        snapshot = _Snapshot(
+            matrix,
+            meta["ids"],
+            meta["metadata"],
+            version=version,
+            row_of={item_id: row for row, item_id in enumerate(meta["ids"])},
+        )
+        if len(matrix) >= VECTOR_INDEX_IVF_MIN_ROWS:
+            snapshot.centroids, snapshot.lists = _build_ivf(matrix)
+        return snapshot
+
+    def reload(self) -> None:
+        """Load the snapshot from disk (blocking) and replay its log"""
+        try:
+            snapshot = self._load_snapshot()
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load {self.name} vector index snapshot: {e}")
+            return
+        with self._lock:
+            self._swap(snapshot)
+        self._replay_log()
+        logger.info(f"Loaded {self.name} vector index: {len(snapshot.ids)} rows")
+
+    def _swap(self, snapshot: _Snapshot) -> None:
+        # Caller holds the lock. The log belongs to the snapshot it was written against
+        self._snapshot = snapshot
+        self._delta = {}
+        self._delta_matrix = None
+        self._shadowed = np.zeros(len(snapshot.ids), dtype=bool)
+        self._log_offset = 0
+        self.reloads += 1
+
+    def _reload_in_background(self) -> None:
+        try:
+            self.reload()
+        finally:
+            self._reloading = False
+
+    def maybe_reload(self) -> None:
+        """Pick up a replaced snapshot or new log lines, checking at most every few seconds"""
+        now = time.monotonic()
+        if now - self._checked_at < VECTOR_INDEX_RELOAD_S or self._reloading:
+            return
+        self._checked_at = now
+        if self._snapshot_version() != self._snapshot.version:
+            self._reloading = True
+            threading.Thread(
+                target=self._reload_in_background, name=f"vector-index-{self.name}", daemon=True
+            ).start()
+        else:
+            self._replay_log()
+
+    def _replay_log(self) -> None:
+        try:
+            with open(self._log_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+                    # Compacted and started afresh; replaying known lines again is harmless
+                    self._log_inode, self._log_offset = stat.st_ino, 0
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Only whole lines; a writer may be midway through the last one
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            entry = json.loads(line)
+            vector = to_vector(base64.b64decode(entry["vector"]))
+            self._put(entry["id"], vector, entry["metadata"])
+        self._log_offset += end
+
+    def _put(self, item_id: Any, vector: np.ndarray, metadata: dict[str, Any]) -> None:
+        with self._lock:
+            self._delta[item_id] = (_normalize(vector), metadata)
+            self._delta_matrix = None
+            row = self._snapshot.row_of.get(item_id)
+            if row is not None:
+                shadowed = self._shadowed.copy()  # searches may hold the old array
+                shadowed[row] = True
+                self._shadowed = shadowed
+
+    def add(self, item_id: Any, vector: Any, metadata: dict[str, Any]) -> None:
+        """Insert or replace one row, in memory and in the log"""
+        vector = to_vector(vector)
+        self._put(item_id, vector, metadata)
+        self.adds += 1
+        line = json.dumps(
+            {
+                "id": item_id,
+                "vector": base64.b64encode(vector.astype("<f4").tobytes()).decode(),
+                "metadata": metadata,
+            },
+            default=str,
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self._log_path, "ab") as f:
+            f.write(line.encode() + b"\n")
+            # Our own line is already applied; skip it when replaying
+            if f.tell() - len(line) - 1 == self._log_offset:
+                self._log_offset = f.tell()
+
+    def _delta_view(self) -> tuple[np.ndarray, list[Any], list[dict[str, Any]]]:
+        with self._lock:
+            if self._delta_matrix is None:
+                self._delta_ids = list(self._delta)
+                vectors = [self._delta[item_id][0] for item_id in self._delta_ids]
+                self._delta_matrix = (
+                    np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+                )
+            return (
+                self._delta_matrix,
+                self._delta_ids,
+                [self._delta[item_id][1] for item_id in self._delta_ids],
+            )
+
+    def search(
+        self,
+        query: Any,
+        limit: int = 10,
+        similarity_threshold: float = 0.0,
+        where: Optional[Callable[[dict[str, Any]], bool]] = None,
+        nprobe: int = VECTOR_INDEX_NPROBE,
+    ) -> list[tuple[dict[str, Any], float]]:
+        """
+        Nearest rows by cosine similarity, as (metadata, similarity) pairs best first.
+
+        where filters on metadata. If probing nprobe IVF lists finds fewer than limit
+        rows passing it, the search is repeated over every row.
+        """
+        self.maybe_reload()
+        self.searches += 1
+        query = _normalize(to_vector(query))
+        with self._lock:
+            snapshot, shadowed = self._snapshot, self._shadowed
+
+        probe = None
+        if snapshot.centroids is not None and nprobe < len(snapshot.lists):
+            nearest_lists = np.argsort(-(snapshot.centroids @ query))[:nprobe]
+            probe = np.concatenate([snapshot.lists[i] for i in nearest_lists])
+        results = self._search_rows(
+            snapshot, shadowed, probe, query, limit, similarity_threshold, where
+        )
+        if probe is not None and where is not None and len(results) < limit:
+            results = self._search_rows(
+                snapshot, shadowed, None, query, limit, similarity_threshold, where
+            )
+        return results
+
+    def _search_rows(
+        self,
+        snapshot: _Snapshot,
+        shadowed: np.ndarray,
+        rows: Optional[np.ndarray],
+        query: np.ndarray,
+        limit: int,
+        similarity_threshold: float,
+        where: Optional[Callable[[dict[str, Any]], bool]],
+    ) -> list[tuple[dict[str, Any], float]]:
+        if rows is None:
+            rows = np.arange(len(snapshot.ids))
+            scores = snapshot.matrix @ query if len(rows) else np.zeros(0, dtype=np.float32)
+            live = ~shadowed
+        else:
+            scores, live = np.asarray(snapshot.matrix[rows]) @ query, ~shadowed[rows]
+        keep = live & (scores > similarity_threshold)
+        metadata = [snapshot.metadata[row] for row in rows[keep]] if where else None
+        scores = scores[keep]
+        rows = rows[keep]
+
+        delta_matrix, _, delta_metadata = self._delta_view()
+        if len(delta_matrix):
+            delta_scores = delta_matrix @ query
+            delta_keep = np.flatnonzero(delta_scores > similarity_threshold)
+            scores = np.concatenate([scores, delta_scores[delta_keep]])
+        else:
+            delta_keep = np.zeros(0, dtype=np.int64)
+
+        def _metadata(i: int) -> dict[str, Any]:
+            if i >= len(rows):
+                return delta_metadata[delta_keep[i - len(rows)]]
+            return metadata[i] if metadata is not None else snapshot.metadata[rows[i]]
+
+        if where is None and len(scores) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+            order = top[np.argsort(-scores[top])]
+        else:
+            order = np.argsort(-scores, kind="stable")
+
+        results = []
+        for i in order:
+            item = _metadata(i)
+            if where is None or where(item):
+                results.append((item, float(scores[i])))
+                if len(results) == limit:
+                    break
+        return results
+
+    def compact(self) -> int:
+        """Write snapshot plus delta as a new snapshot and empty the log; returns rows"""
+        with self._lock:
+            snapshot, shadowed, delta = self._snapshot, self._shadowed, dict(self._delta)
+        live = np.flatnonzero(~shadowed)
+        ids = [snapshot.ids[row] for row in live] + list(delta)
+        metadata = [snapshot.metadata[row] for row in live] + [meta for _, meta in delta.values()]
+        vectors = [np.asarray(snapshot.matrix[live])]
+        vectors += [vector[None] for vector, _ in delta.values()]
+        matrix = np.concatenate([v for v in vectors if v.size] or [np.zeros((0, 0), np.float32)])
+        write_snapshot(self.name, ids, matrix, metadata, directory=str(self.directory))
+        self._log_path.unlink(missing_ok=True)
+        self.reload()
+        return len(ids)
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "rows": len(snapshot.ids) - int(self._shadowed.sum()) + len(self._delta),
+            "snapshot_rows": len(snapshot.ids),
+            "delta_rows": len(self._delta),
+            "dimension": snapshot.matrix.shape[1] if snapshot.matrix.ndim == 2 else 0,
+            "ivf_lists": len(snapshot.lists),
+            "nprobe": VECTOR_INDEX_NPROBE,
+            "searches": self.searches,
+            "adds": self.adds,
+            "reloads": self.reloads,
+        }
+
+
+def write_snapshot(
+    name: str,
+    ids: list[Any],
+    vectors: Any,
+    metadata: list[dict[str, Any]],
+    directory: str = VECTOR_INDEX_DIR,
+) -> None:
+    """Write <name>.npy and <name>.json atomically; running indexes pick them up on their own"""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix = _normalize(matrix.reshape(len(ids), -1) if len(ids) else matrix.reshape(0, 0))
+    if len(matrix) != len(ids) or len(ids) != len(metadata):
+        raise ValueError("ids, vectors and metadata must have the same length")
+
+    tmp_matrix = path / f".{name}.npy.tmp"
+    with open(tmp_matrix, "wb") as f:
+        np.save(f, matrix)
+    tmp_meta = path / f".{name}.json.tmp"
+    with open(tmp_meta, "w") as f:
+        json.dump({"ids": ids, "metadata": metadata}, f, default=str)
+    # The .json is replaced last: readers key reloads on it
+    os.replace(tmp_matrix, path / f"{name}.npy")
+    os.replace(tmp_meta, path / f"{name}.json")
+
+
+_indexes: dict[str, InProcessVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index(name: str) -> InProcessVectorIndex:
+    """Process-wide index for name, loaded from VECTOR_INDEX_DIR on first use"""
+    with _indexes_lock:
+        if name not in _indexes:
+            _indexes[name] = InProcessVectorIndex(name)
+        return _indexes[name]
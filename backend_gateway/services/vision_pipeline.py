@@ -0,0 +1,151 @@
+"""
+Concurrency control for OpenAI vision calls.
+
+Image analysis requests take several seconds each, so they are run on the async
+OpenAI client through a shared pipeline that caps how many are in flight, queues
+a bounded number behind them and rejects the rest so the endpoint can answer 429
+instead of piling up work. Identical images that are being analysed at the same
+time (same purpose and image hash) share a single upstream call.
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class VisionCapacityError(Exception):
+    """Raised when the vision pipeline is saturated; map to HTTP 429"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def generate_image_hash(data: bytes) -> str:
+    """Compute an MD5 hash of image bytes for cache keys and request deduplication."""
+    return hashlib.md5(data).hexdigest()
+
+
+def generate_base64_image_hash(base64_image: str) -> str:
+    """Hash a base64-encoded image the same way as its raw bytes."""
+    try:
+        return generate_image_hash(base64.b64decode(base64_image))
+    except ValueError:
+        return generate_image_hash(base64_image.encode("utf-8"))
+
+
+class VisionPipeline:
+    """Bounded worker pool with a bounded wait queue and in-flight deduplication"""
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 16, queue_timeout: float = 30):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._waiting = 0
+        self._running = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to the loop they were first used on (Python 3.9), so
+        # build a new one if the pipeline is used from a different loop.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._in_flight = {}
+        return self._semaphore
+
+    async def run(self, key: Optional[str], call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run call() once a worker slot is free.
+
+        Callers passing the same key while a call is in flight receive its result
+        instead of starting another. Raises VisionCapacityError if the wait queue
+        is full or no slot frees up within queue_timeout.
+        """
+        semaphore = self._get_semaphore()
+
+        if key is not None and key in self._in_flight:
+            self.coalesced += 1
+            logger.info(f"Reusing in-flight vision request {key}")
+            return await asyncio.shield(self._in_flight[key])
+
+        # Count the request as waiting before it is scheduled, so a burst arriving
+        # in the same tick is bounded too
+        if self._running + self._waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            logger.warning(
+                f"Vision pipeline full ({self._running} running, {self._waiting} queued)"
+            )
+            raise VisionCapacityError(
+                "Image analysis is busy, please retry shortly", retry_after=self._retry_after()
+            )
+
+        self._waiting += 1
+        future = asyncio.ensure_future(self._run_limited(semaphore, call))
+        if key is not None:
+            self._in_flight[key] = future
+
+            def _done(done: asyncio.Future, in_flight=self._in_flight):
+                in_flight.pop(key, None)
+                # Mark the exception retrieved in case every waiter was cancelled
+                if not done.cancelled():
+                    done.exception()
+
+            future.add_done_callback(_done)
+
+        # Shield the shared call so one caller disconnecting does not fail the others
+        return await asyncio.shield(future)
+
+    async def _run_limited(self, semaphore: asyncio.Semaphore, call: Callable[[], Awaitable[T]]):
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise VisionCapacityError(
+                "Timed out waiting for image analysis capacity", retry_after=self._retry_after()
+            ) from None
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            return await call()
+        finally:
+            self._running -= 1
+            self.completed += 1
+            semaphore.release()
+
+    def _retry_after(self) -> int:
+        # Rough guess: each queued wave of requests takes a few seconds
+        return max(1, 5 * (1 + self._waiting // max(1, self.max_concurrency)))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued": self._waiting,
+            "completed": self.completed,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+
+vision_pipeline = VisionPipeline(
+    max_concurrency=int(os.getenv("VISION_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("VISION_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("VISION_QUEUE_TIMEOUT", "30")),
+)
@@ -9,7 +9,8 @@ from typing import Any, Optional
 
 from dotenv import load_dotenv
 
-from backend_gateway.core.openai_client import get_openai_client
+from backend_gateway.core.openai_client import get_async_openai_client, get_openai_client
+from backend_gateway.services.vision_pipeline import generate_base64_image_hash, vision_pipeline
 
 # Load environment variables.
 load_dotenv()
@@ -44,11 +45,8 @@ class VisionService:
         base64_image = base64.b64encode(img_bytes).decode("utf-8")
         return base64_image, file.content_type
 
-    def classify_food_items(self, base64_image: str, content_type: Optional[str]) -> str:
-        """
-        Sends the base64-encoded image to OpenAI's API with a detailed prompt.
-        Returns the raw JSON response string from OpenAI.
-        """
+    def _build_classification_prompt(self) -> str:
+        """Prompt asking the model to list every visible food item as JSON."""
         today_str = datetime.today().strftime("%Y-%m-%d")
         prompt_text = (
             f"You are a grocery inventory assistant helping track food items.\n\n"
@@ -113,51 +111,95 @@ class VisionService:
             "DO NOT include any explanation before or after the JSON."
         )
 
+        return prompt_text
+
+    def _build_classification_messages(
+        self, base64_image: str, content_type: Optional[str]
+    ) -> list[dict[str, Any]]:
         if not content_type:
             content_type = "image/jpeg"  # Default if not provided
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-5-nano-2025-08-07",  # Or your preferred current vision model
-                messages=[
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": self._build_classification_prompt()},
                     {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt_text},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:{content_type};base64,{base64_image}"},
-                            },
-                        ],
-                    }
+                        "type": "image_url",
+                        "image_url": {"url": f"data:{content_type};base64,{base64_image}"},
+                    },
                 ],
-                temperature=0.5,
-            )
+            }
+        ]
 
-            # Log the full OpenAI vision response for debugging
-            print("\n👁️ OpenAI Vision API Response:")
-            print("   Model: gpt-5-nano-2025-08-07 (vision)")
-            print(f"   Usage: {response.usage}")
-            print(f"   Response ID: {response.id}")
+    def _extract_vision_result(self, response) -> str:
+        """Log the vision response and return its text content."""
+        # Log the full OpenAI vision response for debugging
+        print("\n👁️ OpenAI Vision API Response:")
+        print("   Model: gpt-5-nano-2025-08-07 (vision)")
+        print(f"   Usage: {response.usage}")
+        print(f"   Response ID: {response.id}")
 
-            # Handle potential None response
-            message_content = response.choices[0].message.content
-            if message_content is None:
-                print("   ⚠️ Warning: OpenAI returned None content")
-                print(f"   Full response: {response}")
-                raise RuntimeError("OpenAI API returned empty response content")
+        # Handle potential None response
+        message_content = response.choices[0].message.content
+        if message_content is None:
+            print("   ⚠️ Warning: OpenAI returned None content")
+            print(f"   Full response: {response}")
+            raise RuntimeError("OpenAI API returned empty response content")
 
-            vision_result = message_content.strip()
-            print("   Vision Result Preview:")
-            print(f"   {vision_result[:300]}...")
-            print(f"   Full Result Length: {len(vision_result)} characters\n")
+        vision_result = message_content.strip()
+        print("   Vision Result Preview:")
+        print(f"   {vision_result[:300]}...")
+        print(f"   Full Result Length: {len(vision_result)} characters\n")
+
+        return vision_result
+
+    def classify_food_items(self, base64_image: str, content_type: Optional[str]) -> str:
+        """
+        Sends the base64-encoded image to OpenAI's API with a detailed prompt.
+        Returns the raw JSON response string from OpenAI.
 
-            return vision_result
+        Blocks the calling thread; async endpoints should use classify_food_items_async.
+        """
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-5-nano-2025-08-07",  # Or your preferred current vision model
+                messages=self._build_classification_messages(base64_image, content_type),
+                temperature=0.5,
+            )
+            return self._extract_vision_result(response)
 
         except Exception as e:
             print(f"Error communicating with OpenAI API: {e}")  # Log the actual error
             raise RuntimeError(f"Error communicating with OpenAI API: {str(e)}") from e
 
+    async def classify_food_items_async(
+        self, base64_image: str, content_type: Optional[str]
+    ) -> str:
+        """
+        Async version of classify_food_items, run through the shared vision pipeline.
+
+        Raises VisionCapacityError when too many image analyses are already pending.
+        """
+        messages = self._build_classification_messages(base64_image, content_type)
+
+        async def _classify() -> str:
+            try:
+                response = await get_async_openai_client().chat.completions.create(
+                    model="gpt-5-nano-2025-08-07",
+                    messages=messages,
+                    temperature=0.5,
+                )
+                return self._extract_vision_result(response)
+
+            except Exception as e:
+                print(f"Error communicating with OpenAI API: {e}")  # Log the actual error
+                raise RuntimeError(f"Error communicating with OpenAI API: {str(e)}") from e
+
+        return await vision_pipeline.run(
+            f"vision_classify_{generate_base64_image_hash(base64_image)}", _classify
+        )
+
     def parse_openai_response(self, response_text: str) -> list[dict[str, Any]]:
         """
         Parses the JSON response from OpenAI and extracts pantry items.
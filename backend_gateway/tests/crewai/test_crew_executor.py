@@ -0,0 +1,134 @@
+"""Tests for the bounded crew executor"""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend_gateway.prepsense_crew.executor import (
+    CrewCapacityError,
+    CrewDeadlineExceeded,
+    CrewExecutor,
+)
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def make(**kwargs) -> CrewExecutor:
+        executor = CrewExecutor(**kwargs)
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        executor.shutdown()
+
+
+async def _wait_until(condition, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+
+async def test_run_returns_result_and_counts_completion(make_executor):
+    executor = make_executor()
+
+    assert await executor.run(lambda a, b=0: a + b, 2, b=3, user_id=1) == 5
+
+    stats = executor.stats()
+    assert stats["submitted"] == 1
+    assert stats["completed"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["active_users"] == 0
+
+
+async def test_run_propagates_exceptions(make_executor):
+    executor = make_executor()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        await executor.run(fail, user_id=1)
+    await _wait_until(lambda: executor.stats()["failed"] == 1)
+
+
+async def test_per_user_cap_is_per_kind_and_user(make_executor):
+    executor = make_executor(max_workers=4, max_per_user=1)
+    release = threading.Event()
+
+    first = asyncio.create_task(executor.run(release.wait, user_id=1, kind="crew"))
+    await _wait_until(lambda: executor.stats()["running"] == 1)
+
+    with pytest.raises(CrewCapacityError):
+        await executor.run(lambda: None, user_id=1, kind="crew")
+    # Other users and other kinds of run are not affected
+    await executor.run(lambda: None, user_id=2, kind="crew")
+    await executor.run(lambda: None, user_id=1, kind="flow")
+
+    release.set()
+    await first
+    await _wait_until(lambda: executor.stats()["active_users"] == 0)
+    await executor.run(lambda: None, user_id=1, kind="crew")
+    assert executor.stats()["rejected"] == 1
+
+
+async def test_rejects_when_queue_is_full(make_executor):
+    executor = make_executor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait))
+    await _wait_until(lambda: executor.stats()["running"] == 1)
+    queued = asyncio.create_task(executor.run(lambda: "queued"))
+    await _wait_until(lambda: executor.stats()["queue_depth"] == 1)
+
+    with pytest.raises(CrewCapacityError):
+        await executor.run(lambda: None)
+
+    release.set()
+    assert await queued == "queued"
+    await running
+
+
+async def test_deadline_while_running_keeps_the_user_slot(make_executor):
+    executor = make_executor(max_per_user=1)
+    release = threading.Event()
+
+    with pytest.raises(CrewDeadlineExceeded) as exc_info:
+        await executor.run(release.wait, user_id=7, deadline_s=0.05)
+    assert exc_info.value.started
+
+    # The abandoned thread still holds the user's slot until it returns
+    with pytest.raises(CrewCapacityError):
+        await executor.run(lambda: None, user_id=7)
+
+    release.set()
+    await _wait_until(lambda: executor.stats()["completed"] == 1)
+    await executor.run(lambda: None, user_id=7)
+    assert executor.stats()["timed_out"] == 1
+
+
+async def test_deadline_while_queued_cancels_the_run(make_executor):
+    executor = make_executor(max_workers=1)
+    release = threading.Event()
+    ran = threading.Event()
+
+    blocker = asyncio.create_task(executor.run(release.wait))
+    await _wait_until(lambda: executor.stats()["running"] == 1)
+
+    with pytest.raises(CrewDeadlineExceeded) as exc_info:
+        await executor.run(ran.set, user_id=3, deadline_s=0.05)
+    assert not exc_info.value.started
+
+    stats = executor.stats()
+    assert stats["cancelled"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["active_users"] == 0
+
+    release.set()
+    await blocker
+    assert not ran.is_set()
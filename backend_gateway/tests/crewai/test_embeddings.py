@@ -0,0 +1,121 @@
+"""Tests for the local hashed TF-IDF embedder and the per-text embedding cache"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from backend_gateway.prepsense_crew import embeddings
+from backend_gateway.prepsense_crew.embeddings import (
+    EmbeddingCache,
+    HashedTfidfEmbedder,
+    embed_texts,
+)
+
+
+class CountingEmbedder(HashedTfidfEmbedder):
+    """Records every text it is asked to embed"""
+
+    def __init__(self):
+        super().__init__(dimension=64)
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = CountingEmbedder()
+    monkeypatch.setattr(embeddings, "embedding_provider", provider)
+    monkeypatch.setattr(embeddings, "embedding_cache", EmbeddingCache())
+    return provider
+
+
+def test_embeddings_are_deterministic_and_normalized():
+    texts = ["cherry tomatoes", "Chicken breast", ""]
+    first = HashedTfidfEmbedder().embed(texts)
+    second = HashedTfidfEmbedder().embed(texts)
+
+    np.testing.assert_array_equal(first, second)
+    assert first.dtype == np.float32 and first.shape == (3, 256)
+    np.testing.assert_allclose(np.linalg.norm(first[:2], axis=1), 1.0, rtol=1e-6)
+    assert not first[2].any()
+
+
+def test_embeddings_do_not_depend_on_the_hash_seed():
+    script = (
+        "import runpy, sys; "
+        "module = runpy.run_path(sys.argv[1]); "
+        "print(module['HashedTfidfEmbedder']().embed(['cherry tomatoes']).tobytes().hex())"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", script, embeddings.__file__],
+            env={**os.environ, "PYTHONHASHSEED": seed, "EMBEDDING_CACHE_DIR": ""},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+
+    assert outputs == {HashedTfidfEmbedder().embed(["cherry tomatoes"]).tobytes().hex() + "\n"}
+
+
+def test_inflections_are_closer_than_unrelated_words():
+    tomato, tomatoes, chicken = HashedTfidfEmbedder().embed(["tomato", "tomatoes", "chicken"])
+
+    assert tomato @ tomatoes > tomato @ chicken
+
+
+def test_fit_changes_the_provider_name():
+    embedder = HashedTfidfEmbedder()
+    before = embedder.name
+    embedder.fit(["tomato", "chicken", "tomato sauce"])
+
+    assert embedder.name != before
+    assert embedder.idf.shape == (256,) and (embedder.idf >= 1).all()
+
+
+def test_embed_texts_normalizes_and_deduplicates(provider):
+    matrix = embed_texts(["Tomato!", "tomato", "", "basil"])
+
+    assert provider.embedded == ["tomato", "basil"]
+    np.testing.assert_array_equal(matrix[0], matrix[1])
+    assert not matrix[2].any()
+    np.testing.assert_array_equal(matrix[3], provider.embed(["basil"])[0])
+
+
+def test_sqlite_cache_serves_vectors_to_a_new_process(tmp_path, provider, monkeypatch):
+    monkeypatch.setattr(embeddings, "embedding_cache", EmbeddingCache(cache_dir=str(tmp_path)))
+    expected = embed_texts(["tomato", "basil"])
+
+    # A fresh cache has an empty memory tier, so these come from the SQLite table
+    reloaded = EmbeddingCache(cache_dir=str(tmp_path))
+    monkeypatch.setattr(embeddings, "embedding_cache", reloaded)
+    provider.embedded.clear()
+    np.testing.assert_array_equal(embed_texts(["basil", "tomato"]), expected[::-1])
+
+    assert provider.embedded == []
+    assert reloaded.stats()["hits"] == 2
+    assert (tmp_path / "embeddings.sqlite3").exists()
+
+
+def test_cache_is_keyed_by_provider_name(tmp_path):
+    cache = EmbeddingCache(cache_dir=str(tmp_path))
+    cache.put_many("model_a", {"tomato": np.ones(4, dtype=np.float32)})
+
+    assert EmbeddingCache(cache_dir=str(tmp_path)).get_many("model_b", ["tomato"]) == {}
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = EmbeddingCache(maxsize=2)
+    for text in ("a", "b", "c"):
+        cache.put_many("p", {text: np.zeros(2, dtype=np.float32)})
+
+    assert set(cache.get_many("p", ["a", "b", "c"])) == {"b", "c"}
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,96 @@
+"""Tests for taste vectors and matrix recipe scoring"""
+
+import numpy as np
+import pytest
+
+from backend_gateway.prepsense_crew import embeddings
+from backend_gateway.prepsense_crew.embeddings import EmbeddingCache
+from backend_gateway.prepsense_crew.ml import (
+    build_taste_vector,
+    calculate_recipe_similarity,
+    rank_recipes_by_preference,
+    score_recipe_matrix,
+)
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    monkeypatch.setattr(embeddings, "embedding_cache", EmbeddingCache())
+
+
+def test_taste_vector_is_clipped_to_non_negative():
+    recipe_embeddings = {1: [1.0, 0.0, 0.5], 2: [0.0, 1.0, 1.0]}
+    interactions = [
+        {"recipe_id": 1, "rating": "thumbs_up"},
+        {"recipe_id": 2, "rating": "thumbs_down"},
+    ]
+
+    taste = build_taste_vector(interactions, recipe_embeddings)
+
+    # Without the clip the second and third components would be negative
+    assert min(taste) == 0.0
+    assert taste[1] == 0.0
+    assert np.linalg.norm(taste) == pytest.approx(1.0)
+
+
+def test_only_dislikes_give_no_taste_vector():
+    interactions = [{"recipe_id": 1, "rating": "thumbs_down"}, {"recipe_id": 2, "rating": 1}]
+
+    assert build_taste_vector(interactions, {1: [1.0, 0.0], 2: [0.0, 1.0]}) == []
+
+
+def test_neutral_ratings_carry_no_signal():
+    assert build_taste_vector([{"recipe_id": 1, "rating": 3}, {"rating": "neutral"}]) == []
+    assert build_taste_vector([]) == []
+
+
+def test_star_ratings_are_centred_on_three():
+    recipe_embeddings = {1: [1.0, 0.0], 2: [0.0, 1.0]}
+    taste = build_taste_vector(
+        [{"recipe_id": 1, "rating": 5}, {"recipe_id": 2, "rating": 4}], recipe_embeddings
+    )
+
+    np.testing.assert_allclose(taste, np.array([1.0, 0.5]) / np.linalg.norm([1.0, 0.5]))
+
+
+def test_interactions_without_vectors_are_embedded_from_their_text():
+    taste = build_taste_vector(
+        [{"recipe_title": "Spicy Curry", "cuisine_type": "indian", "rating": "thumbs_up"}]
+    )
+    expected = embeddings.embed_texts(["Spicy Curry indian "])[0]
+
+    assert len(taste) == embeddings.embedding_provider.dimension
+    np.testing.assert_allclose(taste, expected, rtol=1e-6)
+
+
+def test_matrix_scores_match_the_scalar_path():
+    rng = np.random.default_rng(14)
+    matrix = rng.normal(size=(12, 8)).astype(np.float32)
+    matrix[3] = 0.0
+    preference = rng.normal(size=8).tolist()
+
+    scores = score_recipe_matrix(matrix, preference)
+
+    expected = [calculate_recipe_similarity(row.tolist(), preference) for row in matrix]
+    np.testing.assert_allclose(scores, expected, atol=1e-6)
+    assert scores[3] == 0.0
+
+
+def test_zero_preference_scores_zero():
+    assert not score_recipe_matrix(np.ones((3, 4), dtype=np.float32), [0.0] * 4).any()
+
+
+def test_ranking_orders_by_matrix_score():
+    recipes = [
+        {"id": 1, "embedding": [0.0, 1.0]},
+        {"id": 2, "embedding": [1.0, 0.1]},
+        {"id": 3, "embedding": [1.0, 2.0, 3.0]},
+    ]
+
+    ranked = rank_recipes_by_preference(recipes, [1.0, 0.0])
+
+    assert [recipe["id"] for recipe in ranked] == [2, 1, 3]
+    assert ranked[0]["preference_score"] == pytest.approx(
+        calculate_recipe_similarity([1.0, 0.1], [1.0, 0.0])
+    )
+    assert ranked[2]["preference_score"] == 0.0
@@ -0,0 +1,127 @@
+"""Tests that /chat/message runs RealCrewAIService through its stage graph"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend_gateway.prepsense_crew.models import CrewOutput
+from backend_gateway.routers import chat_router
+from backend_gateway.services import real_crewai_service
+from backend_gateway.services.real_crewai_service import RealCrewAIService
+
+PANTRY = [
+    {"product_name": "chicken", "quantity": 2, "food_category": "Meat"},
+    {"product_name": "rice", "quantity": 1, "food_category": "Grains"},
+]
+CANDIDATES = [
+    {"id": 1, "title": "Chicken Rice", "readyInMinutes": 25, "extendedIngredients": []},
+    {"id": 2, "title": "Fried Rice", "readyInMinutes": 15, "extendedIngredients": []},
+]
+STAGES = {"pantry_items", "preference_artifact", "pantry_artifact", "recipe_candidates"}
+
+
+class FakeDatabase:
+    def get_user_pantry_items(self, user_id):
+        return PANTRY
+
+    def get_user_preferences(self, user_id):
+        return {"dietary_restrictions": ["vegetarian"], "allergens": [], "cuisine_preferences": {}}
+
+
+class EmptyCache:
+    def get_pantry_artifact(self, user_id):
+        return None
+
+    def get_preference_artifact(self, user_id):
+        return None
+
+
+class FakeSpoonacular:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.searches = []
+
+    async def search_recipes_by_ingredients(self, ingredients, number, ranking):
+        self.searches.append(ingredients)
+        await asyncio.sleep(self.delay)
+        return CANDIDATES
+
+
+class FakeCrew:
+    def __init__(self):
+        self.inputs = []
+
+    async def generate_recommendations(self, crew_input):
+        self.inputs.append(crew_input)
+        return CrewOutput(
+            response_text="Try these",
+            recipe_cards=[
+                {"id": r["id"], "title": r["title"]} for r in crew_input.recipe_candidates
+            ],
+            processing_time_ms=5,
+            agents_used=["fake"],
+        )
+
+
+@pytest.fixture
+def service():
+    service = RealCrewAIService.__new__(RealCrewAIService)
+    service.db_service = FakeDatabase()
+    service.cache_manager = EmptyCache()
+    service.spoonacular_service = FakeSpoonacular()
+    service.foreground_crew = FakeCrew()
+    return service
+
+
+@pytest.fixture
+def client(service):
+    app = FastAPI()
+    app.include_router(chat_router.router)
+    app.dependency_overrides[chat_router.get_crew_ai_service] = lambda: service
+    return TestClient(app)
+
+
+def test_message_runs_every_stage_and_reports_timings(client, service):
+    response = client.post("/chat/message", json={"message": "dinner ideas", "user_id": 7})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [recipe["id"] for recipe in body["recipes"]] == [1, 2]
+    assert [item["name"] for item in body["pantry_items"]] == ["chicken", "rice"]
+    assert body["user_preferences"]["dietary_restrictions"] == ["vegetarian"]
+
+    metadata = body["metadata"]
+    assert set(metadata["stage_timings_ms"]) == STAGES
+    assert metadata["degraded_stages"] == {}
+    assert metadata["total_ms"] >= 0
+    assert metadata["agents_used"] == ["fake"]
+
+    # Pantry items are read once and shared by the artifact and candidate stages
+    assert service.spoonacular_service.searches == [["chicken", "rice"]]
+    crew_input = service.foreground_crew.inputs[0]
+    assert crew_input.pantry_artifact.normalized_items == PANTRY
+    assert crew_input.context == {"meal_type": "dinner"}
+
+
+def test_message_without_preferences_skips_the_preference_artifact(client, service):
+    response = client.post(
+        "/chat/message", json={"message": "quick lunch", "use_preferences": False}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["user_preferences"] == {}
+    assert service.foreground_crew.inputs[0].preference_artifact is None
+
+
+def test_slow_candidate_search_degrades_instead_of_failing(client, service, monkeypatch):
+    monkeypatch.setattr(real_crewai_service, "CHAT_SPOONACULAR_STAGE_TIMEOUT", 0.05)
+    service.spoonacular_service = FakeSpoonacular(delay=1.0)
+
+    response = client.post("/chat/message", json={"message": "dinner"})
+
+    assert response.status_code == 200
+    metadata = response.json()["metadata"]
+    assert list(metadata["degraded_stages"]) == ["recipe_candidates"]
+    assert service.foreground_crew.inputs[0].recipe_candidates == []
@@ -0,0 +1,198 @@
+"""Tests for the streaming chat endpoint and RealCrewAIService.stream_recommendations"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend_gateway.config.database import get_database_service
+from backend_gateway.routers import chat_streaming_router
+from backend_gateway.routers.chat_streaming_router import ChatStreamingService
+from backend_gateway.services.real_crewai_service import RealCrewAIService
+
+PANTRY = [{"product_name": "chicken"}, {"product_name": "rice"}]
+CANDIDATES = [
+    {"id": 1, "title": "Chicken Rice", "usedIngredientCount": 2, "missedIngredientCount": 1},
+    {"id": 2, "title": "Fried Rice", "usedIngredientCount": 1, "missedIngredientCount": 3},
+]
+DETAILS = {
+    "1": {
+        "id": 1,
+        "readyInMinutes": 25,
+        "servings": 2,
+        "vegetarian": False,
+        "nutrition": {"nutrients": [{"name": "Calories", "amount": 512.4}]},
+    },
+    "2": {"id": 2, "readyInMinutes": 15, "servings": 4, "vegetarian": True},
+}
+
+
+class FakeDatabase:
+    def get_user_pantry_items(self, user_id):
+        return PANTRY
+
+    def get_user_preferences(self, user_id):
+        return None
+
+
+class EmptyCache:
+    def get_pantry_artifact(self, user_id):
+        return None
+
+    def get_preference_artifact(self, user_id):
+        return None
+
+
+class FakeSpoonacular:
+    def __init__(self, details_delay=0.0):
+        self.details_delay = details_delay
+        self.details_cancelled = False
+
+    async def search_recipes_by_ingredients(self, ingredients, number, ranking):
+        return [dict(recipe) for recipe in CANDIDATES]
+
+    async def get_recipe_information_bulk(self, recipe_ids, include_nutrition=False):
+        try:
+            await asyncio.sleep(self.details_delay)
+        except asyncio.CancelledError:
+            self.details_cancelled = True
+            raise
+        return {str(recipe_id): DETAILS[str(recipe_id)] for recipe_id in recipe_ids}
+
+
+class FakeCacheManager:
+    async def ensure_fresh_cache(self, user_id, db_service, force_refresh=False):
+        return None
+
+
+class FakeHistogram:
+    def __init__(self):
+        self.observed = []
+
+    def observe(self, value):
+        self.observed.append(value)
+
+
+@pytest.fixture
+def crew_service():
+    service = RealCrewAIService.__new__(RealCrewAIService)
+    service.db_service = FakeDatabase()
+    service.cache_manager = EmptyCache()
+    service.spoonacular_service = FakeSpoonacular()
+    return service
+
+
+@pytest.fixture(autouse=True)
+def histogram(monkeypatch):
+    histogram = FakeHistogram()
+    monkeypatch.setattr(chat_streaming_router, "CHAT_TIME_TO_FIRST_RECIPE", histogram)
+    return histogram
+
+
+@pytest.fixture
+def streaming_service(crew_service, monkeypatch, tmp_path):
+    # BackgroundFlowManager creates its cache directory relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    service = ChatStreamingService(FakeDatabase())
+    service.cache_manager = FakeCacheManager()
+    service._crew_service = crew_service
+    monkeypatch.setattr(chat_streaming_router, "chat_streaming_service", service)
+    return service
+
+
+@pytest.fixture
+def client(streaming_service):
+    app = FastAPI()
+    app.include_router(chat_streaming_router.router)
+    app.dependency_overrides[get_database_service] = FakeDatabase
+    return TestClient(app)
+
+
+def _events(body: str) -> list:
+    return [
+        line[len("data: ") :] if line == "data: [DONE]" else json.loads(line[len("data: ") :])
+        for line in body.split("\n\n")
+        if line
+    ]
+
+
+def test_stream_sends_cards_then_updates(client, streaming_service, histogram):
+    response = client.post("/api/v1/chat/stream", json={"message": "what's for dinner?"})
+
+    assert response.status_code == 200
+    events = _events(response.text)
+    assert [event if event == "[DONE]" else event["type"] for event in events] == [
+        "message_start",
+        "recipe_recommendation",
+        "recipe_recommendation",
+        "recipe_update",
+        "recipe_update",
+        "message_complete",
+        "[DONE]",
+    ]
+
+    cards = events[1:3]
+    assert [card["recipe_data"]["id"] for card in cards] == [1, 2]
+    assert [card["index"] for card in cards] == [1, 2]
+    assert cards[0]["total_found"] == 2
+    assert "Uses 2 of your ingredients" in cards[0]["content"]
+
+    updates = {event["recipe_id"]: event for event in events[3:5]}
+    assert updates[1]["index"] == 1
+    assert updates[1]["delta"]["ready_in_minutes"] == 25
+    assert updates[1]["delta"]["nutrition"] == {"calories": 512}
+    assert updates[2]["delta"]["dietary_info"] == ["Vegetarian"]
+
+    assert events[5]["content"].startswith("Found 2 great recipes")
+    assert events[5]["timing"]["time_to_first_recipe_ms"] is not None
+    assert len(histogram.observed) == 1
+    snapshot = streaming_service.metrics.snapshot()
+    assert (snapshot["streams"], snapshot["completed"]) == (1, 1)
+    assert snapshot["time_to_first_recipe_ms"]["samples"] == 1
+
+
+def test_quick_endpoint_merges_updates_into_cards(client):
+    response = client.post("/api/v1/chat/quick", json={"message": "dinner"})
+
+    assert response.status_code == 200
+    recommendations = response.json()["recommendations"]
+    assert [recipe["title"] for recipe in recommendations] == ["Chicken Rice", "Fried Rice"]
+    assert recommendations[0]["ready_in_minutes"] == 25
+    assert recommendations[0]["used_ingredient_count"] == 2
+
+
+def test_general_messages_do_not_observe_time_to_first_recipe(client, histogram):
+    events = _events(client.post("/api/v1/chat/stream", json={"message": "help"}).text)
+
+    assert [event if event == "[DONE]" else event["type"] for event in events] == [
+        "message_complete",
+        "[DONE]",
+    ]
+    assert histogram.observed == []
+
+
+async def test_disconnect_stops_the_stream_and_cancels_enrichment(streaming_service, crew_service):
+    crew_service.spoonacular_service = FakeSpoonacular(details_delay=10)
+    sent = []
+
+    async def is_disconnected():
+        # Like Request.is_disconnected, this lets other tasks run. The client goes away
+        # once the first card has been sent
+        await asyncio.sleep(0)
+        return any('"recipe_recommendation"' in chunk for chunk in sent)
+
+    async for chunk in streaming_service.process_message_stream(
+        "dinner recipes", 7, {}, is_disconnected=is_disconnected
+    ):
+        sent.append(chunk)
+
+    assert [json.loads(chunk[len("data: ") :])["type"] for chunk in sent] == [
+        "message_start",
+        "recipe_recommendation",
+    ]
+    await asyncio.sleep(0)
+    assert crew_service.spoonacular_service.details_cancelled
+    assert streaming_service.metrics.disconnected == 1
+    assert streaming_service.metrics.completed == 0
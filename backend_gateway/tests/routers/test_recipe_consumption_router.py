@@ -0,0 +1,122 @@
+"""Tests for the ingredient availability check in /recipe-consumption"""
+
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend_gateway.routers import recipe_consumption_router
+
+TODAY = date.today()
+
+
+def _pantry_item(item_id, name, quantity, unit, *, expires_in=None, created_at=None):
+    return {
+        "item_id": item_id,
+        "product_name": name,
+        "quantity": quantity,
+        "quantity_unit": unit,
+        "expiration_date": (
+            (TODAY + timedelta(days=expires_in)).isoformat() if expires_in is not None else None
+        ),
+        "created_at": created_at,
+    }
+
+
+class FakePantryService:
+    def __init__(self, items):
+        self.items = items
+
+    async def get_user_pantry_items(self, user_id):
+        return self.items
+
+
+class FakeSpoonacular:
+    def __init__(self, ingredients):
+        self.ingredients = ingredients
+
+    async def get_recipe_information(self, recipe_id):
+        return {
+            "id": recipe_id,
+            "extendedIngredients": [
+                {"name": name, "amount": amount, "unit": unit}
+                for name, amount, unit in self.ingredients
+            ],
+        }
+
+
+@pytest.fixture
+def check():
+    def check(pantry, ingredients, servings=1):
+        app = FastAPI()
+        app.include_router(recipe_consumption_router.router)
+        app.dependency_overrides[recipe_consumption_router.get_pantry_service_dep] = lambda: (
+            FakePantryService(pantry)
+        )
+        app.dependency_overrides[recipe_consumption_router.get_spoonacular_service] = lambda: (
+            FakeSpoonacular(ingredients)
+        )
+        response = TestClient(app).post(
+            "/recipe-consumption/check-ingredients",
+            json={"user_id": 1, "recipe_id": 9, "servings": servings},
+        )
+        assert response.status_code == 200
+        return {row["ingredient_name"]: row for row in response.json()["ingredients"]}
+
+    return check
+
+
+def test_quantities_are_compared_in_base_units(check):
+    # 2 cups of flour is 250 g and 1 liter of milk is over 1 kg
+    result = check(
+        [_pantry_item(1, "flour", 200, "g"), _pantry_item(2, "milk", 1, "liter")],
+        [("flour", 2, "cups"), ("milk", 500, "g")],
+    )
+
+    assert result["flour"]["status"] == "partial"
+    assert result["milk"]["status"] == "available"
+    assert result["flour"]["required_quantity"] == 2
+    assert result["flour"]["required_unit"] == "cups"
+    assert result["flour"]["pantry_matches"][0]["quantity_available"] == 200
+
+
+def test_servings_scale_the_requirement(check):
+    pantry = [_pantry_item(1, "flour", 200, "g")]
+
+    assert check(pantry, [("flour", 1, "cup")])["flour"]["status"] == "available"
+    scaled = check(pantry, [("flour", 1, "cup")], servings=2)["flour"]
+    assert scaled["status"] == "partial"
+    assert scaled["required_quantity"] == 2
+
+
+def test_unconvertible_units_fall_back_to_raw_quantities(check):
+    # "large" eggs have no piece weight, so 3 eggs cover 2 as plain counts
+    result = check(
+        [_pantry_item(1, "eggs", 3, "each"), _pantry_item(2, "saffron", 1, "pinch")],
+        [("eggs", 2, "large"), ("saffron", 5, "threads")],
+    )
+
+    assert result["eggs"]["status"] == "available"
+    assert result["saffron"]["status"] == "partial"
+
+
+def test_ingredients_not_in_the_pantry_are_missing(check):
+    result = check([_pantry_item(1, "flour", 200, "g")], [("Butter", 2, "tbsp")])
+
+    assert result["Butter"]["status"] == "missing"
+    assert result["Butter"]["pantry_matches"] == []
+
+
+def test_matches_are_sorted_by_expiry_then_newest(check):
+    pantry = [
+        _pantry_item(1, "milk", 1, "cup"),
+        _pantry_item(2, "milk", 1, "cup", expires_in=5, created_at="2026-01-01T00:00:00"),
+        _pantry_item(3, "milk", 1, "cup", expires_in=2, created_at="2026-01-01T00:00:00"),
+        _pantry_item(4, "milk", 1, "cup", expires_in=5, created_at="2026-02-01T00:00:00"),
+    ]
+
+    matches = check(pantry, [("milk", 3, "cups")])["milk"]["pantry_matches"]
+
+    assert [match["pantry_item_id"] for match in matches] == [3, 4, 2, 1]
+    assert [match["days_until_expiry"] for match in matches] == [2, 5, 5, None]
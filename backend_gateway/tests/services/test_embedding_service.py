@@ -0,0 +1,172 @@
+"""Tests for embedding request coalescing, micro-batching and rate limiting"""
+
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+
+from backend_gateway.services import embedding_service
+from backend_gateway.services.embedding_service import EmbeddingService, TokenBucket
+
+
+def _vector(text: str) -> np.ndarray:
+    return np.array([len(text), sum(map(ord, text))], dtype=np.float32)
+
+
+class FakeClient:
+    """Answers embedding requests like the OpenAI API, with a vector derived from each text"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    async def post(self, url, json):
+        self.calls.append(json["input"])
+        request = httpx.Request("POST", url)
+        if self.fail:
+            return httpx.Response(500, text="upstream error", request=request)
+        data = [
+            {"index": i, "embedding": base64.b64encode(_vector(text).astype("<f4")).decode()}
+            for i, text in reversed(list(enumerate(json["input"])))
+        ]
+        return httpx.Response(200, json={"data": data}, request=request)
+
+
+class FakeDatabase:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+
+    async def execute_query_async(self, query, params=None):
+        self.queries.append((query, params))
+        return self.rows if "SELECT" in query else []
+
+
+@pytest.fixture
+def make_service():
+    def make(client=None, db_service=None, max_batch_size=100) -> EmbeddingService:
+        service = EmbeddingService(api_key="test-key", db_service=db_service)
+        service.client = client or FakeClient()
+        service.max_batch_size = max_batch_size
+        service.batch_window = 0.001
+        return service
+
+    return make
+
+
+async def test_concurrent_requests_for_one_text_share_an_api_call(make_service):
+    service = make_service()
+
+    results = await asyncio.gather(*(service.generate_embedding("tomato") for _ in range(5)))
+
+    assert service.client.calls == [["tomato"]]
+    for result in results:
+        np.testing.assert_array_equal(result.embedding, _vector("tomato"))
+    assert service.stats()["coalesced"] == 4
+    assert service.stats()["in_flight"] == 0
+
+    await service.generate_embedding("tomato")
+    assert len(service.client.calls) == 1
+    assert service.stats()["memory_hits"] == 1
+
+
+async def test_batches_respect_the_size_limit(make_service):
+    service = make_service(max_batch_size=3)
+    texts = [f"item {n}" for n in range(7)]
+
+    results = await service.generate_embeddings_batch(texts)
+
+    assert [len(call) for call in service.client.calls] == [3, 3, 1]
+    assert sorted(text for call in service.client.calls for text in call) == texts
+    for text, result in zip(texts, results):
+        assert result.text == text
+        np.testing.assert_array_equal(result.embedding, _vector(text))
+
+
+async def test_failed_batch_rejects_every_waiter(make_service):
+    service = make_service(client=FakeClient(fail=True))
+
+    outcomes = await asyncio.gather(
+        service.generate_embedding("a"),
+        service.generate_embedding("b"),
+        service.generate_embedding("a"),
+        return_exceptions=True,
+    )
+
+    assert len(service.client.calls) == 1
+    assert all(isinstance(outcome, httpx.HTTPStatusError) for outcome in outcomes)
+    assert service.stats()["in_flight"] == 0
+    assert await service.generate_embeddings_batch(["a", "b"]) == []
+
+    # Nothing from the failed batch is cached, so the next request retries
+    service.client.fail = False
+    result = await service.generate_embedding("a")
+    np.testing.assert_array_equal(result.embedding, _vector("a"))
+
+
+async def test_database_tier_is_read_before_the_api_and_written_after(make_service):
+    service = make_service()
+    cached_key = service._cache_key("tomato")
+    db = FakeDatabase(rows=[{"item_name": cached_key, "embedding": [1.0, 2.0]}])
+    service.db_service = db
+
+    results = await service.generate_embeddings_batch(["tomato", "basil"])
+
+    np.testing.assert_array_equal(results[0].embedding, [1.0, 2.0])
+    assert service.client.calls == [["basil"]]
+    assert service.stats()["db_hits"] == 1
+    await asyncio.gather(*service._flush_tasks)
+    insert, params = db.queries[-1]
+    assert "INSERT INTO food_item_embeddings" in insert
+    assert params["key0"] == service._cache_key("basil") and params["text0"] == "basil"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record TokenBucket waits instead of sleeping"""
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(round(delay, 6))
+
+    monkeypatch.setattr(embedding_service.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+async def test_token_bucket_throttles_past_its_capacity(sleeps):
+    bucket = TokenBucket(rate=1e-9, capacity=2)
+
+    await bucket.acquire()
+    await bucket.acquire()
+    assert sleeps == []
+
+    await bucket.acquire()
+    assert len(sleeps) == 1 and sleeps[0] > 1e8
+    assert bucket.waits == 1
+
+
+async def test_token_bucket_queues_concurrent_callers_in_order(sleeps):
+    bucket = TokenBucket(rate=1e-3, capacity=2)
+
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+
+    assert [round(wait) for wait in sleeps] == [1000, 2000, 3000]
+
+
+async def test_token_bucket_refills_over_time(sleeps, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(embedding_service, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    for _ in range(3):
+        await bucket.acquire()
+    assert sleeps == [0.1]
+
+    now[0] += 1.0
+    await bucket.acquire(5)
+    await bucket.acquire()
+    # A request larger than the capacity takes the whole bucket, not more
+    assert sleeps == [0.1, 0.1]
@@ -0,0 +1,171 @@
+"""Tests for resolving food names to OWID and FAO dataset keys"""
+
+import json
+
+import pytest
+
+from backend_gateway.services.environmental_impact_service import EnvironmentalImpactService
+from backend_gateway.services.food_name_resolver import FOOD_NAME_FUZZY_CUTOFF, FoodNameResolver
+from backend_gateway.services.food_waste_service import FoodWasteService
+
+ALIASES = {
+    "ground_beef": "beef",
+    "beef": "beef",
+    "eggs": "eggs",
+    "egg": "eggs",
+    "olive_oil": "olive_oil",
+    "extra_virgin_olive_oil": "olive_oil",
+    "broccoli": "broccoli",
+    "rice": "rice",
+}
+OWID_FOODS = {
+    food: food
+    for foods in EnvironmentalImpactService.OWID_TO_FOOD_MAPPING.values()
+    for food in foods
+}
+
+
+@pytest.fixture
+def resolver():
+    return FoodNameResolver.build(ALIASES)
+
+
+@pytest.fixture
+def owid():
+    return FoodNameResolver.build(OWID_FOODS)
+
+
+def test_exact_names_are_normalized(resolver):
+    assert resolver.resolve("Ground Beef") == "beef"
+    assert resolver.resolve("EGGS") == "eggs"
+    assert resolver.resolve("olive-oil") == "olive_oil"
+    assert resolver.resolve("") is None
+
+
+def test_phrases_prefer_the_longest_then_rightmost_name(resolver):
+    assert resolver.resolve("Lean Ground Beef 80/20") == "beef"
+    assert resolver.resolve("organic extra virgin olive oil") == "olive_oil"
+    assert resolver.resolve("egg fried rice") == "rice"
+
+
+def test_tokens_match_reordered_words_of_a_longer_name(resolver):
+    assert resolver.resolve("oil, olive") == "olive_oil"
+    assert resolver.resolve("extra virgin oil") == "olive_oil"
+
+
+def test_single_words_are_not_widened_to_longer_names(resolver, owid):
+    assert resolver.resolve("oil") is None
+    assert owid.resolve("butter") is None
+    assert owid.resolve("peanut butter") == "peanut_butter"
+
+
+@pytest.mark.parametrize(
+    "name", ["strawberry yogurt", "chicken stock", "apple juice", "tomato sauce"]
+)
+def test_product_words_stop_a_phrase_match(owid, name):
+    assert owid.resolve(name) is None
+
+
+def test_product_words_before_the_match_do_not_stop_it(owid):
+    assert owid.resolve("stock pot chicken") == "chicken"
+    assert owid.resolve("olive oil") == "olive_oil"
+
+
+def test_misspellings_resolve_above_the_cutoff(resolver, owid):
+    assert FOOD_NAME_FUZZY_CUTOFF == 0.85
+    assert resolver.resolve("brocoli") == "broccoli"
+    assert owid.resolve("brocoli") == "broccoli"
+    assert FoodNameResolver.build(ALIASES, fuzzy_cutoff=0.95).resolve("brocoli") is None
+    # "eggplant" shares only its first letters with "egg"
+    assert owid.resolve("eggplant") is None
+    assert owid.resolve("licorice") is None
+
+
+def test_answers_are_memoized(resolver):
+    resolver.resolve("ground beef")
+    resolver.resolve("ground beef")
+
+    assert resolver.stats() == {"names": len(ALIASES) - 1, "memo_hits": 1, "memo_misses": 1}
+
+
+def test_index_is_reused_while_the_aliases_are_unchanged(tmp_path):
+    path = tmp_path / "food_name_index.json"
+    FoodNameResolver.load_or_build(ALIASES, path)
+    index = json.loads(path.read_text())
+    # Marks the saved index so a reload from disk can be told apart from a rebuild
+    index["names"]["ground beef"] = "from_disk"
+    path.write_text(json.dumps(index))
+
+    assert FoodNameResolver.load_or_build(ALIASES, path).resolve("ground beef") == "from_disk"
+
+
+def test_stale_index_is_rebuilt_and_saved(tmp_path):
+    path = tmp_path / "food_name_index.json"
+    FoodNameResolver.load_or_build(ALIASES, path)
+    stale_source = json.loads(path.read_text())["source"]
+
+    aliases = {**ALIASES, "tofu": "tofu"}
+    resolver = FoodNameResolver.load_or_build(aliases, path)
+
+    assert resolver.resolve("silken tofu") == "tofu"
+    saved = json.loads(path.read_text())
+    assert saved["source"] == resolver.source != stale_source
+    assert "tofu" in saved["names"]
+
+
+def test_unreadable_index_is_rebuilt(tmp_path):
+    path = tmp_path / "food_name_index.json"
+    path.write_text("{not json")
+
+    assert FoodNameResolver.load_or_build(ALIASES, path).resolve("beef") == "beef"
+    assert json.loads(path.read_text())["names"]["beef"] == "beef"
+
+
+def test_food_impact_is_looked_up_through_the_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = EnvironmentalImpactService()
+    service._impact_data = {
+        "eggs": {"owid_product": "Eggs"},
+        "broccoli": {"owid_product": "Brassicas"},
+    }
+    service._load_resolver()
+
+    assert service.get_food_impact("Large Eggs")["owid_product"] == "Eggs"
+    assert service.get_food_impact("brocoli")["owid_product"] == "Brassicas"
+    assert service.get_food_impact("eggplant") is None
+
+
+@pytest.fixture
+def waste_service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = FoodWasteService()
+    # A distinct loss rate per CPC code, so every code a name lands on is visible
+    service._loss_data = {
+        cpc: {"median_loss_pct": index + 1}
+        for index, cpc in enumerate(FoodWasteService.CPC_TO_FOOD_SAMPLES)
+    }
+    return service
+
+
+def _keyword_loss_rate(service, name):
+    """get_loss_rate as it was before the resolver: first CPC with a sample in the name"""
+    cpc = service._cpc_keywords.first(name.lower())
+    return service._loss_data[cpc]["median_loss_pct"] / 100 if cpc else None
+
+
+def test_loss_rates_of_sample_names_match_the_keyword_pass(waste_service):
+    samples = [food for foods in FoodWasteService.CPC_TO_FOOD_SAMPLES.values() for food in foods]
+    changed = {
+        name
+        for name in samples
+        if waste_service.get_loss_rate(name) != _keyword_loss_rate(waste_service, name)
+    }
+
+    # The keyword pass found "potato" inside "sweet_potatoes" first
+    assert changed == {"sweet_potatoes"}
+    assert waste_service._cpc_resolver.resolve("sweet_potatoes") == "01352"
+
+
+def test_unresolved_names_keep_the_keyword_loss_rate(waste_service):
+    for name in ["apple juice", "chicken stock", "tomato sauce"]:
+        assert waste_service.get_loss_rate(name) == _keyword_loss_rate(waste_service, name)
@@ -0,0 +1,52 @@
+"""Tests for PhraseLookup, the precompiled substring index over catalog phrases"""
+
+import random
+
+import pytest
+
+from backend_gateway.services.ingredient_matcher_service import PhraseLookup
+
+PHRASES = ["chicken breast", "chicken", "rice", "brown rice", "egg", "eggplant", "oil", "olive oil"]
+
+
+def _random_texts(count: int = 300, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = PHRASES + ["fresh", "stock", "plant", "bro", "ken", "ri", ""]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 3))) for _ in range(count)]
+
+
+def test_phrase_lookup_matches_substring_loops():
+    lookup = PhraseLookup(PHRASES)
+
+    for text in _random_texts():
+        contained = [i for i, phrase in enumerate(PHRASES) if phrase in text]
+        containing = [i for i, phrase in enumerate(PHRASES) if text and text in phrase]
+        overlapping = sorted(set(contained) | set(containing))
+
+        assert lookup.contained_in(text) == contained, text
+        assert lookup.containing(text) == containing, text
+        assert lookup.overlapping(text) == overlapping, text
+        assert lookup.first_overlapping(text) == (overlapping[0] if overlapping else None), text
+
+
+def test_phrase_lookup_text_spanning_phrases_does_not_match():
+    lookup = PhraseLookup(["rice", "egg"])
+
+    assert lookup.containing("rice\negg") == []
+    assert lookup.containing("ce") == [0]
+
+
+@pytest.mark.parametrize("phrases", [[], ["rice"]])
+def test_phrase_lookup_empty_text(phrases):
+    lookup = PhraseLookup(phrases)
+
+    assert lookup.containing("") == []
+    assert lookup.overlapping("") == []
+    assert lookup.first_overlapping("") is None
+
+
+def test_phrase_lookup_without_phrases():
+    lookup = PhraseLookup([])
+
+    assert lookup.overlapping("rice") == []
+    assert lookup.first_overlapping("rice") is None
@@ -0,0 +1,86 @@
+"""Tests for aggregating parsed ingredients by name"""
+
+import pytest
+
+from backend_gateway.services.ingredient_parser_service import IngredientParserService
+
+
+@pytest.fixture
+def parser():
+    return IngredientParserService()
+
+
+def _parsed(*rows):
+    return [
+        {"aggregatable": {"name": name, "quantity": qty, "unit": unit}} for name, qty, unit in rows
+    ]
+
+
+def _totals(aggregated):
+    return {row["item_name"]: (row["quantity"], row["unit"]) for row in aggregated}
+
+
+def test_rows_sharing_one_unit_are_summed_in_that_unit(parser):
+    aggregated = parser.aggregate_ingredients(
+        _parsed(("flour", 2, "cup"), ("flour", 3, "cup"), ("eggs", 2, "unit"), ("eggs", 1, "unit"))
+    )
+
+    assert _totals(aggregated) == {"flour": (5, "cup"), "eggs": (3, "unit")}
+    assert aggregated[0]["category"] == "Grains"
+
+
+def test_volumes_are_summed_in_the_most_readable_unit(parser):
+    assert _totals(
+        parser.aggregate_ingredients(
+            _parsed(
+                ("sugar", 1, "tablespoon"),
+                ("sugar", 2, "teaspoon"),
+                ("milk", 3, "cup"),
+                ("milk", 2, "cup"),
+                ("milk", 1, "pint"),
+            )
+        )
+    ) == {"sugar": (1.67, "tablespoon"), "milk": (1.75, "quart")}
+
+
+def test_weights_are_summed_in_the_most_readable_unit(parser):
+    assert _totals(
+        parser.aggregate_ingredients(
+            _parsed(
+                ("salt", 8, "ounce"),
+                ("salt", 100, "gram"),
+                ("yeast", 500, "milligram"),
+                ("yeast", 1, "gram"),
+            )
+        )
+    ) == {"salt": (11.53, "ounce"), "yeast": (1.5, "gram")}
+
+
+def test_volume_and_weight_are_added_by_density(parser):
+    # 1 cup of flour is 125 g
+    assert _totals(
+        parser.aggregate_ingredients(_parsed(("flour", 1, "cup"), ("flour", 100, "gram")))
+    ) == {"flour": (7.94, "ounce")}
+
+
+def test_unconvertible_mixed_units_keep_the_first_unit(parser):
+    assert _totals(
+        parser.aggregate_ingredients(_parsed(("garlic", 2, "clove"), ("garlic", 1, "unit")))
+    ) == {"garlic": (2, "clove")}
+
+
+def test_single_rows_pass_through_unchanged(parser):
+    assert parser.aggregate_ingredients(_parsed(("garlic", 3, "clove"))) == [
+        {"item_name": "garlic", "quantity": 3, "unit": "clove", "category": "Produce"}
+    ]
+
+
+def test_rows_without_a_name_are_skipped(parser):
+    ingredients = _parsed(("rice", 1, "cup")) + [
+        {"original": "salt to taste"},
+        {"aggregatable": {"quantity": 1, "unit": "cup"}},
+        {"aggregatable": None},
+    ]
+
+    assert _totals(parser.aggregate_ingredients(ingredients)) == {"rice": (1, "cup")}
+    assert parser.aggregate_ingredients([]) == []
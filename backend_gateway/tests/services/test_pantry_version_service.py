@@ -0,0 +1,143 @@
+"""Tests for memoized pantry versions and the caches keyed on them"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend_gateway.services import pantry_version_service, recipe_cache_service
+from backend_gateway.services.pantry_version_service import PantryVersionService
+from backend_gateway.services.recipe_cache_service import RecipeCacheService
+
+
+class UndefinedTable(Exception):
+    pgcode = "42P01"
+
+
+class FakeDatabase:
+    """pantry_versions rows by user; error is raised by every read when set"""
+
+    def __init__(self, versions=None, error=None):
+        self.versions = dict(versions or {})
+        self.error = error
+        self.reads = 0
+
+    def execute_query(self, query, params=None):
+        self.reads += 1
+        if self.error is not None:
+            raise self.error
+        version = self.versions.get(params["user_id"])
+        return [{"version": version}] if version is not None else []
+
+    async def execute_query_async(self, query, params=None):
+        return self.execute_query(query, params)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the memo TTL"""
+    now = [1000.0]
+    monkeypatch.setattr(pantry_version_service, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase({1: 5, 2: 9})
+    monkeypatch.setattr(pantry_version_service, "_db", lambda: db)
+    return db
+
+
+def test_versions_are_memoized_for_the_ttl(clock, db):
+    versions = PantryVersionService(ttl_s=2)
+
+    assert versions.get(1) == "v5"
+    db.versions[1] = 6
+    clock[0] += 1.9
+    assert versions.get(1) == "v5"
+    assert db.reads == 1
+
+    clock[0] += 0.1
+    assert versions.get(1) == "v6"
+    assert db.reads == 2
+    assert versions.stats()["hits"] == 1 and versions.stats()["reads"] == 2
+
+
+def test_unknown_users_are_at_version_zero(clock, db):
+    assert PantryVersionService().get(3) == "v0"
+
+
+async def test_async_reads_share_the_memo(clock, db):
+    versions = PantryVersionService(ttl_s=2)
+
+    assert await versions.get_async(1) == "v5"
+    assert versions.get(1) == "v5"
+    assert db.reads == 1
+
+
+def test_bump_drops_one_users_memo(clock, db):
+    versions = PantryVersionService(ttl_s=60)
+    versions.get(1)
+    versions.get(2)
+    db.versions.update({1: 6, 2: 10})
+
+    versions.bump(1)
+
+    assert versions.get(1) == "v6"
+    assert versions.get(2) == "v9"
+
+
+def test_bump_without_user_drops_every_memo(clock, db):
+    versions = PantryVersionService(ttl_s=60)
+    versions.get(1)
+    versions.get(2)
+    db.versions.update({1: 6, 2: 10})
+
+    versions.bump()
+
+    assert (versions.get(1), versions.get(2)) == ("v6", "v10")
+
+
+def test_missing_table_falls_back_to_local_write_counters(clock, db):
+    db.error = UndefinedTable("relation pantry_versions does not exist")
+    versions = PantryVersionService(ttl_s=60)
+
+    first = versions.get(1)
+    assert first.startswith("local-")
+    assert versions.stats()["table_available"] is False
+
+    versions.bump(1)
+    second = versions.get(1)
+    versions.bump()
+    third = versions.get(1)
+
+    assert len({first, second, third}) == 3
+    # The table is not looked up again once it is known to be missing
+    assert db.reads == 1
+
+
+def test_other_read_errors_are_retried(clock, db):
+    db.error = ConnectionError("database is restarting")
+    versions = PantryVersionService(ttl_s=2)
+
+    assert versions.get(1).startswith("local-")
+    assert versions.stats()["table_available"] is None
+
+    db.error = None
+    clock[0] += 2
+    assert versions.get(1) == "v5"
+    assert db.reads == 2
+
+
+def test_recipe_cache_entries_follow_the_pantry_version(monkeypatch):
+    version = ["v1"]
+    monkeypatch.setattr(recipe_cache_service, "get_pantry_version", lambda user_id: version[0])
+    cache = RecipeCacheService()
+    recipes = [{"id": n} for n in range(8)]
+
+    cache.cache_recipes(7, None, recipes)
+    assert len(cache.get_cached_recipes(7)) == cache.recipes_per_request
+    assert cache.get_cache_stats(7)["pantry_hash"] == "v1"
+
+    version[0] = "v2"
+    assert cache.get_cached_recipes(7) is None
+    assert cache.get_cache_stats(7) == {"cached": False}
@@ -0,0 +1,298 @@
+"""Tests for PostgresService query translation and async dispatch"""
+
+from contextlib import asynccontextmanager, contextmanager
+
+import pytest
+
+from backend_gateway.services import postgres_service
+from backend_gateway.services.postgres_service import (
+    DEFAULT_POOL_CONFIG,
+    PostgresService,
+    QueryTranslationCache,
+    translate_query,
+)
+
+
+class FakeConnection:
+    """Records asyncpg fetch/execute calls; extversion answers the pgvector version probe"""
+
+    def __init__(self, rows=(), status="UPDATE 0", extversion=None):
+        self.rows = list(rows)
+        self.status = status
+        self.extversion = extversion
+        self.calls = []
+
+    async def fetch(self, statement, *args):
+        if "pg_extension" in statement:
+            return [{"extversion": self.extversion}] if self.extversion else []
+        self.calls.append(("fetch", statement, args))
+        return self.rows
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.calls.append(("begin",))
+        yield
+        self.calls.append(("commit",))
+
+    async def execute(self, statement, *args):
+        self.calls.append(("execute", statement, args))
+        return self.status
+
+
+def make_service(conn=None, async_enabled=True):
+    """PostgresService without pools: sync queries are recorded, async ones go to conn"""
+    service = PostgresService.__new__(PostgresService)
+    service.pool_config = {**DEFAULT_POOL_CONFIG, "async_enabled": async_enabled}
+    service.sync_calls = []
+    service._iterative_scan_supported = None
+
+    def execute_query(query, params=None, fetch="all"):
+        service.sync_calls.append((query, params, fetch))
+        return [{"sync": True}]
+
+    @asynccontextmanager
+    async def get_async_connection():
+        if conn is None:
+            raise AssertionError("the asyncio pool should not be used")
+        yield conn
+
+    service.execute_query = execute_query
+    service.get_async_connection = get_async_connection
+    return service
+
+
+def test_repeated_names_share_one_positional_slot():
+    translated = translate_query(
+        "SELECT * FROM t WHERE a = %(x)s OR b = %(x)s AND c = %(y)s", ("x", "y")
+    )
+
+    assert translated.positional_statement == "SELECT * FROM t WHERE a = $1 OR b = $1 AND c = $2"
+    assert translated.param_order == ("x", "y")
+    assert translated.positional_args({"y": 2, "x": 1}) == [1, 2]
+
+
+def test_escaped_percent_becomes_literal_for_asyncpg_only():
+    translated = translate_query("SELECT * FROM t WHERE name LIKE 'a%%' AND id = %(id)s", ("id",))
+
+    assert translated.statement == "SELECT * FROM t WHERE name LIKE 'a%%' AND id = %(id)s"
+    assert translated.positional_statement == "SELECT * FROM t WHERE name LIKE 'a%' AND id = $1"
+
+
+def test_statement_without_params_is_left_as_is():
+    translated = translate_query("SELECT 'a%%'", ())
+
+    assert translated.positional_statement == "SELECT 'a%%'"
+    assert translated.param_order == ()
+    assert translated.positional_args(None) == []
+
+
+def test_at_params_do_not_replace_prefixes_of_longer_names():
+    translated = translate_query(
+        "UPDATE t SET unit = @unit, unit_price = @unit_price WHERE id = @id",
+        ("unit", "unit_price", "id"),
+    )
+
+    assert translated.statement == (
+        "UPDATE t SET unit = %(unit)s, unit_price = %(unit_price)s WHERE id = %(id)s"
+    )
+    assert (
+        translated.positional_statement == "UPDATE t SET unit = $1, unit_price = $2 WHERE id = $3"
+    )
+    assert not translated.returns_rows
+
+
+def test_bigquery_tables_and_types_are_rewritten():
+    translated = translate_query(
+        'SELECT CAST(q AS FLOAT64) FROM `"adsp-34002-on02-prep-sense.Inventory.pantry_items"`', ()
+    )
+
+    assert translated.statement == 'SELECT CAST(q AS NUMERIC) FROM "pantry_items"'
+
+
+@pytest.mark.parametrize(
+    "query, returns_rows",
+    [
+        ("SELECT 1", True),
+        ("  with x AS (SELECT 1) SELECT * FROM x", True),
+        ("INSERT INTO t (a) VALUES (1) RETURNING id", True),
+        ("UPDATE t SET a = 1", False),
+        ("DELETE FROM t", False),
+    ],
+)
+def test_returns_rows(query, returns_rows):
+    assert translate_query(query, ()).returns_rows is returns_rows
+
+
+def test_cache_keys_on_query_and_param_names():
+    cache = QueryTranslationCache(maxsize=4)
+    query = "SELECT * FROM t WHERE a = %(a)s"
+
+    first = cache.get(query, {"a": 1})
+    assert cache.get(query, {"a": 2}) is first
+    assert cache.get(query, None) is not first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = QueryTranslationCache(maxsize=2)
+    cache.get("SELECT 1", None)
+    cache.get("SELECT 2", None)
+    cache.get("SELECT 1", None)
+    cache.get("SELECT 3", None)
+
+    assert cache.stats()["evictions"] == 1
+    cache.get("SELECT 1", None)
+    assert cache.stats()["hits"] == 2
+    cache.get("SELECT 2", None)
+    assert cache.stats()["misses"] == 4
+
+
+async def test_async_query_fetches_translated_statement():
+    conn = FakeConnection(rows=[{"id": 1}])
+    service = make_service(conn)
+
+    rows = await service.execute_query_async(
+        "SELECT id FROM t WHERE a = %(a)s OR b = %(a)s", {"a": 5}
+    )
+
+    assert rows == [{"id": 1}]
+    assert conn.calls == [("fetch", "SELECT id FROM t WHERE a = $1 OR b = $1", (5,))]
+
+
+async def test_async_statement_reports_affected_rows():
+    conn = FakeConnection(status="INSERT 0 3")
+    service = make_service(conn)
+
+    assert await service.execute_query_async("INSERT INTO t SELECT 1", None) == [
+        {"affected_rows": 3}
+    ]
+
+
+async def test_tuple_params_fall_back_to_the_threaded_pool():
+    service = make_service()
+
+    rows = await service.execute_query_async(
+        "SELECT * FROM t WHERE id IN %(ids)s", {"ids": (1, 2)}, fetch="one"
+    )
+
+    assert rows == [{"sync": True}]
+    assert service.sync_calls == [("SELECT * FROM t WHERE id IN %(ids)s", {"ids": (1, 2)}, "one")]
+
+
+async def test_async_disabled_uses_the_threaded_pool():
+    service = make_service(async_enabled=False)
+
+    await service.execute_query_async("SELECT 1")
+
+    assert service.sync_calls == [("SELECT 1", None, "all")]
+
+
+VECTOR_QUERY = """
+SELECT * FROM (
+    SELECT id, embedding <=> %(q)s AS distance FROM items
+    ORDER BY distance LIMIT %(candidates)s
+) nearest WHERE distance <= %(max_distance)s LIMIT %(limit)s
+"""
+
+
+PARAMS = {"q": "v", "candidates": 8, "max_distance": 0.5, "limit": 2}
+
+
+def _settings_call(*settings):
+    placeholders = ", ".join(
+        f"set_config(${2 * i + 1}, ${2 * i + 2}, true)" for i in range(len(settings))
+    )
+    return ("execute", f"SELECT {placeholders}", tuple(arg for item in settings for arg in item))
+
+
+async def test_vector_search_over_fetches_candidates_in_one_transaction(monkeypatch):
+    monkeypatch.setattr(postgres_service, "VECTOR_ITERATIVE_SCAN", "")
+    conn = FakeConnection(rows=[{"id": 1, "distance": 0.1}])
+    service = make_service(conn)
+
+    rows = await service._vector_search(VECTOR_QUERY, {"q": "v"}, limit=5, similarity_threshold=0.8)
+
+    assert rows == [{"id": 1, "distance": 0.1}]
+    begin, settings, fetch, commit = conn.calls
+    assert (begin, commit) == (("begin",), ("commit",))
+    assert settings == _settings_call(("hnsw.ef_search", "40"))
+    # Parameters bind in first-use order: q, candidates, max_distance, limit
+    assert fetch[2][:2] == ("v", 20)
+    assert fetch[2][2] == pytest.approx(0.2)
+    assert fetch[2][3] == 5
+
+
+@pytest.mark.parametrize(
+    "limit, multiplier, ef_search",
+    [(5, None, "40"), (50, None, "200"), (10, 8, "80"), (400, None, "1000")],
+)
+async def test_ef_search_covers_the_candidate_count(monkeypatch, limit, multiplier, ef_search):
+    monkeypatch.setattr(postgres_service, "VECTOR_ITERATIVE_SCAN", "")
+    conn = FakeConnection()
+    service = make_service(conn)
+
+    await service._vector_search(
+        VECTOR_QUERY, {"q": "v"}, limit, 0.5, candidate_multiplier=multiplier
+    )
+
+    assert conn.calls[1] == _settings_call(("hnsw.ef_search", ef_search))
+
+
+async def test_iterative_scan_is_set_on_pgvector_0_8():
+    conn = FakeConnection(extversion="0.8.0")
+    service = make_service(conn)
+
+    await service._with_vector_settings(VECTOR_QUERY, PARAMS, ef_search=64)
+
+    assert conn.calls[1] == _settings_call(
+        ("hnsw.ef_search", "64"), ("hnsw.iterative_scan", "relaxed_order")
+    )
+
+
+@pytest.mark.parametrize("extversion", ["0.7.4", "0.5.1", None])
+async def test_iterative_scan_is_skipped_before_pgvector_0_8(extversion):
+    conn = FakeConnection(extversion=extversion)
+    service = make_service(conn)
+
+    await service._with_vector_settings(VECTOR_QUERY, PARAMS, ef_search=64)
+    conn.extversion = "0.8.0"
+    await service._with_vector_settings(VECTOR_QUERY, PARAMS, ef_search=64)
+
+    # The version is checked once per service
+    settings = [call for call in conn.calls if call[0] == "execute"]
+    assert settings == [_settings_call(("hnsw.ef_search", "64"))] * 2
+
+
+class FakeCursor:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def execute(self, statement, params=None):
+        self.calls.append((statement, params))
+
+    def fetchall(self):
+        return [{"id": 1}]
+
+
+async def test_vector_settings_without_asyncpg_use_set_config_on_the_cursor(monkeypatch):
+    monkeypatch.setattr(postgres_service, "VECTOR_ITERATIVE_SCAN", "")
+    service = make_service(async_enabled=False)
+    calls = []
+
+    @contextmanager
+    def get_cursor():
+        yield FakeCursor(calls)
+
+    service.get_cursor = get_cursor
+
+    rows = await service._with_vector_settings(VECTOR_QUERY, PARAMS, ef_search=2000)
+
+    assert rows == [{"id": 1}]
+    assert calls == [
+        (
+            "SELECT set_config(%(name)s, %(value)s, true)",
+            {"name": "hnsw.ef_search", "value": "1000"},
+        ),
+        (VECTOR_QUERY, PARAMS),
+    ]
@@ -0,0 +1,105 @@
+"""Tests that indexed recipe deduplication returns exactly what the all-pairs scan does"""
+
+import random
+
+import pytest
+
+from backend_gateway.services.recipe_deduplication_service import RecipeDeduplicationService
+
+TITLE_WORDS = ["spicy", "creamy", "roasted", "chicken", "salmon", "pasta", "curry", "soup", "rice"]
+# A small pantry, so unrelated recipes still share ingredients and blocking is exercised
+PANTRY = [f"ingredient{n}" for n in range(25)] + ["chicken", "onion", "garlic", "olive oil"]
+
+
+def _corpus(count: int, seed: int, duplicate_rate: float = 0.35) -> list[dict]:
+    """Spoonacular-shaped recipes with a share of lightly edited copies"""
+    rng = random.Random(seed)
+    recipes = []
+    for recipe_id in range(count):
+        if recipes and rng.random() < duplicate_rate:
+            base = rng.choice(recipes)
+            ingredients = list(base["extendedIngredients"])
+            if rng.random() < 0.5 and len(ingredients) > 3:
+                ingredients.pop(rng.randrange(len(ingredients)))
+            if rng.random() < 0.5:
+                ingredients.append({"name": rng.choice(PANTRY)})
+            recipes.append(
+                {
+                    "id": recipe_id,
+                    "title": base["title"] + rng.choice(["", " recipe", " (easy)"]),
+                    "readyInMinutes": base["readyInMinutes"] + rng.randint(-5, 5),
+                    "servings": base["servings"],
+                    "extendedIngredients": ingredients,
+                }
+            )
+            continue
+        recipes.append(
+            {
+                "id": recipe_id,
+                "title": " ".join(rng.sample(TITLE_WORDS, 3)).title(),
+                "readyInMinutes": rng.choice([15, 30, 45, 60]),
+                "servings": rng.randint(1, 8),
+                "extendedIngredients": [
+                    {"name": name} for name in rng.sample(PANTRY, rng.randint(3, 10))
+                ],
+            }
+        )
+    return recipes
+
+
+@pytest.mark.parametrize("threshold", [0.71, 0.75, 0.8, 0.85, 0.9, 0.95])
+@pytest.mark.parametrize("seed", [1, 2])
+def test_indexed_matches_all_pairs_scan(threshold, seed):
+    service = RecipeDeduplicationService(similarity_threshold=threshold)
+    corpus = _corpus(90, seed)
+
+    indexed_unique, indexed_dupes = service.deduplicate_recipes_indexed(corpus)
+    scan_unique, scan_dupes = service.deduplicate_recipes(corpus, use_index=False)
+
+    assert [r["id"] for r in indexed_unique] == [r["id"] for r in scan_unique]
+    assert indexed_dupes == scan_dupes
+
+
+def test_corpus_has_duplicates_to_find():
+    unique, dupes = RecipeDeduplicationService().deduplicate_recipes(_corpus(120, 1))
+
+    assert dupes and len(unique) + len(dupes) == 120
+
+
+def test_profile_similarity_matches_calculate_similarity():
+    service = RecipeDeduplicationService()
+    corpus = _corpus(40, 3)
+    profiles = [service._build_profile(recipe) for recipe in corpus]
+
+    for i in range(len(corpus)):
+        for j in range(i):
+            assert service._profile_similarity(profiles[i], profiles[j]) == pytest.approx(
+                service.calculate_similarity(corpus[i], corpus[j])
+            )
+
+
+def test_recipes_without_ingredients_or_title_match_the_scan():
+    corpus = _corpus(30, 4) + [
+        {"id": "no-ingredients", "title": "Spicy Chicken Curry", "readyInMinutes": 30},
+        {"id": "no-title", "extendedIngredients": [{"name": "chicken"}]},
+        {"id": "bad-ingredients", "title": "Creamy Soup", "extendedIngredients": [None]},
+    ]
+    service = RecipeDeduplicationService()
+
+    indexed = service.deduplicate_recipes_indexed(corpus)
+    scan = service.deduplicate_recipes(corpus, use_index=False)
+
+    assert [r["id"] for r in indexed[0]] == [r["id"] for r in scan[0]]
+    assert indexed[1] == scan[1]
+
+
+def test_low_thresholds_use_the_full_scan():
+    service = RecipeDeduplicationService(similarity_threshold=0.6)
+    corpus = _corpus(30, 5)
+
+    assert service.deduplicate_recipes(corpus) == service.deduplicate_recipes(
+        corpus, use_index=False
+    )
+    assert service.deduplicate_recipes_indexed(corpus) == service.deduplicate_recipes(
+        corpus, use_index=False
+    )
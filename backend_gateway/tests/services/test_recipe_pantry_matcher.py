@@ -0,0 +1,43 @@
+"""Tests for batch recipe-to-pantry matching"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from backend_gateway.services.recipe_pantry_matcher import (
+    PantryMatchIndex,
+    match_recipes_to_pantry,
+)
+
+
+def test_pantry_index_skips_empty_names():
+    index = PantryMatchIndex(["", "rice", ""], expiring=[True, True, False])
+
+    assert index.names == ["rice"]
+    assert index.expiring_names == ["rice"]
+    result = index.match_recipes([["", "brown rice"]])
+    assert result.matched_ingredients(0) == ["brown rice"]
+
+
+def test_match_recipes_to_pantry_counts_and_expiring_coverage():
+    today = date.today()
+    pantry = [
+        {"product_name": "Chicken Breast", "expiration_date": today + timedelta(days=2)},
+        {"product_name": "Rice", "expiration_date": str(today + timedelta(days=200))},
+        {"product_name": "Olive Oil – 500ml", "expiration_date": None},
+        {"product_name": "", "expiration_date": None},
+    ]
+    recipes = [
+        {"ingredients": ["chicken breast", "rice", "garlic"]},
+        {"ingredients": [{"name": "Olive oil"}, {"name": "Salt"}]},
+        {"ingredients": []},
+    ]
+
+    result = match_recipes_to_pantry(recipes, pantry)
+
+    assert result.matched_counts.tolist() == [2, 1, 0]
+    assert result.missing_counts.tolist() == [1, 1, 0]
+    assert result.match_scores.tolist() == pytest.approx([2 / 3, 0.5, 0.0])
+    assert result.expiring_counts.tolist() == [1, 0, 0]
+    assert result.expiring_coverage.tolist() == [1.0, 0.0, 0.0]
+    assert result.missing_ingredients(0) == ["garlic"]
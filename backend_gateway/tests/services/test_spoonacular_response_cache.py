@@ -0,0 +1,164 @@
+"""Tests for the two-tier Spoonacular response cache"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from backend_gateway.services import spoonacular_response_cache as cache_module
+from backend_gateway.services.spoonacular_response_cache import (
+    ENDPOINT_POLICIES,
+    SpoonacularResponseCache,
+    cache_key,
+    normalize_params,
+    served_from_cache,
+)
+
+SEARCH = ENDPOINT_POLICIES["complexSearch"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for freshness checks"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_params_are_normalized_for_keys():
+    assert normalize_params(
+        {"ingredients": "Tomato, onion,,tomato", "apiKey": "x", "number": 5, "sort": None}
+    ) == {"ingredients": "onion,tomato", "number": "5"}
+    assert normalize_params({"instructionsRequired": True}) == {"instructionsRequired": "true"}
+    assert cache_key("findByIngredients", {"ingredients": "a,b", "number": 3}) == cache_key(
+        "findByIngredients", {"number": "3", "ingredients": "B, a", "apiKey": "y"}
+    )
+
+
+async def test_memory_hit_returns_an_independent_copy():
+    cache = SpoonacularResponseCache()
+    await cache.store("information", {"id": 1}, {"title": "Soup", "tags": []})
+
+    first = await cache.lookup("information", {"id": 1})
+    first.value["tags"].append("mutated")
+    second = await cache.lookup("information", {"id": 1})
+
+    assert second.value == {"title": "Soup", "tags": []}
+    assert not second.stale
+    assert served_from_cache()
+    assert await cache.lookup("information", {"id": 2}) is None
+    assert not served_from_cache()
+
+
+async def test_memory_tier_is_lru_bounded():
+    cache = SpoonacularResponseCache(maxsize=2)
+    for recipe_id in (1, 2):
+        await cache.store("information", {"id": recipe_id}, recipe_id)
+    await cache.lookup("information", {"id": 1})
+    await cache.store("information", {"id": 3}, 3)
+
+    assert await cache.lookup("information", {"id": 2}) is None
+    assert (await cache.lookup("information", {"id": 1})).value == 1
+
+
+async def test_disk_tier_survives_a_new_instance(tmp_path):
+    await SpoonacularResponseCache(cache_dir=str(tmp_path)).store(
+        "information", {"id": 1}, {"title": "Soup"}
+    )
+
+    reloaded = SpoonacularResponseCache(cache_dir=str(tmp_path))
+    cached = await reloaded.lookup("information", {"id": 1})
+
+    assert cached.value == {"title": "Soup"}
+    assert reloaded.stats()["endpoints"]["information"]["disk_hits"] == 1
+    await reloaded.lookup("information", {"id": 1})
+    assert reloaded.stats()["endpoints"]["information"]["disk_hits"] == 1
+
+
+async def test_unreadable_disk_file_is_discarded(tmp_path):
+    cache = SpoonacularResponseCache(cache_dir=str(tmp_path))
+    path = cache._disk_path(cache_key("information", {"id": 1}))
+    path.write_text("{not json")
+
+    assert await cache.lookup("information", {"id": 1}) is None
+    assert not path.exists()
+
+
+async def test_entries_go_stale_then_expire(tmp_path, clock):
+    cache = SpoonacularResponseCache(cache_dir=str(tmp_path))
+    await cache.store("complexSearch", {"query": "soup"}, ["fresh"])
+
+    clock[0] += SEARCH.ttl + 1
+    cached = await cache.lookup("complexSearch", {"query": "soup"})
+    assert cached.value == ["fresh"] and cached.stale
+
+    clock[0] += SEARCH.stale_ttl
+    assert await cache.lookup("complexSearch", {"query": "soup"}) is None
+    assert list(tmp_path.glob("*.json")) == []
+
+
+async def test_get_or_fetch_fetches_once_and_revalidates_stale_entries(clock):
+    cache = SpoonacularResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(clock[0])
+        return len(calls)
+
+    assert await cache.get_or_fetch("complexSearch", {"query": "soup"}, fetch) == 1
+    assert await cache.get_or_fetch("complexSearch", {"query": "soup"}, fetch) == 1
+    assert len(calls) == 1
+
+    clock[0] += SEARCH.ttl + 1
+    assert await cache.get_or_fetch("complexSearch", {"query": "soup"}, fetch) == 1
+    await asyncio.gather(*cache._refreshing.values())
+    assert len(calls) == 2
+    assert await cache.get_or_fetch("complexSearch", {"query": "soup"}, fetch) == 2
+
+
+def _disk_files(directory) -> list[str]:
+    return sorted(path.name for path in directory.iterdir())
+
+
+async def test_disk_tier_drops_oldest_files_past_its_size_limit(tmp_path):
+    cache = SpoonacularResponseCache(cache_dir=str(tmp_path), disk_max_bytes=10_000)
+    body = "x" * 1000
+    for recipe_id in range(20):
+        await cache.store("information", {"id": recipe_id}, body)
+        path = cache._disk_path(cache_key("information", {"id": recipe_id}))
+        os.utime(path, (time.time() - 1000 + recipe_id, time.time() - 1000 + recipe_id))
+
+    sizes = [path.stat().st_size for path in tmp_path.glob("*.json")]
+    assert sum(sizes) <= 10_000
+    assert cache.stats()["disk_bytes"] == sum(sizes)
+
+    reloaded = SpoonacularResponseCache(cache_dir=str(tmp_path))
+    assert await reloaded.lookup("information", {"id": 0}) is None
+    assert (await reloaded.lookup("information", {"id": 19})).value == body
+
+
+async def test_disk_sweep_removes_expired_and_abandoned_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "_DISK_SWEEP_EVERY", 1)
+    cache = SpoonacularResponseCache(cache_dir=str(tmp_path))
+    await cache.store("information", {"id": 1}, "old")
+    old = cache._disk_path(cache_key("information", {"id": 1}))
+    long_ago = time.time() - cache_module._MAX_DISK_AGE - 10
+    os.utime(old, (long_ago, long_ago))
+    abandoned = tmp_path / "abc.123.tmp"
+    abandoned.write_text("partial")
+    os.utime(abandoned, (time.time() - 7200, time.time() - 7200))
+
+    await cache.store("information", {"id": 2}, "new")
+
+    assert _disk_files(tmp_path) == [cache._disk_path(cache_key("information", {"id": 2})).name]
+
+
+def test_unusable_cache_dir_keeps_memory_only(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    cache = SpoonacularResponseCache(cache_dir=str(blocker / "sub"))
+
+    assert cache.cache_dir is None
+    assert cache.stats()["disk_tier"] is None
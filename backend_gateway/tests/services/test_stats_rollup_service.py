@@ -0,0 +1,185 @@
+"""Tests for the stats rollup reads and their periodic rebuild"""
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+from backend_gateway.services import stats_rollup_service
+from backend_gateway.services.stats_rollup_service import (
+    RECIPE_COUNT_KEYS,
+    StatsRollupService,
+)
+
+
+class UndefinedTable(Exception):
+    pgcode = "42P01"
+
+
+class FakeDatabase:
+    """Answers the rollup, stale-user and refresh queries from in-memory state"""
+
+    def __init__(self, stale_users=(), failing_users=(), error=None):
+        self.stale_users = list(stale_users)
+        self.failing_users = set(failing_users)
+        self.error = error
+        self.rollup_row = None
+        self.queries = []
+
+    async def execute_query_async(self, query, params=None):
+        self.queries.append((query, params))
+        if self.error is not None:
+            raise self.error
+        if query == stats_rollup_service._ROLLUP_QUERY:
+            return [self.rollup_row]
+        if query == stats_rollup_service._STALE_USERS_QUERY:
+            return [{"user_id": user_id} for user_id in self.stale_users[: params["limit"]]]
+        if query == stats_rollup_service._REFRESH_QUERY:
+            if params["user_id"] in self.failing_users:
+                raise RuntimeError("refresh failed")
+            self.stale_users.remove(params["user_id"])
+            return []
+        raise AssertionError(f"unexpected query: {query}")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(stats_rollup_service, "_db", lambda: database)
+    return database
+
+
+def _rollup_row(**overrides):
+    row = {
+        "total_items": 10,
+        "expired_items": 2,
+        "expiring_soon": 3,
+        "unexpired_items": 8,
+        "avg_quantity": 1.5,
+        "recently_added": 4,
+        "top_categories": [{"category": "Dairy", "count": 5}],
+        "top_products": [{"product_name": "Milk", "purchase_count": 2}],
+        "shopping_by_day": [{"day_of_week": 1, "items_added": 4}],
+        "days_cooked": 3,
+        "total_recipes_cooked": 5,
+        "current_streak": 2,
+        "cooked_this_week": 1,
+        "cooked_this_month": 5,
+        "recipe_counts": {"user_id": 1, "total_recipes": 7, "saved_recipes": 2},
+        "items_used_in_recipes": 6,
+        "updated_at": datetime(2026, 1, 2, 3, 4, 5),
+        "refreshed_at": datetime(2026, 1, 1),
+        "staleness_seconds": 90,
+    }
+    row.update(overrides)
+    return row
+
+
+async def test_read_shapes_the_rollup_row(db):
+    db.rollup_row = _rollup_row()
+
+    stats = await StatsRollupService().read(1, date(2026, 1, 1))
+
+    assert stats["pantry"]["total_items"] == 10
+    assert stats["pantry"]["top_categories"] == [{"category": "Dairy", "count": 5}]
+    assert stats["cooking"]["current_streak"] == 2
+    assert stats["sustainability"]["food_saved_kg"] == pytest.approx(2.4)
+    assert stats["shopping"] == [{"day_of_week": 1, "items_added": 4}]
+    assert stats["recipes"]["total_recipes"] == 7
+    assert stats["recipes"]["liked_recipes"] == 0
+    assert set(stats["recipes"]) == set(RECIPE_COUNT_KEYS)
+    assert stats["freshness"] == {
+        "source": "rollups",
+        "updated_at": "2026-01-02T03:04:05",
+        "refreshed_at": "2026-01-01T00:00:00",
+        "staleness_seconds": 90.0,
+    }
+    assert db.queries[0][1] == {"user_id": 1, "start_day": date(2026, 1, 1)}
+
+
+async def test_read_of_a_user_without_rollups(db):
+    db.rollup_row = _rollup_row(
+        recipe_counts=None,
+        shopping_by_day=None,
+        updated_at=None,
+        refreshed_at=None,
+        staleness_seconds=None,
+    )
+
+    stats = await StatsRollupService().read(1, date(2026, 1, 1))
+
+    assert stats["shopping"] == []
+    assert all(count == 0 for count in stats["recipes"].values())
+    assert stats["freshness"]["refreshed_at"] is None
+    assert stats["freshness"]["staleness_seconds"] is None
+
+
+async def test_missing_tables_disable_reads_and_refreshes(db):
+    db.error = UndefinedTable("relation user_pantry_state does not exist")
+    service = StatsRollupService()
+
+    assert await service.read(1, date(2026, 1, 1)) is None
+    assert await service.read(1, date(2026, 1, 1)) is None
+    assert await service.refresh_stale() == 0
+    assert len(db.queries) == 1
+
+
+async def test_other_read_errors_are_retried(db):
+    db.error = RuntimeError("connection reset")
+    service = StatsRollupService()
+
+    assert await service.read(1, date(2026, 1, 1)) is None
+    db.error, db.rollup_row = None, _rollup_row()
+    assert (await service.read(1, date(2026, 1, 1)))["pantry"]["total_items"] == 10
+
+
+async def test_refresh_stale_runs_batches_until_no_user_is_stale(db):
+    db.stale_users = list(range(25))
+
+    assert await StatsRollupService().refresh_stale(batch_size=10) == 25
+    assert db.stale_users == []
+    stale_queries = [q for q, _ in db.queries if q == stats_rollup_service._STALE_USERS_QUERY]
+    assert len(stale_queries) == 3
+
+
+async def test_refresh_stale_skips_users_that_fail(db):
+    db.stale_users = list(range(12))
+    db.failing_users = {0, 5}
+
+    assert await StatsRollupService().refresh_stale(batch_size=5) == 10
+    assert db.stale_users == [0, 5]
+
+
+async def test_refresh_loop_starts_and_stops(db):
+    db.stale_users = [1, 2]
+    service = StatsRollupService()
+
+    service.start(interval_s=3600)
+    first_task = service._refresh_task
+    service.start(interval_s=3600)
+    assert service._refresh_task is first_task
+
+    for _ in range(100):
+        if not db.stale_users:
+            break
+        await asyncio.sleep(0)
+    assert db.stale_users == []
+
+    await service.stop()
+    assert first_task.cancelled()
+    assert service._refresh_task is None
+
+
+async def test_refresh_loop_ends_without_tables(db):
+    db.error = UndefinedTable("relation users does not exist")
+    service = StatsRollupService()
+
+    service.start(interval_s=3600)
+    await asyncio.wait_for(service._refresh_task, timeout=1)
+    await service.stop()
+
+
+def test_start_with_zero_interval_is_a_no_op():
+    service = StatsRollupService()
+    service.start(interval_s=0)
+    assert service._refresh_task is None
@@ -0,0 +1,128 @@
+"""Tests for the local unit conversion engine and the learned conversion cache"""
+
+import numpy as np
+import pytest
+
+from backend_gateway.constants.units import Unit, convert_quantity
+from backend_gateway.services.unit_conversion_engine import (
+    LearnedConversions,
+    UnitConversionEngine,
+    normalize_ingredient,
+)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return UnitConversionEngine()
+
+
+@pytest.mark.parametrize("from_unit", list(Unit), ids=lambda unit: unit.value)
+def test_engine_matches_convert_quantity_for_every_unit_pair(engine, from_unit):
+    for to_unit in Unit:
+        expected = convert_quantity(3.0, from_unit.value, to_unit.value)
+        converted = engine.convert(3.0, from_unit.value, to_unit.value)
+        if expected is None:
+            # The engine only goes further for gross, which it counts as 144 each
+            if {from_unit, to_unit} != {Unit.GROSS, Unit.EACH}:
+                assert converted is None, (from_unit, to_unit)
+        else:
+            assert converted == pytest.approx(expected), (from_unit, to_unit)
+
+
+def test_canonical_values_and_aliases_are_known(engine):
+    for unit in Unit:
+        assert engine.unit(unit.value) is not None, unit
+        assert engine.unit(unit) is not None, unit
+    assert engine.convert(500, "mg", "g") == pytest.approx(0.5)
+    assert engine.convert(2, "Tbsp.", "tsp") == pytest.approx(convert_quantity(2, "tbsp", "tsp"))
+
+
+def test_gross_counts_as_each(engine):
+    assert engine.convert(1, "gross", "each") == pytest.approx(144)
+
+
+def test_unknown_units_do_not_convert(engine):
+    assert engine.convert(1, "smidgen", "g") is None
+    assert engine.convert(1, "g", None) is None
+
+
+def test_volume_to_weight_needs_ingredient_data(engine):
+    assert engine.convert(1, "cup", "g") is None
+    key = next(iter(engine.densities))
+    grams = engine.convert(1, "ml", "g", key.replace("_", " "))
+    assert grams == pytest.approx(engine.densities[key])
+
+
+def test_piece_units_convert_through_piece_weights(engine):
+    key, pieces = next((k, p) for k, p in engine.piece_grams.items() if "each" not in p)
+    piece, grams = next(iter(pieces.items()))
+    assert engine.convert(2, piece, "g", key.replace("_", " ")) == pytest.approx(2 * grams)
+    assert engine.convert(2, piece, "g") is None
+
+
+def test_factor_is_memoized(engine):
+    engine.factor.cache_clear()
+    engine.convert(1, "kg", "lb")
+    engine.convert(2, "kg", "lb")
+    info = engine.factor.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_normalize_many_matches_scalar_conversion(engine):
+    names = ["sugar", "milk", "eggs", None, "salt"]
+    amounts = [250.0, 2.0, 3.0, 1.0, None]
+    units = ["mg", "cup", "each", "smidgen", Unit.TEASPOON]
+    result = engine.normalize_many(names, amounts, units)
+
+    assert result.amounts[0] == pytest.approx(0.25)
+    assert result.amounts[1] == pytest.approx(engine.convert(2, "cup", "ml"))
+    assert result.amounts[2] == pytest.approx(3)
+    assert np.isnan(result.amounts[3]) and np.isnan(result.amounts[4])
+    assert list(result.units) == ["g", "ml", "each", None, "ml"]
+
+
+def test_normalize_many_to_weight_uses_densities(engine):
+    key = next(iter(engine.densities))
+    name = key.replace("_", " ")
+    result = engine.normalize_many([name, name], [10.0, 5.0], ["ml", "kg"], to_weight=True)
+
+    assert result.amounts[0] == pytest.approx(10 * engine.densities[key])
+    assert result.amounts[1] == pytest.approx(5000)
+    assert list(result.units) == ["g", "g"]
+
+
+def test_normalize_many_empty(engine):
+    result = engine.normalize_many([], [], [], to_weight=True)
+    assert len(result.amounts) == 0 and len(result.units) == 0
+
+
+def test_normalize_ingredient():
+    assert normalize_ingredient("Fresh Tomatoes,") == "fresh tomato"
+    assert normalize_ingredient("Cherries") == "cherry"
+
+
+def test_learned_conversions_in_memory():
+    learned = LearnedConversions()
+    assert learned.get("flour", "cup", "g") is None
+
+    learned.put("Flour", Unit.CUP, "G", 120.0, "spoonacular", 0.9, "ok")
+    entry = learned.get("flour", "cup", "g")
+    assert entry == {"factor": 120.0, "method": "spoonacular", "confidence": 0.9, "message": "ok"}
+
+
+def test_learned_conversions_survive_restart(tmp_path):
+    LearnedConversions(cache_dir=str(tmp_path)).put("rice", "cup", "g", 185.0, "ai", 0.7)
+
+    reloaded = LearnedConversions(cache_dir=str(tmp_path))
+    assert reloaded.get("rice", "cup", "g")["factor"] == 185.0
+    assert reloaded.get("rice", "g", "cup") is None
+
+
+def test_learned_conversions_unusable_cache_dir_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    learned = LearnedConversions(cache_dir=str(blocker / "sub"))
+
+    assert learned.cache_dir is None
+    learned.put("oats", "cup", "g", 90.0, "ai", 0.5)
+    assert learned.get("oats", "cup", "g")["factor"] == 90.0
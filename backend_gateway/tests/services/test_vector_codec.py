@@ -0,0 +1,74 @@
+"""Tests for the pgvector binary codec and the psycopg2 vector adapter"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from backend_gateway.services.vector_codec import (
+    decode_binary,
+    encode_binary,
+    register_psycopg2_vector,
+    to_vector,
+    vector_literal,
+)
+
+
+@pytest.mark.parametrize(
+    "vector",
+    [[0.5, -1.25, 3.0], np.arange(1536, dtype=np.float32) / 7, []],
+    ids=["small", "1536", "empty"],
+)
+def test_binary_round_trip(vector):
+    data = encode_binary(vector)
+
+    assert struct.unpack_from(">HH", data) == (len(vector), 0)
+    assert len(data) == 4 + 4 * len(vector)
+    np.testing.assert_array_equal(decode_binary(data), np.asarray(vector, dtype=np.float32))
+
+
+def test_binary_round_trip_keeps_nan_and_infinity():
+    decoded = decode_binary(encode_binary([np.nan, np.inf, -0.0]))
+
+    assert np.isnan(decoded[0]) and decoded[1] == np.inf
+    assert np.signbit(decoded[2])
+
+
+def test_values_are_big_endian_float32():
+    assert encode_binary([1.0]) == b"\x00\x01\x00\x00" + struct.pack(">f", 1.0)
+    assert isinstance(decode_binary(encode_binary([1.0]))[0], float)
+
+
+@pytest.mark.parametrize("dimensions", [0, 2, 4])
+def test_wrong_dimension_header_is_rejected(dimensions):
+    body = encode_binary([1.0, 2.0, 3.0])[4:]
+
+    with pytest.raises(ValueError, match="dimensions"):
+        decode_binary(struct.pack(">HH", dimensions, 0) + body)
+
+
+def test_to_vector_accepts_every_stored_form():
+    expected = np.array([0.25, -2.0], dtype=np.float32)
+
+    for value in (
+        [0.25, -2.0],
+        expected.astype(np.float64),
+        "[0.25,-2]",
+        expected.astype("<f4").tobytes(),
+    ):
+        vector = to_vector(value)
+        assert vector.dtype == np.float32
+        np.testing.assert_array_equal(vector, expected)
+
+
+def test_psycopg2_adapter_renders_float32_arrays_as_vector_literals():
+    psycopg2_extensions = pytest.importorskip("psycopg2.extensions")
+    register_psycopg2_vector()
+
+    vector = np.array([0.1, -2.0, 3.5], dtype=np.float32)
+    quoted = psycopg2_extensions.adapt(vector).getquoted()
+
+    assert quoted == b"'[0.1,-2.0,3.5]'::vector"
+    assert vector_literal(vector) == "[0.1,-2.0,3.5]"
+    # Other arrays still bind as SQL arrays
+    assert psycopg2_extensions.adapt(np.array([1.0, 2.0])).getquoted() == b"ARRAY[1.0,2.0]"
@@ -0,0 +1,138 @@
+"""Tests for the in-process vector index fallback"""
+
+import numpy as np
+import pytest
+
+from backend_gateway.services import vector_index
+from backend_gateway.services.vector_index import InProcessVectorIndex, write_snapshot
+
+DIM = 16
+
+
+@pytest.fixture(autouse=True)
+def reload_every_search(monkeypatch):
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_RELOAD_S", 0.0)
+
+
+def _vectors(rows: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(rows, DIM)).astype(np.float32)
+
+
+def _write(directory, rows: int = 50, seed: int = 0) -> np.ndarray:
+    vectors = _vectors(rows, seed)
+    metadata = [{"recipe_id": i, "even": i % 2 == 0} for i in range(rows)]
+    write_snapshot("recipes", list(range(rows)), vectors, metadata, directory=str(directory))
+    return vectors
+
+
+def _exact(vectors: np.ndarray, query: np.ndarray, limit: int) -> list[int]:
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    return [int(i) for i in np.argsort(-scores)[:limit]]
+
+
+def _ids(results) -> list[int]:
+    return [metadata["recipe_id"] for metadata, _ in results]
+
+
+def test_search_matches_exact_cosine_ranking(tmp_path):
+    vectors = _write(tmp_path)
+    index = InProcessVectorIndex("recipes", directory=str(tmp_path))
+    query = _vectors(1, seed=1)[0]
+
+    results = index.search(query, limit=5, similarity_threshold=-2.0)
+
+    assert _ids(results) == _exact(vectors, query, 5)
+    similarities = [similarity for _, similarity in results]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_search_applies_threshold_and_where(tmp_path):
+    _write(tmp_path)
+    index = InProcessVectorIndex("recipes", directory=str(tmp_path))
+    query = _vectors(1, seed=2)[0]
+
+    results = index.search(query, limit=50, similarity_threshold=0.2, where=lambda m: m["even"])
+
+    assert results
+    assert all(metadata["even"] and similarity > 0.2 for metadata, similarity in results)
+
+
+def test_add_replaces_snapshot_row_and_adds_new_rows(tmp_path):
+    vectors = _write(tmp_path, rows=10)
+    index = InProcessVectorIndex("recipes", directory=str(tmp_path))
+
+    # Row 3 now points the opposite way, so it must not be the best match for its old vector
+    index.add(3, -vectors[3], {"recipe_id": 3, "even": False})
+    index.add(99, vectors[5], {"recipe_id": 99, "even": False})
+
+    results = index.search(vectors[3], limit=11, similarity_threshold=-2.0)
+    ids = _ids(results)
+    assert ids.count(3) == 1
+    assert ids[-1] == 3
+    assert _ids(index.search(vectors[5], limit=2))[:2] in ([5, 99], [99, 5])
+    assert index.stats()["rows"] == 11
+
+
+def test_adds_are_replayed_by_other_processes_and_after_restart(tmp_path):
+    vectors = _write(tmp_path, rows=10)
+    writer = InProcessVectorIndex("recipes", directory=str(tmp_path))
+    reader = InProcessVectorIndex("recipes", directory=str(tmp_path))
+
+    new_vector = _vectors(1, seed=3)[0]
+    writer.add(42, new_vector, {"recipe_id": 42, "even": True})
+
+    assert _ids(reader.search(new_vector, limit=1)) == [42]
+    restarted = InProcessVectorIndex("recipes", directory=str(tmp_path))
+    assert _ids(restarted.search(new_vector, limit=1)) == [42]
+    assert restarted.stats()["delta_rows"] == 1
+    assert _ids(restarted.search(vectors[0], limit=1)) == [0]
+
+
+def test_compact_folds_the_log_into_a_snapshot(tmp_path):
+    vectors = _write(tmp_path, rows=10)
+    index = InProcessVectorIndex("recipes", directory=str(tmp_path))
+    index.add(3, -vectors[3], {"recipe_id": 3, "even": False})
+    index.add(10, vectors[0] + 0.01, {"recipe_id": 10, "even": True})
+
+    assert index.compact() == 11
+    assert not (tmp_path / "recipes.log").exists()
+    stats = index.stats()
+    assert (stats["snapshot_rows"], stats["delta_rows"], stats["rows"]) == (11, 0, 11)
+
+    reopened = InProcessVectorIndex("recipes", directory=str(tmp_path))
+    query = _vectors(1, seed=4)[0]
+    assert _ids(reopened.search(query, limit=11, similarity_threshold=-2.0)) == _ids(
+        index.search(query, limit=11, similarity_threshold=-2.0)
+    )
+    assert _ids(reopened.search(-vectors[3], limit=1)) == [3]
+
+
+def test_ivf_search_with_every_list_probed_is_exact(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_IVF_MIN_ROWS", 100)
+    vectors = _write(tmp_path, rows=400)
+    index = InProcessVectorIndex("recipes", directory=str(tmp_path))
+    lists = index.stats()["ivf_lists"]
+    assert lists > 1
+
+    query = _vectors(1, seed=5)[0]
+    exact = _exact(vectors, query, 10)
+    assert _ids(index.search(query, limit=10, similarity_threshold=-2.0, nprobe=lists)) == exact
+
+    # A selective filter falls back to every row when the probed lists run short
+    results = index.search(
+        query, limit=5, similarity_threshold=-2.0, nprobe=1, where=lambda m: m["recipe_id"] < 5
+    )
+    assert sorted(_ids(results)) == [0, 1, 2, 3, 4]
+
+
+def test_missing_snapshot_is_an_empty_index(tmp_path):
+    index = InProcessVectorIndex("products", directory=str(tmp_path))
+
+    assert index.search(_vectors(1)[0]) == []
+    assert index.stats()["rows"] == 0
+
+
+def test_write_snapshot_rejects_misaligned_inputs(tmp_path):
+    with pytest.raises(ValueError):
+        write_snapshot("recipes", [1, 2], _vectors(2), [{}], directory=str(tmp_path))
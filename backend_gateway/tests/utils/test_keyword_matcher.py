@@ -0,0 +1,135 @@
+"""Tests that the compiled keyword tables give the results of the per-keyword loops"""
+
+import random
+import re
+
+import pytest
+
+from backend_gateway.utils.keyword_matcher import (
+    KeywordMatcher,
+    PatternTable,
+    keyword_matcher,
+    pattern_table,
+)
+
+# A small alphabet so random keywords overlap, nest and share prefixes
+ALPHABET = "abc -'"
+
+
+def _word(rng: random.Random, max_length: int = 4) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, max_length)))
+
+
+def _table(rng: random.Random) -> dict[str, list[str]]:
+    return {f"label_{i}": [_word(rng) for _ in range(rng.randint(0, 4))] for i in range(6)}
+
+
+def _naive_find(table, text: str, whole_words: bool) -> set:
+    if whole_words:
+        return {
+            label
+            for label, keywords in table.items()
+            if any(
+                keyword and re.search(rf"\b{re.escape(keyword)}\b", text) for keyword in keywords
+            )
+        }
+    return {
+        label
+        for label, keywords in table.items()
+        if any(keyword and keyword in text for keyword in keywords)
+    }
+
+
+@pytest.mark.parametrize("whole_words", [False, True])
+def test_find_matches_per_keyword_loops(whole_words):
+    rng = random.Random(23)
+    for _ in range(300):
+        table = _table(rng)
+        matcher = KeywordMatcher(table, whole_words=whole_words)
+        for _ in range(20):
+            text = _word(rng, max_length=12)
+            assert matcher.find(text) == _naive_find(table, text, whole_words), (table, text)
+
+
+def test_first_follows_table_order():
+    matcher = KeywordMatcher({"dairy": ["cheese", "milk"], "produce": ["apple", "milk"]})
+
+    assert matcher.first("apple and milk") == "dairy"
+    assert matcher.first("apple pie") == "produce"
+    assert matcher.first("bread", default="other") == "other"
+    assert matcher.first_of({"produce", "dairy"}) == "dairy"
+
+
+def test_nested_and_overlapping_keywords():
+    matcher = KeywordMatcher({"bake": ["bake"], "baked": ["baked"], "kedgeree": ["kedge"]})
+
+    assert matcher.find("baked kedge") == {"bake", "baked", "kedgeree"}
+    assert matcher.find("bakedge") == {"bake", "baked", "kedgeree"}
+    assert KeywordMatcher({"bake": ["bake"]}, whole_words=True).find("baked") == set()
+
+
+def test_empty_tables_and_keywords():
+    assert KeywordMatcher({}).find("anything") == set()
+    assert KeywordMatcher({"empty": [""]}).find("anything") == set()
+    assert KeywordMatcher({"x": ["a"]}).find("") == set()
+
+
+PATTERNS = {
+    "fruit": [r"\b(apple|apples|pear)\b", r"\bbanana\b"],
+    "snacks": [r"\b(chip|chips)\b", r".*bar\b", r"granola\s+bar"],
+    "dairy": [r"\b(milk|cheese)\b", r"\bapple\b"],
+}
+
+
+def _naive_matches(table, text: str) -> dict:
+    matched = {}
+    for label, patterns in table.items():
+        for pattern in patterns:
+            if re.search(pattern, text):
+                matched.setdefault(label, []).append(pattern)
+    return matched
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "apple",
+        "apples and pears",
+        "pear chips",
+        "granola   bar",
+        "candy bar with milk",
+        "pineapple",
+        "banana-bread",
+        "",
+    ],
+)
+def test_pattern_table_matches_per_pattern_search(text):
+    table = PatternTable(PATTERNS)
+
+    assert table.matches(text) == _naive_matches(PATTERNS, text)
+    expected_first = next(
+        ((label, p) for label, ps in PATTERNS.items() for p in ps if re.search(p, text)), None
+    )
+    assert table.first(text) == expected_first
+
+
+def test_pattern_table_random_keyword_patterns():
+    rng = random.Random(7)
+    for _ in range(200):
+        table = {
+            label: [rf"\b({'|'.join(keywords)})\b"]
+            for label, keywords in _table(rng).items()
+            if keywords
+        }
+        compiled = PatternTable(table)
+        for _ in range(20):
+            text = _word(rng, max_length=12)
+            assert compiled.matches(text) == _naive_matches(table, text), (table, text)
+
+
+def test_compiled_tables_are_shared_by_content():
+    table = {"a": ["x", "y"]}
+
+    assert keyword_matcher(table) is keyword_matcher({"a": ["x", "y"]})
+    assert keyword_matcher(table) is not keyword_matcher(table, whole_words=True)
+    assert pattern_table(PATTERNS) is pattern_table(dict(PATTERNS))
@@ -0,0 +1,145 @@
+"""Tests for the bounded SmartCache"""
+
+import time
+
+import pytest
+
+from backend_gateway.utils.smart_cache import SmartCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for TTL checks"""
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_get_returns_stored_value():
+    cache = SmartCache()
+    cache.set("recipes_1", {"title": "Soup"})
+
+    assert cache.get("recipes_1") == {"title": "Soup"}
+    assert cache.get("missing") is None
+    assert cache.get_stats()["hit_count"] == 1
+    assert cache.get_stats()["miss_count"] == 1
+
+
+def test_entries_expire_at_their_own_ttl(clock):
+    cache = SmartCache(default_ttl=100)
+    cache.set("short", 1, ttl=10)
+    cache.set("default", 2)
+
+    clock[0] += 11
+    assert cache.get("short") is None
+    assert cache.get("default") == 2
+
+    clock[0] += 100
+    assert cache.get("default") is None
+    assert cache.get_stats()["expirations"] == 2
+
+
+def test_get_ttl_rejects_older_entries(clock):
+    cache = SmartCache(default_ttl=100)
+    cache.set("key", "value")
+
+    clock[0] += 30
+    assert cache.get("key", ttl=60) == "value"
+    assert cache.get("key", ttl=20) is None
+
+
+def test_expired_entries_are_purged_on_set(clock):
+    cache = SmartCache()
+    for i in range(10):
+        cache.set(f"old_{i}", i, ttl=5)
+
+    clock[0] += 6
+    cache.set("new", "value")
+
+    assert len(cache) == 1
+    assert cache.get_stats()["expirations"] == 10
+
+
+def test_evicts_least_recently_used_over_max_entries():
+    cache = SmartCache(max_entries=3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.get("a")  # b is now the least recently used
+    cache.set("d", 4)
+
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in ("a", "c", "d")] == [1, 3, 4]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_evicts_over_max_bytes():
+    cache = SmartCache(max_bytes=2000)
+    for i in range(20):
+        cache.set(f"blob_{i}", "x" * 200)
+
+    stats = cache.get_stats()
+    assert stats["memory_bytes"] <= 2000
+    assert stats["evictions"] > 0
+    assert cache.get("blob_19") is not None
+    assert cache.get("blob_0") is None
+
+
+def test_value_larger_than_cache_is_not_stored():
+    cache = SmartCache(max_bytes=100)
+    cache.set("small", 1)
+    cache.set("huge", "x" * 1000)
+
+    assert cache.get("huge") is None
+    assert cache.get("small") == 1
+
+
+def test_overwrite_replaces_size_and_expiry(clock):
+    cache = SmartCache()
+    cache.set("key", "x" * 1000, ttl=5)
+    cache.set("key", "y", ttl=50)
+
+    clock[0] += 10
+    assert cache.get("key") == "y"
+    assert len(cache) == 1
+    assert cache.get_stats()["memory_bytes"] < 1000
+
+
+def test_invalidate_tag_removes_only_tagged_entries():
+    cache = SmartCache()
+    cache.set("search_1", 1, tags=["user_id=1"])
+    cache.set("search_2", 2, tags=["user_id=2"])
+    cache.set("other", 3, tags=["user_id=1"])
+
+    assert cache.invalidate_tag("user_id=1") == 2
+    assert cache.get("search_1") is None
+    assert cache.get("other") is None
+    assert cache.get("search_2") == 2
+    assert cache.invalidate_tag("user_id=1") == 0
+
+
+def test_invalidate_pattern_uses_prefix_index_and_substring_fallback():
+    cache = SmartCache()
+    cache.set("ocr_scan_abc", 1)
+    cache.set("ocr_scan_def", 2)
+    cache.set("ocr_receipt_abc", 3)
+    cache.set("recipes_abc", 4)
+
+    assert sorted(cache.keys_matching("ocr_scan_")) == ["ocr_scan_abc", "ocr_scan_def"]
+    assert cache.invalidate_pattern("ocr_scan_") == 2
+    assert cache.invalidate_pattern("abc") == 2
+    assert len(cache) == 0
+
+
+def test_delete_and_clear_drop_indexes():
+    cache = SmartCache()
+    cache.set("ocr_scan_1", 1, tags=["t"])
+    cache.delete("ocr_scan_1")
+
+    assert cache.keys_matching("ocr_scan_") == []
+    assert cache.invalidate_tag("t") == 0
+
+    cache.set("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get_stats()["memory_bytes"] == 0
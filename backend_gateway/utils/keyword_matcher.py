@@ -0,0 +1,178 @@
+"""
+Compiled keyword tables for single-pass text classification
+
+Item categorization and chat-message context extraction test short texts against
+{label: [keywords]} tables, one `keyword in text` or re.search at a time and one
+table after another. KeywordMatcher compiles a whole table (or several, with
+namespaced labels) into one regex and returns every label it hits in a single
+pass over the text. PatternTable does the same for tables of regex patterns: the
+ones that are plain keyword alternations such as r"\\b(apple|apples)\\b" go through
+a whole-word KeywordMatcher and only the rest are searched one by one.
+
+The regex is a lookahead tried at every position of the text, with the keywords
+folded into a prefix trie so each position reports its longest keyword; the shorter
+keywords that also start there are its prefixes, whose labels are merged in
+ahead of time. That gives exactly the hits of the per-keyword loops, including
+overlapping and nested keywords.
+
+Matching is case sensitive; callers lowercase the text as before. Compiled tables
+are memoized by content, so services that rebuild their tables per instance
+share one compiled copy.
+"""
+
+import re
+from collections.abc import Hashable, Iterable, Mapping, Sequence
+from functools import lru_cache
+from typing import Any, Optional
+
+# r"\b(a|b|c)\b" or r"\bword\b" with nothing but literal text inside
+_LITERAL_PATTERN = re.compile(r"\\b\((?P<alternatives>[\w '&|-]+)\)\\b|\\b(?P<word>[\w '&-]+)\\b")
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Alternation of keywords factored by common prefix, e.g. "bake(?:d)?|bbq".
+
+    The regex engine tries alternatives one after another, so a flat list costs a
+    comparison per keyword at every position; in trie form only one branch can
+    match each character. Optional suffixes are greedy, so the longest keyword
+    starting at a position wins.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node: dict) -> str:
+        branches = [
+            re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return body + "?" if len(branches) == 1 and len(branches[0]) == 1 else f"(?:{body})?"
+        return body
+
+    return pattern(trie)
+
+
+class KeywordMatcher:
+    """Every label of a {label: keywords} table found in a text, in one regex pass"""
+
+    def __init__(self, table: Mapping[Hashable, Iterable[str]], whole_words: bool = False):
+        self.whole_words = whole_words
+        self._order = {label: index for index, label in enumerate(table)}
+
+        labels_by_keyword: dict[str, set] = {}
+        for label, keywords in table.items():
+            for keyword in keywords:
+                if keyword:
+                    labels_by_keyword.setdefault(keyword, set()).add(label)
+
+        # Each keyword also stands for the shorter keywords it starts with
+        self._labels: dict[str, frozenset] = {}
+        for keyword, labels in labels_by_keyword.items():
+            merged = set(labels)
+            for end in range(1, len(keyword)):
+                prefix_labels = labels_by_keyword.get(keyword[:end])
+                if prefix_labels and (
+                    not whole_words
+                    or _is_word_char(keyword[end - 1]) != _is_word_char(keyword[end])
+                ):
+                    merged |= prefix_labels
+            self._labels[keyword] = frozenset(merged)
+
+        alternation = _trie_pattern(labels_by_keyword)
+        if not alternation:
+            self._regex = None
+        elif whole_words:
+            self._regex = re.compile(rf"(?=\b({alternation})\b)")
+        else:
+            self._regex = re.compile(rf"(?=({alternation}))")
+
+    def find(self, text: str) -> set:
+        """All labels with a keyword in text"""
+        hits: set = set()
+        if self._regex is not None:
+            for match in self._regex.finditer(text):
+                hits |= self._labels[match.group(1)]
+        return hits
+
+    def first(self, text: str, default: Any = None) -> Any:
+        """The earliest label in table order with a keyword in text"""
+        return self.first_of(self.find(text), default)
+
+    def first_of(self, hits: set, default: Any = None) -> Any:
+        """The earliest label in table order among hits returned by find()"""
+        return min(hits, key=self._order.__getitem__) if hits else default
+
+
+class PatternTable:
+    """Every pattern of a {label: [regex patterns]} table that matches a text"""
+
+    def __init__(self, table: Mapping[Hashable, Sequence[str]]):
+        keyword_table: dict[tuple, list[str]] = {}
+        self._searched: dict[tuple, re.Pattern] = {}
+        self._patterns: list[tuple] = []
+
+        for label, patterns in table.items():
+            for pattern in patterns:
+                key = (label, pattern)
+                self._patterns.append(key)
+                literal = _LITERAL_PATTERN.fullmatch(pattern)
+                if literal:
+                    keyword_table[key] = (literal["alternatives"] or literal["word"]).split("|")
+                else:
+                    self._searched[key] = re.compile(pattern)
+
+        self._keywords = KeywordMatcher(keyword_table, whole_words=True)
+
+    def matches(self, text: str) -> dict[Hashable, list[str]]:
+        """Matched patterns by label, both in table order"""
+        hits = self._keywords.find(text)
+        matched: dict[Hashable, list[str]] = {}
+        for key in self._patterns:
+            if key in hits or (key in self._searched and self._searched[key].search(text)):
+                matched.setdefault(key[0], []).append(key[1])
+        return matched
+
+    def first(self, text: str) -> Optional[tuple[Hashable, str]]:
+        """(label, pattern) of the first matching pattern in table order"""
+        hits = self._keywords.find(text)
+        for key in self._patterns:
+            if key in hits or (key in self._searched and self._searched[key].search(text)):
+                return key
+        return None
+
+
+def _freeze(table: Mapping[Hashable, Iterable[str]]) -> tuple:
+    return tuple((label, tuple(entries)) for label, entries in table.items())
+
+
+@lru_cache(maxsize=64)
+def _keyword_matcher(frozen: tuple, whole_words: bool) -> KeywordMatcher:
+    return KeywordMatcher(dict(frozen), whole_words)
+
+
+@lru_cache(maxsize=64)
+def _pattern_table(frozen: tuple) -> PatternTable:
+    return PatternTable(dict(frozen))
+
+
+def keyword_matcher(
+    table: Mapping[Hashable, Iterable[str]], whole_words: bool = False
+) -> KeywordMatcher:
+    """Compiled KeywordMatcher for table, shared by every caller with the same table"""
+    return _keyword_matcher(_freeze(table), whole_words)
+
+
+def pattern_table(table: Mapping[Hashable, Sequence[str]]) -> PatternTable:
+    """Compiled PatternTable for table, shared by every caller with the same table"""
+    return _pattern_table(_freeze(table))
@@ -5,9 +5,14 @@ Implements TTL-based caching with pantry state awareness
 
 import asyncio
 import hashlib
+import heapq
 import json
 import logging
+import os
+import sys
+import threading
 import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 from functools import wraps
 from typing import Any, Callable, Optional
@@ -15,83 +20,243 @@ from typing import Any, Callable, Optional
 logger = logging.getLogger(__name__)
 
 
+def _estimate_size(value: Any, _seen: Optional[set[int]] = None) -> int:
+    """Approximate deep size of a cached value in bytes"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            _estimate_size(k, _seen) + _estimate_size(v, _seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(_estimate_size(item, _seen) for item in value)
+    if hasattr(value, "__dict__"):
+        # Plain objects and pydantic models (e.g. OCR responses) keep fields in __dict__
+        return size + _estimate_size(vars(value), _seen)
+    return size
+
+
+class _CacheEntry:
+    __slots__ = ("value", "stored_at", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, stored_at: float, expires_at: float, size: int, tags):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
 class SmartCache:
-    """TTL-based cache with content-aware keys"""
+    """
+    Bounded LRU cache with per-entry TTLs and tag/prefix invalidation.
+
+    Entries are evicted least-recently-used first once either max_entries or
+    max_bytes (approximate deep size of the cached values) is exceeded. Every
+    operation is O(1) or O(log n) and holds a lock only briefly without awaiting,
+    so one instance can be shared by threads and coroutines.
+    """
 
-    def __init__(self, default_ttl: int = 3600):
-        self.cache: dict[str, tuple[Any, float]] = {}
+    # Keys are indexed under their first few "_"-delimited prefixes ("ocr_", "ocr_scan_")
+    INDEXED_PREFIX_DEPTH = 3
+
+    def __init__(
+        self, default_ttl: int = 3600, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024
+    ):
         self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._prefix_index: dict[str, set[str]] = defaultdict(set)
+        self._tag_index: dict[str, set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+        self.total_bytes = 0
         self.hit_count = 0
         self.miss_count = 0
-
-    def _is_expired(self, timestamp: float, ttl: int) -> bool:
-        """Check if cache entry is expired"""
-        return time.time() - timestamp > ttl
-
-    def _cleanup_expired(self):
-        """Remove expired entries from cache"""
-        current_time = time.time()
-        expired_keys = [
-            key
-            for key, (_, timestamp) in self.cache.items()
-            if current_time - timestamp > self.default_ttl
-        ]
-
-        for key in expired_keys:
-            del self.cache[key]
+        self.eviction_count = 0
+        self.expired_count = 0
+
+    def _prefixes(self, key: str) -> list[str]:
+        prefixes = []
+        end = key.find("_")
+        while end != -1 and len(prefixes) < self.INDEXED_PREFIX_DEPTH:
+            prefixes.append(key[: end + 1])
+            end = key.find("_", end + 1)
+        return prefixes
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry and its index references (caller holds the lock)"""
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+        for prefix in self._prefixes(key):
+            keys = self._prefix_index.get(prefix)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._prefix_index[prefix]
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop entries whose TTL has passed, soonest-expiring first (caller holds the lock)"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Skip heap records left behind by entries that were overwritten or deleted
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expired_count += 1
+
+        # Overwritten keys leave dead heap records behind; rebuild when they dominate
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [(e.expires_at, k) for k, e in self._entries.items()]
+            heapq.heapify(self._expiry_heap)
 
     def get(self, key: str, ttl: Optional[int] = None) -> Optional[Any]:
-        """Get value from cache"""
-        if key not in self.cache:
-            self.miss_count += 1
-            return None
-
-        value, timestamp = self.cache[key]
-        cache_ttl = ttl or self.default_ttl
-
-        if self._is_expired(timestamp, cache_ttl):
-            del self.cache[key]
-            self.miss_count += 1
-            return None
-
-        self.hit_count += 1
-        return value
-
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
-        """Set value in cache"""
-        # Periodic cleanup
-        if len(self.cache) > 1000:  # Arbitrary limit
-            self._cleanup_expired()
+        """
+        Get value from cache
 
-        self.cache[key] = (value, time.time())
+        ttl, if given, additionally rejects entries stored more than ttl seconds ago.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.miss_count += 1
+                return None
+
+            if now >= entry.expires_at or (ttl is not None and now - entry.stored_at > ttl):
+                self._remove(key)
+                self.expired_count += 1
+                self.miss_count += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hit_count += 1
+            return entry.value
+
+    def set(
+        self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[list[str]] = None
+    ):
+        """Set value in cache, optionally tagged for invalidate_tag()"""
+        now = time.time()
+        size = _estimate_size(key) + _estimate_size(value)
+        expires_at = now + (ttl if ttl is not None else self.default_ttl)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size > self.max_bytes:
+                logger.debug(f"Not caching {key}: {size} bytes exceeds cache limit")
+                return
+
+            entry = _CacheEntry(value, now, expires_at, size, tuple(tags or ()))
+            self._entries[key] = entry
+            self.total_bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            for prefix in self._prefixes(key):
+                self._prefix_index[prefix].add(key)
+            for tag in entry.tags:
+                self._tag_index[tag].add(key)
+
+            self._purge_expired(now)
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.eviction_count += 1
 
     def delete(self, key: str):
         """Delete key from cache"""
-        if key in self.cache:
-            del self.cache[key]
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _delete_keys(self, keys) -> int:
+        with self._lock:
+            keys = [key for key in keys if key in self._entries]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Delete every entry stored with the given tag; returns the number removed"""
+        with self._lock:
+            return self._delete_keys(list(self._tag_index.get(tag, ())))
+
+    def keys_matching(self, pattern: str) -> list[str]:
+        """
+        Keys matching pattern.
+
+        A pattern that is an indexed key prefix (e.g. "ocr_scan_") or a tag is
+        looked up directly and matches keys starting with / tagged with it; any
+        other pattern falls back to a substring scan over every key.
+        """
+        with self._lock:
+            if pattern in self._prefix_index:
+                return list(self._prefix_index[pattern])
+            if pattern in self._tag_index:
+                return list(self._tag_index[pattern])
+            return [key for key in self._entries if pattern in key]
+
+    def invalidate_pattern(self, pattern: str) -> int:
+        """Delete every entry matched by keys_matching(pattern); returns the number removed"""
+        with self._lock:
+            return self._delete_keys(self.keys_matching(pattern))
 
     def clear(self):
         """Clear all cache entries"""
-        self.cache.clear()
-        self.hit_count = 0
-        self.miss_count = 0
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._prefix_index.clear()
+            self._tag_index.clear()
+            self.total_bytes = 0
+            self.hit_count = 0
+            self.miss_count = 0
+            self.eviction_count = 0
+            self.expired_count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
     def get_stats(self) -> dict[str, Any]:
         """Get cache statistics"""
-        total_requests = self.hit_count + self.miss_count
-        hit_rate = (self.hit_count / total_requests) if total_requests > 0 else 0
-
-        return {
-            "size": len(self.cache),
-            "hit_count": self.hit_count,
-            "miss_count": self.miss_count,
-            "hit_rate": hit_rate,
-            "total_requests": total_requests,
-        }
+        with self._lock:
+            total_requests = self.hit_count + self.miss_count
+            hit_rate = (self.hit_count / total_requests) if total_requests > 0 else 0
+
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_count": self.hit_count,
+                "miss_count": self.miss_count,
+                "hit_rate": hit_rate,
+                "total_requests": total_requests,
+                "evictions": self.eviction_count,
+                "expirations": self.expired_count,
+            }
 
 
 # Global cache instance
-_global_cache = SmartCache()
+_global_cache = SmartCache(
+    max_entries=int(os.getenv("SMART_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("SMART_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
 
 
 def get_cache() -> SmartCache:
@@ -108,6 +273,11 @@ def generate_cache_key(*args, **kwargs) -> str:
     return hashlib.md5(key_string.encode()).hexdigest()
 
 
+def _user_tags(kwargs: dict[str, Any]) -> list[str]:
+    """Tag per-user results so invalidate_user_cache can find them without a scan"""
+    return [f"user_id={kwargs['user_id']}"] if "user_id" in kwargs else []
+
+
 def cache_with_pantry_state(ttl: int = 3600, include_pantry: bool = True):
     """
     Decorator for caching function results with pantry state awareness
@@ -147,7 +317,7 @@ def cache_with_pantry_state(ttl: int = 3600, include_pantry: bool = True):
             result = await func(*args, **kwargs)
 
             # Cache result
-            cache.set(cache_key, result, ttl)
+            cache.set(cache_key, result, ttl, tags=_user_tags(kwargs))
 
             return result
 
@@ -173,7 +343,7 @@ def cache_with_pantry_state(ttl: int = 3600, include_pantry: bool = True):
             result = func(*args, **kwargs)
 
             # Cache result
-            cache.set(cache_key, result, ttl)
+            cache.set(cache_key, result, ttl, tags=_user_tags(kwargs))
 
             return result
 
@@ -187,72 +357,28 @@ def cache_with_pantry_state(ttl: int = 3600, include_pantry: bool = True):
 
 
 async def _get_pantry_hash(user_id: int) -> str:
-    """Get hash of user's pantry state for cache key"""
+    """Get the user's pantry version for cache keys"""
     try:
-        from backend_gateway.config.database import get_database_service
-
-        db_service = get_database_service()
-
-        # Get pantry items with quantities and expiry dates
-        query = """
-            SELECT product_name, quantity, expiration_date, updated_at
-            FROM pantry_items
-            WHERE user_id = %s AND quantity > 0
-            ORDER BY product_name
-        """
-
-        items = db_service.execute_query(query, (user_id,))
-
-        # Create hash of pantry state
-        pantry_data = []
-        for item in items:
-            pantry_data.append(
-                {
-                    "name": item["product_name"],
-                    "quantity": item["quantity"],
-                    "expiry": str(item.get("expiration_date", "")),
-                    "updated": str(item.get("updated_at", "")),
-                }
-            )
+        from backend_gateway.services.pantry_version_service import get_pantry_version_async
 
-        pantry_string = json.dumps(pantry_data, sort_keys=True)
-        return hashlib.md5(pantry_string.encode()).hexdigest()[:8]
+        return await get_pantry_version_async(user_id)
 
     except Exception as e:
-        logger.warning(f"Error getting pantry hash for user {user_id}: {str(e)}")
+        logger.warning(f"Error getting pantry version for user {user_id}: {str(e)}")
         return "unknown"
 
 
 def invalidate_user_cache(user_id: int):
     """Invalidate all cache entries for a specific user"""
-    cache = get_cache()
+    removed = get_cache().invalidate_tag(f"user_id={user_id}")
+    logger.info(f"Invalidated {removed} cache entries for user {user_id}")
 
-    # Find all keys that contain this user_id
-    keys_to_delete = []
-    for key in cache.cache:
-        if f"user_id={user_id}" in key or f"args=({user_id}" in key:
-            keys_to_delete.append(key)
 
-    # Delete the keys
-    for key in keys_to_delete:
-        cache.delete(key)
-
-    logger.info(f"Invalidated {len(keys_to_delete)} cache entries for user {user_id}")
-
-
-def invalidate_pattern_cache(pattern: str):
+def invalidate_pattern_cache(pattern: str) -> int:
     """Invalidate all cache entries matching a pattern"""
-    cache = get_cache()
-
-    keys_to_delete = []
-    for key in cache.cache:
-        if pattern in key:
-            keys_to_delete.append(key)
-
-    for key in keys_to_delete:
-        cache.delete(key)
-
-    logger.info(f"Invalidated {len(keys_to_delete)} cache entries matching pattern: {pattern}")
+    removed = get_cache().invalidate_pattern(pattern)
+    logger.info(f"Invalidated {removed} cache entries matching pattern: {pattern}")
+    return removed
 
 
 class CacheStats:
@@ -269,20 +395,13 @@ class CacheStats:
     @staticmethod
     def get_memory_usage() -> dict[str, Any]:
         """Get approximate memory usage of cache"""
-        import sys
-
-        cache = get_cache()
-
-        total_size = 0
-        for key, (value, timestamp) in cache.cache.items():
-            total_size += sys.getsizeof(key)
-            total_size += sys.getsizeof(value)
-            total_size += sys.getsizeof(timestamp)
+        stats = get_cache().get_stats()
+        total_size = stats["memory_bytes"]
 
         return {
             "total_size_bytes": total_size,
             "total_size_mb": total_size / (1024 * 1024),
-            "entries": len(cache.cache),
+            "entries": stats["size"],
             "timestamp": datetime.now().isoformat(),
         }
 
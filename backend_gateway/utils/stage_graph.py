@@ -0,0 +1,139 @@
+"""
+Dependency-aware async stage runner.
+
+A request pipeline is declared as named stages, each listing the stages whose
+results it needs. Every stage starts as soon as its dependencies finish, so
+independent I/O runs concurrently and the pipeline takes about as long as its
+slowest dependency chain rather than the sum of all steps. Stages can have a
+timeout and a fallback; a non-required stage that fails, times out or runs past
+the overall budget yields its fallback and is reported as degraded instead of
+failing the request.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StageFailedError(Exception):
+    """Raised when a required stage fails or times out"""
+
+    def __init__(self, stage: str, cause: BaseException):
+        super().__init__(f"Stage '{stage}' failed: {cause}")
+        self.stage = stage
+        self.cause = cause
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline.
+
+    run receives a dict with the results of the stages listed in depends_on.
+    fallback is called to produce the result when a non-required stage fails.
+    """
+
+    name: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+    timeout: Optional[float] = None  # seconds
+    required: bool = False
+    fallback: Callable[[], Any] = lambda: None
+
+
+@dataclass
+class StageGraphResult:
+    results: dict[str, Any]
+    timings: dict[str, float] = field(default_factory=dict)  # milliseconds per stage
+    degraded: dict[str, str] = field(default_factory=dict)  # stage -> reason
+    total_ms: float = 0.0
+
+    def metadata(self) -> dict[str, Any]:
+        """Timing summary suitable for a response's metadata"""
+        return {
+            "stage_timings_ms": self.timings,
+            "degraded_stages": self.degraded,
+            "total_ms": self.total_ms,
+        }
+
+
+class StageGraph:
+    """Runs stages as soon as their dependencies are done, within an optional overall budget"""
+
+    def __init__(self, stages: list[Stage], budget: Optional[float] = None):
+        names = set()
+        for stage in stages:
+            if stage.name in names:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            missing = [dep for dep in stage.depends_on if dep not in names]
+            if missing:
+                # Declaration order doubles as a topological order, which rules out cycles
+                raise ValueError(f"Stage '{stage.name}' depends on undeclared stages {missing}")
+            names.add(stage.name)
+        self.stages = stages
+        self.budget = budget
+
+    async def run(self) -> StageGraphResult:
+        started = time.perf_counter()
+        deadline = started + self.budget if self.budget is not None else None
+        result = StageGraphResult(results={})
+        tasks: dict[str, asyncio.Task] = {}
+
+        for stage in self.stages:
+            dependencies = [tasks[dep] for dep in stage.depends_on]
+            tasks[stage.name] = asyncio.ensure_future(
+                self._run_stage(stage, dependencies, deadline, result)
+            )
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # Collect the remaining outcomes so no task exception goes unretrieved
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            result.total_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        return result
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        dependencies: list[asyncio.Task],
+        deadline: Optional[float],
+        result: StageGraphResult,
+    ) -> None:
+        # A failed required dependency raises here and fails the pipeline
+        await asyncio.gather(*dependencies)
+        inputs = {dep: result.results[dep] for dep in stage.depends_on}
+
+        timeout = stage.timeout
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.perf_counter())
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        started = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(stage.run(inputs), timeout=timeout)
+        except asyncio.TimeoutError as e:
+            value = self._degrade(stage, result, f"timed out after {timeout:.2f}s", e)
+        except Exception as e:
+            value = self._degrade(stage, result, f"{type(e).__name__}: {e}", e)
+        finally:
+            result.timings[stage.name] = round((time.perf_counter() - started) * 1000, 1)
+
+        result.results[stage.name] = value
+
+    @staticmethod
+    def _degrade(stage: Stage, result: StageGraphResult, reason: str, cause: Exception) -> Any:
+        if stage.required:
+            raise StageFailedError(stage.name, cause) from cause
+        logger.warning(f"Stage '{stage.name}' degraded: {reason}")
+        result.degraded[stage.name] = reason
+        return stage.fallback()